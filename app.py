@@ -9,18 +9,21 @@ Crypto Trading MCP System - Flask App
 4. 回測功能 (保留原有)
 """
 
-from flask import Flask, render_template, request, jsonify
+from flask import Flask, render_template, request, jsonify, g
 from flask_cors import CORS
 from flask_socketio import SocketIO, emit
 import sys
 import os
-import re
-from datetime import datetime
+import threading
+import uuid
 
 # Add current directory to path
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
 from config import Config
+from orchestrator import handlers
+from orchestrator.handlers import SESSION_COOKIE
+from orchestrator.intent_router import route
 
 app = Flask(__name__,
             template_folder='frontend/templates',
@@ -29,23 +32,69 @@ CORS(app)
 socketio = SocketIO(app, cors_allowed_origins="*")
 
 # Lazy initialization
-_agent = None
+_sessions = None
+_sessions_lock = threading.Lock()
 
 
-def get_agent():
-    """Lazy load CryptoAgent"""
-    global _agent
-    if _agent is None:
-        print("[INIT] Loading CryptoAgent...")
-        from orchestrator.agent import CryptoAgent
-        _agent = CryptoAgent(
-            ollama_host=Config.OLLAMA_URI.rstrip('/'),
-            model=Config.OLLAMA_MODEL,
-            timeout=60.0,
-            api_key=Config.OLLAMA_API_KEY
-        )
-        print(f"[INIT] ✅ CryptoAgent loaded (model: {Config.OLLAMA_MODEL})")
-    return _agent
+def get_sessions():
+    """Lazy load the per-session agent store"""
+    global _sessions
+    if _sessions is None:
+        with _sessions_lock:
+            if _sessions is None:
+                from orchestrator.sessions import SessionStore
+                _sessions = SessionStore(handlers.create_agent)
+                print(f"[INIT] ✅ Session store ready (model: {Config.OLLAMA_MODEL}, "
+                      f"max sessions: {_sessions.max_sessions})")
+    return _sessions
+
+
+def get_agent(session_id: str):
+    """CryptoAgent of one chat session"""
+    return get_sessions().get(session_id)
+
+
+def _http_session_id() -> str:
+    """Session id from the request body or cookie; a new one is issued via cookie"""
+    data = request.get_json(silent=True) or {}
+    session_id = data.get('session_id') or request.cookies.get(SESSION_COOKIE)
+    if not session_id:
+        session_id = uuid.uuid4().hex
+        g.new_session_id = session_id
+    return session_id
+
+
+@app.after_request
+def _set_session_cookie(response):
+    session_id = g.pop('new_session_id', None)
+    if session_id:
+        response.set_cookie(SESSION_COOKIE, session_id, httponly=True, samesite='Lax')
+    return response
+
+
+def _enrich_response(session_id: str, sid: str, request_id, message: str, tool_results: list):
+    """背景任務：LLM 解讀快速路徑的工具結果後推送給客戶端"""
+    try:
+        event = handlers.enrichment_event(request_id, get_agent(session_id).interpret(message, tool_results))
+        if event is not None:
+            socketio.emit('response_enriched', event, to=sid)
+    except Exception as e:
+        print(f"[API] Enrichment error: {e}")
+
+
+def _schedule_enrichment(session_id: str, sid: str, request_id, message: str, result: dict) -> bool:
+    """快速路徑回應後，排程 LLM 補充解讀（需要 Socket.IO 連線）"""
+    if not handlers.should_enrich(sid, result):
+        return False
+    socketio.start_background_task(_enrich_response, session_id, sid, request_id, message,
+                                   result.get('tool_results', []))
+    return True
+
+
+# Warm up configured components in the background as soon as the app is
+# created, whether it runs via `python app.py` or another WSGI server
+from backend.warmup import start_warmup
+start_warmup(socketio.start_background_task)
 
 
 # ============================================================
@@ -79,142 +128,40 @@ def chat():
     - 一般問題 → LLM 回答
     """
     try:
-        data = request.get_json()
-        message = data.get('message', '').strip()
+        data = request.get_json(silent=True) or {}
+        message = handlers.chat_message(data)
 
         if not message:
-            return jsonify({'success': False, 'error': 'No message provided'}), 400
+            return jsonify(handlers.NO_MESSAGE), 400
 
         print(f"[API] Received message: {message}")
 
-        # 檢測幣種
-        symbol = None
-        message_lower = message.lower()
-        for s in ['btc', 'eth', 'sol', 'bnb', 'xrp', 'ada', 'dot', 'doge']:
-            if s in message_lower:
-                symbol = s.upper()
-                break
-
-        # 檢測是否為圖表請求
-        chart_keywords = ["走勢", "圖表", "chart", "歷史", "價格圖", "趨勢圖", "近", "過去", "最近"]
-        is_chart_request = any(kw in message_lower for kw in chart_keywords)
-
-        # 檢測時間範圍
-        has_time_range = bool(
-            re.search(r'\d{1,2}[月\/]\d{1,2}', message) or
-            re.search(r'\d{4}-\d{1,2}-\d{1,2}', message) or
-            re.search(r'(\d+)\s*(?:天|日|週|周|月)', message_lower)
-        )
+        # 一次解析幣種、意圖與時間範圍
+        intent = route(message)
 
         # 如果是明確的圖表請求，直接獲取數據
-        if symbol and (is_chart_request or has_time_range):
+        chart = handlers.chart_request(intent)
+        if chart:
             from data.scrapers.coincap_client import get_price_history
-
-            # 解析天數
-            days = 30
-            days_match = re.search(r'(\d+)\s*(?:天|日)', message_lower)
-            if days_match:
-                days = min(int(days_match.group(1)), 365)
-            elif "一週" in message_lower or "一周" in message_lower:
-                days = 7
-            elif "兩週" in message_lower:
-                days = 14
-            elif "一個月" in message_lower:
-                days = 30
-            elif "三個月" in message_lower:
-                days = 90
-
-            # 解析日期範圍
-            start_date = None
-            end_date = None
-
-            # 匹配日期範圍
-            date_range_match = re.search(
-                r'(\d{1,2}[\/月]\d{1,2}日?|\d{4}-\d{1,2}-\d{1,2})\s*(?:到|至|~)\s*(\d{1,2}[\/月]\d{1,2}日?|\d{4}-\d{1,2}-\d{1,2}|現在|今天)',
-                message
-            )
-            if date_range_match:
-                start_date = _parse_date(date_range_match.group(1))
-                end_str = date_range_match.group(2)
-                if end_str in ['現在', '今天']:
-                    end_date = datetime.now().strftime("%Y-%m-%d")
-                else:
-                    end_date = _parse_date(end_str)
-
-            # 獲取歷史數據
-            if start_date and end_date:
-                history = get_price_history(symbol, start_date=start_date, end_date=end_date)
-                period_label = f"{start_date} ~ {end_date}"
-            else:
-                history = get_price_history(symbol, days=days)
-                period_label = f"近 {days} 天"
-
-            chart_data = {
-                "symbol": symbol,
-                "timestamps": [p["timestamp"] for p in history["data"]],
-                "prices": [p["price_usd"] for p in history["data"]],
-                "period": period_label,
-                "source": history["source"]
-            }
-
-            return jsonify({
-                "success": True,
-                "response": f"以下是 {symbol} {period_label} 的價格走勢圖：",
-                "chart_data": chart_data
-            })
+            history = get_price_history(chart["symbol"], **chart["history_args"])
+            return jsonify(handlers.chart_reply(chart, history))
 
         # 使用 CryptoAgent 處理
         try:
-            agent = get_agent()
-            result = agent.chat(message)
-
-            return jsonify({
-                "success": True,
-                "response": result.get("response", ""),
-                "chart_data": result.get("chart_data"),
-                "tool_results": result.get("tool_results", [])
-            })
+            session_id = _http_session_id()
+            agent = get_agent(session_id)
+            result = agent.chat(message, intent=intent)
+            enriching = _schedule_enrichment(session_id, data.get('sid'), data.get('request_id'),
+                                             message, result)
+            return jsonify(handlers.chat_reply(result, enriching))
 
         except Exception as e:
-            print(f"[API] Agent error: {e}")
-            import traceback
-            traceback.print_exc()
-            return jsonify({
-                'success': False,
-                'response': f'處理請求時發生錯誤: {e}'
-            }), 500
+            payload, status = handlers.agent_error(e)
+            return jsonify(payload), status
 
     except Exception as e:
-        print(f"[API] Request error: {e}")
-        import traceback
-        return jsonify({
-            'success': False,
-            'error': str(e),
-            'traceback': traceback.format_exc()
-        }), 500
-
-
-def _parse_date(date_str: str) -> str:
-    """解析日期字串為 YYYY-MM-DD 格式"""
-    now = datetime.now()
-    year = now.year
-
-    # YYYY-MM-DD
-    if re.match(r'^\d{4}-\d{1,2}-\d{1,2}$', date_str):
-        parts = date_str.split('-')
-        return f"{parts[0]}-{parts[1].zfill(2)}-{parts[2].zfill(2)}"
-
-    # MM/DD
-    if re.match(r'^\d{1,2}/\d{1,2}$', date_str):
-        parts = date_str.split('/')
-        return f"{year}-{parts[0].zfill(2)}-{parts[1].zfill(2)}"
-
-    # X月X日
-    cn_match = re.match(r'(\d{1,2})月(\d{1,2})日?', date_str)
-    if cn_match:
-        return f"{year}-{cn_match.group(1).zfill(2)}-{cn_match.group(2).zfill(2)}"
-
-    return None
+        payload, status = handlers.request_error(e)
+        return jsonify(payload), status
 
 
 # ============================================================
@@ -242,24 +189,9 @@ def get_chart_data():
     try:
         from data.scrapers.coincap_client import get_price_history
 
-        data = request.get_json() or {}
-        symbol = data.get('symbol', 'BTC').upper()
-        days = data.get('days', 30)
-        start_date = data.get('start_date')
-        end_date = data.get('end_date')
-
-        if start_date and end_date:
-            history = get_price_history(symbol, start_date=start_date, end_date=end_date)
-        else:
-            history = get_price_history(symbol, days=days)
-
-        return jsonify({
-            "success": True,
-            "symbol": symbol,
-            "timestamps": [p["timestamp"] for p in history["data"]],
-            "prices": [p["price_usd"] for p in history["data"]],
-            "source": history["source"]
-        })
+        symbol, history_args = handlers.history_query(request.get_json(silent=True))
+        history = get_price_history(symbol, **history_args)
+        return jsonify(handlers.chart_data_reply(symbol, history))
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
 
@@ -291,13 +223,11 @@ def run_backtest():
 
 @app.route('/api/backtest/results', methods=['GET'])
 def get_backtest_results():
-    """獲取回測結果"""
+    """獲取回測結果（分頁，最新的在前）"""
     try:
-        limit = request.args.get('limit', 10, type=int)
-
         from backend.models.backtest_engine import BacktestTool
         tool = BacktestTool()
-        result = tool.get_results(limit)
+        result = tool.get_results(*handlers.backtest_results_args(request.args))
 
         return jsonify(result)
 
@@ -349,21 +279,46 @@ def list_tools():
 def llm_status():
     """檢查 LLM 連接狀態"""
     try:
-        agent = get_agent()
-        status = agent.check_connection()
+        status = handlers.create_agent().check_connection()
         return jsonify(status)
     except Exception as e:
         return jsonify({"status": "error", "error": str(e)})
 
 
+@app.route('/api/upstreams/status', methods=['GET'])
+def upstreams_status():
+    """上游 API 斷路器與限流狀態"""
+    return jsonify(handlers.upstreams_reply())
+
+
+@app.route('/healthz', methods=['GET'])
+def healthz():
+    """存活檢查（含各元件載入狀態）"""
+    return jsonify(handlers.health_reply())
+
+
+@app.route('/readyz', methods=['GET'])
+def readyz():
+    """就緒檢查：所有預熱元件載入完成才回傳 200"""
+    payload, status = handlers.readiness_reply()
+    return jsonify(payload), status
+
+
 @app.route('/api/reset', methods=['POST'])
 def reset_conversation():
-    """重置對話"""
-    global _agent
-    _agent = None
+    """重置本會話的對話（不影響其他使用者）"""
+    get_sessions().reset(_http_session_id())
     return jsonify({'success': True, 'message': 'Conversation reset'})
 
 
+@app.route('/api/sessions/status', methods=['GET'])
+def sessions_status():
+    """會話數量與淘汰統計"""
+    sessions = get_sessions()
+    sessions.sweep()
+    return jsonify(sessions.stats())
+
+
 # ============================================================
 # WebSocket
 # ============================================================
@@ -377,6 +332,9 @@ def handle_connect():
 @socketio.on('disconnect')
 def handle_disconnect():
     print('Client disconnected')
+    # 以連線為單位的會話隨連線結束
+    if _sessions is not None:
+        _sessions.reset(request.sid)
 
 
 @socketio.on('message')
@@ -384,13 +342,11 @@ def handle_message(data):
     """處理即時消息"""
     try:
         message = data.get('message', '')
-        agent = get_agent()
+        session_id = data.get('session_id') or request.sid
+        agent = get_agent(session_id)
         result = agent.chat(message)
-        emit('response', {
-            'success': True,
-            'response': result.get('response', ''),
-            'chart_data': result.get('chart_data')
-        })
+        enriching = _schedule_enrichment(session_id, request.sid, data.get('request_id'), message, result)
+        emit('response', handlers.socket_reply(data.get('request_id'), result, enriching))
     except Exception as e:
         emit('error', {'error': str(e)})
 
@@ -0,0 +1,398 @@
+"""
+Crypto Trading MCP System - Async App (aiohttp)
+
+與 app.py 相同的 API 與 Socket.IO 事件，但以單一事件迴圈服務所有連線：
+- 行情查詢與 LLM 調用使用非阻塞 HTTP，等待上游時不佔用執行緒
+- 同一則訊息的多個工具並行執行
+- 回測、技術分析等 CPU 工作交給有上限的執行緒池
+
+啟動：python async_app.py（使用 FLASK_HOST / FLASK_PORT）
+"""
+
+import asyncio
+import json
+import os
+import sys
+import traceback
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+import jinja2
+import socketio
+from aiohttp import web
+
+# Add current directory to path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from config import Config
+from orchestrator import handlers
+from orchestrator.handlers import SESSION_COOKIE
+from orchestrator.intent_router import route
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+TEMPLATE_DIR = os.path.join(BASE_DIR, 'frontend', 'templates')
+STATIC_DIR = os.path.join(BASE_DIR, 'frontend', 'static')
+
+sio = socketio.AsyncServer(async_mode='aiohttp', cors_allowed_origins='*')
+
+# Lazy initialization
+_sessions = None
+
+
+def get_sessions():
+    """Lazy load the per-session agent store (only touched from the event loop)"""
+    global _sessions
+    if _sessions is None:
+        from orchestrator.sessions import SessionStore
+        _sessions = SessionStore(handlers.create_agent)
+        print(f"[INIT] ✅ Session store ready (model: {Config.OLLAMA_MODEL}, "
+              f"max sessions: {_sessions.max_sessions})")
+    return _sessions
+
+
+def get_agent(session_id: str):
+    """CryptoAgent of one chat session"""
+    return get_sessions().get(session_id)
+
+
+async def run_blocking(fn, *args):
+    """在執行緒池中執行阻塞函式"""
+    return await asyncio.get_running_loop().run_in_executor(None, fn, *args)
+
+
+async def _json_body(request: web.Request) -> dict:
+    if not request.can_read_body:
+        return {}
+    try:
+        return await request.json()
+    except (json.JSONDecodeError, UnicodeDecodeError):
+        return {}
+
+
+def _http_session_id(request: web.Request, data: dict) -> str:
+    """Session id from the request body or cookie; a new one is issued via cookie"""
+    session_id = data.get('session_id') or request.cookies.get(SESSION_COOKIE)
+    if not session_id:
+        session_id = uuid.uuid4().hex
+        request['new_session_id'] = session_id
+    return session_id
+
+
+def json_response(request: web.Request, payload, status: int = 200) -> web.Response:
+    response = web.json_response(payload, status=status, dumps=lambda obj: json.dumps(obj, default=str))
+    session_id = request.get('new_session_id')
+    if session_id:
+        response.set_cookie(SESSION_COOKIE, session_id, httponly=True, samesite='Lax')
+    return response
+
+
+@web.middleware
+async def cors_middleware(request: web.Request, handler):
+    if request.method == 'OPTIONS':
+        response = web.Response()
+    else:
+        response = await handler(request)
+    response.headers['Access-Control-Allow-Origin'] = '*'
+    response.headers['Access-Control-Allow-Headers'] = 'Content-Type'
+    response.headers['Access-Control-Allow-Methods'] = 'GET, POST, OPTIONS'
+    return response
+
+
+async def _enrich_response(session_id: str, sid: str, request_id, message: str, tool_results: list):
+    """背景任務：LLM 解讀快速路徑的工具結果後推送給客戶端"""
+    try:
+        event = handlers.enrichment_event(request_id, await get_agent(session_id).ainterpret(message, tool_results))
+        if event is not None:
+            await sio.emit('response_enriched', event, to=sid)
+    except Exception as e:
+        print(f"[API] Enrichment error: {e}")
+
+
+def _schedule_enrichment(session_id: str, sid: str, request_id, message: str, result: dict) -> bool:
+    """快速路徑回應後，排程 LLM 補充解讀（需要 Socket.IO 連線）"""
+    if not handlers.should_enrich(sid, result):
+        return False
+    sio.start_background_task(_enrich_response, session_id, sid, request_id, message,
+                              result.get('tool_results', []))
+    return True
+
+
+# ============================================================
+# 頁面路由
+# ============================================================
+
+_templates = jinja2.Environment(
+    loader=jinja2.FileSystemLoader(TEMPLATE_DIR),
+    autoescape=jinja2.select_autoescape(['html'])
+)
+# 模板沿用 Flask 的 url_for('static', filename=...)
+_templates.globals['url_for'] = lambda endpoint, filename='': f"/{endpoint}/{filename}"
+
+
+def _render(name: str) -> web.Response:
+    return web.Response(text=_templates.get_template(name).render(), content_type='text/html')
+
+
+async def index(request: web.Request):
+    """主聊天界面"""
+    return _render('index.html')
+
+
+async def backtest(request: web.Request):
+    """回測結果頁面"""
+    return _render('backtest.html')
+
+
+# ============================================================
+# 聊天 API
+# ============================================================
+
+async def chat(request: web.Request):
+    """Chat endpoint - 與 app.py 相同，但工具與 LLM 調用皆為非同步"""
+    try:
+        data = await _json_body(request)
+        message = handlers.chat_message(data)
+
+        if not message:
+            return json_response(request, handlers.NO_MESSAGE, 400)
+
+        print(f"[API] Received message: {message}")
+
+        # 一次解析幣種、意圖與時間範圍
+        intent = route(message)
+
+        # 如果是明確的圖表請求，直接獲取數據
+        chart = handlers.chart_request(intent)
+        if chart:
+            from data.scrapers.market_data import get_market_data
+            history = await get_market_data().aget_price_history(chart["symbol"], **chart["history_args"])
+            return json_response(request, handlers.chart_reply(chart, history))
+
+        try:
+            session_id = _http_session_id(request, data)
+            result = await get_agent(session_id).achat(message, intent=intent)
+            enriching = _schedule_enrichment(session_id, data.get('sid'), data.get('request_id'),
+                                             message, result)
+            return json_response(request, handlers.chat_reply(result, enriching))
+
+        except Exception as e:
+            return json_response(request, *handlers.agent_error(e))
+
+    except Exception as e:
+        return json_response(request, *handlers.request_error(e))
+
+
+# ============================================================
+# 即時價格 / 圖表數據 API
+# ============================================================
+
+async def get_price(request: web.Request):
+    """獲取即時價格"""
+    try:
+        from data.scrapers.market_data import get_market_data
+        result = await get_market_data().aget_current_price(request.match_info['symbol'].upper())
+        return json_response(request, result)
+    except Exception as e:
+        return json_response(request, {'success': False, 'error': str(e)}, 500)
+
+
+async def get_chart_data(request: web.Request):
+    """獲取圖表數據"""
+    try:
+        from data.scrapers.market_data import get_market_data
+
+        symbol, history_args = handlers.history_query(await _json_body(request))
+        history = await get_market_data().aget_price_history(symbol, **history_args)
+        return json_response(request, handlers.chart_data_reply(symbol, history))
+    except Exception as e:
+        return json_response(request, {'success': False, 'error': str(e)}, 500)
+
+
+# ============================================================
+# 回測 / 策略 API（同步工作，交給執行緒池）
+# ============================================================
+
+async def run_backtest(request: web.Request):
+    """執行回測"""
+    try:
+        data = await _json_body(request)
+
+        from backend.models.backtest_engine import BacktestTool
+        result = await run_blocking(BacktestTool().execute, data)
+        return json_response(request, result)
+
+    except Exception as e:
+        return json_response(request, {
+            'success': False,
+            'error': str(e),
+            'traceback': traceback.format_exc()
+        }, 500)
+
+
+async def get_backtest_results(request: web.Request):
+    """獲取回測結果（分頁，最新的在前）"""
+    try:
+        from backend.models.backtest_engine import BacktestTool
+        result = await run_blocking(BacktestTool().get_results, *handlers.backtest_results_args(request.query))
+        return json_response(request, result)
+
+    except Exception as e:
+        return json_response(request, {'success': False, 'error': str(e)}, 500)
+
+
+async def get_strategies(request: web.Request):
+    """獲取所有策略"""
+    try:
+        from backend.mcp_tools.crypto_tools import TradingStrategyTool
+        result = await run_blocking(TradingStrategyTool().list_strategies)
+        return json_response(request, result)
+    except Exception as e:
+        return json_response(request, {'success': False, 'error': str(e)}, 500)
+
+
+async def create_strategy(request: web.Request):
+    """創建新策略"""
+    try:
+        data = await _json_body(request)
+        from backend.mcp_tools.crypto_tools import TradingStrategyTool
+        result = await run_blocking(TradingStrategyTool().create_strategy, data.get('name'), data.get('config', {}))
+        return json_response(request, result)
+    except Exception as e:
+        return json_response(request, {'success': False, 'error': str(e)}, 500)
+
+
+# ============================================================
+# 工具 / 狀態 API
+# ============================================================
+
+async def list_tools(request: web.Request):
+    """列出可用工具"""
+    from mcp.tools import get_available_tools
+    return json_response(request, {"tools": get_available_tools()})
+
+
+async def llm_status(request: web.Request):
+    """檢查 LLM 連接狀態"""
+    try:
+        status = await run_blocking(handlers.create_agent().check_connection)
+        return json_response(request, status)
+    except Exception as e:
+        return json_response(request, {"status": "error", "error": str(e)})
+
+
+async def upstreams_status(request: web.Request):
+    """上游 API 斷路器與限流狀態"""
+    return json_response(request, handlers.upstreams_reply())
+
+
+async def healthz(request: web.Request):
+    """存活檢查（含各元件載入狀態）"""
+    return json_response(request, handlers.health_reply())
+
+
+async def readyz(request: web.Request):
+    """就緒檢查：所有預熱元件載入完成才回傳 200"""
+    return json_response(request, *handlers.readiness_reply())
+
+
+async def reset_conversation(request: web.Request):
+    """重置本會話的對話（不影響其他使用者）"""
+    get_sessions().reset(_http_session_id(request, await _json_body(request)))
+    return json_response(request, {'success': True, 'message': 'Conversation reset'})
+
+
+async def sessions_status(request: web.Request):
+    """會話數量與淘汰統計"""
+    sessions = get_sessions()
+    sessions.sweep()
+    return json_response(request, sessions.stats())
+
+
+# ============================================================
+# WebSocket
+# ============================================================
+
+@sio.on('connect')
+async def handle_connect(sid, environ):
+    print('Client connected')
+    await sio.emit('connected', {'data': 'Connected to server'}, to=sid)
+
+
+@sio.on('disconnect')
+async def handle_disconnect(sid):
+    print('Client disconnected')
+    # 以連線為單位的會話隨連線結束
+    if _sessions is not None:
+        _sessions.reset(sid)
+
+
+@sio.on('message')
+async def handle_message(sid, data):
+    """處理即時消息"""
+    try:
+        message = data.get('message', '')
+        session_id = data.get('session_id') or sid
+        result = await get_agent(session_id).achat(message)
+        enriching = _schedule_enrichment(session_id, sid, data.get('request_id'), message, result)
+        await sio.emit('response', handlers.socket_reply(data.get('request_id'), result, enriching), to=sid)
+    except Exception as e:
+        await sio.emit('error', {'error': str(e)}, to=sid)
+
+
+# ============================================================
+# 啟動 / 關閉
+# ============================================================
+
+async def on_startup(app: web.Application):
+    loop = asyncio.get_running_loop()
+    loop.set_default_executor(ThreadPoolExecutor(max_workers=Config.ASYNC_EXECUTOR_WORKERS,
+                                                 thread_name_prefix='async-app'))
+    # Warm up configured components in the background so startup is not blocked
+    from backend.warmup import start_warmup
+    start_warmup(lambda fn: loop.run_in_executor(None, fn))
+
+
+async def on_cleanup(app: web.Application):
+    from data.scrapers.market_data import get_market_data
+    from orchestrator.agent import close_http_session
+    await get_market_data().aclose()
+    await close_http_session()
+
+
+def create_app() -> web.Application:
+    app = web.Application(middlewares=[cors_middleware])
+    sio.attach(app)
+
+    app.router.add_get('/', index)
+    app.router.add_get('/backtest', backtest)
+    app.router.add_post('/api/chat', chat)
+    app.router.add_get('/api/price/{symbol}', get_price)
+    app.router.add_post('/api/chart-data', get_chart_data)
+    app.router.add_post('/api/backtest/run', run_backtest)
+    app.router.add_get('/api/backtest/results', get_backtest_results)
+    app.router.add_get('/api/strategies', get_strategies)
+    app.router.add_post('/api/strategies', create_strategy)
+    app.router.add_get('/api/tools', list_tools)
+    app.router.add_get('/api/llm/status', llm_status)
+    app.router.add_get('/api/upstreams/status', upstreams_status)
+    app.router.add_get('/healthz', healthz)
+    app.router.add_get('/readyz', readyz)
+    app.router.add_post('/api/reset', reset_conversation)
+    app.router.add_get('/api/sessions/status', sessions_status)
+    app.router.add_static('/static', STATIC_DIR)
+
+    app.on_startup.append(on_startup)
+    app.on_cleanup.append(on_cleanup)
+    return app
+
+
+if __name__ == '__main__':
+    print("=" * 60)
+    print("Crypto Trading MCP System (async)")
+    print("=" * 60)
+    print(f"Server: http://{Config.FLASK_HOST}:{Config.FLASK_PORT}")
+    print(f"Ollama: {Config.OLLAMA_URI}")
+    print(f"Model:  {Config.OLLAMA_MODEL}")
+    print("=" * 60)
+
+    web.run_app(create_app(), host=Config.FLASK_HOST, port=Config.FLASK_PORT)
@@ -0,0 +1,139 @@
+"""
+Conversation Memory
+Compact per-session chat history: tool results are stored as short
+summaries instead of full payloads, and the history is capped by an
+estimated token budget. The oldest turns are folded into a running
+summary when the budget is exceeded.
+"""
+
+import json
+import re
+import threading
+from typing import Any, Dict, List, Optional
+
+from config import Config
+
+# CJK characters are roughly one token each; other text about four characters per token
+_CJK_RE = re.compile(r'[\u3000-\u9fff\uac00-\ud7af\uff00-\uffef]')
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count for budgeting (no tokenizer dependency)"""
+    if not text:
+        return 0
+    cjk = len(_CJK_RE.findall(text))
+    return cjk + (len(text) - cjk + 3) // 4
+
+
+def _compact(value: Any, depth: int = 0) -> Any:
+    """Keep scalars, shorten strings, and replace long lists and deep structures with a size note"""
+    if isinstance(value, float):
+        return round(value, 4)
+    if isinstance(value, str):
+        return value if len(value) <= 80 else value[:77] + '...'
+    if isinstance(value, dict):
+        if depth >= 2:
+            return f"{{{len(value)} fields}}"
+        return {k: _compact(v, depth + 1) for k, v in value.items() if k not in ('traceback', 'timestamp')}
+    if isinstance(value, (list, tuple)):
+        if len(value) <= 3 and depth < 2:
+            return [_compact(v, depth + 1) for v in value]
+        return f"[{len(value)} items]"
+    return value
+
+
+def summarize_tool_result(tool_name: str, result: Dict[str, Any], max_chars: int = None) -> str:
+    """One-line summary of a tool result (arrays and article lists become counts)"""
+    max_chars = max_chars or Config.CONVERSATION_TOOL_SUMMARY_CHARS
+    if not isinstance(result, dict):
+        text = str(result)
+    elif result.get('success') is False or 'error' in result:
+        text = f"error: {result.get('error', 'unknown')}"
+    else:
+        text = json.dumps(_compact(result), ensure_ascii=False, default=str)
+    text = f"{tool_name}: {text}"
+    return text if len(text) <= max_chars else text[:max_chars - 3] + '...'
+
+
+class ConversationMemory:
+    """Token-budgeted conversation history for one session"""
+
+    def __init__(self, max_tokens: int = None, summary_tokens: int = None, max_message_chars: int = None):
+        self.max_tokens = max_tokens or Config.CONVERSATION_MAX_TOKENS
+        self.summary_tokens = summary_tokens or Config.CONVERSATION_SUMMARY_TOKENS
+        self.max_message_chars = max_message_chars or Config.CONVERSATION_MESSAGE_CHARS
+        self._messages: List[Dict[str, Any]] = []
+        self._tokens = 0
+        self._summary_lines: List[str] = []
+        self._lock = threading.Lock()
+
+    def add_user(self, content: str):
+        self._append({"role": "user", "content": content or ""})
+
+    def add_assistant(self, content: str, tool_name: str = None, tool_result: Dict[str, Any] = None):
+        """Store an assistant turn; a tool result is kept only as a summary"""
+        message = {"role": "assistant", "content": content or ""}
+        if tool_name:
+            message["tool"] = tool_name
+            message["tool_summary"] = summarize_tool_result(tool_name, tool_result or {})
+        self._append(message)
+
+    def _append(self, message: Dict[str, Any]):
+        if len(message["content"]) > self.max_message_chars:
+            message["content"] = message["content"][:self.max_message_chars - 3] + '...'
+        message["tokens"] = estimate_tokens(self._render(message))
+        with self._lock:
+            self._messages.append(message)
+            self._tokens += message["tokens"]
+            # Keep at least the latest message even if it alone exceeds the budget
+            while self._tokens > self.max_tokens and len(self._messages) > 1:
+                self._evict_oldest()
+
+    def _evict_oldest(self):
+        old = self._messages.pop(0)
+        self._tokens -= old["tokens"]
+        if old["role"] == "user":
+            line = f"用戶問：{old['content'][:60]}"
+        else:
+            line = f"助手答：{old.get('tool_summary') or old['content'][:60]}"
+        self._summary_lines.append(line[:120])
+        # The running summary keeps the most recent evicted lines within its own budget
+        while self._summary_lines and estimate_tokens("\n".join(self._summary_lines)) > self.summary_tokens:
+            self._summary_lines.pop(0)
+
+    @staticmethod
+    def _render(message: Dict[str, Any]) -> str:
+        if message.get("tool_summary"):
+            return f"{message['content']}\n[工具結果摘要] {message['tool_summary']}"
+        return message["content"]
+
+    def messages(self, last: Optional[int] = None) -> List[Dict[str, str]]:
+        """
+        Messages for the LLM: the running summary of evicted turns (if any)
+        followed by the retained turns, as plain role/content dicts
+        """
+        with self._lock:
+            retained = self._messages if last is None else self._messages[-last:]
+            result = [{"role": m["role"], "content": self._render(m)} for m in retained]
+            if self._summary_lines:
+                summary = "先前對話摘要：\n" + "\n".join(self._summary_lines)
+                result.insert(0, {"role": "system", "content": summary})
+        return result
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "messages": len(self._messages),
+                "tokens": self._tokens,
+                "max_tokens": self.max_tokens,
+                "summarized_lines": len(self._summary_lines)
+            }
+
+    def clear(self):
+        with self._lock:
+            self._messages = []
+            self._tokens = 0
+            self._summary_lines = []
+
+    def __len__(self) -> int:
+        return len(self._messages)
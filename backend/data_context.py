@@ -0,0 +1,107 @@
+"""
+Request-scoped Data Context
+Memoizes the market data and news fetched while handling one user message,
+so tools that run in the same orchestration (price, indicators, charts,
+backtests, combined analysis) share one upstream call per distinct dataset.
+
+Open a scope with ``with data_context():`` around the orchestration; tools
+read through ``current_data()``. Outside a scope every call gets a fresh,
+throwaway context, so behaviour is unchanged. Worker threads see the scope
+only if started via ``contextvars.copy_context().run``.
+"""
+
+import contextvars
+import threading
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator
+
+from data.scrapers.market_data import get_market_data, split_symbol
+
+_current: contextvars.ContextVar = contextvars.ContextVar('data_context', default=None)
+
+
+class DataContext:
+    """Per-request memo of tickers, candles and news"""
+
+    def __init__(self, market_data=None):
+        self.market_data = market_data or get_market_data()
+        self._values: Dict[tuple, Any] = {}
+        self._key_locks: Dict[tuple, threading.Lock] = {}
+        self._lock = threading.Lock()
+        self.fetches = 0
+        self.hits = 0
+
+    def memo(self, key: tuple, fetch: Callable[[], Any],
+             reuse: Callable[[Any], bool] = None) -> Any:
+        """
+        Return the value stored under ``key`` (if ``reuse`` accepts it), else fetch it.
+        Concurrent callers of the same key wait for one fetch; failed results
+        (``success`` is False) are returned but not stored.
+        """
+        with self._lock:
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+        with key_lock:
+            if key in self._values and (reuse is None or reuse(self._values[key])):
+                with self._lock:
+                    self.hits += 1
+                return self._values[key]
+            value = fetch()
+            with self._lock:
+                self.fetches += 1
+            if not (isinstance(value, dict) and value.get('success') is False):
+                self._values[key] = value
+            return value
+
+    def ticker(self, symbol: str) -> Dict[str, Any]:
+        _, pair = split_symbol(symbol)
+        return self.memo(('ticker', pair), lambda: self.market_data.get_ticker(pair))
+
+    def ohlcv(self, symbol: str, timeframe: str = '1d', limit: int = 100) -> Dict[str, Any]:
+        """Candles, sliced from the widest download of this pair and timeframe so far"""
+        _, pair = split_symbol(symbol)
+        limit = int(limit)
+        result = self.memo(
+            ('ohlcv', pair, timeframe),
+            lambda: self.market_data.get_ohlcv(pair, timeframe, limit) | {"requested": limit},
+            reuse=lambda cached: cached.get('requested', 0) >= limit
+        )
+        data = result.get('data')
+        result = {k: v for k, v in result.items() if k != 'requested'}
+        return result if data is None else result | {"data": data[-limit:]}
+
+    def current_price(self, symbol: str) -> Dict[str, Any]:
+        """Chat tool shape of the memoized ticker"""
+        return self.market_data.get_current_price(symbol, ticker=self.ticker)
+
+    def price_history(self, symbol: str, days: int = None, start_date: str = None,
+                      end_date: str = None) -> Dict[str, Any]:
+        """Chat tool shape of the memoized daily candles"""
+        return self.market_data.get_price_history(symbol, days=days, start_date=start_date,
+                                                  end_date=end_date, candles=self.ohlcv)
+
+    def news(self, symbol: str, limit: int, fetch: Callable[[], Dict[str, Any]]) -> Dict[str, Any]:
+        return self.memo(('news', symbol.upper(), int(limit)), fetch)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"datasets": len(self._values), "fetches": self.fetches, "hits": self.hits}
+
+
+@contextmanager
+def data_context() -> Iterator[DataContext]:
+    """Scope one orchestration; nested scopes reuse the outer context"""
+    ctx = _current.get()
+    if ctx is not None:
+        yield ctx
+        return
+    ctx = DataContext()
+    token = _current.set(ctx)
+    try:
+        yield ctx
+    finally:
+        _current.reset(token)
+
+
+def current_data() -> DataContext:
+    """The current scope's context, or a throwaway one outside a scope"""
+    return _current.get() or DataContext()
@@ -1,10 +1,46 @@
+import importlib
+import threading
 from typing import Dict, Any, List
 from backend.models.ollama_client import OllamaClient
-from backend.mcp_tools.crypto_tools import CryptoDataTool, CryptoNewsTool, TradingStrategyTool
-from backend.mcp_tools.chart_tool import ChartTool
-from backend.models.sentiment_analyzer import SentimentAnalysisTool
-from backend.models.technical_analysis import TechnicalAnalysisTool
-from backend.models.backtest_engine import BacktestTool
+from backend.conversation_memory import ConversationMemory
+from backend.data_context import data_context
+
+
+# Tool key -> (module, class). Tool modules pull in torch, transformers,
+# backtrader, plotly, sklearn and ta, so each is imported on first use.
+TOOL_CLASSES = {
+    'crypto_data': ('backend.mcp_tools.crypto_tools', 'CryptoDataTool'),
+    'crypto_news': ('backend.mcp_tools.crypto_tools', 'CryptoNewsTool'),
+    'sentiment_analysis': ('backend.models.sentiment_analyzer', 'SentimentAnalysisTool'),
+    'technical_analysis': ('backend.models.technical_analysis', 'TechnicalAnalysisTool'),
+    'trading_strategy': ('backend.mcp_tools.crypto_tools', 'TradingStrategyTool'),
+    'backtest': ('backend.models.backtest_engine', 'BacktestTool'),
+    'robustness': ('backend.models.robustness', 'RobustnessAnalysisTool'),
+    'chart': ('backend.mcp_tools.chart_tool', 'ChartTool'),
+}
+
+
+class LazyTools(dict):
+    """Tool instances, imported and constructed on first access"""
+
+    def __init__(self, classes: Dict[str, tuple]):
+        super().__init__()
+        self.classes = classes
+        self._lock = threading.Lock()
+
+    def __missing__(self, name: str):
+        if name not in self.classes:
+            raise KeyError(name)
+        with self._lock:
+            if not dict.__contains__(self, name):
+                module, cls = self.classes[name]
+                self[name] = getattr(importlib.import_module(module), cls)()
+        return dict.__getitem__(self, name)
+
+    def load_all(self):
+        """Construct every tool now (e.g. from a warm-up thread)"""
+        for name in self.classes:
+            self[name]
 
 
 class MCPOrchestrator:
@@ -16,22 +52,14 @@ class MCPOrchestrator:
     def __init__(self):
         self.ollama_client = OllamaClient()
 
-        # Initialize all MCP tools
-        self.tools = {
-            'crypto_data': CryptoDataTool(),
-            'crypto_news': CryptoNewsTool(),
-            'sentiment_analysis': SentimentAnalysisTool(),
-            'technical_analysis': TechnicalAnalysisTool(),
-            'trading_strategy': TradingStrategyTool(),
-            'backtest': BacktestTool(),
-            'chart': ChartTool()
-        }
+        # MCP tools load on first use
+        self.tools = LazyTools(TOOL_CLASSES)
 
         # Build tool definitions for LLM
         self.tool_definitions = self._build_tool_definitions()
 
-        # Conversation history
-        self.conversation_history = []
+        # Conversation history (token-budgeted, tool results summarized)
+        self.memory = ConversationMemory()
 
     def _build_tool_definitions(self) -> List[Dict[str, Any]]:
         """Build tool definitions for LLM context"""
@@ -72,6 +100,10 @@ class MCPOrchestrator:
                 "name": "get_backtest_results",
                 "description": "獲取最近的回測結果"
             },
+            {
+                "name": "analyze_backtest_robustness",
+                "description": "對回測進行自助法重抽樣，給出總回報、夏普比率、最大回撤的信賴區間"
+            },
             {
                 "name": "combined_analysis",
                 "description": "綜合分析：結合新聞情感、技術分析、市場數據給出完整的交易建議"
@@ -98,21 +130,19 @@ class MCPOrchestrator:
             llm_response = self.ollama_client.chat_with_tools(
                 user_message,
                 self.tool_definitions,
-                self.conversation_history[-10:]  # Last 10 messages
+                self.memory.messages()
             )
 
             # Update conversation history
-            self.conversation_history.append({
-                "role": "user",
-                "content": user_message
-            })
+            self.memory.add_user(user_message)
 
             tool_call = llm_response.get('tool_call')
             response_content = llm_response.get('content', '')
 
-            # Execute tool if selected
+            # Execute tool if selected; tools share fetched market data and news
             if tool_call and isinstance(tool_call, dict):
-                tool_result = self._execute_tool(tool_call)
+                with data_context():
+                    tool_result = self._execute_tool(tool_call)
 
                 # Format user-friendly response
                 formatted_message = self._format_tool_response(
@@ -121,13 +151,8 @@ class MCPOrchestrator:
                     response_content
                 )
 
-                # Add assistant response with tool result
-                self.conversation_history.append({
-                    "role": "assistant",
-                    "content": formatted_message,
-                    "tool_call": tool_call,
-                    "tool_result": tool_result
-                })
+                # Add assistant response with a summary of the tool result
+                self.memory.add_assistant(formatted_message, tool_call.get('tool'), tool_result)
 
                 return {
                     "success": True,
@@ -138,10 +163,7 @@ class MCPOrchestrator:
                 }
             else:
                 # No tool needed, just conversation
-                self.conversation_history.append({
-                    "role": "assistant",
-                    "content": response_content
-                })
+                self.memory.add_assistant(response_content)
 
                 return {
                     "success": True,
@@ -206,6 +228,9 @@ class MCPOrchestrator:
             elif tool_name == 'get_backtest_results':
                 return self.tools['backtest'].get_results()
 
+            elif tool_name == 'analyze_backtest_robustness':
+                return self.tools['robustness'].execute(params)
+
             elif tool_name == 'combined_analysis':
                 return self._combined_analysis(params)
 
@@ -345,7 +370,8 @@ class MCPOrchestrator:
             response = self.ollama_client.chat(
                 prompt,
                 system_prompt="你是專業的加密貨幣交易分析師，擅長綜合多種數據來源做出明智的交易決策。",
-                temperature=0.3
+                temperature=0.3,
+                cache=True
             )
 
             # Parse LLM response
@@ -536,6 +562,25 @@ class MCPOrchestrator:
 勝率: {metrics.get('win_rate', 0):.1f}%
 總交易次數: {metrics.get('total_trades', 0)}"""
 
+        elif tool_name == 'analyze_backtest_robustness':
+            bars = tool_result.get('bar_bootstrap', {})
+            confidence = tool_result.get('confidence', 0.95)
+
+            def interval(name):
+                m = bars.get(name, {})
+                return f"{m.get('observed', 0):.2f} ({m.get('ci_lower', 0):.2f} ~ {m.get('ci_upper', 0):.2f})"
+
+            verdict = "✅ 夏普比率信賴區間高於 0，策略優勢顯著" if tool_result.get('edge_significant') \
+                else "⚠️ 夏普比率信賴區間包含 0，無法與隨機雜訊區分"
+
+            return f"""🎲 回測穩健性分析 ({tool_result.get('n_samples', 0)} 次重抽樣, {confidence:.0%} 信賴區間)
+
+總收益率 (%): {interval('total_return_pct')}
+夏普比率: {interval('sharpe_ratio')}
+最大回撤 (%): {interval('max_drawdown_pct')}
+
+{verdict}"""
+
         elif tool_name == 'create_chart':
             chart_data = tool_result.get('chart_data', {})
             data_points = tool_result.get('data_points', 0)
@@ -552,6 +597,11 @@ class MCPOrchestrator:
             # Default formatting
             return default_message or "✅ 操作完成"
 
+    @property
+    def conversation_history(self) -> List[Dict[str, str]]:
+        """Retained conversation as role/content messages"""
+        return self.memory.messages()
+
     def reset_conversation(self):
         """Reset conversation history"""
-        self.conversation_history = []
+        self.memory.clear()
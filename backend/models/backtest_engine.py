@@ -3,8 +3,16 @@ import pandas as pd
 import numpy as np
 from datetime import datetime
 from typing import Dict, Any, List, Optional
-import json
-import os
+
+from config import Config
+from backend.models.execution_model import ExecutionCommInfo, ExecutionModel
+from backend.models.feature_store import FeatureFrameStore, OHLCV_COLUMNS
+from backend.models.indicators import add_indicator_columns, get_indicator_cache
+from backend.models.strategy_spec import StrategySpecError, validate_spec
+from backend.models.vectorized_backtest import (
+    ALLOCATION_RULES, PortfolioBacktester, downsample_curve, periods_per_year,
+    sharpe_ratio as compute_sharpe
+)
 
 
 class SentimentStrategy(bt.Strategy):
@@ -35,7 +43,9 @@ class SentimentStrategy(bt.Strategy):
                 self.log(f'BUY EXECUTED, Price: {order.executed.price:.2f}')
             elif order.issell():
                 self.log(f'SELL EXECUTED, Price: {order.executed.price:.2f}')
-        self.order = None
+        # Partially filled orders stay pending until the rest fills
+        if not order.alive():
+            self.order = None
     
     def log(self, txt):
         dt = self.datas[0].datetime.date(0)
@@ -95,7 +105,9 @@ class MACDStrategy(bt.Strategy):
                 self.log(f'BUY EXECUTED, Price: {order.executed.price:.2f}')
             elif order.issell():
                 self.log(f'SELL EXECUTED, Price: {order.executed.price:.2f}')
-        self.order = None
+        # Partially filled orders stay pending until the rest fills
+        if not order.alive():
+            self.order = None
     
     def log(self, txt):
         dt = self.datas[0].datetime.date(0)
@@ -153,7 +165,9 @@ class TechnicalStrategy(bt.Strategy):
                 self.log(f'BUY EXECUTED, Price: {order.executed.price:.2f}')
             elif order.issell():
                 self.log(f'SELL EXECUTED, Price: {order.executed.price:.2f}')
-        self.order = None
+        # Partially filled orders stay pending until the rest fills
+        if not order.alive():
+            self.order = None
     
     def log(self, txt):
         dt = self.datas[0].datetime.date(0)
@@ -250,7 +264,9 @@ class CombinedStrategy(bt.Strategy):
                 self.log(f'BUY EXECUTED, Price: {order.executed.price:.2f}')
             elif order.issell():
                 self.log(f'SELL EXECUTED, Price: {order.executed.price:.2f}')
-        self.order = None
+        # Partially filled orders stay pending until the rest fills
+        if not order.alive():
+            self.order = None
     
     def log(self, txt):
         dt = self.datas[0].datetime.date(0)
@@ -380,26 +396,187 @@ class CombinedStrategy(bt.Strategy):
                 self.log(f'SELL SIGNAL - Score: {sell_score:.2f}, Sentiment: {sentiment_score:.2f}, RSI: {self.rsi[0]:.1f}')
 
 
-class PortfolioValueRecorder(bt.Observer):
-    """Custom observer to record portfolio value over time"""
-    lines = ('value',)
+STRATEGIES = {
+    'sentiment': SentimentStrategy,
+    'macd': MACDStrategy,
+    'technical': TechnicalStrategy,
+    'combined': CombinedStrategy,
+}
+
+# Strategies that read the aligned sentiment column
+SENTIMENT_STRATEGIES = ('sentiment', 'combined')
+
+
+def _sentiment_timeframe(timeframe: str) -> str:
+    """Sentiment is aggregated daily, or over 3 days for longer candles"""
+    try:
+        candle = pd.Timedelta(timeframe)
+    except ValueError:
+        candle = pd.Timedelta(days=1)
+    return '1d' if candle <= pd.Timedelta(days=1) else '3d'
+
+
+# Backtrader's float date number of 1970-01-01
+_NUM_EPOCH = bt.date2num(datetime(1970, 1, 1))
+
+
+class EquityCurveAnalyzer(bt.Analyzer):
+    """
+    Record fills and the trade ledger during the run; the equity curve and
+    position series are derived in bulk from the fills and price arrays afterwards
+
+    Assumes stock-like commission schemes (value = cash + size * close), which
+    is what both the flat commission and ExecutionCommInfo use.
+    """
     
-    def next(self):
-        self.lines.value[0] = self._owner.broker.getvalue()
+    def start(self):
+        self._starting_cash = self.strategy.broker.getcash()
+        self._fill_bars = []
+        self._fill_sizes = []
+        self._fill_cash = []
+        self._closed_size = 0.0
+        self.trades = []
+    
+    def notify_order(self, order):
+        # Only the execution bits new since the last notification (partial fills)
+        bar = len(self.data) - 1
+        for bit in order.executed.iterpending():
+            self._fill_bars.append(bar)
+            self._fill_sizes.append(bit.size)
+            self._fill_cash.append(-bit.size * bit.price - bit.comm)
+            # Part of the fill that reduced the open trade (opposite sign to it)
+            self._closed_size -= bit.closed
+    
+    def notify_trade(self, trade):
+        # Trades are not notified on scale-ins or partial exits, so the closed
+        # size comes from the fills (orders are notified before trades)
+        if not trade.isclosed:
+            return
+        
+        size, self._closed_size = self._closed_size, 0.0
+        self.trades.append({
+            "entry_time": bt.num2date(trade.dtopen).isoformat(),
+            "exit_time": bt.num2date(trade.dtclose).isoformat(),
+            "size": float(size),
+            "entry_price": float(trade.price),
+            "exit_price": float(trade.price + trade.pnl / size) if size else float(trade.price),
+            "pnl": float(trade.pnl),
+            "pnl_net": float(trade.pnlcomm),
+            "bars": int(trade.barlen)
+        })
+    
+    def get_analysis(self):
+        n = len(self.data)
+        closes = np.asarray(self.data.close.get(size=n), dtype=float)
+        nums = np.asarray(self.data.datetime.get(size=n), dtype=float)
+        
+        bars = np.asarray(self._fill_bars, dtype=int)
+        position = np.cumsum(np.bincount(bars, weights=self._fill_sizes, minlength=n))
+        cash = self._starting_cash + np.cumsum(np.bincount(bars, weights=self._fill_cash, minlength=n))
+        timestamps = np.round((nums - _NUM_EPOCH) * 86400e6).astype('int64').astype('datetime64[us]')
+        return {
+            "timestamps": timestamps.astype('datetime64[ns]'),
+            "equity": cash + position * closes,
+            "position": position,
+            "trades": self.trades
+        }
 
 
 class BacktestEngine:
     """Backtesting engine for quantitative trading strategies"""
     
-    def __init__(self, initial_cash: float = 10000, commission: float = 0.001):
+    def __init__(self, initial_cash: float = 10000, commission: float = 0.001,
+                 feature_store: Optional[FeatureFrameStore] = None):
         self.initial_cash = initial_cash
         self.commission = commission
         self.sentiment_processor = None
         self.sentiment_analyzer = None
+        self.feature_store = feature_store or FeatureFrameStore()
+        
+    def prepare_feature_frame(self, df: pd.DataFrame, symbol: str = 'BTC',
+                              timeframe: Optional[str] = None,
+                              with_sentiment: bool = True) -> pd.DataFrame:
+        """
+        Build (or load from cache) the aligned price + sentiment + indicator frame
+        
+        Args:
+            df: DataFrame with OHLCV data and a timestamp column
+            symbol: Symbol for sentiment analysis
+            timeframe: Candle timeframe (inferred from the data when omitted)
+            with_sentiment: Whether to align news sentiment onto the candles
+            
+        Returns:
+            Feature frame indexed by timestamp
+        """
+        df = df.copy()
+        df['timestamp'] = pd.to_datetime(df['timestamp'])
+        df = df.sort_values('timestamp')
+        
+        timeframe = timeframe or self._infer_timeframe(df)
+        # Only the inputs, not the derived sentiment CSV (written below on a cold
+        # cache), so the key computed here is the one the next run computes
+        sentiment_version = self._sentiment_processor().article_store_version() if with_sentiment else ''
+        key = self.feature_store.make_key(symbol, timeframe, df, with_sentiment, sentiment_version)
+        frame = self.feature_store.load(key)
+        if frame is not None:
+            print(f"Loaded cached feature frame: {key}")
+            return frame
+        
+        # Add time-aligned sentiment if needed
+        sentiment_data = None
+        if with_sentiment:
+            sentiment_data = self._add_aligned_sentiment(df, symbol, timeframe)
+        
+        # Merge sentiment data if available
+        sentiment_available = sentiment_data is not None and not sentiment_data.empty
+        if sentiment_available:
+            # Ensure sentiment_data timestamp is datetime type
+            sentiment_data = sentiment_data.copy()
+            sentiment_data['timestamp'] = pd.to_datetime(sentiment_data['timestamp'])
+
+            # Use merge_asof for time-series alignment (more robust)
+            sentiment_data = sentiment_data.sort_values('timestamp')
+            df = pd.merge_asof(
+                df,
+                sentiment_data[['timestamp', 'sentiment_score']],
+                on='timestamp',
+                direction='backward'
+            )
+            df['sentiment_score'] = df['sentiment_score'].fillna(0.0)
+        else:
+            df['sentiment_score'] = 0.0
+        
+        frame = df.set_index('timestamp')[OHLCV_COLUMNS + ['sentiment_score']].astype(float)
+        frame = add_indicator_columns(frame, get_indicator_cache().for_frame(frame, symbol, timeframe))
+        
+        # Do not pin a neutral fallback when sentiment loading failed
+        if sentiment_available or not with_sentiment:
+            self.feature_store.save(key, frame, {'symbol': symbol, 'timeframe': timeframe})
+        
+        return frame
+    
+    def _sentiment_processor(self):
+        """News sentiment processor, created on first use"""
+        if self.sentiment_processor is None:
+            from backend.models.sentiment_timeseries import SentimentTimeSeriesProcessor
+            self.sentiment_processor = SentimentTimeSeriesProcessor()
+        return self.sentiment_processor
+    
+    @staticmethod
+    def _infer_timeframe(df: pd.DataFrame) -> str:
+        """Infer the candle timeframe from timestamp spacing"""
+        time_diff = pd.to_datetime(df['timestamp']).diff().median()
+        if pd.isna(time_diff):
+            return '1d'
+        if time_diff < pd.Timedelta(days=1):
+            return f"{max(1, round(time_diff / pd.Timedelta(hours=1)))}h"
+        return f"{max(1, round(time_diff / pd.Timedelta(days=1)))}d"
         
     def run_backtest(self, df: pd.DataFrame, strategy_name: str = 'sentiment',
                      strategy_params: Optional[Dict] = None, 
-                     symbol: str = 'BTC', use_aligned_sentiment: bool = True) -> Dict[str, Any]:
+                     symbol: str = 'BTC', use_aligned_sentiment: bool = True,
+                     timeframe: Optional[str] = None,
+                     execution_model: Optional[ExecutionModel] = None) -> Dict[str, Any]:
         """
         Run backtest with specified strategy
         
@@ -409,6 +586,8 @@ class BacktestEngine:
             strategy_params: Parameters for the strategy
             symbol: Symbol for sentiment analysis
             use_aligned_sentiment: Whether to use time-aligned sentiment
+            timeframe: Candle timeframe of ``df`` (inferred when omitted)
+            execution_model: Slippage/fee-tier/partial-fill model (flat commission when omitted)
             
         Returns:
             Backtest results with performance metrics
@@ -417,35 +596,9 @@ class BacktestEngine:
             # Initialize Cerebro
             cerebro = bt.Cerebro()
             
-            # Prepare data
-            df = df.copy()
-            df['timestamp'] = pd.to_datetime(df['timestamp'])
-            
-            # Add time-aligned sentiment if needed
-            sentiment_data = None
-            if strategy_name in ['sentiment', 'combined'] and use_aligned_sentiment:
-                sentiment_data = self._add_aligned_sentiment(df, symbol, strategy_name)
-            
-            # Merge sentiment data if available
-            if sentiment_data is not None and not sentiment_data.empty:
-                # Ensure sentiment_data timestamp is datetime type
-                sentiment_data = sentiment_data.copy()
-                sentiment_data['timestamp'] = pd.to_datetime(sentiment_data['timestamp'])
-
-                # Use merge_asof for time-series alignment (more robust)
-                df = df.sort_values('timestamp')
-                sentiment_data = sentiment_data.sort_values('timestamp')
-                df = pd.merge_asof(
-                    df,
-                    sentiment_data[['timestamp', 'sentiment_score']],
-                    on='timestamp',
-                    direction='backward'
-                )
-                df['sentiment_score'] = df['sentiment_score'].fillna(0.0)
-            else:
-                df['sentiment_score'] = 0.0
-            
-            df.set_index('timestamp', inplace=True)
+            # Prepare data (cached across runs with different strategies)
+            with_sentiment = strategy_name in SENTIMENT_STRATEGIES and use_aligned_sentiment
+            df = self.prepare_feature_frame(df, symbol, timeframe, with_sentiment)
             
             # Create custom data feed with sentiment
             class PandasDataWithSentiment(bt.feeds.PandasData):
@@ -466,27 +619,17 @@ class BacktestEngine:
             cerebro.adddata(data)
             
             # Add strategy
-            if strategy_name == 'sentiment':
-                if strategy_params:
-                    cerebro.addstrategy(SentimentStrategy, **strategy_params)
-                else:
-                    cerebro.addstrategy(SentimentStrategy)
-            elif strategy_name == 'technical':
-                if strategy_params:
-                    cerebro.addstrategy(TechnicalStrategy, **strategy_params)
-                else:
-                    cerebro.addstrategy(TechnicalStrategy)
-            elif strategy_name == 'combined':
-                if strategy_params:
-                    cerebro.addstrategy(CombinedStrategy, **strategy_params)
-                else:
-                    cerebro.addstrategy(CombinedStrategy)
-            else:
+            strategy_class = STRATEGIES.get(strategy_name)
+            if strategy_class is None:
                 return {"success": False, "error": f"Unknown strategy: {strategy_name}"}
+            cerebro.addstrategy(strategy_class, **(strategy_params or {}))
             
             # Set initial cash and commission
             cerebro.broker.setcash(self.initial_cash)
-            cerebro.broker.setcommission(commission=self.commission)
+            if execution_model is not None:
+                ExecutionCommInfo(model=execution_model, data=data).configure(cerebro)
+            else:
+                cerebro.broker.setcommission(commission=self.commission)
             
             # Enable fractional trading for crypto
             cerebro.broker.set_fundmode(fundmode=True, fundstartval=self.initial_cash)
@@ -498,8 +641,8 @@ class BacktestEngine:
             cerebro.addanalyzer(bt.analyzers.Returns, _name='returns')
             cerebro.addanalyzer(bt.analyzers.TradeAnalyzer, _name='trades')
             
-            # Add custom observer to track portfolio value
-            cerebro.addobserver(PortfolioValueRecorder)
+            # Equity curve, positions and trade ledger
+            cerebro.addanalyzer(EquityCurveAnalyzer, _name='equity')
             
             # Run backtest
             print(f'Starting Portfolio Value: {cerebro.broker.getvalue():.2f}')
@@ -550,31 +693,17 @@ class BacktestEngine:
             except:
                 pass
             
-            # Calculate Sharpe ratio manually if backtrader returns None or 0
+            equity_capture = strat.analyzers.equity.get_analysis()
+            equity = equity_capture['equity']
+            equity_index = pd.DatetimeIndex(equity_capture['timestamps'])
+            
+            # Calculate Sharpe ratio from the equity curve if backtrader returns None or 0
             sharpe_ratio = sharpe_analysis.get('sharperatio', None)
             if sharpe_ratio is None or (isinstance(sharpe_ratio, (int, float)) and sharpe_ratio == 0):
-                # Calculate using returns
-                try:
-                    # Get portfolio values from observer
-                    portfolio_values = []
-                    for i in range(len(strat.observers[0].lines.value)):
-                        portfolio_values.append(strat.observers[0].lines.value[i])
-                    
-                    if len(portfolio_values) > 1:
-                        # Calculate daily returns
-                        portfolio_values = np.array(portfolio_values)
-                        returns = np.diff(portfolio_values) / portfolio_values[:-1]
-                        
-                        if len(returns) > 0 and returns.std() > 0:
-                            # Annualized Sharpe ratio (assuming daily data)
-                            sharpe_ratio = (returns.mean() / returns.std()) * np.sqrt(365)
-                        else:
-                            sharpe_ratio = 0.0
-                    else:
-                        sharpe_ratio = 0.0
-                except Exception as e:
-                    print(f"Error calculating manual Sharpe ratio: {e}")
-                    sharpe_ratio = 0.0
+                sharpe_ratio = 0.0
+                if len(equity) > 1:
+                    returns = np.diff(equity) / equity[:-1]
+                    sharpe_ratio = compute_sharpe(returns, periods_per_year(equity_index))
             
             # Ensure winning_trades + losing_trades <= total_trades
             # Backtrader sometimes counts open/closed trades differently
@@ -600,7 +729,13 @@ class BacktestEngine:
                 "win_rate": 0,
                 "avg_trade_return": 0,
                 "avg_win": float(avg_win) if avg_win else 0.0,
-                "avg_loss": float(avg_loss) if avg_loss else 0.0
+                "avg_loss": float(avg_loss) if avg_loss else 0.0,
+                "equity_curve": {
+                    "timestamps": [t.isoformat() for t in equity_index],
+                    "values": equity.round(2).tolist(),
+                    "positions": equity_capture['position'].tolist()
+                },
+                "trades_log": equity_capture['trades']
             }
             
             if result['total_trades'] > 0:
@@ -619,7 +754,82 @@ class BacktestEngine:
             import traceback
             return {"success": False, "error": str(e), "traceback": traceback.format_exc()}
     
-    def _add_aligned_sentiment(self, df: pd.DataFrame, symbol: str, strategy_name: str) -> pd.DataFrame:
+    def run_portfolio_backtest(self, dfs: Dict[str, pd.DataFrame], strategy_name: str = 'technical',
+                               strategy_params: Optional[Dict] = None, allocation: str = 'equal',
+                               use_aligned_sentiment: bool = True,
+                               timeframe: Optional[str] = None,
+                               execution_model: Optional[ExecutionModel] = None) -> Dict[str, Any]:
+        """
+        Run one strategy over several symbols as a single portfolio
+        
+        Args:
+            dfs: OHLCV DataFrames keyed by symbol name (e.g. BTC)
+            strategy_name: Name of strategy to use for every asset
+            strategy_params: Parameters for the strategy
+            allocation: Capital allocation rule (equal, volatility, signal)
+            use_aligned_sentiment: Whether to use time-aligned sentiment
+            timeframe: Candle timeframe shared by all frames (inferred when omitted)
+            execution_model: Slippage/fee-tier/partial-fill model (flat commission when omitted)
+            
+        Returns:
+            Portfolio metrics, per-asset breakdown and correlation matrix
+        """
+        try:
+            if allocation not in ALLOCATION_RULES:
+                return {"success": False, "error": f"Unknown allocation rule: {allocation}"}
+            
+            with_sentiment = strategy_name in SENTIMENT_STRATEGIES and use_aligned_sentiment
+            frames = {
+                symbol: self.prepare_feature_frame(df, symbol, timeframe, with_sentiment)
+                for symbol, df in dfs.items()
+            }
+            
+            backtester = PortfolioBacktester(self.initial_cash, self.commission, execution_model)
+            return backtester.run(frames, strategy_name, strategy_params, allocation)
+            
+        except Exception as e:
+            import traceback
+            return {"success": False, "error": str(e), "traceback": traceback.format_exc()}
+    
+    def run_spec_backtest(self, dfs: Dict[str, pd.DataFrame], config: Dict[str, Any],
+                          strategy_name: str = 'custom', allocation: str = 'equal',
+                          use_aligned_sentiment: bool = True, timeframe: Optional[str] = None,
+                          execution_model: Optional[ExecutionModel] = None) -> Dict[str, Any]:
+        """
+        Run a declarative strategy spec on the vectorized engine
+        
+        Args:
+            dfs: OHLCV DataFrames keyed by symbol name (one entry for a single-asset run)
+            config: Strategy spec (rules or template config)
+            strategy_name: Name reported in the result
+            allocation: Capital allocation rule for multi-symbol runs
+            use_aligned_sentiment: Whether to align sentiment when the spec reads it
+            timeframe: Candle timeframe shared by all frames (inferred when omitted)
+            execution_model: Slippage/fee-tier/partial-fill model (flat commission when omitted)
+            
+        Returns:
+            Backtest results with performance metrics
+        """
+        try:
+            compiled = validate_spec(config)
+        except StrategySpecError as e:
+            return {"success": False, "error": f"Invalid strategy spec: {e}"}
+        
+        try:
+            with_sentiment = compiled.uses_sentiment and use_aligned_sentiment
+            frames = {
+                symbol: self.prepare_feature_frame(df, symbol, timeframe, with_sentiment)
+                for symbol, df in dfs.items()
+            }
+            
+            backtester = PortfolioBacktester(self.initial_cash, self.commission, execution_model)
+            return backtester.run(frames, strategy_name, allocation=allocation, signal_fn=compiled)
+            
+        except Exception as e:
+            import traceback
+            return {"success": False, "error": str(e), "traceback": traceback.format_exc()}
+    
+    def _add_aligned_sentiment(self, df: pd.DataFrame, symbol: str, timeframe: str) -> pd.DataFrame:
         """Add time-aligned sentiment data to price DataFrame"""
         try:
             import signal
@@ -633,42 +843,31 @@ class BacktestEngine:
             signal.alarm(30)
             
             try:
-                # Lazy load sentiment processor and analyzer
-                if self.sentiment_processor is None:
-                    from backend.models.sentiment_timeseries import SentimentTimeSeriesProcessor
-                    from backend.models.sentiment_analyzer import FinBERTSentimentAnalyzer
+                # Lazy load sentiment analyzer
+                if self.sentiment_analyzer is None:
+                    from backend.models.model_registry import get_sentiment_analyzer
                     
                     print("Initializing sentiment analysis for backtest...")
-                    self.sentiment_processor = SentimentTimeSeriesProcessor()
-                    self.sentiment_analyzer = FinBERTSentimentAnalyzer()
+                    self.sentiment_analyzer = get_sentiment_analyzer()
                 
                 # Load news data
                 print(f"Loading news data for {symbol}...")
-                news_df = self.sentiment_processor.load_news_data(symbol)
+                news_df = self._sentiment_processor().load_news_data(symbol)
                 
                 if news_df.empty:
                     print("No news data available, using neutral sentiment")
                     signal.alarm(0)  # Cancel alarm
                     return pd.DataFrame()
                 
-                # Determine timeframe from data
-                df_temp = df.copy()
-                df_temp['timestamp'] = pd.to_datetime(df_temp['timestamp'])
-                time_diff = df_temp['timestamp'].diff().median()
-                
-                # Map timedelta to timeframe string
-                if time_diff <= pd.Timedelta(days=1):
-                    timeframe = '1d'
-                else:
-                    timeframe = '3d'
+                sentiment_timeframe = _sentiment_timeframe(timeframe)
                 
-                print(f"Detected timeframe: {timeframe}")
+                print(f"Sentiment timeframe: {sentiment_timeframe}")
                 
                 # Preprocess sentiment time series
                 sentiment_ts = self.sentiment_processor.preprocess_sentiment_timeseries(
                     news_df=news_df,
                     sentiment_analyzer=self.sentiment_analyzer,
-                    timeframe=timeframe,
+                    timeframe=sentiment_timeframe,
                     symbol=symbol,
                     use_cache=True
                 )
@@ -714,16 +913,6 @@ class BacktestTool:
     
     def __init__(self):
         self.engine = BacktestEngine()
-        self.results_file = 'data/backtest_results.json'
-        self._ensure_file_exists()
-    
-    def _ensure_file_exists(self):
-        """Ensure results file exists"""
-        import os
-        os.makedirs('data', exist_ok=True)
-        if not os.path.exists(self.results_file):
-            with open(self.results_file, 'w') as f:
-                json.dump([], f)
     
     @staticmethod
     def get_tool_definition() -> Dict[str, Any]:
@@ -733,70 +922,136 @@ class BacktestTool:
             "parameters": {
                 "symbol": "Trading pair symbol",
                 "timeframe": "Timeframe for backtest",
-                "strategy": "Strategy to test (sentiment, technical, combined)",
+                "strategy": "Strategy to test (sentiment, macd, technical, combined, or a saved strategy name)",
+                "strategy_config": "Inline declarative strategy spec (optional, see strategy_spec)",
+                "symbols": "List of trading pairs for a portfolio backtest (optional, overrides symbol)",
+                "allocation": "Portfolio capital allocation: equal, volatility, signal (default: equal)",
+                "full_resolution": "Return the full equity curve instead of a chart-sized one (default: false)",
+                "execution": "Execution model: true for defaults, or {liquidity, slippage_coef, max_participation, fee_tiers} (optional)",
                 "start_date": "Start date for backtest (YYYY-MM-DD, optional)",
                 "end_date": "End date for backtest (YYYY-MM-DD, optional)",
                 "initial_capital": "Initial capital (default: 10000)"
             }
         }
     
+    def _load_ohlcv(self, data_tool, symbol: str, timeframe: str,
+                    start_date: Optional[str], end_date: Optional[str]) -> Dict[str, Any]:
+        """Fetch OHLCV data for one symbol and apply the date range"""
+        ohlcv_result = data_tool.get_ohlcv(symbol, timeframe, limit=1000)
+        
+        if not ohlcv_result['success']:
+            return ohlcv_result
+        
+        # Convert to DataFrame
+        df = pd.DataFrame(ohlcv_result['data'])
+        
+        # Filter by date range if specified
+        if start_date or end_date:
+            df['timestamp'] = pd.to_datetime(df['timestamp'])
+            
+            if start_date:
+                start_dt = pd.to_datetime(start_date)
+                df = df[df['timestamp'] >= start_dt]
+                
+            if end_date:
+                end_dt = pd.to_datetime(end_date) + pd.Timedelta(days=1)  # Include end date
+                df = df[df['timestamp'] < end_dt]
+            
+            if len(df) == 0:
+                return {"success": False, "error": f"{symbol} 指定日期範圍內沒有數據"}
+
+        # Check minimum data requirement for indicators
+        # SMA slow period is 50, which requires at least 50+ data points
+        MIN_DATA_POINTS = 60  # Buffer for indicator warm-up
+        if len(df) < MIN_DATA_POINTS:
+            return {
+                "success": False,
+                "error": f"{symbol} 數據量不足：需要至少 {MIN_DATA_POINTS} 個數據點來計算技術指標，但只有 {len(df)} 個。請擴大日期範圍或使用更短的時間週期。"
+            }
+        
+        return {"success": True, "df": df}
+    
     def execute(self, params: Dict[str, Any]) -> Dict[str, Any]:
         """Execute backtest"""
         try:
             from backend.mcp_tools.crypto_tools import CryptoDataTool
             
             symbol = params.get('symbol', 'BTC/USDT')
+            symbols = params.get('symbols') or []
             timeframe = params.get('timeframe', '1d')
             strategy = params.get('strategy', 'sentiment')
+            allocation = params.get('allocation', 'equal')
             initial_capital = params.get('initial_capital', 10000)
             start_date = params.get('start_date')
             end_date = params.get('end_date')
             
-            # Extract symbol name for sentiment (e.g., BTC from BTC/USDT)
-            symbol_name = symbol.split('/')[0] if '/' in symbol else symbol
-            
-            # Fetch historical data
-            data_tool = CryptoDataTool()
-            ohlcv_result = data_tool.get_ohlcv(symbol, timeframe, limit=1000)
+            execution_model = None
+            if params.get('execution'):
+                execution_model = ExecutionModel.from_params(params['execution'])
             
-            if not ohlcv_result['success']:
-                return ohlcv_result
+            # Strategies outside the built-in classes run from their declarative spec
+            spec = params.get('strategy_config')
+            if spec is None and strategy not in STRATEGIES:
+                from backend.mcp_tools.crypto_tools import TradingStrategyTool
+                stored = TradingStrategyTool().get_strategy(strategy)
+                if not stored['success']:
+                    return {"success": False, "error": f"Unknown strategy: {strategy}"}
+                spec = stored['strategy']['config']
             
-            # Convert to DataFrame
-            df = pd.DataFrame(ohlcv_result['data'])
+            data_tool = CryptoDataTool()
+            self.engine.initial_cash = initial_capital
             
-            # Filter by date range if specified
-            if start_date or end_date:
-                df['timestamp'] = pd.to_datetime(df['timestamp'])
+            if len(symbols) > 1:
+                # Portfolio mode: one pass over all symbols on a shared time index
+                dfs = {}
+                for pair in symbols:
+                    loaded = self._load_ohlcv(data_tool, pair, timeframe, start_date, end_date)
+                    if not loaded['success']:
+                        return loaded
+                    # Extract symbol name for sentiment (e.g., BTC from BTC/USDT)
+                    dfs[pair.split('/')[0]] = loaded['df']
                 
-                if start_date:
-                    start_dt = pd.to_datetime(start_date)
-                    df = df[df['timestamp'] >= start_dt]
-                    
-                if end_date:
-                    end_dt = pd.to_datetime(end_date) + pd.Timedelta(days=1)  # Include end date
-                    df = df[df['timestamp'] < end_dt]
+                if spec is not None:
+                    result = self.engine.run_spec_backtest(
+                        dfs, spec, strategy, allocation,
+                        timeframe=timeframe, execution_model=execution_model
+                    )
+                else:
+                    result = self.engine.run_portfolio_backtest(
+                        dfs,
+                        strategy,
+                        allocation=allocation,
+                        use_aligned_sentiment=True,
+                        timeframe=timeframe,
+                        execution_model=execution_model
+                    )
+                symbol = ','.join(symbols)
+            else:
+                if symbols:
+                    symbol = symbols[0]
                 
-                if len(df) == 0:
-                    return {"success": False, "error": "指定日期範圍內沒有數據"}
-
-            # Check minimum data requirement for indicators
-            # SMA slow period is 50, which requires at least 50+ data points
-            MIN_DATA_POINTS = 60  # Buffer for indicator warm-up
-            if len(df) < MIN_DATA_POINTS:
-                return {
-                    "success": False,
-                    "error": f"數據量不足：需要至少 {MIN_DATA_POINTS} 個數據點來計算技術指標，但只有 {len(df)} 個。請擴大日期範圍或使用更短的時間週期。"
-                }
+                # Extract symbol name for sentiment (e.g., BTC from BTC/USDT)
+                symbol_name = symbol.split('/')[0] if '/' in symbol else symbol
+                
+                loaded = self._load_ohlcv(data_tool, symbol, timeframe, start_date, end_date)
+                if not loaded['success']:
+                    return loaded
 
-            # Run backtest with time-aligned sentiment
-            self.engine.initial_cash = initial_capital
-            result = self.engine.run_backtest(
-                df, 
-                strategy, 
-                symbol=symbol_name,
-                use_aligned_sentiment=True
-            )
+                if spec is not None:
+                    result = self.engine.run_spec_backtest(
+                        {symbol_name: loaded['df']}, spec, strategy,
+                        timeframe=timeframe, execution_model=execution_model
+                    )
+                else:
+                    # Run backtest with time-aligned sentiment
+                    result = self.engine.run_backtest(
+                        loaded['df'], 
+                        strategy, 
+                        symbol=symbol_name,
+                        use_aligned_sentiment=True,
+                        timeframe=timeframe,
+                        execution_model=execution_model
+                    )
             
             if result['success']:
                 # Save result
@@ -808,6 +1063,11 @@ class BacktestTool:
                 if end_date:
                     result['end_date'] = end_date
                 self._save_result(result)
+                
+                # Store keeps full resolution; the response is thinned for charts
+                if result.get('equity_curve') and not params.get('full_resolution'):
+                    result['equity_curve'] = downsample_curve(
+                        result['equity_curve'], Config.BACKTEST_EQUITY_POINTS)
             
             return result
             
@@ -818,28 +1078,23 @@ class BacktestTool:
     def _save_result(self, result: Dict[str, Any]):
         """Save backtest result"""
         try:
-            with open(self.results_file, 'r') as f:
-                results = json.load(f)
-            
-            results.append(result)
-            
-            # Keep only last 100 results
-            results = results[-100:]
-            
-            with open(self.results_file, 'w') as f:
-                json.dump(results, f, indent=2)
+            from backend.models.results_store import get_results_store
+            result['result_id'] = get_results_store().save(result)
         except Exception as e:
             print(f"Error saving result: {e}")
     
-    def get_results(self, limit: int = 10) -> Dict[str, Any]:
-        """Get recent backtest results"""
+    def get_results(self, limit: int = 10, page: int = 1, offset: Optional[int] = None,
+                    symbol: Optional[str] = None, strategy: Optional[str] = None,
+                    include_equity: bool = False, full_resolution: bool = False) -> Dict[str, Any]:
+        """Get backtest results, newest first"""
         try:
-            with open(self.results_file, 'r') as f:
-                results = json.load(f)
-            
-            return {
-                "success": True,
-                "results": results[-limit:]
-            }
+            from backend.models.results_store import get_results_store
+            page_data = get_results_store().query(limit, page, offset, symbol, strategy, include_equity)
+            if include_equity and not full_resolution:
+                for result in page_data['results']:
+                    if result.get('equity_curve'):
+                        result['equity_curve'] = downsample_curve(
+                            result['equity_curve'], Config.BACKTEST_EQUITY_POINTS)
+            return page_data
         except Exception as e:
             return {"success": False, "error": str(e)}
@@ -0,0 +1,144 @@
+"""
+Parallel News Corpus Scoring
+Shards the news dataset across worker processes and writes per-article
+FinBERT scores to the store read by SentimentTimeSeriesProcessor
+"""
+
+import json
+import os
+import shutil
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+from typing import Any, Dict, List
+
+import pandas as pd
+
+from config import Config
+
+
+SCORE_COLUMNS = ['article_id', 'newsDatetime', 'negative', 'neutral', 'positive', 'sentiment']
+
+
+def _score_shard(shard_id: int, records: List[Dict[str, Any]], model_name: str,
+                 torch_threads: int, chunk_size: int, store_dir: str) -> Dict[str, Any]:
+    """
+    Worker entry point: score one shard, appending each chunk to its CSV
+
+    Every appended chunk is a checkpoint; a resumed run skips article ids
+    that are already in the store.
+    """
+    import torch
+    torch.set_num_threads(torch_threads)
+
+    from backend.models.sentiment_analyzer import FinBERTSentimentAnalyzer
+    analyzer = FinBERTSentimentAnalyzer(model_name)
+
+    shard_path = os.path.join(store_dir, f'shard_{shard_id:03d}.csv')
+    start_time = time.time()
+    scored = 0
+
+    for start in range(0, len(records), chunk_size):
+        chunk = records[start:start + chunk_size]
+        results = analyzer.analyze_batch([r['text'] for r in chunk])
+
+        rows = []
+        for record, result in zip(chunk, results):
+            if 'error' in result:
+                # Leave failed articles unscored so a rerun picks them up
+                continue
+            rows.append({
+                'article_id': record['article_id'],
+                'newsDatetime': record['newsDatetime'],
+                'negative': result['scores']['negative'],
+                'neutral': result['scores']['neutral'],
+                'positive': result['scores']['positive'],
+                'sentiment': result['sentiment']
+            })
+
+        if rows:
+            pd.DataFrame(rows, columns=SCORE_COLUMNS).to_csv(
+                shard_path, mode='a', header=not os.path.exists(shard_path), index=False
+            )
+        scored += len(rows)
+        print(f"[Shard {shard_id}] {start + len(chunk)}/{len(records)} articles", flush=True)
+
+    return {'shard': shard_id, 'scored': scored, 'seconds': time.time() - start_time}
+
+
+def score_news_corpus(processor, symbol: str = 'ALL', workers: int = None,
+                      torch_threads: int = None, chunk_size: int = 256,
+                      model_name: str = None, force: bool = False) -> Dict[str, Any]:
+    """
+    Score the news dataset with FinBERT across several processes
+
+    Args:
+        processor: SentimentTimeSeriesProcessor (provides dataset and store paths)
+        symbol: Symbol filter for the dataset ('ALL' scores everything)
+        workers: Number of worker processes (default: all cores)
+        torch_threads: Torch intra-op threads per worker (default: cores / workers)
+        chunk_size: Articles per checkpointed chunk
+        model_name: FinBERT model name or path
+        force: Discard existing scores for this model and start over
+
+    Returns:
+        Summary of the run
+    """
+    model_name = model_name or Config.FINBERT_MODEL
+    cpu_count = os.cpu_count() or 1
+    workers = max(1, workers or cpu_count)
+    torch_threads = max(1, torch_threads or cpu_count // workers)
+
+    store_dir = processor.article_scores_dir(model_name)
+    if force and os.path.isdir(store_dir):
+        shutil.rmtree(store_dir)
+    os.makedirs(store_dir, exist_ok=True)
+
+    news_df = processor.load_news_data(symbol)
+    if news_df.empty:
+        return {"success": False, "error": "No news data available"}
+
+    articles = processor.build_article_texts(news_df)
+    existing = processor.load_article_scores(model_name)
+    if not existing.empty:
+        articles = articles[~articles['article_id'].isin(existing['article_id'])]
+
+    total = len(articles) + len(existing)
+    print(f"{len(existing):,} of {total:,} articles already scored, {len(articles):,} remaining")
+
+    results = []
+    if not articles.empty:
+        records = articles.assign(newsDatetime=articles['newsDatetime'].astype(str)).to_dict('records')
+        workers = min(workers, len(records))
+        shards = [records[i::workers] for i in range(workers)]
+
+        # Shard ids continue after existing files so resumed runs never interleave writes
+        first_shard = len([n for n in os.listdir(store_dir) if n.startswith('shard_')])
+
+        print(f"Scoring with {workers} workers x {torch_threads} torch threads")
+        import multiprocessing
+        ctx = multiprocessing.get_context('spawn')
+        with ProcessPoolExecutor(max_workers=workers, mp_context=ctx) as pool:
+            futures = [
+                pool.submit(_score_shard, first_shard + i, shard, model_name,
+                            torch_threads, chunk_size, store_dir)
+                for i, shard in enumerate(shards)
+            ]
+            for future in as_completed(futures):
+                summary = future.result()
+                results.append(summary)
+                print(f"[Shard {summary['shard']}] done: {summary['scored']} articles "
+                      f"in {summary['seconds']:.1f}s")
+
+    scored = len(existing) + sum(r['scored'] for r in results)
+    manifest = {
+        "model": model_name,
+        "symbol": symbol,
+        "total_articles": total,
+        "scored_articles": scored,
+        "updated_at": datetime.now().isoformat()
+    }
+    with open(os.path.join(store_dir, 'manifest.json'), 'w') as f:
+        json.dump(manifest, f, indent=2)
+
+    return {"success": True, **manifest, "shards": results}
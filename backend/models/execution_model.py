@@ -0,0 +1,181 @@
+"""
+Execution Model
+Size-dependent slippage, maker/taker fee tiers and volume-capped partial fills,
+computed over whole exposure matrices so enabling it keeps sweeps vectorized
+"""
+
+from typing import Any, Dict, List, Optional, Tuple
+
+import backtrader as bt
+import numpy as np
+import pandas as pd
+
+
+# (cumulative traded notional, maker fee, taker fee)
+DEFAULT_FEE_TIERS: List[Tuple[float, float, float]] = [
+    (0, 0.0010, 0.0010),
+    (1_000_000, 0.0009, 0.0010),
+    (5_000_000, 0.0008, 0.0009),
+    (20_000_000, 0.0006, 0.0008),
+]
+
+
+class ExecutionModel:
+    """
+    Fill model for orders placed at a bar close and executed on the next bar
+
+    Slippage grows with the candle range and the square root of the order's
+    share of bar volume; fees follow tiers on cumulative traded notional.
+    """
+
+    def __init__(self, fee_tiers: Optional[List[Tuple[float, float, float]]] = None,
+                 liquidity: str = 'taker', slippage_coef: float = 0.1,
+                 max_participation: Optional[float] = 0.1):
+        """
+        Args:
+            fee_tiers: (notional threshold, maker fee, taker fee) rows, ascending
+            liquidity: 'taker' (market orders) or 'maker' (resting limit orders, no slippage)
+            slippage_coef: Fraction of the candle range paid at 100% participation
+            max_participation: Max fraction of bar volume filled per bar (None = unlimited)
+        """
+        if liquidity not in ('maker', 'taker'):
+            raise ValueError(f"Unknown liquidity type: {liquidity}")
+
+        tiers = sorted(fee_tiers or DEFAULT_FEE_TIERS)
+        self.tier_thresholds = np.array([t[0] for t in tiers], dtype=float)
+        self.tier_fees = np.array([t[1] if liquidity == 'maker' else t[2] for t in tiers])
+        self.liquidity = liquidity
+        self.slippage_coef = slippage_coef if liquidity == 'taker' else 0.0
+        self.max_participation = max_participation
+
+    @classmethod
+    def from_params(cls, params: Any) -> 'ExecutionModel':
+        """Build from a tool parameter (True for defaults, or a dict of overrides)"""
+        if isinstance(params, dict):
+            return cls(**params)
+        return cls()
+
+    def fee_rate(self, cumulative_notional: np.ndarray) -> np.ndarray:
+        """Fee rate for the tier reached by the notional traded so far"""
+        tier = np.searchsorted(self.tier_thresholds, cumulative_notional, side='right') - 1
+        return self.tier_fees[np.clip(tier, 0, len(self.tier_fees) - 1)]
+
+    def slippage_rate(self, order_notional: np.ndarray, high: np.ndarray, low: np.ndarray,
+                      close: np.ndarray, volume: np.ndarray) -> np.ndarray:
+        """Adverse price move as a fraction of the fill price"""
+        with np.errstate(divide='ignore', invalid='ignore'):
+            range_pct = np.nan_to_num((high - low) / close)
+            participation = np.nan_to_num(order_notional / (volume * close), posinf=1.0)
+        return self.slippage_coef * range_pct * np.sqrt(np.clip(participation, 0.0, 1.0))
+
+    def simulate(self, target: pd.DataFrame, bars: Dict[str, pd.DataFrame],
+                 initial_cash: float) -> Dict[str, pd.DataFrame]:
+        """
+        Execute a target exposure matrix
+
+        Exposure decided on bar t is filled at the open of bar t+1. Positions
+        carried over earn the close-to-open gap; the filled position earns
+        open-to-close.
+
+        Args:
+            target: Target capital weight per asset (bars x assets)
+            bars: 'open', 'high', 'low', 'close', 'volume' frames aligned with target
+            initial_cash: Starting capital, used to size orders against bar volume
+
+        Returns:
+            held (filled exposure), pnl (net return per asset), fees, slippage
+            (cost as a fraction of equity) and fill_ratio per bar
+        """
+        opens, high, low = bars['open'].to_numpy(), bars['high'].to_numpy(), bars['low'].to_numpy()
+        close, volume = bars['close'].to_numpy(), bars['volume'].to_numpy()
+
+        desired = target.shift(1).fillna(0.0).to_numpy()
+        prev_close = np.vstack([close[:1], close[:-1]])
+        gap_return = opens / prev_close - 1
+        intrabar_return = close / opens - 1
+
+        # Equity path before costs sizes each order against bar volume
+        desired_prev = np.vstack([np.zeros((1, desired.shape[1])), desired[:-1]])
+        gross = (desired_prev * gap_return + desired * intrabar_return).sum(axis=1)
+        equity_before = initial_cash * np.concatenate([[1.0], np.cumprod(1 + gross)[:-1]])
+
+        held = desired
+        if self.max_participation is not None:
+            with np.errstate(divide='ignore', invalid='ignore'):
+                capacity = self.max_participation * volume * opens / equity_before[:, None]
+            capacity = np.nan_to_num(capacity)
+            if (np.abs(np.diff(desired, axis=0, prepend=0.0)) > capacity + 1e-12).any():
+                # Unfilled remainders carry over, so walk the bars (vectorized across assets)
+                held = np.empty_like(desired)
+                current = np.zeros(desired.shape[1])
+                for t in range(len(desired)):
+                    current = current + np.clip(desired[t] - current, -capacity[t], capacity[t])
+                    held[t] = current
+
+        held_prev = np.vstack([np.zeros((1, held.shape[1])), held[:-1]])
+        traded = np.abs(held - held_prev)
+        order_notional = traded * equity_before[:, None]
+
+        traded_before = np.concatenate([[0.0], np.cumsum(order_notional.sum(axis=1))[:-1]])
+        fees = traded * self.fee_rate(traded_before)[:, None]
+        slippage = traded * self.slippage_rate(order_notional, high, low, opens, volume)
+        pnl = held_prev * gap_return + held * intrabar_return - fees - slippage
+
+        desired_traded = np.abs(desired - np.vstack([np.zeros((1, desired.shape[1])), desired[:-1]]))
+        with np.errstate(divide='ignore', invalid='ignore'):
+            fill_ratio = np.where(desired_traded.sum(axis=1) > 0,
+                                  traded.sum(axis=1) / desired_traded.sum(axis=1), 1.0)
+
+        index, columns = target.index, target.columns
+        return {
+            "held": pd.DataFrame(held, index=index, columns=columns),
+            "pnl": pd.DataFrame(pnl, index=index, columns=columns),
+            "fees": pd.DataFrame(fees, index=index, columns=columns),
+            "slippage": pd.DataFrame(slippage, index=index, columns=columns),
+            "fill_ratio": pd.Series(np.minimum(fill_ratio, 1.0), index=index)
+        }
+
+
+class ExecutionCommInfo(bt.CommInfoBase):
+    """
+    Backtrader commission scheme driven by an ExecutionModel
+
+    Charges the tiered fee plus size-dependent slippage as a cost on the
+    execution bar; partial fills come from a FixedBarPerc filler.
+    """
+
+    params = (
+        ('model', None),
+        ('data', None),
+        ('stocklike', True),
+        ('commtype', bt.CommInfoBase.COMM_PERC),
+        ('percabs', True),
+    )
+
+    def __init__(self):
+        super().__init__()
+        self.traded_notional = 0.0
+
+    def _getcommission(self, size, price, pseudoexec):
+        notional = abs(size) * price
+        fee = float(self.p.model.fee_rate(np.array([self.traded_notional]))[0])
+
+        slippage = 0.0
+        if self.p.data is not None:
+            data = self.p.data
+            slippage = float(self.p.model.slippage_rate(
+                np.array([notional]), np.array([data.high[0]]), np.array([data.low[0]]),
+                np.array([price]), np.array([data.volume[0]])
+            )[0])
+
+        if not pseudoexec:
+            self.traded_notional += notional
+        return notional * (fee + slippage)
+
+    def configure(self, cerebro: bt.Cerebro):
+        """Install this scheme and the matching volume filler on a Cerebro broker"""
+        cerebro.broker.addcommissioninfo(self)
+        if self.p.model.max_participation is not None:
+            cerebro.broker.set_filler(
+                bt.broker.fillers.FixedBarPerc(perc=self.p.model.max_participation * 100)
+            )
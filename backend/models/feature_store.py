@@ -0,0 +1,129 @@
+"""
+Aligned Feature Frame Store
+Persists precomputed price + sentiment + indicator frames for backtests and
+loads them memory-mapped, so repeated runs over the same data skip preprocessing
+"""
+
+import hashlib
+import json
+import os
+import shutil
+from typing import Any, Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+from config import Config
+
+
+OHLCV_COLUMNS = ['open', 'high', 'low', 'close', 'volume']
+
+
+def data_fingerprint(df: pd.DataFrame) -> str:
+    """Short content hash of the OHLCV columns"""
+    columns = [c for c in OHLCV_COLUMNS if c in df.columns]
+    # Hash as float so int and float volume columns of the same data match
+    hashed = pd.util.hash_pandas_object(df[columns].astype(float), index=False).values
+    return hashlib.sha1(hashed.tobytes()).hexdigest()[:12]
+
+
+class FeatureFrameStore:
+    """On-disk cache of aligned feature frames keyed by symbol, timeframe and date range"""
+
+    def __init__(self, cache_dir: str = None, max_entries: int = None):
+        self.cache_dir = cache_dir or Config.FEATURE_CACHE_DIR
+        self.max_entries = Config.FEATURE_CACHE_MAX_ENTRIES if max_entries is None else max_entries
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    def make_key(self, symbol: str, timeframe: str, df: pd.DataFrame,
+                 with_sentiment: bool, sentiment_version: str = '') -> str:
+        """
+        Build the cache key for an OHLCV frame
+
+        The fingerprint keeps a frame whose last candle was still open from
+        being served once the candle closes; ``sentiment_version`` does the
+        same when the sentiment model or its stored scores change.
+        """
+        timestamps = pd.to_datetime(df['timestamp'])
+        start = timestamps.min().strftime('%Y%m%d%H%M')
+        end = timestamps.max().strftime('%Y%m%d%H%M')
+        safe_symbol = symbol.replace('/', '')
+        sentiment_tag = f"sent{sentiment_version}" if with_sentiment else 'nosent'
+        return f"{safe_symbol}_{timeframe}_{start}_{end}_{sentiment_tag}_{data_fingerprint(df)}"
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key)
+
+    def load(self, key: str) -> Optional[pd.DataFrame]:
+        """
+        Load a cached frame (timestamp index) backed by read-only memory maps
+
+        Returns:
+            The frame, or None on a cache miss
+        """
+        path = self._path(key)
+        meta_file = os.path.join(path, 'meta.json')
+        if not os.path.exists(meta_file):
+            return None
+
+        try:
+            with open(meta_file, 'r') as f:
+                meta = json.load(f)
+            values = np.load(os.path.join(path, 'values.npy'), mmap_mode='r')
+            index = np.load(os.path.join(path, 'index.npy'), mmap_mode='r')
+
+            frame = pd.DataFrame(values, columns=meta['columns'], copy=False)
+            frame.index = pd.DatetimeIndex(np.asarray(index).astype('datetime64[ns]'), name='timestamp')
+            # meta.json mtime records the last use for eviction
+            os.utime(meta_file)
+            return frame
+        except Exception as e:
+            print(f"Feature cache load error for {key}: {e}")
+            return None
+
+    def save(self, key: str, frame: pd.DataFrame, meta: Dict[str, Any] = None):
+        """Persist a frame with a timestamp index and numeric columns"""
+        path = self._path(key)
+        tmp_path = f"{path}.tmp{os.getpid()}"
+        try:
+            os.makedirs(tmp_path, exist_ok=True)
+            np.save(os.path.join(tmp_path, 'values.npy'),
+                    frame.to_numpy(dtype=np.float64))
+            np.save(os.path.join(tmp_path, 'index.npy'),
+                    pd.DatetimeIndex(frame.index).asi8)
+            with open(os.path.join(tmp_path, 'meta.json'), 'w') as f:
+                json.dump({'columns': list(frame.columns), **(meta or {})}, f)
+
+            # Publish atomically so concurrent readers never see a partial frame
+            if os.path.exists(path):
+                shutil.rmtree(tmp_path)
+            else:
+                os.rename(tmp_path, path)
+        except Exception as e:
+            print(f"Feature cache save error for {key}: {e}")
+            shutil.rmtree(tmp_path, ignore_errors=True)
+        self.prune()
+
+    def prune(self) -> int:
+        """
+        Remove the least recently used frames beyond ``max_entries``
+
+        Returns:
+            Number of frames removed
+        """
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            meta_file = os.path.join(self._path(name), 'meta.json')
+            if '.tmp' in name or not os.path.exists(meta_file):
+                continue
+            try:
+                entries.append((os.path.getmtime(meta_file), name))
+            except OSError:
+                continue  # removed by a concurrent prune
+
+        entries.sort(reverse=True)
+        stale = entries[self.max_entries:] if self.max_entries > 0 else []
+        for _, name in stale:
+            # Open memory maps stay valid after their files are unlinked
+            shutil.rmtree(self._path(name), ignore_errors=True)
+        return len(stale)
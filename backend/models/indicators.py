@@ -0,0 +1,276 @@
+"""
+Vectorized Technical Indicators
+Pandas/NumPy implementations matching the backtrader indicators used by the
+strategies, plus a shared memoization cache so each series is computed once
+"""
+
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+from config import Config
+
+
+def sma(close: pd.Series, period: int = 20) -> pd.Series:
+    """Simple moving average"""
+    return close.rolling(window=period, min_periods=period).mean()
+
+
+def ema(close: pd.Series, period: int = 12) -> pd.Series:
+    """Exponential moving average"""
+    return close.ewm(span=period, adjust=False, min_periods=period).mean()
+
+
+def wilder_smooth(values: pd.Series, period: int = 14) -> pd.Series:
+    """
+    Wilder's smoothing (SMMA), seeded with the simple mean of the first ``period`` values
+    """
+    result = pd.Series(np.nan, index=values.index, dtype=float)
+    if len(values) < period:
+        return result
+
+    seeded = values.iloc[period - 1:].astype(float).copy()
+    seeded.iloc[0] = values.iloc[:period].mean()
+    result.iloc[period - 1:] = seeded.ewm(alpha=1.0 / period, adjust=False).mean().values
+    return result
+
+
+def rsi(close: pd.Series, period: int = 14) -> pd.Series:
+    """Relative Strength Index with Wilder smoothing"""
+    delta = close.diff().iloc[1:]
+    avg_gain = wilder_smooth(delta.clip(lower=0), period)
+    avg_loss = wilder_smooth(-delta.clip(upper=0), period)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        rs = avg_gain / avg_loss
+    values = 100 - 100 / (1 + rs)
+    # No losses in the window means maximum strength
+    values = values.where(avg_loss != 0, 100.0).where(avg_gain.notna())
+    return values.reindex(close.index)
+
+
+def macd(close: pd.Series, fast: int = 12, slow: int = 26,
+         signal: int = 9) -> Tuple[pd.Series, pd.Series, pd.Series]:
+    """
+    MACD line, signal line and histogram
+    """
+    macd_line = ema(close, fast) - ema(close, slow)
+    signal_line = macd_line.ewm(span=signal, adjust=False, min_periods=signal).mean()
+    return macd_line, signal_line, macd_line - signal_line
+
+
+def bollinger_bands(close: pd.Series, period: int = 20,
+                    devs: float = 2.0) -> Tuple[pd.Series, pd.Series, pd.Series]:
+    """
+    Bollinger Bands (mid, upper, lower) using population standard deviation
+    """
+    mid = sma(close, period)
+    std = close.rolling(window=period, min_periods=period).std(ddof=0)
+    return mid, mid + devs * std, mid - devs * std
+
+
+def crossover(fast: pd.Series, slow: pd.Series) -> pd.Series:
+    """
+    +1 where ``fast`` crosses above ``slow``, -1 where it crosses below, else 0
+    """
+    above = (fast > slow).astype(int)
+    below = (fast < slow).astype(int)
+    prev_above = above.shift(1, fill_value=0)
+    prev_below = below.shift(1, fill_value=0)
+    cross_up = (above == 1) & (prev_below == 1)
+    cross_down = (below == 1) & (prev_above == 1)
+    return cross_up.astype(int) - cross_down.astype(int)
+
+
+# ===== Array kernels: rows are series (e.g. symbols), columns are bars =====
+
+def _as_rows(values: np.ndarray) -> np.ndarray:
+    return np.atleast_2d(np.asarray(values, dtype=float))
+
+
+def rolling_mean_array(values: np.ndarray, window: int) -> np.ndarray:
+    """Trailing mean over ``window`` bars, NaN during warm-up"""
+    values = _as_rows(values)
+    out = np.full(values.shape, np.nan)
+    if 0 < window <= values.shape[1]:
+        out[:, window - 1:] = sliding_window_view(values, window, axis=1).mean(axis=-1)
+    return out
+
+
+def rolling_std_array(values: np.ndarray, window: int) -> np.ndarray:
+    """Trailing population standard deviation over ``window`` bars"""
+    values = _as_rows(values)
+    out = np.full(values.shape, np.nan)
+    if 0 < window <= values.shape[1]:
+        out[:, window - 1:] = sliding_window_view(values, window, axis=1).std(axis=-1)
+    return out
+
+
+def wilder_smooth_array(values: np.ndarray, period: int = 14) -> np.ndarray:
+    """Row-wise Wilder smoothing, seeded with the mean of the first ``period`` values"""
+    values = _as_rows(values)
+    out = np.full(values.shape, np.nan)
+    if 0 < period <= values.shape[1]:
+        seeded = values[:, period - 1:].copy()
+        seeded[:, 0] = values[:, :period].mean(axis=1)
+        # ewm runs the recursion column-wise in compiled code
+        smoothed = pd.DataFrame(seeded.T).ewm(alpha=1.0 / period, adjust=False).mean()
+        out[:, period - 1:] = smoothed.to_numpy().T
+    return out
+
+
+def rsi_array(close: np.ndarray, period: int = 14) -> np.ndarray:
+    """Row-wise Wilder RSI; matches ``rsi`` on each row"""
+    close = _as_rows(close)
+    delta = np.diff(close, axis=1)
+    avg_gain = wilder_smooth_array(np.clip(delta, 0, None), period)
+    avg_loss = wilder_smooth_array(np.clip(-delta, 0, None), period)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        values = 100 - 100 / (1 + avg_gain / avg_loss)
+    values = np.where(avg_loss == 0, 100.0, values)
+    values[np.isnan(avg_gain)] = np.nan
+    return np.hstack([np.full((close.shape[0], 1), np.nan), values])
+
+
+# name -> function(frame, *params); tuple-valued indicators return tuples of Series
+INDICATORS: Dict[str, Callable[..., Any]] = {
+    'sma': lambda df, period=20: sma(df['close'], int(period)),
+    'ema': lambda df, period=12: ema(df['close'], int(period)),
+    'rsi': lambda df, period=14: rsi(df['close'], int(period)),
+    'macd': lambda df, fast=12, slow=26, signal=9: macd(df['close'], int(fast), int(slow), int(signal)),
+    'bollinger_bands': lambda df, period=20, devs=2.0: bollinger_bands(df['close'], int(period), float(devs)),
+}
+
+
+class IndicatorCache:
+    """
+    Process-wide LRU of indicator values keyed by
+    (symbol, timeframe, data fingerprint, indicator, params)
+
+    Values are stored as NumPy arrays and re-wrapped with the caller's index,
+    so frames with identical OHLCV data share entries.
+    """
+
+    def __init__(self, max_entries: int = 512):
+        self.max_entries = max_entries
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: tuple, compute: Callable[[], Any]) -> Any:
+        """Return the cached value for ``key``, computing it on a miss"""
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+            self.misses += 1
+
+        value = compute()
+        if isinstance(value, tuple):
+            value = tuple(np.asarray(v, dtype=float) for v in value)
+        else:
+            value = np.asarray(value, dtype=float)
+
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return value
+
+    def for_frame(self, df: pd.DataFrame, symbol: Optional[str] = None,
+                  timeframe: Optional[str] = None) -> 'FrameIndicators':
+        """Bind the cache to one OHLCV frame"""
+        return FrameIndicators(self, df, symbol, timeframe)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+
+def _infer_timeframe(index: pd.Index) -> str:
+    if not isinstance(index, pd.DatetimeIndex) or len(index) < 2:
+        return ''
+    step = pd.Series(index).diff().median()
+    if step < pd.Timedelta(days=1):
+        return f"{max(1, round(step / pd.Timedelta(hours=1)))}h"
+    return f"{max(1, round(step / pd.Timedelta(days=1)))}d"
+
+
+class FrameIndicators:
+    """Cached indicator access for one OHLCV frame"""
+
+    def __init__(self, cache: IndicatorCache, df: pd.DataFrame,
+                 symbol: Optional[str] = None, timeframe: Optional[str] = None):
+        from backend.models.feature_store import data_fingerprint
+
+        self.frame = df
+        # BTC/USDT and BTC name the same series
+        base = (symbol or '').split('/')[0].upper()
+        index = df.index
+        if not isinstance(index, pd.DatetimeIndex) and 'timestamp' in df.columns:
+            index = pd.DatetimeIndex(pd.to_datetime(df['timestamp']))
+        # Spacing of the data decides the timeframe so '1d' and '1D' callers share entries
+        self.key = (base, _infer_timeframe(index) or (timeframe or '').lower(), data_fingerprint(df))
+        self._cache = cache
+
+    def _wrap(self, value):
+        if isinstance(value, tuple):
+            return tuple(pd.Series(v, index=self.frame.index) for v in value)
+        return pd.Series(value, index=self.frame.index)
+
+    def cached(self, name: str, params: tuple, compute: Callable[[], Any]):
+        """Memoize an arbitrary indicator computed by ``compute``"""
+        key = self.key + (name, tuple(float(p) for p in params))
+        return self._wrap(self._cache.get(key, compute))
+
+    def __call__(self, name: str, *params):
+        """Registered indicator by name, e.g. ``view('rsi', 14)``"""
+        if name not in INDICATORS:
+            raise KeyError(f"Unknown indicator: {name}")
+        return self.cached(name, params, lambda: INDICATORS[name](self.frame, *params))
+
+
+_indicator_cache = None
+_indicator_cache_lock = threading.Lock()
+
+
+def get_indicator_cache() -> IndicatorCache:
+    """Get the shared indicator cache"""
+    global _indicator_cache
+    if _indicator_cache is None:
+        with _indicator_cache_lock:
+            if _indicator_cache is None:
+                _indicator_cache = IndicatorCache(Config.INDICATOR_CACHE_SIZE)
+    return _indicator_cache
+
+
+def add_indicator_columns(df: pd.DataFrame, indicators: Optional[FrameIndicators] = None) -> pd.DataFrame:
+    """
+    Add the default indicator set used by the built-in strategies
+
+    Columns: rsi_14, macd, macd_signal, macd_hist, sma_20, sma_50,
+    bb_mid, bb_upper, bb_lower
+    """
+    df = df.copy()
+    indicators = indicators or get_indicator_cache().for_frame(df)
+
+    df['rsi_14'] = indicators('rsi', 14)
+    df['macd'], df['macd_signal'], df['macd_hist'] = indicators('macd', 12, 26, 9)
+    df['sma_20'] = indicators('sma', 20)
+    df['sma_50'] = indicators('sma', 50)
+    df['bb_mid'], df['bb_upper'], df['bb_lower'] = indicators('bollinger_bands', 20, 2.0)
+    return df
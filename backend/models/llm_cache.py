@@ -0,0 +1,149 @@
+"""
+LLM Response Cache
+Prompt-hash keyed cache for deterministic LLM calls (tool-result
+interpretation, recommendations): bounded in-memory LRU with TTL and an
+optional on-disk tier shared across processes and restarts
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Iterable, Optional
+
+from config import Config
+
+
+# Fields that change on every tool call without changing what the LLM should say
+VOLATILE_KEYS = ('timestamp',)
+
+
+def strip_volatile(obj: Any, keys: Iterable[str] = VOLATILE_KEYS) -> Any:
+    """Copy of a JSON-like structure without volatile fields, for cache keys"""
+    keys = tuple(keys)
+    if isinstance(obj, dict):
+        return {k: strip_volatile(v, keys) for k, v in obj.items() if k not in keys}
+    if isinstance(obj, (list, tuple)):
+        return [strip_volatile(v, keys) for v in obj]
+    return obj
+
+
+def prompt_key(*parts: Any) -> str:
+    """Stable hash of a model name, messages, options and any other key parts"""
+    canonical = json.dumps(parts, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+
+class LLMResponseCache:
+    """TTL + LRU cache of LLM responses with an optional disk tier"""
+
+    def __init__(self, max_entries: int = 256, ttl: float = 300.0, disk_dir: Optional[str] = None):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.disk_dir = disk_dir or None
+        if self.disk_dir:
+            os.makedirs(self.disk_dir, exist_ok=True)
+        self._entries: 'OrderedDict[str, tuple]' = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    def _disk_path(self, key: str) -> str:
+        return os.path.join(self.disk_dir, key[:2], f"{key}.json")
+
+    def get(self, key: str) -> Optional[Any]:
+        """Cached response, or None when missing or expired"""
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[0] > now:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return entry[1]
+                del self._entries[key]
+
+        if self.disk_dir:
+            try:
+                with open(self._disk_path(key), 'r', encoding='utf-8') as f:
+                    stored = json.load(f)
+                if stored['expires_at'] > now:
+                    self._remember(key, stored['expires_at'], stored['value'])
+                    with self._lock:
+                        self.disk_hits += 1
+                    return stored['value']
+                os.remove(self._disk_path(key))
+            except (OSError, ValueError, KeyError):
+                pass
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def put(self, key: str, value: Any, ttl: Optional[float] = None):
+        """Store a response for ``ttl`` seconds (default: the cache TTL)"""
+        expires_at = time.time() + (self.ttl if ttl is None else ttl)
+        self._remember(key, expires_at, value)
+        if self.disk_dir:
+            path = self._disk_path(key)
+            try:
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                tmp_path = f"{path}.{os.getpid()}.tmp"
+                with open(tmp_path, 'w', encoding='utf-8') as f:
+                    json.dump({"expires_at": expires_at, "value": value}, f, ensure_ascii=False)
+                os.replace(tmp_path, path)
+            except (OSError, TypeError) as e:
+                print(f"[LLMCache] Disk write failed: {e}")
+
+    def _remember(self, key: str, expires_at: float, value: Any):
+        with self._lock:
+            self._entries[key] = (expires_at, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def get_or_generate(self, key: str, generate: Callable[[], Any],
+                        cacheable: Callable[[Any], bool] = lambda value: True,
+                        ttl: Optional[float] = None) -> Any:
+        """Return the cached response or generate, caching it if ``cacheable`` accepts it"""
+        value = self.get(key)
+        if value is not None:
+            return value
+        value = generate()
+        if cacheable(value):
+            self.put(key, value, ttl)
+        return value
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "disk": bool(self.disk_dir)
+            }
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+_llm_cache = None
+_llm_cache_lock = threading.Lock()
+
+
+def get_llm_cache() -> Optional[LLMResponseCache]:
+    """Get the shared LLM response cache (None when LLM_CACHE_ENABLED is off)"""
+    global _llm_cache
+    if not Config.LLM_CACHE_ENABLED:
+        return None
+    if _llm_cache is None:
+        with _llm_cache_lock:
+            if _llm_cache is None:
+                _llm_cache = LLMResponseCache(Config.LLM_CACHE_SIZE, Config.LLM_CACHE_TTL,
+                                              Config.LLM_CACHE_DIR)
+    return _llm_cache
@@ -0,0 +1,118 @@
+"""
+Process-wide Model Registry
+Loads heavy models once and shares them across tools, engines and requests
+"""
+
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from config import Config
+
+
+_models: Dict[str, Any] = {}
+_load_times: Dict[str, float] = {}
+_model_locks: Dict[str, threading.Lock] = {}
+_registry_lock = threading.Lock()
+
+
+def _get_lock(name: str) -> threading.Lock:
+    """Get (or create) the load lock for a model name"""
+    with _registry_lock:
+        if name not in _model_locks:
+            _model_locks[name] = threading.Lock()
+        return _model_locks[name]
+
+
+def get_model(name: str, factory: Callable[[], Any]) -> Any:
+    """
+    Get a shared model instance, building it with ``factory`` on first use
+
+    Concurrent callers asking for the same model wait for a single load
+    instead of each loading their own copy of the weights.
+    """
+    model = _models.get(name)
+    if model is not None:
+        return model
+
+    with _get_lock(name):
+        model = _models.get(name)
+        if model is None:
+            start = time.time()
+            model = factory()
+            _load_times[name] = time.time() - start
+            _models[name] = model
+            print(f"[Registry] Loaded {name} in {_load_times[name]:.2f}s")
+    return model
+
+
+def get_sentiment_analyzer(model_name: Optional[str] = None):
+    """
+    Get the shared FinBERT sentiment analyzer
+
+    When SENTIMENT_SERVER_ADDRESS is set, returns a client for the
+    out-of-process inference server instead of loading weights here.
+    """
+    if Config.SENTIMENT_SERVER_ADDRESS:
+        def client_factory():
+            from backend.models.sentiment_server import SentimentClient
+            return SentimentClient(Config.SENTIMENT_SERVER_ADDRESS)
+
+        return get_model(f"finbert-client:{Config.SENTIMENT_SERVER_ADDRESS}", client_factory)
+
+    model_name = model_name or Config.FINBERT_MODEL
+
+    def factory():
+        from backend.models.sentiment_analyzer import FinBERTSentimentAnalyzer
+        return FinBERTSentimentAnalyzer(model_name)
+
+    return get_model(f"finbert:{model_name}", factory)
+
+
+def get_price_model(model_type: str = 'transformer', input_size: int = 10):
+    """Get the shared price prediction network (on GPU when available)"""
+    def factory():
+        import torch
+        from backend.models.technical_analysis import LSTMPricePredictor, TransformerPricePredictor
+
+        model_cls = TransformerPricePredictor if model_type == 'transformer' else LSTMPricePredictor
+        model = model_cls(input_size=input_size)
+        model.to(torch.device('cuda' if torch.cuda.is_available() else 'cpu'))
+        model.eval()
+        return model
+
+    return get_model(f"price-model:{model_type}:{input_size}", factory)
+
+
+# Loaders for models that can be preloaded by name
+PRELOADERS: Dict[str, Callable[[], Any]] = {
+    'finbert': get_sentiment_analyzer,
+    'price_model': get_price_model,
+}
+
+
+def preload_models(names: List[str]) -> Dict[str, Any]:
+    """
+    Load the named models now instead of on first request
+
+    Returns:
+        Dict mapping each name to "loaded" or an error message
+    """
+    status = {}
+    for name in names:
+        loader = PRELOADERS.get(name)
+        if loader is None:
+            status[name] = f"unknown model: {name}"
+            continue
+        try:
+            loader()
+            status[name] = "loaded"
+        except Exception as e:
+            print(f"[Registry] Failed to preload {name}: {e}")
+            status[name] = str(e)
+    return status
+
+
+def loaded_models() -> Dict[str, float]:
+    """Get loaded model names and their load time in seconds"""
+    return dict(_load_times)
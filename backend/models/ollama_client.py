@@ -2,6 +2,7 @@ import requests
 import json
 from typing import List, Dict, Any, Optional
 from config import Config
+from backend.models.llm_cache import get_llm_cache, prompt_key
 
 class OllamaClient:
     """Wrapper for Ollama API based on the example notebook"""
@@ -57,7 +58,7 @@ class OllamaClient:
             }
     
     def chat(self, user_message: str, system_prompt: Optional[str] = None, 
-             temperature: float = 0.7) -> str:
+             temperature: float = 0.7, cache: bool = False) -> str:
         """
         Simple chat interface
         
@@ -65,6 +66,7 @@ class OllamaClient:
             user_message: User's message
             system_prompt: Optional system prompt
             temperature: Temperature for generation
+            cache: Serve identical prompts from the LLM response cache
             
         Returns:
             Assistant's response content
@@ -83,12 +85,22 @@ class OllamaClient:
         })
         
         options = {"temperature": temperature}
+        llm_cache = get_llm_cache() if cache else None
+        if llm_cache is not None:
+            key = prompt_key(self.model, messages, options)
+            cached = llm_cache.get(key)
+            if cached is not None:
+                return cached
+        
         response = self.generate(messages, stream=False, options=options)
         
         if "error" in response:
             return response["message"]["content"]
-            
-        return response.get("message", {}).get("content", "No response generated")
+        
+        content = response.get("message", {}).get("content", "No response generated")
+        if llm_cache is not None and content:
+            llm_cache.put(key, content)
+        return content
     
     def chat_with_tools(self, user_message: str, available_tools: List[Dict[str, Any]], 
                         conversation_history: List[Dict[str, str]] = None) -> Dict[str, Any]:
@@ -0,0 +1,230 @@
+"""
+Backtest Results Store
+Append-only SQLite store for backtest runs: indexed metric columns for
+filtering and equity curves packed as compact binary arrays
+"""
+
+import json
+import os
+import sqlite3
+import threading
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from config import Config
+
+
+# Metric columns stored natively (everything else goes in the JSON column)
+METRIC_COLUMNS = [
+    'timestamp', 'symbol', 'strategy', 'timeframe', 'start_date', 'end_date',
+    'initial_capital', 'final_value', 'total_return_pct', 'sharpe_ratio',
+    'max_drawdown_pct', 'total_trades', 'win_rate'
+]
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS backtest_results (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    timestamp TEXT NOT NULL,
+    symbol TEXT,
+    strategy TEXT,
+    timeframe TEXT,
+    start_date TEXT,
+    end_date TEXT,
+    initial_capital REAL,
+    final_value REAL,
+    total_return_pct REAL,
+    sharpe_ratio REAL,
+    max_drawdown_pct REAL,
+    total_trades INTEGER,
+    win_rate REAL,
+    details TEXT,
+    equity_times BLOB,
+    equity_values BLOB,
+    equity_positions BLOB
+);
+CREATE INDEX IF NOT EXISTS idx_results_symbol ON backtest_results (symbol, timestamp);
+CREATE INDEX IF NOT EXISTS idx_results_strategy ON backtest_results (strategy, timestamp);
+CREATE INDEX IF NOT EXISTS idx_results_timestamp ON backtest_results (timestamp);
+"""
+
+
+def pack_equity_curve(curve: Dict[str, List]) -> tuple:
+    """
+    Pack an equity curve into (int64 epoch-seconds, float32 values,
+    float32 positions or None) byte strings
+    """
+    times = pd.to_datetime(pd.Series(curve.get('timestamps', [])))
+    seconds = (times.astype('int64') // 10**9).to_numpy(dtype=np.int64)
+    values = np.asarray(curve.get('values', []), dtype=np.float32)
+    positions = None
+    if curve.get('positions') is not None:
+        positions = np.asarray(curve['positions'], dtype=np.float32).tobytes()
+    return seconds.tobytes(), values.tobytes(), positions
+
+
+def unpack_equity_curve(times_blob: bytes, values_blob: bytes,
+                        positions_blob: Optional[bytes] = None) -> Dict[str, List]:
+    """Inverse of pack_equity_curve"""
+    seconds = np.frombuffer(times_blob or b'', dtype=np.int64)
+    values = np.frombuffer(values_blob or b'', dtype=np.float32)
+    timestamps = pd.to_datetime(seconds, unit='s')
+    curve = {
+        "timestamps": [t.isoformat() for t in timestamps],
+        "values": values.astype(float).round(2).tolist()
+    }
+    if positions_blob:
+        curve["positions"] = np.frombuffer(positions_blob, dtype=np.float32).astype(float).tolist()
+    return curve
+
+
+class BacktestResultsStore:
+    """SQLite-backed store of backtest results"""
+
+    def __init__(self, db_path: str = None):
+        self.db_path = db_path or Config.BACKTEST_DB_PATH
+        os.makedirs(os.path.dirname(os.path.abspath(self.db_path)), exist_ok=True)
+        self._local = threading.local()
+        conn = self._connect()
+        # WAL lets readers page through results while sweeps keep appending
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.executescript(SCHEMA)
+        # Databases created before position capture lack this column
+        columns = {row['name'] for row in conn.execute('PRAGMA table_info(backtest_results)')}
+        if 'equity_positions' not in columns:
+            conn.execute('ALTER TABLE backtest_results ADD COLUMN equity_positions BLOB')
+
+    def _connect(self) -> sqlite3.Connection:
+        """Per-thread connection"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30)
+            conn.row_factory = sqlite3.Row
+            self._local.conn = conn
+        return conn
+
+    @staticmethod
+    def _row_values(result: Dict[str, Any]) -> tuple:
+        details = {k: v for k, v in result.items()
+                   if k not in METRIC_COLUMNS and k != 'equity_curve'}
+        blobs = (None, None, None)
+        if result.get('equity_curve'):
+            blobs = pack_equity_curve(result['equity_curve'])
+        return tuple(result.get(c) for c in METRIC_COLUMNS) + (
+            json.dumps(details, default=str),
+        ) + blobs
+
+    def save(self, result: Dict[str, Any]) -> int:
+        """Append one result, returning its id"""
+        return self.save_many([result])[-1]
+
+    def save_many(self, results: List[Dict[str, Any]]) -> List[int]:
+        """Append several results in one transaction (parameter sweeps)"""
+        columns = METRIC_COLUMNS + ['details', 'equity_times', 'equity_values', 'equity_positions']
+        sql = (f"INSERT INTO backtest_results ({', '.join(columns)}) "
+               f"VALUES ({', '.join('?' * len(columns))})")
+        conn = self._connect()
+        ids = []
+        with conn:
+            for result in results:
+                ids.append(conn.execute(sql, self._row_values(result)).lastrowid)
+        return ids
+
+    @staticmethod
+    def _row_to_result(row: sqlite3.Row, include_equity: bool) -> Dict[str, Any]:
+        result = {"id": row['id']}
+        result.update(json.loads(row['details'] or '{}'))
+        result.update({c: row[c] for c in METRIC_COLUMNS if row[c] is not None})
+        if include_equity and row['equity_values']:
+            result['equity_curve'] = unpack_equity_curve(
+                row['equity_times'], row['equity_values'], row['equity_positions'])
+        return result
+
+    def query(self, limit: int = 10, page: int = 1, offset: Optional[int] = None,
+              symbol: Optional[str] = None, strategy: Optional[str] = None,
+              include_equity: bool = False) -> Dict[str, Any]:
+        """
+        Page through results, newest first
+
+        Args:
+            limit: Page size
+            page: 1-based page number (ignored when offset is given)
+            offset: Explicit row offset
+            symbol: Filter by symbol
+            strategy: Filter by strategy
+            include_equity: Decode and return equity curves
+
+        Returns:
+            Results for the page plus total count and paging info
+        """
+        limit = max(1, min(int(limit), 1000))
+        offset = int(offset) if offset is not None else (max(1, int(page)) - 1) * limit
+
+        conditions, args = [], []
+        if symbol:
+            conditions.append('symbol = ?')
+            args.append(symbol)
+        if strategy:
+            conditions.append('strategy = ?')
+            args.append(strategy)
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ''
+
+        columns = '*' if include_equity else ', '.join(
+            ['id'] + METRIC_COLUMNS + ['details', 'NULL AS equity_times', 'NULL AS equity_values'])
+        conn = self._connect()
+        total = conn.execute(f"SELECT COUNT(*) FROM backtest_results {where}", args).fetchone()[0]
+        rows = conn.execute(
+            f"SELECT {columns} FROM backtest_results {where} "
+            f"ORDER BY timestamp DESC, id DESC LIMIT ? OFFSET ?",
+            args + [limit, offset]
+        ).fetchall()
+
+        return {
+            "success": True,
+            "results": [self._row_to_result(row, include_equity) for row in rows],
+            "total": total,
+            "limit": limit,
+            "offset": offset,
+            "page": offset // limit + 1
+        }
+
+    def get(self, result_id: int) -> Optional[Dict[str, Any]]:
+        """Get one result with its equity curve"""
+        row = self._connect().execute(
+            "SELECT * FROM backtest_results WHERE id = ?", (result_id,)
+        ).fetchone()
+        return self._row_to_result(row, include_equity=True) if row else None
+
+    def migrate_json(self, json_path: str) -> int:
+        """Import a legacy backtest_results.json file once, then rename it"""
+        if not os.path.exists(json_path):
+            return 0
+        try:
+            with open(json_path, 'r') as f:
+                results = json.load(f)
+            results = [r for r in results if r.get('timestamp')]
+            if results:
+                self.save_many(results)
+            os.rename(json_path, json_path + '.migrated')
+            print(f"Migrated {len(results)} backtest results from {json_path}")
+            return len(results)
+        except Exception as e:
+            print(f"Error migrating {json_path}: {e}")
+            return 0
+
+
+_results_store = None
+_results_store_lock = threading.Lock()
+
+
+def get_results_store() -> BacktestResultsStore:
+    """Get the shared results store, importing the legacy JSON file on first use"""
+    global _results_store
+    if _results_store is None:
+        with _results_store_lock:
+            if _results_store is None:
+                store = BacktestResultsStore()
+                store.migrate_json(os.path.join(Config.DATA_DIR, 'backtest_results.json'))
+                _results_store = store
+    return _results_store
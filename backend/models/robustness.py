@@ -0,0 +1,234 @@
+"""
+Backtest Robustness Analysis
+Block-bootstrap resampling of bar returns and trade returns to put
+confidence intervals on return, Sharpe ratio and max drawdown
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from backend.models.vectorized_backtest import periods_per_year
+
+
+# Resamples per vectorized chunk (bounds the samples x bars matrix in memory)
+CHUNK_SAMPLES = 2500
+# Sample counts at or above this run chunks in a process pool
+PARALLEL_MIN_SAMPLES = 20000
+
+
+def block_bootstrap_indices(n: int, n_samples: int, block_size: int,
+                            rng: np.random.Generator) -> np.ndarray:
+    """
+    Circular block-bootstrap index matrix of shape (n_samples, n)
+
+    Contiguous blocks keep the autocorrelation (volatility clustering, trend
+    runs) that an i.i.d. resample would destroy.
+    """
+    block_size = max(1, min(block_size, n))
+    n_blocks = -(-n // block_size)
+    starts = rng.integers(0, n, size=(n_samples, n_blocks))
+    idx = (starts[:, :, None] + np.arange(block_size)) % n
+    return idx.reshape(n_samples, -1)[:, :n]
+
+
+def default_block_size(n: int) -> int:
+    """Cube root of the series length, the usual block-length rate for the block bootstrap"""
+    return max(1, round(n ** (1 / 3)))
+
+
+def path_metrics(samples: np.ndarray, bars_per_year: float) -> Dict[str, np.ndarray]:
+    """Total return %, annualized Sharpe and max drawdown % for each resampled path (rows)"""
+    equity = np.cumprod(1 + samples, axis=1)
+    peaks = np.maximum.accumulate(equity, axis=1)
+    std = samples.std(axis=1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        sharpe = np.where(std > 0, samples.mean(axis=1) / std * np.sqrt(bars_per_year), 0.0)
+    return {
+        "total_return_pct": (equity[:, -1] - 1) * 100,
+        "sharpe_ratio": sharpe,
+        "max_drawdown_pct": np.max((peaks - equity) / peaks, axis=1) * 100
+    }
+
+
+def _bootstrap_chunk(returns: np.ndarray, n_samples: int, block_size: int,
+                     bars_per_year: float, seed) -> Dict[str, np.ndarray]:
+    """Resample one chunk (also the process-pool entry point)"""
+    rng = np.random.default_rng(seed)
+    idx = block_bootstrap_indices(len(returns), n_samples, block_size, rng)
+    return path_metrics(returns[idx], bars_per_year)
+
+
+def bootstrap(returns: np.ndarray, n_samples: int = 2000, block_size: int = 1,
+              bars_per_year: float = 365.0, seed: Optional[int] = None,
+              workers: Optional[int] = None) -> Dict[str, np.ndarray]:
+    """
+    Bootstrap path metrics, chunked and spread over processes for large sample counts
+
+    Returns:
+        Dict of metric name -> array of n_samples resampled values
+    """
+    returns = np.asarray(returns, dtype=float)
+    chunks = [CHUNK_SAMPLES] * (n_samples // CHUNK_SAMPLES)
+    if n_samples % CHUNK_SAMPLES:
+        chunks.append(n_samples % CHUNK_SAMPLES)
+    seeds = np.random.SeedSequence(seed).spawn(len(chunks))
+
+    args = [(returns, size, block_size, bars_per_year, s) for size, s in zip(chunks, seeds)]
+    if n_samples >= PARALLEL_MIN_SAMPLES and len(chunks) > 1:
+        import multiprocessing
+        ctx = multiprocessing.get_context('spawn')
+        workers = min(workers or os.cpu_count() or 1, len(chunks))
+        with ProcessPoolExecutor(max_workers=workers, mp_context=ctx) as pool:
+            parts = list(pool.map(_bootstrap_chunk, *zip(*args)))
+    else:
+        parts = [_bootstrap_chunk(*a) for a in args]
+
+    return {name: np.concatenate([p[name] for p in parts]) for name in parts[0]}
+
+
+def summarize(values: np.ndarray, observed: float, confidence: float) -> Dict[str, float]:
+    """Confidence interval and distribution summary for one metric"""
+    tail = (1 - confidence) / 2 * 100
+    lower, median, upper = np.percentile(values, [tail, 50, 100 - tail])
+    return {
+        "observed": float(observed),
+        "mean": float(values.mean()),
+        "median": float(median),
+        "ci_lower": float(lower),
+        "ci_upper": float(upper),
+        "prob_below_zero": float((values < 0).mean())
+    }
+
+
+def trade_returns(trades_log: List[Dict[str, Any]]) -> np.ndarray:
+    """Net return of each closed trade from the backtest trade ledger"""
+    returns = []
+    for trade in trades_log:
+        notional = abs(trade.get('size', 0)) * trade.get('entry_price', 0)
+        if notional > 0:
+            returns.append(trade['pnl_net'] / notional)
+    return np.array(returns)
+
+
+def analyze_robustness(result: Dict[str, Any], n_samples: int = 2000,
+                       block_size: Optional[int] = None, confidence: float = 0.95,
+                       seed: Optional[int] = None, workers: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Bootstrap a finished backtest
+
+    Args:
+        result: Backtest result with a full-resolution equity_curve (and trades_log)
+        n_samples: Number of bootstrap resamples
+        block_size: Bars per block (default: cube root of the series length)
+        confidence: Confidence level of the intervals
+        seed: Random seed for reproducible runs
+        workers: Processes for large sample counts (default: all cores)
+
+    Returns:
+        Confidence intervals for bar-level and trade-level metrics
+    """
+    curve = result.get('equity_curve') or {}
+    equity = np.asarray(curve.get('values', []), dtype=float)
+    if curve.get('full_length', len(equity)) != len(equity):
+        return {"success": False, "error": "Equity curve is downsampled; a full-resolution curve is required"}
+    if len(equity) < 10:
+        return {"success": False, "error": "Not enough equity data for bootstrap analysis"}
+
+    bar_returns = np.diff(equity) / equity[:-1]
+    bars_per_year = periods_per_year(pd.DatetimeIndex(pd.to_datetime(curve['timestamps'])))
+    block_size = block_size or default_block_size(len(bar_returns))
+
+    observed = path_metrics(bar_returns[None, :], bars_per_year)
+    samples = bootstrap(bar_returns, n_samples, block_size, bars_per_year, seed, workers)
+    bar_summary = {name: summarize(samples[name], observed[name][0], confidence) for name in samples}
+
+    analysis = {
+        "success": True,
+        "n_samples": n_samples,
+        "confidence": confidence,
+        "block_size": block_size,
+        "bars": len(bar_returns),
+        "bar_bootstrap": bar_summary,
+        # Sharpe interval excluding zero is the minimum bar for a real edge
+        "edge_significant": bool(bar_summary['sharpe_ratio']['ci_lower'] > 0)
+    }
+
+    per_trade = trade_returns(result.get('trades_log') or [])
+    if len(per_trade) >= 5:
+        # Consecutive trades share a market regime (winning and losing streaks),
+        # so they are resampled in blocks like the bars
+        trade_block_size = default_block_size(len(per_trade))
+        trade_observed = path_metrics(per_trade[None, :], 1.0)
+        trade_samples = bootstrap(per_trade, n_samples, trade_block_size, 1.0, seed, workers)
+        analysis["trade_bootstrap"] = {
+            "trades": len(per_trade),
+            "block_size": trade_block_size,
+            "total_return_pct": summarize(trade_samples['total_return_pct'],
+                                          trade_observed['total_return_pct'][0], confidence),
+            "max_drawdown_pct": summarize(trade_samples['max_drawdown_pct'],
+                                          trade_observed['max_drawdown_pct'][0], confidence),
+        }
+
+    return analysis
+
+
+class RobustnessAnalysisTool:
+    """MCP Tool for bootstrap robustness analysis of backtests"""
+
+    @staticmethod
+    def get_tool_definition() -> Dict[str, Any]:
+        return {
+            "name": "analyze_backtest_robustness",
+            "description": "Bootstrap a backtest to get confidence intervals for return, Sharpe and max drawdown",
+            "parameters": {
+                "result_id": "Stored backtest result id (optional; otherwise a backtest is run)",
+                "symbol": "Trading pair symbol (when running a new backtest)",
+                "timeframe": "Timeframe for backtest",
+                "strategy": "Strategy to test (sentiment, macd, technical, combined)",
+                "start_date": "Start date for backtest (YYYY-MM-DD, optional)",
+                "end_date": "End date for backtest (YYYY-MM-DD, optional)",
+                "n_samples": "Number of bootstrap resamples (default: 2000)",
+                "block_size": "Bars per bootstrap block (optional)",
+                "confidence": "Confidence level (default: 0.95)"
+            }
+        }
+
+    def execute(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        """Run robustness analysis on a stored or freshly run backtest"""
+        try:
+            if params.get('result_id') is not None:
+                from backend.models.results_store import get_results_store
+                result = get_results_store().get(int(params['result_id']))
+                if result is None:
+                    return {"success": False, "error": f"Backtest result {params['result_id']} not found"}
+            else:
+                from backend.models.backtest_engine import BacktestTool
+                backtest_params = {k: v for k, v in params.items()
+                                   if k not in ('n_samples', 'block_size', 'confidence', 'seed')}
+                result = BacktestTool().execute({**backtest_params, 'full_resolution': True})
+                if not result.get('success'):
+                    return result
+
+            analysis = analyze_robustness(
+                result,
+                n_samples=int(params.get('n_samples', 2000)),
+                block_size=int(params['block_size']) if params.get('block_size') else None,
+                confidence=float(params.get('confidence', 0.95)),
+                seed=params.get('seed')
+            )
+            if analysis['success']:
+                analysis['backtest'] = {
+                    k: result.get(k) for k in (
+                        'result_id', 'id', 'symbol', 'strategy', 'timeframe',
+                        'total_return_pct', 'sharpe_ratio', 'max_drawdown_pct', 'total_trades'
+                    ) if result.get(k) is not None
+                }
+            return analysis
+
+        except Exception as e:
+            import traceback
+            return {"success": False, "error": str(e), "traceback": traceback.format_exc()}
@@ -1,15 +1,51 @@
+import threading
 import torch
 from transformers import AutoTokenizer, AutoModelForSequenceClassification
 from typing import List, Dict, Any
 import numpy as np
 from config import Config
 
+
+def plan_token_budget_batches(lengths: List[int], token_budget: int,
+                              max_batch_size: int = 64) -> List[List[int]]:
+    """
+    Group text indices into length-sorted micro-batches under a token budget
+    
+    Args:
+        lengths: Tokenized length of each text
+        token_budget: Max padded tokens per batch (longest length x batch size)
+        max_batch_size: Hard cap on texts per batch
+        
+    Returns:
+        List of batches, each a list of indices into ``lengths``
+    """
+    order = sorted(range(len(lengths)), key=lambda i: lengths[i])
+    batches = []
+    current = []
+    for i in order:
+        # Sorted ascending, so the new text is the longest in the batch
+        padded_size = lengths[i] * (len(current) + 1)
+        if current and (padded_size > token_budget or len(current) >= max_batch_size):
+            batches.append(current)
+            current = []
+        current.append(i)
+    if current:
+        batches.append(current)
+    return batches
+
+
 class FinBERTSentimentAnalyzer:
     """FinBERT-based sentiment analyzer for financial/crypto news"""
     
     def __init__(self, model_name: str = None):
         self.model_name = model_name or Config.FINBERT_MODEL
         self.device = torch.device('cuda' if torch.cuda.is_available() else 'cpu')
+        # The analyzer is shared across threads via the model registry. Fast
+        # tokenizers are not thread-safe when truncation/padding is set
+        # ("Already borrowed"), so tokenization has its own lock and can
+        # overlap another thread's forward pass.
+        self._inference_lock = threading.Lock()
+        self._tokenizer_lock = threading.Lock()
         self._load_model()
     
     def _load_model(self):
@@ -32,47 +68,80 @@ class FinBERTSentimentAnalyzer:
         Returns:
             Dict with sentiment (positive/negative/neutral) and scores
         """
+        return self.analyze_batch([text])[0]
+    
+    def analyze_batch(self, texts: List[str], token_budget: int = None,
+                      max_batch_size: int = None) -> List[Dict[str, Any]]:
+        """
+        Analyze sentiment for multiple texts
+        
+        Texts are sorted by tokenized length and packed into micro-batches whose
+        padded size (longest sequence x batch size) stays under ``token_budget``,
+        so short titles are never padded up to a long description.
+        Results are returned in the original order.
+        """
+        if not texts:
+            return []
+        
+        token_budget = token_budget or Config.FINBERT_TOKEN_BUDGET
+        max_batch_size = max_batch_size or Config.FINBERT_MAX_BATCH_SIZE
+        results: List[Dict[str, Any]] = [None] * len(texts)
+        
         try:
-            inputs = self.tokenizer(text, return_tensors='pt', 
-                                   truncation=True, max_length=512, 
-                                   padding=True)
-            inputs = {k: v.to(self.device) for k, v in inputs.items()}
-            
-            with torch.no_grad():
-                outputs = self.model(**inputs)
-                predictions = torch.nn.functional.softmax(outputs.logits, dim=-1)
-            
-            scores = predictions.cpu().numpy()[0]
-            
-            # FinBERT labels: negative, neutral, positive
-            sentiment_labels = ['negative', 'neutral', 'positive']
-            sentiment_idx = np.argmax(scores)
-            
-            return {
-                'sentiment': sentiment_labels[sentiment_idx],
-                'scores': {
-                    'negative': float(scores[0]),
-                    'neutral': float(scores[1]),
-                    'positive': float(scores[2])
-                },
-                'confidence': float(scores[sentiment_idx])
-            }
+            with self._tokenizer_lock:
+                encodings = self.tokenizer(list(texts), truncation=True, max_length=512)
         except Exception as e:
-            return {
-                'sentiment': 'neutral',
-                'scores': {'negative': 0.33, 'neutral': 0.34, 'positive': 0.33},
-                'confidence': 0.34,
-                'error': str(e)
-            }
-    
-    def analyze_batch(self, texts: List[str]) -> List[Dict[str, Any]]:
-        """Analyze sentiment for multiple texts"""
-        results = []
-        for text in texts:
-            results.append(self.analyze_sentiment(text))
+            return [self._neutral_result(e) for _ in texts]
+        
+        lengths = [len(ids) for ids in encodings['input_ids']]
+        for batch in plan_token_budget_batches(lengths, token_budget, max_batch_size):
+            try:
+                features = [{k: encodings[k][i] for k in encodings.keys()} for i in batch]
+                with self._tokenizer_lock:
+                    inputs = self.tokenizer.pad(features, return_tensors='pt')
+                inputs = {k: v.to(self.device) for k, v in inputs.items()}
+                
+                with self._inference_lock, torch.no_grad():
+                    outputs = self.model(**inputs)
+                    predictions = torch.nn.functional.softmax(outputs.logits, dim=-1)
+                
+                for i, scores in zip(batch, predictions.cpu().numpy()):
+                    results[i] = self._build_result(scores)
+            except Exception as e:
+                for i in batch:
+                    results[i] = self._neutral_result(e)
+        
         return results
     
-    def aggregate_sentiment(self, sentiments: List[Dict[str, Any]]) -> Dict[str, Any]:
+    @staticmethod
+    def _build_result(scores: np.ndarray) -> Dict[str, Any]:
+        """Convert softmax scores into a sentiment result dict"""
+        # FinBERT labels: negative, neutral, positive
+        sentiment_labels = ['negative', 'neutral', 'positive']
+        sentiment_idx = np.argmax(scores)
+        
+        return {
+            'sentiment': sentiment_labels[sentiment_idx],
+            'scores': {
+                'negative': float(scores[0]),
+                'neutral': float(scores[1]),
+                'positive': float(scores[2])
+            },
+            'confidence': float(scores[sentiment_idx])
+        }
+    
+    @staticmethod
+    def _neutral_result(error: Exception) -> Dict[str, Any]:
+        """Neutral fallback result used when inference fails"""
+        return {
+            'sentiment': 'neutral',
+            'scores': {'negative': 0.33, 'neutral': 0.34, 'positive': 0.33},
+            'confidence': 0.34,
+            'error': str(error)
+        }
+    
+    @staticmethod
+    def aggregate_sentiment(sentiments: List[Dict[str, Any]]) -> Dict[str, Any]:
         """
         Aggregate multiple sentiment results into overall sentiment
         
@@ -128,9 +197,10 @@ class SentimentAnalysisTool:
         self.analyzer = None
     
     def _ensure_analyzer(self):
-        """Lazy load analyzer"""
+        """Lazy load the shared analyzer from the model registry"""
         if self.analyzer is None:
-            self.analyzer = FinBERTSentimentAnalyzer()
+            from backend.models.model_registry import get_sentiment_analyzer
+            self.analyzer = get_sentiment_analyzer()
     
     @staticmethod
     def get_tool_definition() -> Dict[str, Any]:
@@ -0,0 +1,276 @@
+"""
+Out-of-process FinBERT Inference Server
+Runs the sentiment model in a separate worker process and batches concurrent
+requests from web threads into shared forward passes
+
+Start standalone (SENTIMENT_SERVER_AUTHKEY must be set for both sides):
+    python -m backend.models.sentiment_server --address /tmp/finbert.sock
+
+or let the web app spawn it with WARMUP_COMPONENTS=sentiment_server,...
+"""
+
+import argparse
+import os
+import queue
+import secrets
+import threading
+import time
+from multiprocessing import AuthenticationError
+from multiprocessing.connection import Client, Listener
+from typing import Any, Dict, List, Optional
+
+from config import Config
+
+
+_generated_authkey: Optional[str] = None
+_authkey_lock = threading.Lock()
+
+
+def server_authkey() -> str:
+    """
+    SENTIMENT_SERVER_AUTHKEY, or a random key generated once per process
+
+    The random key is only known to this process and the servers it spawns.
+    """
+    global _generated_authkey
+    if Config.SENTIMENT_SERVER_AUTHKEY:
+        return Config.SENTIMENT_SERVER_AUTHKEY
+    with _authkey_lock:
+        if _generated_authkey is None:
+            _generated_authkey = secrets.token_hex(32)
+        return _generated_authkey
+
+
+class _PendingRequest:
+    """A client request waiting for its slice of a batched forward pass"""
+
+    def __init__(self, texts: List[str]):
+        self.texts = texts
+        self.results: Optional[List[Dict[str, Any]]] = None
+        self.error: Optional[str] = None
+        self.done = threading.Event()
+
+
+class SentimentInferenceServer:
+    """Unix-socket FinBERT worker with dynamic micro-batching"""
+
+    def __init__(self, address: str = None, authkey: str = None,
+                 model_name: str = None, max_batch_texts: int = None,
+                 max_latency_ms: float = None):
+        self.address = address or Config.SENTIMENT_SERVER_ADDRESS
+        self.authkey = (authkey or server_authkey()).encode('utf-8')
+        self.model_name = model_name or Config.FINBERT_MODEL
+        self.max_batch_texts = max_batch_texts or Config.SENTIMENT_SERVER_MAX_BATCH
+        self.max_latency = (max_latency_ms or Config.SENTIMENT_SERVER_MAX_LATENCY_MS) / 1000.0
+        self.requests: "queue.Queue[_PendingRequest]" = queue.Queue()
+        self.analyzer = None
+        self._listener = None
+        self._stopped = threading.Event()
+
+    def serve_forever(self):
+        """Load the model (unless one was given), then accept client connections until killed"""
+        if self.analyzer is None:
+            from backend.models.sentiment_analyzer import FinBERTSentimentAnalyzer
+            self.analyzer = FinBERTSentimentAnalyzer(self.model_name)
+        threading.Thread(target=self._batch_loop, daemon=True).start()
+
+        if os.path.exists(self.address):
+            os.remove(self.address)
+
+        with Listener(self.address, family='AF_UNIX', authkey=self.authkey) as listener:
+            self._listener = listener
+            print(f"[SentimentServer] Listening on {self.address}")
+            while not self._stopped.is_set():
+                try:
+                    conn = listener.accept()
+                except Exception as e:
+                    if not self._stopped.is_set():
+                        print(f"[SentimentServer] Accept error: {e}")
+                    continue
+                threading.Thread(target=self._handle_connection, args=(conn,), daemon=True).start()
+
+    def shutdown(self):
+        """Stop accepting connections and remove the socket"""
+        self._stopped.set()
+        if self._listener is not None:
+            self._listener.close()
+
+    def _handle_connection(self, conn):
+        """Serve requests from one client connection"""
+        try:
+            while True:
+                message = conn.recv()
+                request = _PendingRequest(list(message.get('texts', [])))
+                self.requests.put(request)
+                request.done.wait()
+
+                if request.error is not None:
+                    conn.send({'error': request.error})
+                else:
+                    conn.send({'results': request.results})
+        except (EOFError, OSError):
+            pass
+        finally:
+            conn.close()
+
+    def _collect_batch(self) -> List[_PendingRequest]:
+        """Wait for a request, then gather more until the batch is full or the window closes"""
+        batch = [self.requests.get()]
+        total_texts = len(batch[0].texts)
+        deadline = time.monotonic() + self.max_latency
+
+        while total_texts < self.max_batch_texts:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                request = self.requests.get(timeout=remaining)
+            except queue.Empty:
+                break
+            batch.append(request)
+            total_texts += len(request.texts)
+
+        return batch
+
+    def _batch_loop(self):
+        """Run one forward pass per collected micro-batch"""
+        while True:
+            batch = self._collect_batch()
+            texts = [text for request in batch for text in request.texts]
+            try:
+                results = self.analyzer.analyze_batch(texts)
+                offset = 0
+                for request in batch:
+                    request.results = results[offset:offset + len(request.texts)]
+                    offset += len(request.texts)
+            except Exception as e:
+                for request in batch:
+                    request.error = str(e)
+            finally:
+                for request in batch:
+                    request.done.set()
+
+
+class SentimentClient:
+    """
+    Client for SentimentInferenceServer
+
+    Exposes the same analyze/aggregate interface as FinBERTSentimentAnalyzer so
+    it can be passed anywhere an analyzer is expected. Like the local analyzer,
+    failures yield neutral results carrying an ``error`` key instead of raising.
+    """
+
+    def __init__(self, address: str = None, authkey: str = None):
+        self.address = address or Config.SENTIMENT_SERVER_ADDRESS
+        self.authkey = (authkey or server_authkey()).encode('utf-8')
+        # Connections are not thread-safe, so each thread keeps its own
+        self._local = threading.local()
+
+    def _connection(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = Client(self.address, family='AF_UNIX', authkey=self.authkey)
+            self._local.conn = conn
+        return conn
+
+    def _request(self, texts: List[str]) -> Dict[str, Any]:
+        # Retry once on a fresh connection in case the server restarted
+        for attempt in range(2):
+            try:
+                conn = self._connection()
+                conn.send({'texts': texts})
+                return conn.recv()
+            except (EOFError, OSError, AuthenticationError) as e:
+                self._local.conn = None
+                if attempt == 1:
+                    raise ConnectionError(f"Sentiment server unavailable at {self.address}: {e}")
+
+    def analyze_batch(self, texts: List[str]) -> List[Dict[str, Any]]:
+        """Analyze sentiment for multiple texts on the inference server"""
+        if not texts:
+            return []
+        try:
+            response = self._request(list(texts))
+            if 'error' in response:
+                raise RuntimeError(f"Sentiment server error: {response['error']}")
+            return response['results']
+        except (ConnectionError, RuntimeError) as e:
+            from backend.models.sentiment_analyzer import FinBERTSentimentAnalyzer
+            print(f"[SentimentClient] {e}; returning neutral sentiment")
+            return [FinBERTSentimentAnalyzer._neutral_result(e) for _ in texts]
+
+    def analyze_sentiment(self, text: str) -> Dict[str, Any]:
+        """Analyze sentiment of a single text"""
+        return self.analyze_batch([text])[0]
+
+    @staticmethod
+    def aggregate_sentiment(sentiments: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Aggregate results locally; no model is needed"""
+        from backend.models.sentiment_analyzer import FinBERTSentimentAnalyzer
+        return FinBERTSentimentAnalyzer.aggregate_sentiment(sentiments)
+
+
+def run_server(address: str = None, model_name: str = None, authkey: str = None):
+    """Process entry point for the inference server"""
+    SentimentInferenceServer(address=address, authkey=authkey, model_name=model_name).serve_forever()
+
+
+def start_server_process(address: str = None, model_name: str = None):
+    """
+    Start the inference server in a child process, sharing this process's authkey
+
+    Returns:
+        The started multiprocessing.Process
+    """
+    import multiprocessing
+
+    address = address or Config.SENTIMENT_SERVER_ADDRESS
+    if not address:
+        raise ValueError("SENTIMENT_SERVER_ADDRESS is not set")
+
+    # spawn avoids forking a web process that may already hold torch threads;
+    # the key travels over the spawn pipe, not the command line
+    ctx = multiprocessing.get_context('spawn')
+    process = ctx.Process(target=run_server, args=(address, model_name, server_authkey()),
+                          name='finbert-server', daemon=True)
+    process.start()
+    return process
+
+
+def wait_for_server(address: str = None, timeout: float = None, process=None,
+                    authkey: str = None):
+    """
+    Block until the server accepts connections (it listens only once the model is loaded)
+
+    Raises:
+        RuntimeError: If ``process`` exits or the timeout passes first
+    """
+    address = address or Config.SENTIMENT_SERVER_ADDRESS
+    authkey = (authkey or server_authkey()).encode('utf-8')
+    timeout = Config.SENTIMENT_SERVER_START_TIMEOUT if timeout is None else timeout
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            Client(address, family='AF_UNIX', authkey=authkey).close()
+            return
+        except (OSError, EOFError):
+            pass
+        if process is not None and not process.is_alive():
+            raise RuntimeError(f"Sentiment server exited with code {process.exitcode}")
+        if time.monotonic() > deadline:
+            raise RuntimeError(f"Sentiment server not ready at {address} after {timeout:.0f}s")
+        time.sleep(0.2)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='FinBERT sentiment inference server')
+    parser.add_argument('--address', default=Config.SENTIMENT_SERVER_ADDRESS or '/tmp/finbert.sock',
+                        help='Unix socket path to listen on')
+    parser.add_argument('--model', default=Config.FINBERT_MODEL, help='FinBERT model name or path')
+    args = parser.parse_args()
+
+    # A generated key would be unknown to the web processes
+    if not Config.SENTIMENT_SERVER_AUTHKEY:
+        parser.error('set SENTIMENT_SERVER_AUTHKEY (the web app must use the same value)')
+
+    run_server(args.address, args.model)
@@ -7,12 +7,49 @@ import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
 from typing import Dict, Any, List, Optional, Tuple
+import hashlib
 import json
 import os
+import threading
 from pathlib import Path
 from config import Config
 
 
+# Parsed news CSV shared by every processor, keyed by (path, mtime)
+_news_index = {}
+_news_index_lock = threading.Lock()
+
+
+def find_news_csv() -> Optional[str]:
+    """Path of the first available news dataset CSV"""
+    csv_dir = os.path.join(Config.DATA_DIR, 'cryptoNewsDataset', 'csvOutput')
+    for name in ('news_currencies_source_joinedResult.csv', 'cryptonews.csv', 'cryptopanic_news.csv'):
+        candidate = os.path.join(csv_dir, name)
+        if os.path.exists(candidate):
+            return candidate
+    return None
+
+
+def load_news_index(csv_path: Optional[str] = None) -> pd.DataFrame:
+    """
+    Full news dataset sorted by time, parsed once per file version
+
+    Returns an empty frame when no dataset is available.
+    """
+    csv_path = csv_path or find_news_csv()
+    if not csv_path:
+        return pd.DataFrame()
+    key = (csv_path, os.path.getmtime(csv_path))
+    with _news_index_lock:
+        if key not in _news_index:
+            print(f"Loading news from: {os.path.basename(csv_path)}")
+            df = pd.read_csv(csv_path)
+            df['newsDatetime'] = pd.to_datetime(df['newsDatetime'])
+            _news_index.clear()
+            _news_index[key] = df.sort_values('newsDatetime')
+        return _news_index[key]
+
+
 class SentimentTimeSeriesProcessor:
     """Process news sentiment into time-series data aligned with price data"""
     
@@ -21,39 +58,139 @@ class SentimentTimeSeriesProcessor:
         os.makedirs(self.cache_dir, exist_ok=True)
         self.sentiment_cache = {}
         
+    @staticmethod
+    def build_article_texts(news_df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Build the per-article text table used for scoring
+        
+        Returns:
+            DataFrame with article_id, newsDatetime and text columns
+        """
+        if news_df.empty:
+            return pd.DataFrame(columns=['article_id', 'newsDatetime', 'text'])
+        
+        titles = news_df['title'].fillna('').astype(str) if 'title' in news_df.columns \
+            else pd.Series('', index=news_df.index)
+        descriptions = news_df['description'].fillna('').astype(str) if 'description' in news_df.columns \
+            else pd.Series('', index=news_df.index)
+        datetimes = pd.to_datetime(news_df['newsDatetime'])
+        
+        # Stable id so scores survive dataset reloads and resumed runs
+        keys = datetimes.astype(str) + '|' + titles
+        article_ids = keys.map(lambda k: hashlib.md5(k.encode('utf-8')).hexdigest())
+        
+        articles = pd.DataFrame({
+            'article_id': article_ids.values,
+            'newsDatetime': datetimes.values,
+            'text': (titles + ' ' + descriptions).str.strip().values
+        })
+        articles = articles[articles['text'] != '']
+        return articles.drop_duplicates('article_id')
+    
+    def article_scores_dir(self, model_name: str = None) -> str:
+        """Directory holding per-article scores for one model"""
+        model_name = model_name or Config.FINBERT_MODEL
+        model_slug = model_name.strip('/').replace('/', '__')
+        return os.path.join(self.cache_dir, 'article_scores', model_slug)
+    
+    def article_store_version(self, model_name: str = None) -> str:
+        """Short hash of the model and the article scores stored for it"""
+        model_name = model_name or Config.FINBERT_MODEL
+        store_dir = self.article_scores_dir(model_name)
+        signature = [model_name]
+        if os.path.isdir(store_dir):
+            for name in sorted(os.listdir(store_dir)):
+                if name.startswith('shard_'):
+                    stat = os.stat(os.path.join(store_dir, name))
+                    signature.append(f"{name}:{stat.st_size}:{stat.st_mtime_ns}")
+        return hashlib.sha1('|'.join(signature).encode('utf-8')).hexdigest()[:8]
+    
+    def sentiment_cache_file(self, symbol: str, timeframe: str, model_name: str = None) -> str:
+        """
+        Aggregated series CSV, named by the article store version it was built
+        from so re-scoring the corpus (or a new model) produces a new series
+        """
+        version = self.article_store_version(model_name)
+        return os.path.join(self.cache_dir, f'sentiment_{symbol}_{timeframe}_{version}.csv')
+    
+    def load_article_scores(self, model_name: str = None) -> pd.DataFrame:
+        """
+        Load per-article scores written by the corpus scoring command
+        
+        Returns:
+            DataFrame with article_id, newsDatetime, negative, neutral,
+            positive and sentiment columns (empty if nothing is stored)
+        """
+        store_dir = self.article_scores_dir(model_name)
+        if not os.path.isdir(store_dir):
+            return pd.DataFrame()
+        
+        shards = []
+        for name in sorted(os.listdir(store_dir)):
+            if name.startswith('shard_') and name.endswith('.csv'):
+                # A run killed mid-write can leave a truncated last line
+                shards.append(pd.read_csv(os.path.join(store_dir, name), on_bad_lines='skip'))
+        
+        if not shards:
+            return pd.DataFrame()
+        
+        scores = pd.concat(shards, ignore_index=True).dropna(subset=['positive', 'negative'])
+        scores['newsDatetime'] = pd.to_datetime(scores['newsDatetime'])
+        return scores.drop_duplicates('article_id', keep='last')
+    
+    def _aggregate_article_scores(
+        self,
+        news_df: pd.DataFrame,
+        article_scores: pd.DataFrame,
+        sentiment_analyzer,
+        timeframe: str
+    ) -> pd.DataFrame:
+        """Aggregate stored per-article scores into a sentiment time series"""
+        articles = self.build_article_texts(news_df)
+        scored = articles.merge(
+            article_scores[['article_id', 'negative', 'neutral', 'positive', 'sentiment']],
+            on='article_id', how='left'
+        )
+        
+        # Score articles the corpus run has not covered yet
+        missing = scored['positive'].isna()
+        if missing.any():
+            print(f"Scoring {int(missing.sum())} articles missing from the score store...")
+            results = sentiment_analyzer.analyze_batch(scored.loc[missing, 'text'].tolist())
+            for label in ('negative', 'neutral', 'positive'):
+                scored.loc[missing, label] = [r['scores'][label] for r in results]
+            scored.loc[missing, 'sentiment'] = [r['sentiment'] for r in results]
+        
+        scored['period'] = scored['newsDatetime'].dt.floor(timeframe)
+        for label in ('negative', 'neutral', 'positive'):
+            scored[f'is_{label}'] = (scored['sentiment'] == label).astype(float)
+        
+        grouped = scored.groupby('period')
+        sentiment_ts = pd.DataFrame({
+            'timestamp': grouped.size().index,
+            'sentiment_score': (grouped['positive'].mean() - grouped['negative'].mean()).values,
+            'positive_ratio': grouped['is_positive'].mean().values,
+            'negative_ratio': grouped['is_negative'].mean().values,
+            'neutral_ratio': grouped['is_neutral'].mean().values,
+            'news_count': grouped.size().values
+        })
+        return sentiment_ts
+    
+
     def load_news_data(self, symbol: str = 'BTC') -> pd.DataFrame:
         """Load news data from dataset"""
         try:
-            # Try multiple possible CSV files
-            csv_candidates = [
-                os.path.join(Config.DATA_DIR, 'cryptoNewsDataset', 
-                           'csvOutput', 'news_currencies_source_joinedResult.csv'),
-                os.path.join(Config.DATA_DIR, 'cryptoNewsDataset', 
-                           'csvOutput', 'cryptonews.csv'),
-                os.path.join(Config.DATA_DIR, 'cryptoNewsDataset', 
-                           'csvOutput', 'cryptopanic_news.csv'),
-            ]
-            
-            csv_path = None
-            for candidate in csv_candidates:
-                if os.path.exists(candidate):
-                    csv_path = candidate
-                    break
-            
-            if not csv_path:
-                print(f"News dataset not found. Tried: {csv_candidates[0]}")
-                return pd.DataFrame()
-            
-            print(f"Loading news from: {os.path.basename(csv_path)}")
-            df = pd.read_csv(csv_path)
-            df['newsDatetime'] = pd.to_datetime(df['newsDatetime'])
+            df = load_news_index()
+            if df.empty:
+                print("News dataset not found in data/cryptoNewsDataset/csvOutput")
+                return df
             
             # Filter by symbol if specified
             if symbol and symbol != 'ALL' and 'currencies' in df.columns:
                 symbol_filter = df['currencies'].str.contains(symbol, case=False, na=False)
                 df = df[symbol_filter]
             
-            return df.sort_values('newsDatetime')
+            return df.copy()
             
         except Exception as e:
             print(f"Error loading news data: {e}")
@@ -82,10 +219,7 @@ class SentimentTimeSeriesProcessor:
         Returns:
             DataFrame with timestamp and sentiment_score columns
         """
-        cache_file = os.path.join(
-            self.cache_dir, 
-            f'sentiment_{symbol}_{timeframe}.csv'
-        )
+        cache_file = self.sentiment_cache_file(symbol, timeframe)
         
         # Check cache
         if use_cache and os.path.exists(cache_file):
@@ -103,6 +237,15 @@ class SentimentTimeSeriesProcessor:
         
         print(f"Preprocessing sentiment time series for {symbol} at {timeframe}...")
         
+        # Prefer per-article scores from the corpus scoring command
+        article_scores = self.load_article_scores()
+        if not article_scores.empty:
+            print(f"Using {len(article_scores):,} stored article scores")
+            sentiment_ts = self._aggregate_article_scores(
+                news_df, article_scores, sentiment_analyzer, timeframe
+            )
+            return self._save_sentiment_cache(sentiment_ts, cache_file)
+        
         # Group news by time period
         news_df = news_df.copy()
         news_df['period'] = news_df['newsDatetime'].dt.floor(timeframe)
@@ -124,13 +267,8 @@ class SentimentTimeSeriesProcessor:
             if not texts:
                 continue
             
-            # Batch analysis (limit to avoid memory issues)
-            batch_size = 50
-            sentiments = []
-            for i in range(0, len(texts), batch_size):
-                batch = texts[i:i + batch_size]
-                batch_results = sentiment_analyzer.analyze_batch(batch)
-                sentiments.extend(batch_results)
+            # Batch analysis (the analyzer packs texts into token-budget micro-batches)
+            sentiments = sentiment_analyzer.analyze_batch(texts)
             
             # Aggregate sentiment for this period
             if sentiments:
@@ -138,15 +276,18 @@ class SentimentTimeSeriesProcessor:
                 sentiment_data.append({
                     'timestamp': period,
                     'sentiment_score': agg_result['sentiment_score'],
-                    'positive_ratio': agg_result['distribution']['positive'] / len(sentiments),
-                    'negative_ratio': agg_result['distribution']['negative'] / len(sentiments),
-                    'neutral_ratio': agg_result['distribution']['neutral'] / len(sentiments),
+                    'positive_ratio': agg_result['distribution']['positive'],
+                    'negative_ratio': agg_result['distribution']['negative'],
+                    'neutral_ratio': agg_result['distribution']['neutral'],
                     'news_count': len(texts)
                 })
         
         # Create DataFrame
         sentiment_ts = pd.DataFrame(sentiment_data)
-        
+        return self._save_sentiment_cache(sentiment_ts, cache_file)
+    
+    def _save_sentiment_cache(self, sentiment_ts: pd.DataFrame, cache_file: str) -> pd.DataFrame:
+        """Sort and cache a sentiment time series"""
         if not sentiment_ts.empty:
             sentiment_ts = sentiment_ts.sort_values('timestamp')
             
@@ -154,11 +295,21 @@ class SentimentTimeSeriesProcessor:
             try:
                 sentiment_ts.to_csv(cache_file, index=False)
                 print(f"Sentiment time series cached: {cache_file}")
+                self._remove_stale_series(cache_file)
             except Exception as e:
                 print(f"Error caching sentiment data: {e}")
         
         return sentiment_ts
     
+    def _remove_stale_series(self, cache_file: str):
+        """Delete series of the same symbol/timeframe built from older article scores"""
+        name = os.path.basename(cache_file)
+        prefix = name[:-len('_12345678.csv')]
+        for other in os.listdir(self.cache_dir):
+            stale_version = other.startswith(prefix + '_') and len(other) == len(name)
+            if other != name and (stale_version or other == prefix + '.csv'):
+                os.remove(os.path.join(self.cache_dir, other))
+    
     def align_sentiment_with_price(
         self,
         price_df: pd.DataFrame,
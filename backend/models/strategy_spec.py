@@ -0,0 +1,315 @@
+"""
+Declarative Strategy Specs
+Rule-based strategy configs (indicator expressions, thresholds, AND/OR/weighted
+combinations) compiled into vectorized entry/exit signal functions
+
+Example config:
+    {
+        "type": "rules",
+        "entry": {"all": [
+            {"left": "rsi(14)", "op": "<", "right": 30},
+            {"left": "close", "op": "<", "right": "bb_lower(20, 2)"}
+        ]},
+        "exit": {"any": [
+            {"left": "rsi(14)", "op": ">", "right": 70},
+            {"left": "sma(20)", "op": "crosses_below", "right": "sma(50)"}
+        ]}
+    }
+
+Template configs such as {"type": "sma_crossover", "parameters": {...}}
+expand into the same rule form.
+"""
+
+import inspect
+import re
+from typing import Any, Callable, Dict, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+from backend.models import indicators as ind
+
+
+class StrategySpecError(ValueError):
+    """Invalid strategy spec"""
+
+
+def _col(name: str) -> Callable[[ind.FrameIndicators], pd.Series]:
+    return lambda x: x.frame[name].astype(float)
+
+
+def _sentiment(x: ind.FrameIndicators) -> pd.Series:
+    if 'sentiment_score' in x.frame.columns:
+        return x.frame['sentiment_score'].fillna(0.0)
+    return pd.Series(0.0, index=x.frame.index)
+
+
+# name -> (function(indicators, *args), default args); computed series go through the shared cache
+INDICATORS: Dict[str, Tuple[Callable[..., pd.Series], tuple]] = {
+    'open': (_col('open'), ()),
+    'high': (_col('high'), ()),
+    'low': (_col('low'), ()),
+    'close': (_col('close'), ()),
+    'volume': (_col('volume'), ()),
+    'sentiment': (_sentiment, ()),
+    'sma': (lambda x, period: x('sma', period), (20,)),
+    'ema': (lambda x, period: x('ema', period), (20,)),
+    'rsi': (lambda x, period: x('rsi', period), (14,)),
+    'macd': (lambda x, fast, slow, signal: x('macd', fast, slow, signal)[0], (12, 26, 9)),
+    'macd_signal': (lambda x, fast, slow, signal: x('macd', fast, slow, signal)[1], (12, 26, 9)),
+    'macd_hist': (lambda x, fast, slow, signal: x('macd', fast, slow, signal)[2], (12, 26, 9)),
+    'bb_mid': (lambda x, period, devs: x('bollinger_bands', period, devs)[0], (20, 2.0)),
+    'bb_upper': (lambda x, period, devs: x('bollinger_bands', period, devs)[1], (20, 2.0)),
+    'bb_lower': (lambda x, period, devs: x('bollinger_bands', period, devs)[2], (20, 2.0)),
+    'returns': (lambda x, period: x.cached('returns', (period,),
+                                           lambda: x.frame['close'].pct_change(int(period))), (1,)),
+    'volatility': (lambda x, period: x.cached(
+        'volatility', (period,), lambda: x.frame['close'].pct_change().rolling(int(period)).std()), (20,)),
+}
+
+COMPARISONS = {
+    '>': np.greater,
+    '<': np.less,
+    '>=': np.greater_equal,
+    '<=': np.less_equal,
+}
+CROSSES = ('crosses_above', 'crosses_below')
+
+
+
+def _param_names(name: str) -> tuple:
+    """Declared parameter names of an indicator (after the indicators argument)"""
+    return tuple(inspect.signature(INDICATORS[name][0]).parameters)[1:]
+
+
+_EXPRESSION = re.compile(r'^\s*([a-z_]+)\s*(?:\(([^)]*)\))?\s*$')
+
+
+def parse_operand(operand: Union[str, int, float, Dict[str, Any]]) -> Union[float, Tuple[str, tuple]]:
+    """
+    Normalize an operand to a number or (indicator, args)
+
+    Accepts numbers, "rsi(14)" / "close" strings, or
+    {"indicator": "bb_lower", "period": 20, "devs": 2} / {"indicator": "rsi", "args": [14]}.
+    """
+    if isinstance(operand, bool):
+        raise StrategySpecError(f"Invalid operand: {operand}")
+    if isinstance(operand, (int, float)):
+        return float(operand)
+
+    if isinstance(operand, str):
+        match = _EXPRESSION.match(operand.lower())
+        if not match:
+            raise StrategySpecError(f"Cannot parse indicator expression: {operand}")
+        name, raw_args = match.group(1), match.group(2)
+        try:
+            args = tuple(float(a) for a in raw_args.split(',')) if raw_args and raw_args.strip() else ()
+        except ValueError:
+            raise StrategySpecError(f"Indicator arguments must be numbers: {operand}")
+    elif isinstance(operand, dict) and 'indicator' in operand:
+        name = str(operand['indicator']).lower()
+        if name not in INDICATORS:
+            raise StrategySpecError(f"Unknown indicator: {name}")
+        if 'args' in operand:
+            args = tuple(float(a) for a in operand['args'])
+        else:
+            # Named parameters map onto the indicator's declared parameters by name
+            names = _param_names(name)
+            named = {k: v for k, v in operand.items() if k != 'indicator'}
+            unknown = sorted(set(named) - set(names))
+            if unknown:
+                raise StrategySpecError(
+                    f"Unknown parameter(s) for {name}: {', '.join(unknown)} "
+                    f"(expected {', '.join(names) or 'none'})")
+            args = tuple(float(named.get(n, default)) for n, default in zip(names, INDICATORS[name][1]))
+    else:
+        raise StrategySpecError(f"Invalid operand: {operand}")
+
+    if name not in INDICATORS:
+        raise StrategySpecError(f"Unknown indicator: {name}")
+    defaults = INDICATORS[name][1]
+    if len(args) > len(defaults):
+        raise StrategySpecError(f"Too many arguments for {name}: expected at most {len(defaults)}")
+    return name, args + defaults[len(args):]
+
+
+# ===== Templates =====
+
+def _crossover_template(indicator: str) -> Callable[[Dict[str, Any]], Dict[str, Any]]:
+    def expand(p):
+        fast = f"{indicator}({p.get('short_period', 10)})"
+        slow = f"{indicator}({p.get('long_period', 30)})"
+        return {
+            "entry": {"left": fast, "op": "crosses_above", "right": slow},
+            "exit": {"left": fast, "op": "crosses_below", "right": slow}
+        }
+    return expand
+
+
+def _rsi_reversion(p):
+    rsi = f"rsi({p.get('period', 14)})"
+    return {
+        "entry": {"left": rsi, "op": "<", "right": p.get('oversold', 30)},
+        "exit": {"left": rsi, "op": ">", "right": p.get('overbought', 70)}
+    }
+
+
+def _macd_crossover(p):
+    args = f"{p.get('fast_period', 12)}, {p.get('slow_period', 26)}, {p.get('signal_period', 9)}"
+    return {
+        "entry": {"left": f"macd({args})", "op": "crosses_above", "right": f"macd_signal({args})"},
+        "exit": {"left": f"macd({args})", "op": "crosses_below", "right": f"macd_signal({args})"}
+    }
+
+
+def _bollinger_reversion(p):
+    args = f"{p.get('period', 20)}, {p.get('devs', 2)}"
+    return {
+        "entry": {"left": "close", "op": "<", "right": f"bb_lower({args})"},
+        "exit": {"left": "close", "op": ">", "right": f"bb_mid({args})"}
+    }
+
+
+TEMPLATES: Dict[str, Callable[[Dict[str, Any]], Dict[str, Any]]] = {
+    'sma_crossover': _crossover_template('sma'),
+    'ema_crossover': _crossover_template('ema'),
+    'rsi_reversion': _rsi_reversion,
+    'macd_crossover': _macd_crossover,
+    'bollinger_reversion': _bollinger_reversion,
+}
+
+
+def expand_config(config: Dict[str, Any]) -> Dict[str, Any]:
+    """Resolve a template config into rule form"""
+    if not isinstance(config, dict):
+        raise StrategySpecError("Strategy config must be an object")
+    spec_type = config.get('type', 'rules')
+    if spec_type == 'rules':
+        rules = config
+    elif spec_type in TEMPLATES:
+        rules = TEMPLATES[spec_type](config.get('parameters') or {})
+    else:
+        raise StrategySpecError(
+            f"Unknown strategy type: {spec_type} (use 'rules' or one of {', '.join(TEMPLATES)})")
+
+    if 'entry' not in rules or 'exit' not in rules:
+        raise StrategySpecError("Strategy spec needs both 'entry' and 'exit' conditions")
+    return {"entry": rules['entry'], "exit": rules['exit']}
+
+
+# ===== Compilation =====
+
+def _compile_condition(node: Any) -> Tuple[Callable, set]:
+    """
+    Compile a condition node into fn(indicators, resolve) -> bool ndarray
+
+    Returns the function and the set of (indicator, args) operands it uses.
+    """
+    if not isinstance(node, dict):
+        raise StrategySpecError(f"Condition must be an object: {node}")
+
+    for key in ('all', 'any'):
+        if key in node:
+            if not isinstance(node[key], list) or not node[key]:
+                raise StrategySpecError(f"'{key}' needs a non-empty list of conditions")
+            parts = [_compile_condition(child) for child in node[key]]
+            reducer = np.logical_and.reduce if key == 'all' else np.logical_or.reduce
+            fns = [fn for fn, _ in parts]
+            return (lambda frame, resolve: reducer([fn(frame, resolve) for fn in fns]),
+                    set().union(*(used for _, used in parts)))
+
+    if 'not' in node:
+        fn, used = _compile_condition(node['not'])
+        return lambda frame, resolve: ~fn(frame, resolve), used
+
+    if 'weighted' in node:
+        items = node['weighted']
+        if not isinstance(items, list) or not items:
+            raise StrategySpecError("'weighted' needs a non-empty list of {condition, weight}")
+        if not all(isinstance(item, dict) for item in items):
+            raise StrategySpecError("'weighted' items must be {condition, weight} objects")
+        parts = [(_compile_condition(item.get('condition')), float(item.get('weight', 1.0)))
+                 for item in items]
+        threshold = float(node.get('threshold', 0.5))
+        total_weight = sum(weight for _, weight in parts) or 1.0
+
+        def weighted(frame, resolve):
+            score = sum(fn(frame, resolve) * weight for (fn, _), weight in parts)
+            return score / total_weight >= threshold
+        return weighted, set().union(*(used for (_, used), _ in parts))
+
+    if 'op' in node:
+        op = node['op']
+        left, right = parse_operand(node.get('left')), parse_operand(node.get('right'))
+        used = {o for o in (left, right) if isinstance(o, tuple)}
+        if not used:
+            raise StrategySpecError(f"Condition compares two constants: {node}")
+
+        if op in COMPARISONS:
+            compare = COMPARISONS[op]
+            return (lambda frame, resolve: compare(resolve(left), resolve(right)), used)
+        if op in CROSSES:
+            sign = 1 if op == 'crosses_above' else -1
+
+            def crosses(frame, resolve):
+                # Constant operands resolve to scalars; broadcast them to the frame's bars
+                index = frame.frame.index
+                return ind.crossover(pd.Series(resolve(left), index=index),
+                                     pd.Series(resolve(right), index=index)).to_numpy() == sign
+            return crosses, used
+        raise StrategySpecError(f"Unknown operator: {op}")
+
+    raise StrategySpecError(f"Unrecognized condition: {node}")
+
+
+class CompiledStrategy:
+    """Vectorized signal function compiled from a strategy spec"""
+
+    def __init__(self, config: Dict[str, Any]):
+        rules = expand_config(config)
+        self.config = config
+        self._entry, entry_used = _compile_condition(rules['entry'])
+        self._exit, exit_used = _compile_condition(rules['exit'])
+        self.operands = entry_used | exit_used
+        self.uses_sentiment = any(name == 'sentiment' for name, _ in self.operands)
+
+    @staticmethod
+    def resolve_operand(indicators: ind.FrameIndicators, operand) -> np.ndarray:
+        """Evaluate one operand on a frame's cached indicators"""
+        if isinstance(operand, float):
+            return np.full(len(indicators.frame), operand)
+        name, args = operand
+        return INDICATORS[name][0](indicators, *args).to_numpy(dtype=float)
+
+    def signals(self, data: Union[pd.DataFrame, ind.FrameIndicators]) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Entry and exit flags for every bar of a feature frame (or its cached indicators)
+
+        Comparisons against a not-yet-warmed-up indicator (NaN) are False.
+        """
+        indicators = data
+        if isinstance(data, pd.DataFrame):
+            indicators = ind.get_indicator_cache().for_frame(data)
+        values = {}
+
+        def resolve(operand):
+            if isinstance(operand, float):
+                return operand
+            if operand not in values:
+                values[operand] = self.resolve_operand(indicators, operand)
+            return values[operand]
+
+        with np.errstate(invalid='ignore'):
+            return self._entry(indicators, resolve), self._exit(indicators, resolve)
+
+    __call__ = signals
+
+
+def validate_spec(config: Dict[str, Any]) -> CompiledStrategy:
+    """Compile a config, raising StrategySpecError when it is invalid"""
+    try:
+        return CompiledStrategy(config)
+    except StrategySpecError:
+        raise
+    except (TypeError, ValueError, AttributeError) as e:
+        raise StrategySpecError(str(e))
@@ -2,7 +2,7 @@ import torch
 import torch.nn as nn
 import numpy as np
 import pandas as pd
-from typing import Dict, Any, Tuple, List
+from typing import Dict, Any, Tuple, List, Optional
 from sklearn.preprocessing import MinMaxScaler
 import ta
 
@@ -126,10 +126,17 @@ class TechnicalAnalysisEngine:
         self.model = None
         self.sequence_length = 60  # Use 60 time steps for prediction
         
-    def prepare_features(self, df: pd.DataFrame) -> pd.DataFrame:
+    def prepare_features(self, df: pd.DataFrame, symbol: Optional[str] = None,
+                         timeframe: Optional[str] = None) -> pd.DataFrame:
         """
         Engineer features from OHLCV data using technical indicators
+
+        Indicators come from the shared indicator cache, so a backtest or
+        another tool that already computed them on the same data is reused.
         """
+        from backend.models.indicators import get_indicator_cache
+
+        view = get_indicator_cache().for_frame(df, symbol, timeframe)
         df = df.copy()
         
         # Price-based features
@@ -137,41 +144,38 @@ class TechnicalAnalysisEngine:
         df['log_returns'] = np.log(df['close'] / df['close'].shift(1))
         
         # Moving averages
-        df['sma_7'] = ta.trend.sma_indicator(df['close'], window=7)
-        df['sma_25'] = ta.trend.sma_indicator(df['close'], window=25)
-        df['sma_99'] = ta.trend.sma_indicator(df['close'], window=99)
-        df['ema_12'] = ta.trend.ema_indicator(df['close'], window=12)
-        df['ema_26'] = ta.trend.ema_indicator(df['close'], window=26)
+        df['sma_7'] = view('sma', 7)
+        df['sma_25'] = view('sma', 25)
+        df['sma_99'] = view('sma', 99)
+        df['ema_12'] = view('ema', 12)
+        df['ema_26'] = view('ema', 26)
         
         # MACD
-        macd = ta.trend.MACD(df['close'])
-        df['macd'] = macd.macd()
-        df['macd_signal'] = macd.macd_signal()
-        df['macd_diff'] = macd.macd_diff()
+        df['macd'], df['macd_signal'], df['macd_diff'] = view('macd', 12, 26, 9)
         
-        # RSI
-        df['rsi'] = ta.momentum.rsi(df['close'], window=14)
+        # RSI - ta's EWM kernel, which the price model was trained on; the
+        # strategies' Wilder-seeded view('rsi') differs over the first ~100 bars
+        df['rsi'] = view.cached('rsi_ta', (14,), lambda: ta.momentum.rsi(df['close'], window=14))
         
         # Bollinger Bands
-        bollinger = ta.volatility.BollingerBands(df['close'])
-        df['bb_high'] = bollinger.bollinger_hband()
-        df['bb_low'] = bollinger.bollinger_lband()
-        df['bb_mid'] = bollinger.bollinger_mavg()
+        df['bb_mid'], df['bb_high'], df['bb_low'] = view('bollinger_bands', 20, 2.0)
         df['bb_width'] = (df['bb_high'] - df['bb_low']) / df['bb_mid']
         
         # Stochastic Oscillator
-        stoch = ta.momentum.StochasticOscillator(df['high'], df['low'], df['close'])
-        df['stoch_k'] = stoch.stoch()
-        df['stoch_d'] = stoch.stoch_signal()
+        def stochastic():
+            stoch = ta.momentum.StochasticOscillator(df['high'], df['low'], df['close'])
+            return stoch.stoch(), stoch.stoch_signal()
+        df['stoch_k'], df['stoch_d'] = view.cached('stoch', (14, 3), stochastic)
         
         # ATR (Average True Range)
-        df['atr'] = ta.volatility.average_true_range(df['high'], df['low'], df['close'])
+        df['atr'] = view.cached('atr', (14,), lambda: ta.volatility.average_true_range(
+            df['high'], df['low'], df['close']))
         
         # OBV (On Balance Volume)
-        df['obv'] = ta.volume.on_balance_volume(df['close'], df['volume'])
+        df['obv'] = view.cached('obv', (), lambda: ta.volume.on_balance_volume(df['close'], df['volume']))
         
         # ADX (Average Directional Index)
-        df['adx'] = ta.trend.adx(df['high'], df['low'], df['close'])
+        df['adx'] = view.cached('adx', (14,), lambda: ta.trend.adx(df['high'], df['low'], df['close']))
         
         # Volume features
         df['volume_sma'] = df['volume'].rolling(window=20).mean()
@@ -193,20 +197,23 @@ class TechnicalAnalysisEngine:
             y.append(data[i + seq_length, 0])  # Predict close price
         return np.array(X), np.array(y)
     
-    def predict_price(self, df: pd.DataFrame, steps: int = 1) -> Dict[str, Any]:
+    def predict_price(self, df: pd.DataFrame, steps: int = 1,
+                      symbol: Optional[str] = None, timeframe: Optional[str] = None) -> Dict[str, Any]:
         """
         Predict future price using deep learning model
         
         Args:
             df: DataFrame with OHLCV data
             steps: Number of steps to predict ahead
+            symbol: Trading pair, keys the shared indicator cache
+            timeframe: Candle timeframe, keys the shared indicator cache
             
         Returns:
             Prediction results with confidence intervals
         """
         try:
             # Prepare features
-            df_features = self.prepare_features(df)
+            df_features = self.prepare_features(df, symbol, timeframe)
             
             # Select features for model
             feature_cols = [
@@ -227,12 +234,8 @@ class TechnicalAnalysisEngine:
             
             # Initialize model if not exists
             if self.model is None:
-                input_size = features_scaled.shape[1]
-                if self.model_type == 'transformer':
-                    self.model = TransformerPricePredictor(input_size=input_size)
-                else:
-                    self.model = LSTMPricePredictor(input_size=input_size)
-                self.model.to(self.device)
+                from backend.models.model_registry import get_price_model
+                self.model = get_price_model(self.model_type, features_scaled.shape[1])
             
             # For demo, we'll use the technical analysis as prediction
             # In production, you would train the model on historical data
@@ -346,7 +349,7 @@ class TechnicalAnalysisTool:
             df = pd.DataFrame(ohlcv_result['data'])
             
             # Perform analysis
-            prediction = self.engine.predict_price(df, steps)
+            prediction = self.engine.predict_price(df, steps, symbol, timeframe)
             
             return prediction
             
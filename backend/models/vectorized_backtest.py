@@ -0,0 +1,322 @@
+"""
+Vectorized Portfolio Backtesting
+Runs the built-in strategies as NumPy signal functions over several symbols on
+one aligned time index, with vectorized rebalancing across assets
+"""
+
+from typing import Any, Callable, Dict, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from backend.models import indicators as ind
+
+
+# Defaults mirror the params of the backtrader strategy classes
+STRATEGY_DEFAULTS = {
+    'sentiment': {
+        'sentiment_threshold': 0.2, 'rsi_period': 14, 'rsi_overbought': 70,
+        'rsi_oversold': 30, 'sma_fast': 20, 'sma_slow': 50,
+    },
+    'macd': {'fast_period': 12, 'slow_period': 26, 'signal_period': 9},
+    'technical': {
+        'rsi_period': 14, 'rsi_overbought': 70, 'rsi_oversold': 30, 'macd_fast': 12,
+        'macd_slow': 26, 'macd_signal': 9, 'bb_period': 20, 'bb_devs': 2,
+    },
+    'combined': {
+        'sentiment_threshold': 0.1, 'rsi_period': 14, 'rsi_overbought': 70,
+        'rsi_oversold': 30, 'macd_fast': 12, 'macd_slow': 26, 'macd_signal': 9,
+        'sma_fast': 20, 'sma_slow': 50, 'bb_period': 20, 'bb_devs': 2,
+        'sentiment_weight': 0.3, 'technical_weight': 0.7,
+        'buy_threshold': 0.45, 'sell_threshold': 0.45,
+    },
+}
+
+ALLOCATION_RULES = ('equal', 'volatility', 'signal')
+
+
+def positions_from_signals(entries: np.ndarray, exits: np.ndarray) -> np.ndarray:
+    """
+    Convert entry/exit flags into a long-only 0/1 position series
+
+    A bar with both flags set keeps the previous position.
+    """
+    events = np.where(entries & ~exits, 1.0, np.where(exits & ~entries, 0.0, np.nan))
+    return pd.Series(events).ffill().fillna(0.0).to_numpy()
+
+
+def _sentiment(frame: pd.DataFrame) -> pd.Series:
+    if 'sentiment_score' in frame.columns:
+        return frame['sentiment_score'].fillna(0.0)
+    return pd.Series(0.0, index=frame.index)
+
+
+def sentiment_signals(x: ind.FrameIndicators, p: Dict[str, Any]) -> Tuple[np.ndarray, np.ndarray]:
+    """Vectorized SentimentStrategy"""
+    sentiment = _sentiment(x.frame)
+    rsi = x('rsi', p['rsi_period'])
+    cross = ind.crossover(x('sma', p['sma_fast']), x('sma', p['sma_slow']))
+
+    entries = ((sentiment > p['sentiment_threshold']) & (rsi < p['rsi_oversold'])) | (cross > 0)
+    exits = ((sentiment < -p['sentiment_threshold']) & (rsi > p['rsi_overbought'])) | (cross < 0)
+    return entries.to_numpy(), exits.to_numpy()
+
+
+def macd_signals(x: ind.FrameIndicators, p: Dict[str, Any]) -> Tuple[np.ndarray, np.ndarray]:
+    """Vectorized MACDStrategy"""
+    macd_line, signal_line, _ = x('macd', p['fast_period'], p['slow_period'], p['signal_period'])
+    cross = ind.crossover(macd_line, signal_line)
+    return (cross > 0).to_numpy(), (cross < 0).to_numpy()
+
+
+def technical_signals(x: ind.FrameIndicators, p: Dict[str, Any]) -> Tuple[np.ndarray, np.ndarray]:
+    """Vectorized TechnicalStrategy"""
+    close = x.frame['close']
+    rsi = x('rsi', p['rsi_period'])
+    macd_line, signal_line, _ = x('macd', p['macd_fast'], p['macd_slow'], p['macd_signal'])
+    cross = ind.crossover(macd_line, signal_line)
+    mid, top, bot = x('bollinger_bands', p['bb_period'], p['bb_devs'])
+
+    weak_buy = (cross > 0).astype(int) + (rsi < 50).astype(int) + (close < mid).astype(int)
+    strong_buy = (rsi < p['rsi_oversold']) | (close < bot)
+    entries = ((cross > 0) & (weak_buy >= 2)) | strong_buy
+
+    strong_sell = (rsi > p['rsi_overbought']) | (close > top)
+    exits = ((cross < 0) & (rsi > 50)) | strong_sell
+    return entries.to_numpy(), exits.to_numpy()
+
+
+def combined_scores(x: ind.FrameIndicators, p: Dict[str, Any]) -> Tuple[pd.Series, pd.Series]:
+    """Weighted buy/sell scores of CombinedStrategy"""
+    frame = x.frame
+    close = frame['close']
+    sentiment = _sentiment(frame)
+    rsi = x('rsi', p['rsi_period'])
+    macd_line, signal_line, _ = x('macd', p['macd_fast'], p['macd_slow'], p['macd_signal'])
+    macd_cross = ind.crossover(macd_line, signal_line)
+    sma_fast = x('sma', p['sma_fast'])
+    sma_slow = x('sma', p['sma_slow'])
+    sma_cross = ind.crossover(sma_fast, sma_slow)
+    mid, top, bot = x('bollinger_bands', p['bb_period'], p['bb_devs'])
+
+    def score(sentiment_signal, conditions):
+        tech = sum(np.select(conds, values, 0.0) for conds, values in conditions) / len(conditions)
+        return sentiment_signal * p['sentiment_weight'] + tech * p['technical_weight']
+
+    buy = score(((sentiment + 1) / 2).clip(0, 1), [
+        ([rsi < p['rsi_oversold'], rsi < 50], [1.0, 0.5]),
+        ([macd_cross > 0, macd_line > signal_line], [1.0, 0.5]),
+        ([sma_cross > 0, sma_fast > sma_slow], [1.0, 0.5]),
+        ([close < bot, close < mid], [0.8, 0.4]),
+    ])
+    sell = score(((-sentiment + 1) / 2).clip(0, 1), [
+        ([rsi > p['rsi_overbought'], rsi > 50], [1.0, 0.5]),
+        ([macd_cross < 0, macd_line < signal_line], [1.0, 0.5]),
+        ([sma_cross < 0, sma_fast < sma_slow], [1.0, 0.5]),
+        ([close > top, close > mid], [0.8, 0.4]),
+    ])
+    return pd.Series(buy, index=frame.index), pd.Series(sell, index=frame.index)
+
+
+def combined_signals(x: ind.FrameIndicators, p: Dict[str, Any]) -> Tuple[np.ndarray, np.ndarray]:
+    """Vectorized CombinedStrategy"""
+    buy, sell = combined_scores(x, p)
+    return (buy > p['buy_threshold']).to_numpy(), (sell > p['sell_threshold']).to_numpy()
+
+
+STRATEGY_SIGNALS: Dict[str, Callable[[ind.FrameIndicators, Dict[str, Any]], Tuple[np.ndarray, np.ndarray]]] = {
+    'sentiment': sentiment_signals,
+    'macd': macd_signals,
+    'technical': technical_signals,
+    'combined': combined_signals,
+}
+
+
+def periods_per_year(index: pd.DatetimeIndex) -> float:
+    """Number of bars per year implied by the index spacing"""
+    if len(index) < 2:
+        return 365.0
+    step = pd.Series(index).diff().median()
+    return pd.Timedelta(days=365) / step
+
+
+def max_drawdown_pct(equity: np.ndarray) -> float:
+    """Maximum peak-to-trough drawdown in percent"""
+    if len(equity) == 0:
+        return 0.0
+    peaks = np.maximum.accumulate(equity)
+    return float(np.max((peaks - equity) / peaks) * 100)
+
+
+def sharpe_ratio(returns: np.ndarray, bars_per_year: float) -> float:
+    """Annualized Sharpe ratio with a zero risk-free rate"""
+    if len(returns) < 2 or returns.std() == 0:
+        return 0.0
+    return float(returns.mean() / returns.std() * np.sqrt(bars_per_year))
+
+
+def downsample_curve(curve: Dict[str, list], max_points: int = 500) -> Dict[str, list]:
+    """
+    Thin an equity curve to about ``max_points`` evenly spaced points for charts
+
+    The highest and lowest equity points are always kept so drawdowns stay visible.
+    """
+    values = np.asarray(curve.get('values', []), dtype=float)
+    if len(values) <= max_points:
+        return curve
+
+    keep = np.linspace(0, len(values) - 1, max_points).round().astype(int)
+    keep = np.unique(np.concatenate([keep, [values.argmax(), values.argmin()]]))
+    thinned = {key: [series[i] for i in keep] for key, series in curve.items()
+               if isinstance(series, list) and len(series) == len(values)}
+    return {**thinned, "full_length": len(values)}
+
+
+class PortfolioBacktester:
+    """Multi-asset backtester on a shared time index"""
+
+    def __init__(self, initial_cash: float = 10000, commission: float = 0.001,
+                 execution_model=None):
+        self.initial_cash = initial_cash
+        self.commission = commission
+        # Optional ExecutionModel; flat commission on close fills when None
+        self.execution_model = execution_model
+
+    def allocation_weights(self, allocation: str, returns: pd.DataFrame,
+                           positions: pd.DataFrame, vol_window: int = 20) -> pd.DataFrame:
+        """
+        Target capital weight of each asset sleeve per bar
+
+        equal: 1/N per asset, cash when the asset is flat
+        volatility: inverse rolling volatility, cash when the asset is flat
+        signal: capital split across the assets currently holding a position
+        """
+        n_assets = returns.shape[1]
+        if allocation == 'equal':
+            weights = pd.DataFrame(1.0 / n_assets, index=returns.index, columns=returns.columns)
+        elif allocation == 'volatility':
+            inv_vol = 1.0 / returns.rolling(vol_window, min_periods=vol_window).std()
+            inv_vol = inv_vol.replace([np.inf, -np.inf], np.nan)
+            weights = inv_vol.div(inv_vol.sum(axis=1), axis=0)
+            # Equal weight until every asset has a volatility estimate
+            weights = weights.where(weights.notna().all(axis=1), 1.0 / n_assets, axis=0)
+        elif allocation == 'signal':
+            active = positions.sum(axis=1)
+            return positions.div(active.where(active > 0, 1.0), axis=0)
+        else:
+            raise ValueError(f"Unknown allocation rule: {allocation}")
+        return weights * positions
+
+    def run(self, frames: Dict[str, pd.DataFrame], strategy_name: str = 'technical',
+            strategy_params: Optional[Dict] = None, allocation: str = 'equal',
+            vol_window: int = 20,
+            signal_fn: Optional[Callable[[ind.FrameIndicators], Tuple[np.ndarray, np.ndarray]]] = None
+            ) -> Dict[str, Any]:
+        """
+        Run a portfolio backtest
+
+        Args:
+            frames: Feature frames (timestamp index, OHLCV + sentiment) per symbol
+            strategy_name: Built-in strategy used for every asset
+            strategy_params: Overrides for the strategy defaults
+            allocation: Capital allocation rule (equal, volatility, signal)
+            vol_window: Lookback for volatility parity
+            signal_fn: Custom signal function taking the frame's cached indicators,
+                overrides strategy_name
+
+        Returns:
+            Portfolio metrics, per-asset stats and the return correlation matrix
+        """
+        if signal_fn is None:
+            if strategy_name not in STRATEGY_SIGNALS:
+                return {"success": False, "error": f"Unknown strategy: {strategy_name}"}
+            params = {**STRATEGY_DEFAULTS[strategy_name], **(strategy_params or {})}
+            signal_fn = lambda indicators: STRATEGY_SIGNALS[strategy_name](indicators, params)
+
+        symbols = list(frames.keys())
+
+        # Shared time index: bars present for every asset
+        index = None
+        for frame in frames.values():
+            index = frame.index if index is None else index.intersection(frame.index)
+        index = index.sort_values()
+        if len(index) < 2:
+            return {"success": False, "error": "No overlapping bars across symbols"}
+
+        closes = pd.DataFrame({s: frames[s]['close'].reindex(index) for s in symbols})
+        returns = closes.pct_change().fillna(0.0)
+
+        # Signals use each asset's full history so indicator warm-up is not lost
+        positions = {}
+        for symbol in symbols:
+            indicators = ind.get_indicator_cache().for_frame(frames[symbol], symbol)
+            entries, exits = signal_fn(indicators)
+            held = pd.Series(positions_from_signals(entries, exits), index=frames[symbol].index)
+            positions[symbol] = held.reindex(index).fillna(0.0)
+        positions = pd.DataFrame(positions)
+
+        exposure = self.allocation_weights(allocation, returns, positions, vol_window)
+
+        execution = None
+        if self.execution_model is None:
+            # Decided on bar t, held over bar t+1
+            held = exposure.shift(1).fillna(0.0)
+            turnover = held.diff().abs().fillna(held.abs())
+            asset_pnl = held * returns - turnover * self.commission
+        else:
+            bars = {
+                column: pd.DataFrame({s: frames[s][column].reindex(index) for s in symbols})
+                for column in ('open', 'high', 'low', 'close', 'volume')
+            }
+            fills = self.execution_model.simulate(exposure, bars, self.initial_cash)
+            held, asset_pnl = fills['held'], fills['pnl']
+            traded = fills['fill_ratio'][held.diff().abs().sum(axis=1) > 0]
+            execution = {
+                "liquidity": self.execution_model.liquidity,
+                "fees_pct": float(fills['fees'].to_numpy().sum() * 100),
+                "slippage_pct": float(fills['slippage'].to_numpy().sum() * 100),
+                "avg_fill_ratio": float(traded.mean()) if len(traded) else 1.0
+            }
+
+        portfolio_returns = asset_pnl.sum(axis=1).to_numpy()
+        equity = self.initial_cash * np.cumprod(1 + portfolio_returns)
+
+        bars_per_year = periods_per_year(index)
+        final_value = float(equity[-1])
+        entries_per_asset = (positions.diff().fillna(positions) > 0).sum()
+
+        per_asset = {}
+        for symbol in symbols:
+            per_asset[symbol] = {
+                "return_contribution_pct": float(asset_pnl[symbol].sum() * 100),
+                "buy_and_hold_pct": float((closes[symbol].iloc[-1] / closes[symbol].iloc[0] - 1) * 100),
+                "trades": int(entries_per_asset[symbol]),
+                "time_in_market_pct": float(positions[symbol].mean() * 100),
+                "avg_weight": float(held[symbol].mean())
+            }
+
+        correlation = returns.iloc[1:].corr().fillna(0.0).round(4)
+
+        result = {
+            "success": True,
+            "mode": "portfolio" if len(symbols) > 1 else "single",
+            "strategy": strategy_name,
+            "allocation": allocation,
+            "symbols": symbols,
+            "bars": len(index),
+            "initial_capital": self.initial_cash,
+            "final_value": final_value,
+            "total_return_pct": (final_value / self.initial_cash - 1) * 100,
+            "sharpe_ratio": sharpe_ratio(portfolio_returns[1:], bars_per_year),
+            "max_drawdown_pct": max_drawdown_pct(equity),
+            "total_trades": int(entries_per_asset.sum()),
+            "per_asset": per_asset,
+            "correlation_matrix": correlation.to_dict(),
+            "equity_curve": {
+                "timestamps": [t.isoformat() for t in index],
+                "values": equity.round(2).tolist()
+            }
+        }
+        if execution is not None:
+            result["execution"] = execution
+        return result
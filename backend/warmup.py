@@ -0,0 +1,148 @@
+"""
+Warm-up Stage
+Preloads configured components (models, news index, candle caches) in the
+background after the server starts, and tracks their load state for the
+/healthz and /readyz endpoints
+"""
+
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from config import Config
+
+
+def _warm_sentiment_server():
+    from backend.models.sentiment_server import start_server_process, wait_for_server
+    process = start_server_process()
+    wait_for_server(process=process)
+    return {"pid": process.pid, "address": Config.SENTIMENT_SERVER_ADDRESS}
+
+
+def _warm_finbert():
+    from backend.models.model_registry import get_sentiment_analyzer
+    get_sentiment_analyzer()
+
+
+def _warm_price_model():
+    from backend.models.model_registry import get_price_model
+    get_price_model()
+
+
+def _warm_news_index():
+    from backend.models.sentiment_timeseries import load_news_index
+    return {"articles": len(load_news_index())}
+
+
+def _warm_candles():
+    from data.scrapers.market_data import get_market_data
+    market_data = get_market_data()
+    sources = {}
+    for symbol in Config.WARMUP_SYMBOLS:
+        # Same pair/timeframe/limit as the backtests, so they hit this cache entry
+        result = market_data.get_ohlcv(f"{symbol}/USDT", '1d', limit=1000)
+        sources[symbol] = result.get('source')
+    return {"sources": sources}
+
+
+# Component name -> loader (returns optional detail for the status report)
+COMPONENTS: Dict[str, Callable[[], Any]] = {
+    # Spawns the out-of-process FinBERT server; list it before finbert
+    'sentiment_server': _warm_sentiment_server,
+    'finbert': _warm_finbert,
+    'price_model': _warm_price_model,
+    'news_index': _warm_news_index,
+    'candles': _warm_candles,
+}
+
+
+class WarmupState:
+    """Load state of each warm-up component"""
+
+    def __init__(self, components: List[str]):
+        self._lock = threading.Lock()
+        self.started_at = None
+        self.components = {
+            name: {"state": "pending", "seconds": None, "error": None, "detail": None}
+            for name in components
+        }
+
+    def run(self):
+        """Load every component in order, recording state and timing"""
+        self.started_at = time.time()
+        for name in list(self.components):
+            loader = COMPONENTS.get(name)
+            if loader is None:
+                self._update(name, state="failed", error=f"unknown component: {name}")
+                continue
+
+            self._update(name, state="loading")
+            start = time.time()
+            try:
+                detail = loader()
+                self._update(name, state="ready", seconds=round(time.time() - start, 3), detail=detail)
+                print(f"[Warmup] {name} ready in {time.time() - start:.2f}s")
+            except Exception as e:
+                self._update(name, state="failed", seconds=round(time.time() - start, 3), error=str(e))
+                print(f"[Warmup] {name} failed: {e}")
+
+    def _update(self, name: str, **fields):
+        with self._lock:
+            self.components[name].update(fields)
+
+    def ready(self) -> bool:
+        with self._lock:
+            return all(c["state"] == "ready" for c in self.components.values())
+
+    def status(self) -> Dict[str, Any]:
+        with self._lock:
+            components = {name: dict(c) for name, c in self.components.items()}
+        return {
+            "ready": all(c["state"] == "ready" for c in components.values()),
+            "started_at": self.started_at,
+            "components": components
+        }
+
+
+_warmup: Optional[WarmupState] = None
+_warmup_lock = threading.Lock()
+
+
+def configured_components() -> List[str]:
+    """WARMUP_COMPONENTS plus models listed in the older PRELOAD_MODELS setting"""
+    names = list(Config.WARMUP_COMPONENTS)
+    for name in Config.PRELOAD_MODELS:
+        if name not in names:
+            names.append(name)
+    return names
+
+
+def start_warmup(spawn: Callable[..., Any] = None) -> WarmupState:
+    """
+    Start the warm-up stage once per process
+
+    Args:
+        spawn: Background task launcher (e.g. socketio.start_background_task);
+            defaults to a daemon thread
+    """
+    global _warmup
+    with _warmup_lock:
+        if _warmup is not None:
+            return _warmup
+        _warmup = WarmupState(configured_components())
+    if _warmup.components:
+        if spawn is not None:
+            spawn(_warmup.run)
+        else:
+            threading.Thread(target=_warmup.run, name='warmup', daemon=True).start()
+    return _warmup
+
+
+def get_warmup() -> WarmupState:
+    """
+    Current warm-up state
+
+    Before start_warmup() runs, the configured components are all pending,
+    so /readyz reports not ready instead of an empty (ready) state.
+    """
+    return _warmup or WarmupState(configured_components())
@@ -31,10 +31,90 @@ class Config:
     
     # Model Paths
     FINBERT_MODEL = 'ProsusAI/finbert'
+    FINBERT_TOKEN_BUDGET = int(os.getenv('FINBERT_TOKEN_BUDGET', 8192))
+    FINBERT_MAX_BATCH_SIZE = int(os.getenv('FINBERT_MAX_BATCH_SIZE', 64))
+    # Out-of-process FinBERT server (Unix socket path; empty = in-process model)
+    SENTIMENT_SERVER_ADDRESS = os.getenv('SENTIMENT_SERVER_ADDRESS', '')
+    # Shared secret for the server socket; empty = random per web process (spawned server only)
+    SENTIMENT_SERVER_AUTHKEY = os.getenv('SENTIMENT_SERVER_AUTHKEY', '')
+    # Seconds the sentiment_server warm-up waits for the spawned server to load the model
+    SENTIMENT_SERVER_START_TIMEOUT = float(os.getenv('SENTIMENT_SERVER_START_TIMEOUT', 300))
+    SENTIMENT_SERVER_MAX_BATCH = int(os.getenv('SENTIMENT_SERVER_MAX_BATCH', 128))
+    SENTIMENT_SERVER_MAX_LATENCY_MS = float(os.getenv('SENTIMENT_SERVER_MAX_LATENCY_MS', 20))
+    # Comma-separated models to load at startup (e.g. "finbert")
+    PRELOAD_MODELS = [m.strip() for m in os.getenv('PRELOAD_MODELS', '').split(',') if m.strip()]
+    # Warm-up stage after startup: sentiment_server, finbert, price_model, news_index, candles
+    WARMUP_COMPONENTS = [c.strip() for c in os.getenv('WARMUP_COMPONENTS', '').split(',') if c.strip()]
+    WARMUP_SYMBOLS = [s.strip().upper() for s in os.getenv('WARMUP_SYMBOLS', 'BTC,ETH').split(',') if s.strip()]
     
     # Data Directories
     BASE_DIR = os.path.dirname(os.path.abspath(__file__))
     DATA_DIR = os.path.join(BASE_DIR, 'data')
+    FEATURE_CACHE_DIR = os.path.join(DATA_DIR, 'feature_cache')
+    # Feature frames kept on disk (least recently used are removed first)
+    FEATURE_CACHE_MAX_ENTRIES = int(os.getenv('FEATURE_CACHE_MAX_ENTRIES', 64))
+    BACKTEST_DB_PATH = os.getenv('BACKTEST_DB_PATH', os.path.join(DATA_DIR, 'backtest_results.db'))
+    # Equity curve points returned to the UI (full resolution stays in the results store)
+    BACKTEST_EQUITY_POINTS = int(os.getenv('BACKTEST_EQUITY_POINTS', 500))
+    
+    # Shared indicator cache entries (one per symbol/data/indicator/params)
+    INDICATOR_CACHE_SIZE = int(os.getenv('INDICATOR_CACHE_SIZE', 512))
+    
+    # Market data cache (seconds)
+    MARKET_DATA_PRICE_TTL = float(os.getenv('MARKET_DATA_PRICE_TTL', 30))
+    MARKET_DATA_HISTORY_TTL = float(os.getenv('MARKET_DATA_HISTORY_TTL', 300))
+    # Mock fallbacks are cached briefly so a transient outage doesn't pin fabricated prices
+    MARKET_DATA_FALLBACK_TTL = float(os.getenv('MARKET_DATA_FALLBACK_TTL', 5))
+    # CoinGecko market cap added to exchange tickers that lack one
+    MARKET_DATA_MARKET_CAP_TTL = float(os.getenv('MARKET_DATA_MARKET_CAP_TTL', 300))
+    
+    # Upstream API guards: (requests per minute, burst) token buckets,
+    # circuit breaker threshold/cooldown (seconds), max wait for a token
+    UPSTREAM_RATE_LIMITS = {
+        'coingecko': (float(os.getenv('COINGECKO_RATE_PER_MIN', 30)), float(os.getenv('COINGECKO_BURST', 5))),
+        'binance': (float(os.getenv('BINANCE_RATE_PER_MIN', 1200)), float(os.getenv('BINANCE_BURST', 20))),
+    }
+    UPSTREAM_FAILURE_THRESHOLD = int(os.getenv('UPSTREAM_FAILURE_THRESHOLD', 3))
+    UPSTREAM_COOLDOWN = float(os.getenv('UPSTREAM_COOLDOWN', 60))
+    UPSTREAM_MAX_WAIT = float(os.getenv('UPSTREAM_MAX_WAIT', 5))
+    BINANCE_TIMEOUT_MS = int(os.getenv('BINANCE_TIMEOUT_MS', 10000))
+    
+    # LLM response cache for deterministic prompts (enabled per call site);
+    # LLM_CACHE_DIR adds a disk tier shared across workers and restarts
+    LLM_CACHE_ENABLED = os.getenv('LLM_CACHE_ENABLED', 'true').lower() == 'true'
+    LLM_CACHE_TTL = float(os.getenv('LLM_CACHE_TTL', 300))
+    LLM_CACHE_SIZE = int(os.getenv('LLM_CACHE_SIZE', 256))
+    LLM_CACHE_DIR = os.getenv('LLM_CACHE_DIR', '')
+    
+    # Chat fast path: answer price/history/indicator queries from templates,
+    # then push the LLM interpretation as a Socket.IO 'response_enriched' event
+    CHAT_FAST_PATH = os.getenv('CHAT_FAST_PATH', 'true').lower() == 'true'
+    CHAT_FAST_PATH_ENRICH = os.getenv('CHAT_FAST_PATH_ENRICH', 'true').lower() == 'true'
+    
+    # Conversation memory per session (estimated tokens); older turns are
+    # folded into a summary, tool results are kept only as short summaries
+    CONVERSATION_MAX_TOKENS = int(os.getenv('CONVERSATION_MAX_TOKENS', 2000))
+    CONVERSATION_SUMMARY_TOKENS = int(os.getenv('CONVERSATION_SUMMARY_TOKENS', 300))
+    CONVERSATION_MESSAGE_CHARS = int(os.getenv('CONVERSATION_MESSAGE_CHARS', 1500))
+    CONVERSATION_TOOL_SUMMARY_CHARS = int(os.getenv('CONVERSATION_TOOL_SUMMARY_CHARS', 400))
+    
+    # Per-session chat agents: LRU cap and idle eviction (seconds)
+    MAX_SESSIONS = int(os.getenv('MAX_SESSIONS', 500))
+    SESSION_IDLE_TIMEOUT = float(os.getenv('SESSION_IDLE_TIMEOUT', 1800))
+    
+    # Independent tool calls of one chat message run concurrently, at most
+    # CHAT_TOOL_WORKERS at a time per message, on a process-wide pool of
+    # CHAT_TOOL_POOL_SIZE threads. The per-message bound keeps one message with
+    # many tools from starving other users; the pool bounds total threads (and
+    # upstream load) across all users. A pool smaller than concurrent messages
+    # x CHAT_TOOL_WORKERS queues tools behind other users' requests, a larger
+    # one trades memory and exchange rate-limit headroom for latency.
+    CHAT_TOOL_WORKERS = int(os.getenv('CHAT_TOOL_WORKERS', 4))
+    CHAT_TOOL_POOL_SIZE = int(os.getenv('CHAT_TOOL_POOL_SIZE', 32))
+    
+    # Async server (async_app.py): thread pool for backtests, model inference
+    # and other blocking work that has no async path
+    ASYNC_EXECUTOR_WORKERS = int(os.getenv('ASYNC_EXECUTOR_WORKERS', 8))
     
     # Trading Parameters
     DEFAULT_INITIAL_CAPITAL = 10000
@@ -2,7 +2,9 @@
 CoinGecko API Client Module - 資料爬蟲
 (從 /user_data/1141/ML/ 複製並適配)
 
-Provides functions for fetching real-time and historical cryptocurrency data.
+Low-level CoinGecko client. get_current_price / get_price_history go through
+the shared MarketDataService (data/scrapers/market_data.py), which adds
+caching, rate limiting and the Binance -> CoinGecko -> mock fallback chain.
 API: https://api.coingecko.com/api/v3/
 No API key required for basic usage.
 """
@@ -37,6 +39,81 @@ SYMBOL_MAP = {
 Symbol = Literal["BTC", "ETH", "SOL", "BNB", "XRP", "ADA", "DOT", "DOGE"]
 
 
+def _build_url(endpoint: str, params: dict = None) -> str:
+    url = f"{COINGECKO_BASE_URL}{endpoint}"
+    if params:
+        query = "&".join(f"{k}={v}" for k, v in params.items() if v is not None)
+        url = f"{url}?{query}"
+    return url
+
+
+def _asset_request(symbol: str) -> tuple:
+    """(asset_id, endpoint, params) for the current price of a symbol"""
+    asset_id = SYMBOL_MAP.get(symbol.upper())
+    if not asset_id:
+        raise ValueError(f"Unknown symbol: {symbol}")
+
+    params = {
+        "ids": asset_id,
+        "vs_currencies": "usd",
+        "include_24hr_change": "true",
+        "include_24hr_vol": "true",
+        "include_market_cap": "true",
+    }
+    return asset_id, "/simple/price", params
+
+
+def _parse_asset(asset_id: str, response: dict) -> dict:
+    data = response.get(asset_id, {})
+    return {
+        "priceUsd": data.get("usd", 0),
+        "changePercent24Hr": data.get("usd_24h_change", 0),
+        "volumeUsd24Hr": data.get("usd_24h_vol", 0),
+        "marketCapUsd": data.get("usd_market_cap", 0),
+    }
+
+
+def _history_request(symbol: str, days: int = None, start_date: str = None, end_date: str = None) -> tuple:
+    """(endpoint, params, filter_start, filter_end) for historical prices"""
+    asset_id = SYMBOL_MAP.get(symbol.upper())
+    if not asset_id:
+        raise ValueError(f"Unknown symbol: {symbol}")
+
+    now = datetime.now()
+    filter_start = None
+    filter_end = None
+
+    if start_date and end_date:
+        start_time = datetime.strptime(start_date, "%Y-%m-%d")
+        end_time = datetime.strptime(end_date, "%Y-%m-%d")
+        days_from_now = (now - start_time).days + 1
+        days = min(days_from_now, 365)
+        filter_start = start_time
+        filter_end = end_time + timedelta(days=1)
+    else:
+        days = days or 30
+
+    params = {
+        "vs_currency": "usd",
+        "days": str(days),
+    }
+    return f"/coins/{asset_id}/market_chart", params, filter_start, filter_end
+
+
+def _parse_history(response: dict, filter_start: datetime = None, filter_end: datetime = None) -> list:
+    result = []
+    for timestamp_ms, price in response.get("prices", []):
+        dt = datetime.fromtimestamp(timestamp_ms / 1000)
+
+        if filter_start and filter_end:
+            if dt < filter_start or dt >= filter_end:
+                continue
+
+        result.append({"time": timestamp_ms, "priceUsd": str(price)})
+
+    return result
+
+
 class CoinGeckoClient:
     """Synchronous client for CoinGecko API - 資料爬蟲"""
 
@@ -45,11 +122,7 @@ class CoinGeckoClient:
 
     def _request(self, endpoint: str, params: dict = None) -> dict:
         """Make HTTP GET request to CoinGecko API"""
-        url = f"{COINGECKO_BASE_URL}{endpoint}"
-
-        if params:
-            query = "&".join(f"{k}={v}" for k, v in params.items() if v is not None)
-            url = f"{url}?{query}"
+        url = _build_url(endpoint, params)
 
         print(f"[CoinGecko] GET {url}", file=sys.stderr)
 
@@ -70,26 +143,8 @@ class CoinGeckoClient:
 
     def get_asset(self, symbol: str) -> dict:
         """Get current asset data including price, volume, market cap."""
-        asset_id = SYMBOL_MAP.get(symbol.upper())
-        if not asset_id:
-            raise ValueError(f"Unknown symbol: {symbol}")
-
-        params = {
-            "ids": asset_id,
-            "vs_currencies": "usd",
-            "include_24hr_change": "true",
-            "include_24hr_vol": "true",
-            "include_market_cap": "true",
-        }
-        response = self._request("/simple/price", params)
-
-        data = response.get(asset_id, {})
-        return {
-            "priceUsd": data.get("usd", 0),
-            "changePercent24Hr": data.get("usd_24h_change", 0),
-            "volumeUsd24Hr": data.get("usd_24h_vol", 0),
-            "marketCapUsd": data.get("usd_market_cap", 0),
-        }
+        asset_id, endpoint, params = _asset_request(symbol)
+        return _parse_asset(asset_id, self._request(endpoint, params))
 
     def get_history(
         self,
@@ -100,45 +155,47 @@ class CoinGeckoClient:
         end_date: str = None,
     ) -> list[dict]:
         """Get historical price data."""
-        asset_id = SYMBOL_MAP.get(symbol.upper())
-        if not asset_id:
-            raise ValueError(f"Unknown symbol: {symbol}")
+        endpoint, params, filter_start, filter_end = _history_request(symbol, days, start_date, end_date)
+        return _parse_history(self._request(endpoint, params), filter_start, filter_end)
+
 
-        now = datetime.now()
-        filter_start = None
-        filter_end = None
+class AsyncCoinGeckoClient:
+    """Asynchronous (aiohttp) client for CoinGecko API, for the async server"""
 
-        if start_date and end_date:
-            start_time = datetime.strptime(start_date, "%Y-%m-%d")
-            end_time = datetime.strptime(end_date, "%Y-%m-%d")
-            days_from_now = (now - start_time).days + 1
-            days = min(days_from_now, 365)
-            filter_start = start_time
-            filter_end = end_time + timedelta(days=1)
-        else:
-            days = days or 30
+    def __init__(self, timeout: float = 10.0):
+        self.timeout = timeout
+        self._session = None
 
-        params = {
-            "vs_currency": "usd",
-            "days": str(days),
-        }
-        response = self._request(f"/coins/{asset_id}/market_chart", params)
+    async def _request(self, endpoint: str, params: dict = None) -> dict:
+        import aiohttp
 
-        prices = response.get("prices", [])
+        url = _build_url(endpoint, params)
+        print(f"[CoinGecko] GET {url} (async)", file=sys.stderr)
 
-        result = []
-        for p in prices:
-            timestamp_ms = p[0]
-            price = p[1]
-            dt = datetime.fromtimestamp(timestamp_ms / 1000)
+        # The session is bound to the running event loop, so it is created on first use
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+                headers={'Accept': 'application/json', 'User-Agent': 'Mozilla/5.0'}
+            )
+        async with self._session.get(url, ssl=SSL_CONTEXT) as response:
+            response.raise_for_status()
+            return await response.json(content_type=None)
 
-            if filter_start and filter_end:
-                if dt < filter_start or dt >= filter_end:
-                    continue
+    async def get_asset(self, symbol: str) -> dict:
+        """Get current asset data including price, volume, market cap."""
+        asset_id, endpoint, params = _asset_request(symbol)
+        return _parse_asset(asset_id, await self._request(endpoint, params))
 
-            result.append({"time": timestamp_ms, "priceUsd": str(price)})
+    async def get_history(self, symbol: str, days: int = None, start_date: str = None,
+                          end_date: str = None) -> list[dict]:
+        """Get historical price data."""
+        endpoint, params, filter_start, filter_end = _history_request(symbol, days, start_date, end_date)
+        return _parse_history(await self._request(endpoint, params), filter_start, filter_end)
 
-        return result
+    async def close(self):
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
 
 
 # Singleton instance
@@ -158,73 +215,10 @@ def get_coincap_client() -> CoinGeckoClient:
     return get_coingecko_client()
 
 
-def _get_mock_price(symbol: str) -> dict:
-    """Return mock price data when API is unavailable"""
-    mock_prices = {
-        "BTC": {"price": 98500.00, "change": 1.85, "volume": 32.5e9, "market_cap": 1950e9},
-        "ETH": {"price": 3520.50, "change": 2.15, "volume": 18.2e9, "market_cap": 425e9},
-        "SOL": {"price": 195.30, "change": -0.45, "volume": 4.2e9, "market_cap": 92e9},
-        "BNB": {"price": 715.20, "change": 0.95, "volume": 1.8e9, "market_cap": 108e9},
-        "XRP": {"price": 2.35, "change": 3.25, "volume": 5.5e9, "market_cap": 135e9},
-        "ADA": {"price": 1.05, "change": 1.55, "volume": 1.2e9, "market_cap": 37e9},
-        "DOT": {"price": 7.85, "change": -1.20, "volume": 0.8e9, "market_cap": 11e9},
-        "DOGE": {"price": 0.325, "change": 4.50, "volume": 2.1e9, "market_cap": 48e9},
-    }
-    data = mock_prices.get(symbol.upper(), mock_prices["BTC"])
-    return {
-        "symbol": symbol.upper(),
-        "price_usd": data["price"],
-        "change_24h_percent": data["change"],
-        "volume_24h_usd": data["volume"],
-        "market_cap_usd": data["market_cap"],
-        "timestamp": datetime.now().isoformat(),
-        "source": "mock",
-    }
-
-
 def get_current_price(symbol: str) -> dict:
-    """Get current price data for a symbol."""
-    try:
-        client = get_coincap_client()
-        data = client.get_asset(symbol)
-
-        return {
-            "symbol": symbol.upper(),
-            "price_usd": float(data.get("priceUsd", 0)),
-            "change_24h_percent": float(data.get("changePercent24Hr", 0)),
-            "volume_24h_usd": float(data.get("volumeUsd24Hr", 0)),
-            "market_cap_usd": float(data.get("marketCapUsd", 0)),
-            "timestamp": datetime.now().isoformat(),
-            "source": "coingecko",
-        }
-    except Exception as e:
-        print(f"[CoinGecko] API failed: {e}, using mock data", file=sys.stderr)
-        return _get_mock_price(symbol)
-
-
-def _get_mock_history(symbol: str, start_dt: datetime, end_dt: datetime) -> list:
-    """Return mock historical data when API is unavailable"""
-    import hashlib
-
-    base_prices = {"BTC": 97000, "ETH": 3400, "SOL": 190, "BNB": 700, "XRP": 2.3, "ADA": 1.0, "DOT": 7.5, "DOGE": 0.32}
-    base_price = base_prices.get(symbol.upper(), 97000)
-
-    data_points = []
-    days = (end_dt - start_dt).days + 1
-
-    for i in range(days):
-        date = start_dt + timedelta(days=i)
-        seed_str = f"{symbol}{date.strftime('%Y-%m-%d')}"
-        hash_val = int(hashlib.md5(seed_str.encode()).hexdigest()[:8], 16)
-        variation = ((hash_val % 10000) / 10000 - 0.5) * 0.1
-        price = base_price * (1 + variation)
-
-        data_points.append({
-            "timestamp": date.isoformat(),
-            "price_usd": round(price, 2),
-        })
-
-    return data_points
+    """Get current price data for a symbol (via the shared market data service)."""
+    from data.scrapers.market_data import get_market_data
+    return get_market_data().get_current_price(symbol)
 
 
 def get_price_history(
@@ -234,41 +228,6 @@ def get_price_history(
     start_date: str = None,
     end_date: str = None,
 ) -> dict:
-    """Get historical price data for a symbol."""
-    if start_date and end_date:
-        start_dt = datetime.strptime(start_date, "%Y-%m-%d")
-        end_dt = datetime.strptime(end_date, "%Y-%m-%d")
-    else:
-        end_dt = datetime.now()
-        start_dt = end_dt - timedelta(days=days or 30)
-
-    try:
-        client = get_coincap_client()
-        raw_data = client.get_history(
-            symbol, interval,
-            start_date=start_dt.strftime("%Y-%m-%d"),
-            end_date=end_dt.strftime("%Y-%m-%d")
-        )
-
-        data_points = []
-        for point in raw_data:
-            timestamp = datetime.fromtimestamp(point["time"] / 1000)
-            data_points.append({
-                "timestamp": timestamp.isoformat(),
-                "price_usd": float(point["priceUsd"]),
-            })
-
-        source = "coingecko"
-    except Exception as e:
-        print(f"[CoinGecko] History API failed: {e}, using mock data", file=sys.stderr)
-        data_points = _get_mock_history(symbol, start_dt, end_dt)
-        source = "mock"
-
-    return {
-        "symbol": symbol.upper(),
-        "interval": interval,
-        "data": data_points,
-        "start_date": start_dt.strftime("%Y-%m-%d"),
-        "end_date": end_dt.strftime("%Y-%m-%d"),
-        "source": source,
-    }
+    """Get daily price history for a symbol (via the shared market data service)."""
+    from data.scrapers.market_data import get_market_data
+    return get_market_data().get_price_history(symbol, days=days, start_date=start_date, end_date=end_date)
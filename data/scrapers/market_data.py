@@ -0,0 +1,587 @@
+"""
+Market Data Service - 統一市場數據存取層
+
+One cached access layer for prices and candles used by every entry point
+(chat tools, Flask API, orchestrator, backtests). Each request walks the
+fallback chain Binance -> CoinGecko -> mock; results are cached per
+symbol/timeframe so the chat path and the backtest path share downloads.
+Each upstream call goes through its rate limiter and circuit breaker
+(data/scrapers/upstream.py), so a dead source is skipped without waiting.
+The a* methods are awaitable counterparts (ccxt.async_support, aiohttp)
+for the async server; they share the same cache and guards.
+"""
+
+import asyncio
+import hashlib
+import sys
+import threading
+import time
+from concurrent.futures import Future
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, Dict
+
+import pandas as pd
+
+from config import Config
+from data.scrapers.coincap_client import CoinGeckoClient
+from data.scrapers.upstream import get_upstream
+
+
+# Mock 數據（當所有 API 都不可用時）
+MOCK_PRICES = {
+    "BTC": {"price": 98500.00, "change": 1.85, "volume": 32.5e9, "market_cap": 1950e9, "high": 99200, "low": 97100},
+    "ETH": {"price": 3520.50, "change": 2.15, "volume": 18.2e9, "market_cap": 425e9, "high": 3580, "low": 3450},
+    "SOL": {"price": 195.30, "change": -0.45, "volume": 4.2e9, "market_cap": 92e9, "high": 198, "low": 192},
+    "BNB": {"price": 715.20, "change": 0.95, "volume": 1.8e9, "market_cap": 108e9, "high": 720, "low": 708},
+    "XRP": {"price": 2.35, "change": 3.25, "volume": 5.5e9, "market_cap": 135e9, "high": 2.42, "low": 2.28},
+    "ADA": {"price": 1.05, "change": 1.55, "volume": 1.2e9, "market_cap": 37e9, "high": 1.08, "low": 1.02},
+    "DOT": {"price": 7.85, "change": -1.20, "volume": 0.8e9, "market_cap": 11e9, "high": 8.05, "low": 7.72},
+    "DOGE": {"price": 0.325, "change": 4.50, "volume": 2.1e9, "market_cap": 48e9, "high": 0.335, "low": 0.312},
+}
+
+# 備援結果（上游皆失敗）只短暫快取
+FALLBACK_SOURCES = ('mock', 'unavailable')
+
+# CCXT 原生不支援、需由日線重採樣的週期
+RESAMPLED_TIMEFRAMES = ('3d', '5d', '10d')
+
+
+def split_symbol(symbol: str) -> tuple:
+    """'BTC', 'btc' or 'BTC/USDT' -> ('BTC', 'BTC/USDT')"""
+    base = symbol.split('/')[0].upper()
+    quote = symbol.split('/')[1].upper() if '/' in symbol else 'USDT'
+    return base, f"{base}/{quote}"
+
+
+def mock_ticker(symbol: str) -> Dict[str, Any]:
+    """Mock 即時報價"""
+    base, pair = split_symbol(symbol)
+    mock = MOCK_PRICES.get(base, MOCK_PRICES["BTC"])
+    return {
+        "success": True,
+        "symbol": pair,
+        "price": mock["price"],
+        "bid": mock["price"] * 0.9999,
+        "ask": mock["price"] * 1.0001,
+        "volume_24h": mock["volume"],
+        "change_24h": mock["change"],
+        "high_24h": mock["high"],
+        "low_24h": mock["low"],
+        "market_cap": mock["market_cap"],
+        "timestamp": int(datetime.now().timestamp() * 1000),
+        "source": "mock"
+    }
+
+
+def mock_ohlcv(symbol: str, limit: int = 30) -> Dict[str, Any]:
+    """Mock 日線 OHLCV（以日期雜湊產生，結果可重現）"""
+    base, pair = split_symbol(symbol)
+    mock = MOCK_PRICES.get(base, MOCK_PRICES["BTC"])
+    today = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+
+    data = []
+    for i in range(limit):
+        date = today - timedelta(days=limit - i - 1)
+        seed_str = f"{base}{date.strftime('%Y-%m-%d')}"
+        hash_val = int(hashlib.md5(seed_str.encode()).hexdigest()[:8], 16)
+        variation = ((hash_val % 10000) / 10000 - 0.5) * 0.1
+        price = mock["price"] * (1 + variation)
+        data.append({
+            'timestamp': pd.Timestamp(date),
+            'open': price * 0.998,
+            'high': price * 1.01,
+            'low': price * 0.99,
+            'close': price,
+            'volume': mock["volume"] / limit
+        })
+
+    return {"success": True, "symbol": pair, "timeframe": "1d", "data": data, "source": "mock"}
+
+
+class MarketDataService:
+    """Cached, rate-limited market data with a Binance -> CoinGecko -> mock fallback chain"""
+
+    def __init__(self, price_ttl: float = None, history_ttl: float = None, fallback_ttl: float = None):
+        self.price_ttl = Config.MARKET_DATA_PRICE_TTL if price_ttl is None else price_ttl
+        self.history_ttl = Config.MARKET_DATA_HISTORY_TTL if history_ttl is None else history_ttl
+        self.fallback_ttl = Config.MARKET_DATA_FALLBACK_TTL if fallback_ttl is None else fallback_ttl
+        self.coingecko = CoinGeckoClient()
+        self.binance_guard = get_upstream('binance')
+        self.coingecko_guard = get_upstream('coingecko')
+        self._exchange = None
+        self._async_exchange = None
+        self._async_coingecko = None
+        # In-flight async fetches (single-flight), used only from the event loop
+        self._inflight: Dict[tuple, Any] = {}
+        # In-flight sync fetches (single-flight across threads)
+        self._pending: Dict[tuple, Future] = {}
+        self._cache = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def exchange(self):
+        """Binance (ccxt) client, created on first use"""
+        if self._exchange is None:
+            import ccxt
+            self._exchange = ccxt.binance({
+                'enableRateLimit': True,
+                'timeout': Config.BINANCE_TIMEOUT_MS,
+                'options': {'defaultType': 'future'}
+            })
+        return self._exchange
+
+    def _cached(self, key: tuple, ttl: float, fetch: Callable[[], Any],
+                reuse: Callable[[Any], bool] = None, flight: tuple = None) -> Any:
+        """
+        Return a fresh cached entry (optionally only if ``reuse`` accepts it), else fetch.
+        Concurrent misses for the same ``flight`` key (default ``key``) wait for
+        one fetch instead of each calling upstream.
+        """
+        flight = flight or key
+        with self._lock:
+            entry = self._cache.get(key)
+            if entry and entry[0] > time.monotonic() and (reuse is None or reuse(entry[1])):
+                self.hits += 1
+                return entry[1]
+            pending = self._pending.get(flight)
+            leader = pending is None
+            if leader:
+                self.misses += 1
+                pending = self._pending[flight] = Future()
+            else:
+                self.hits += 1
+        if not leader:
+            return pending.result()
+
+        try:
+            value = fetch()
+        except BaseException as e:
+            with self._lock:
+                self._pending.pop(flight, None)
+            pending.set_exception(e)
+            raise
+        with self._lock:
+            self._cache[key] = (time.monotonic() + self._ttl_for(value, ttl), value)
+            self._pending.pop(flight, None)
+        pending.set_result(value)
+        return value
+
+    def _ttl_for(self, value: Any, ttl: float) -> float:
+        """Mock fallbacks are kept only briefly so the next request retries upstream"""
+        if isinstance(value, dict) and value.get('source') in FALLBACK_SOURCES:
+            return min(ttl, self.fallback_ttl)
+        return ttl
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"entries": len(self._cache), "hits": self.hits, "misses": self.misses}
+
+    def clear(self):
+        with self._lock:
+            self._cache.clear()
+
+    # ===== Tickers =====
+
+    def get_ticker(self, symbol: str) -> Dict[str, Any]:
+        """
+        Current ticker for a pair ('BTC/USDT') or base symbol ('BTC')
+        數據源優先順序: Binance -> CoinGecko -> Mock
+        """
+        base, pair = split_symbol(symbol)
+        return self._cached(('ticker', pair), self.price_ttl, lambda: self._fetch_ticker(base, pair))
+
+    def _fetch_ticker(self, base: str, pair: str) -> Dict[str, Any]:
+        # 1. 嘗試 Binance
+        try:
+            return _binance_ticker(pair, self.binance_guard.call(self.exchange.fetch_ticker, pair))
+        except Exception as binance_error:
+            print(f"[Binance] API failed: {binance_error}, trying CoinGecko...", file=sys.stderr)
+
+        # 2. 嘗試 CoinGecko
+        try:
+            return _coingecko_ticker(pair, self.coingecko_guard.call(self.coingecko.get_asset, base))
+        except Exception as coingecko_error:
+            print(f"[CoinGecko] API failed: {coingecko_error}, using mock data...", file=sys.stderr)
+
+        # 3. 使用 Mock 數據
+        return mock_ticker(pair)
+
+    def get_market_cap(self, symbol: str) -> Dict[str, Any]:
+        """
+        Market cap from CoinGecko (exchange tickers don't carry one)
+        Returns {"market_cap": USD, "source": ...}; market_cap is 0 when unavailable.
+        """
+        base, _ = split_symbol(symbol)
+        return self._cached(('market_cap', base), Config.MARKET_DATA_MARKET_CAP_TTL,
+                            lambda: self._fetch_market_cap(base))
+
+    def _fetch_market_cap(self, base: str) -> Dict[str, Any]:
+        try:
+            return _market_cap(self.coingecko_guard.call(self.coingecko.get_asset, base))
+        except Exception as coingecko_error:
+            print(f"[CoinGecko] Market cap failed: {coingecko_error}", file=sys.stderr)
+            return {"market_cap": 0.0, "source": "unavailable"}
+
+    # ===== Candles =====
+
+    def get_ohlcv(self, symbol: str, timeframe: str = '1d', limit: int = 100) -> Dict[str, Any]:
+        """
+        OHLCV candles, newest last
+        數據源優先順序: Binance -> CoinGecko -> Mock
+
+        A cached download of at least ``limit`` candles for the same pair and
+        timeframe is sliced instead of fetching again.
+        """
+        base, pair = split_symbol(symbol)
+        limit = int(limit)
+        result = self._cached(
+            ('ohlcv', pair, timeframe), self.history_ttl,
+            lambda: self._fetch_ohlcv(base, pair, timeframe, limit),
+            reuse=lambda cached: cached.get('requested', 0) >= limit,
+            flight=('ohlcv', pair, timeframe, limit)
+        )
+        data = result['data'][-limit:]
+        return {k: v for k, v in result.items() if k != 'requested'} | {"data": data}
+
+    def _fetch_ohlcv(self, base: str, pair: str, timeframe: str, limit: int) -> Dict[str, Any]:
+        # 1. 嘗試 Binance
+        try:
+            fetch_timeframe, fetch_limit = _binance_candle_request(timeframe, limit)
+            ohlcv = self.binance_guard.call(self.exchange.fetch_ohlcv, pair, fetch_timeframe, limit=fetch_limit)
+            return _binance_candles(pair, timeframe, ohlcv, limit)
+        except Exception as binance_error:
+            print(f"[Binance] OHLCV API failed: {binance_error}, trying CoinGecko...", file=sys.stderr)
+
+        # 2. 嘗試 CoinGecko（只有價格，日線週期合併為日 K）
+        try:
+            points = self.coingecko_guard.call(self.coingecko.get_history, base, days=min(limit, 365))
+            return _coingecko_candles(pair, timeframe, points, limit)
+        except Exception as coingecko_error:
+            print(f"[CoinGecko] OHLCV API failed: {coingecko_error}, using mock data...", file=sys.stderr)
+
+        # 3. 使用 Mock 數據
+        return mock_ohlcv(pair, min(limit, 365)) | {"requested": limit}
+
+    # ===== Chat-facing shapes =====
+
+    def get_current_price(self, symbol: str, ticker: Callable[[str], Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Current price in the chat tool format (``ticker`` overrides get_ticker, e.g. a request memo)"""
+        base, _ = split_symbol(symbol)
+        ticker_data = (ticker or self.get_ticker)(base)
+        if ticker_data.get("market_cap") is None:
+            ticker_data = ticker_data | {"market_cap": self.get_market_cap(base)["market_cap"]}
+        return _price_shape(base, ticker_data)
+
+    def get_price_history(self, symbol: str, days: int = None, start_date: str = None,
+                          end_date: str = None, candles: Callable[..., Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Daily closes in the chat tool format, served from the shared daily candles"""
+        base, _ = split_symbol(symbol)
+        start_dt, end_dt, limit = _history_window(days, start_date, end_date)
+        return _history_shape(base, (candles or self.get_ohlcv)(base, '1d', limit), start_dt, end_dt)
+
+    # ===== Async (event-loop) access, same cache and upstream guards =====
+
+    @property
+    def async_exchange(self):
+        """Binance (ccxt.async_support) client, created on first use inside the event loop"""
+        if self._async_exchange is None:
+            import ccxt.async_support as ccxt_async
+            self._async_exchange = ccxt_async.binance({
+                'enableRateLimit': True,
+                'timeout': Config.BINANCE_TIMEOUT_MS,
+                'options': {'defaultType': 'future'}
+            })
+        return self._async_exchange
+
+    @property
+    def async_coingecko(self):
+        if self._async_coingecko is None:
+            from data.scrapers.coincap_client import AsyncCoinGeckoClient
+            self._async_coingecko = AsyncCoinGeckoClient()
+        return self._async_coingecko
+
+    async def _acached(self, key: tuple, ttl: float, fetch: Callable[[], Awaitable],
+                       reuse: Callable[[Any], bool] = None, flight: tuple = None) -> Any:
+        """
+        Async _cached(): concurrent misses for the same ``flight`` key (default
+        ``key``) share one in-flight fetch instead of each calling upstream
+        """
+        now = time.monotonic()
+        with self._lock:
+            entry = self._cache.get(key)
+            if entry and entry[0] > now and (reuse is None or reuse(entry[1])):
+                self.hits += 1
+                return entry[1]
+
+        flight = flight or key
+        pending = self._inflight.get(flight)
+        if pending is not None:
+            with self._lock:
+                self.hits += 1
+            return await asyncio.shield(pending)
+
+        with self._lock:
+            self.misses += 1
+
+        async def fill():
+            value = await fetch()
+            with self._lock:
+                self._cache[key] = (time.monotonic() + self._ttl_for(value, ttl), value)
+            return value
+
+        # The fetch outlives a cancelled caller; other waiters still get its result
+        task = asyncio.ensure_future(fill())
+        self._inflight[flight] = task
+        task.add_done_callback(lambda _: self._inflight.pop(flight, None))
+        return await asyncio.shield(task)
+
+    async def aget_ticker(self, symbol: str) -> Dict[str, Any]:
+        """Async get_ticker()"""
+        base, pair = split_symbol(symbol)
+        return await self._acached(('ticker', pair), self.price_ttl, lambda: self._afetch_ticker(base, pair))
+
+    async def _afetch_ticker(self, base: str, pair: str) -> Dict[str, Any]:
+        try:
+            return _binance_ticker(pair, await self.binance_guard.acall(self.async_exchange.fetch_ticker, pair))
+        except Exception as binance_error:
+            print(f"[Binance] API failed: {binance_error}, trying CoinGecko...", file=sys.stderr)
+
+        try:
+            return _coingecko_ticker(pair, await self.coingecko_guard.acall(self.async_coingecko.get_asset, base))
+        except Exception as coingecko_error:
+            print(f"[CoinGecko] API failed: {coingecko_error}, using mock data...", file=sys.stderr)
+
+        return mock_ticker(pair)
+
+    async def aget_market_cap(self, symbol: str) -> Dict[str, Any]:
+        """Async get_market_cap()"""
+        base, _ = split_symbol(symbol)
+        return await self._acached(('market_cap', base), Config.MARKET_DATA_MARKET_CAP_TTL,
+                                   lambda: self._afetch_market_cap(base))
+
+    async def _afetch_market_cap(self, base: str) -> Dict[str, Any]:
+        try:
+            return _market_cap(await self.coingecko_guard.acall(self.async_coingecko.get_asset, base))
+        except Exception as coingecko_error:
+            print(f"[CoinGecko] Market cap failed: {coingecko_error}", file=sys.stderr)
+            return {"market_cap": 0.0, "source": "unavailable"}
+
+    async def aget_ohlcv(self, symbol: str, timeframe: str = '1d', limit: int = 100) -> Dict[str, Any]:
+        """Async get_ohlcv()"""
+        base, pair = split_symbol(symbol)
+        limit = int(limit)
+        result = await self._acached(
+            ('ohlcv', pair, timeframe), self.history_ttl,
+            lambda: self._afetch_ohlcv(base, pair, timeframe, limit),
+            reuse=lambda cached: cached.get('requested', 0) >= limit,
+            flight=('ohlcv', pair, timeframe, limit)
+        )
+        data = result['data'][-limit:]
+        return {k: v for k, v in result.items() if k != 'requested'} | {"data": data}
+
+    async def _afetch_ohlcv(self, base: str, pair: str, timeframe: str, limit: int) -> Dict[str, Any]:
+        try:
+            fetch_timeframe, fetch_limit = _binance_candle_request(timeframe, limit)
+            ohlcv = await self.binance_guard.acall(self.async_exchange.fetch_ohlcv, pair,
+                                                   fetch_timeframe, limit=fetch_limit)
+            return _binance_candles(pair, timeframe, ohlcv, limit)
+        except Exception as binance_error:
+            print(f"[Binance] OHLCV API failed: {binance_error}, trying CoinGecko...", file=sys.stderr)
+
+        try:
+            points = await self.coingecko_guard.acall(self.async_coingecko.get_history, base,
+                                                      days=min(limit, 365))
+            return _coingecko_candles(pair, timeframe, points, limit)
+        except Exception as coingecko_error:
+            print(f"[CoinGecko] OHLCV API failed: {coingecko_error}, using mock data...", file=sys.stderr)
+
+        return mock_ohlcv(pair, min(limit, 365)) | {"requested": limit}
+
+    async def aget_current_price(self, symbol: str) -> Dict[str, Any]:
+        """Async get_current_price()"""
+        base, _ = split_symbol(symbol)
+        ticker_data = await self.aget_ticker(base)
+        if ticker_data.get("market_cap") is None:
+            ticker_data = ticker_data | {"market_cap": (await self.aget_market_cap(base))["market_cap"]}
+        return _price_shape(base, ticker_data)
+
+    async def aget_price_history(self, symbol: str, days: int = None, start_date: str = None,
+                                 end_date: str = None) -> Dict[str, Any]:
+        """Async get_price_history()"""
+        base, _ = split_symbol(symbol)
+        start_dt, end_dt, limit = _history_window(days, start_date, end_date)
+        return _history_shape(base, await self.aget_ohlcv(base, '1d', limit), start_dt, end_dt)
+
+    async def aclose(self):
+        """Close the async clients (call on event loop shutdown)"""
+        if self._async_exchange is not None:
+            exchange, self._async_exchange = self._async_exchange, None
+            # A failed market load can leave sibling requests running that reopen
+            # the HTTP session after close(); give them a moment and close again
+            for _ in range(20):
+                await exchange.close()
+                await asyncio.sleep(0.05)
+                if exchange.session is None:
+                    break
+        if self._async_coingecko is not None:
+            await self._async_coingecko.close()
+            self._async_coingecko = None
+
+
+# ===== Upstream response -> service format =====
+
+def _binance_ticker(pair: str, ticker: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "success": True,
+        "symbol": pair,
+        "price": ticker['last'],
+        "bid": ticker['bid'],
+        "ask": ticker['ask'],
+        "volume_24h": ticker['quoteVolume'],
+        "change_24h": ticker['percentage'],
+        "high_24h": ticker['high'],
+        "low_24h": ticker['low'],
+        "timestamp": ticker['timestamp'],
+        "source": "binance"
+    }
+
+
+def _coingecko_ticker(pair: str, data: Dict[str, Any]) -> Dict[str, Any]:
+    price = float(data.get("priceUsd", 0))
+    return {
+        "success": True,
+        "symbol": pair,
+        "price": price,
+        "bid": price * 0.9999,  # 估算
+        "ask": price * 1.0001,  # 估算
+        "volume_24h": float(data.get("volumeUsd24Hr", 0)),
+        "change_24h": float(data.get("changePercent24Hr", 0)),
+        "high_24h": price * 1.02,  # 估算
+        "low_24h": price * 0.98,   # 估算
+        "market_cap": float(data.get("marketCapUsd", 0)),
+        "timestamp": int(datetime.now().timestamp() * 1000),
+        "source": "coingecko"
+    }
+
+
+def _market_cap(data: Dict[str, Any]) -> Dict[str, Any]:
+    return {"market_cap": float(data.get("marketCapUsd") or 0), "source": "coingecko"}
+
+
+def _binance_candle_request(timeframe: str, limit: int) -> tuple:
+    """(timeframe, limit) to request from Binance; custom periods are resampled from daily candles"""
+    if timeframe in RESAMPLED_TIMEFRAMES:
+        return '1d', limit * int(timeframe[:-1])
+    return timeframe, limit
+
+
+def _binance_candles(pair: str, timeframe: str, ohlcv: list, limit: int) -> Dict[str, Any]:
+    df = pd.DataFrame(ohlcv, columns=['timestamp', 'open', 'high', 'low', 'close', 'volume'])
+    df['timestamp'] = pd.to_datetime(df['timestamp'], unit='ms')
+
+    if timeframe in RESAMPLED_TIMEFRAMES:
+        # 以日線重採樣自訂週期
+        df = df.set_index('timestamp').resample(f'{int(timeframe[:-1])}D').agg({
+            'open': 'first',
+            'high': 'max',
+            'low': 'min',
+            'close': 'last',
+            'volume': 'sum'
+        }).dropna().reset_index()
+
+    return {
+        "success": True,
+        "symbol": pair,
+        "timeframe": timeframe,
+        "data": df.to_dict('records'),
+        "source": "binance",
+        "requested": limit
+    }
+
+
+def _coingecko_candles(pair: str, timeframe: str, points: list, limit: int) -> Dict[str, Any]:
+    prices = pd.Series(
+        [float(p["priceUsd"]) for p in points],
+        index=pd.to_datetime([p["time"] for p in points], unit='ms')
+    )
+    if timeframe.endswith('d'):
+        candles = prices.resample(f"{int(timeframe[:-1] or 1)}D").ohlc().dropna()
+    else:
+        candles = pd.DataFrame({'open': prices, 'high': prices * 1.005,
+                                'low': prices * 0.995, 'close': prices})
+    candles['volume'] = 0
+    candles.index.name = 'timestamp'
+    return {
+        "success": True,
+        "symbol": pair,
+        "timeframe": timeframe,
+        "data": candles.reset_index().to_dict('records'),
+        "source": "coingecko",
+        "requested": limit
+    }
+
+
+# ===== Chat-facing shapes =====
+
+def _price_shape(base: str, ticker: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "symbol": base,
+        "price_usd": float(ticker.get("price") or 0),
+        "change_24h_percent": float(ticker.get("change_24h") or 0),
+        "volume_24h_usd": float(ticker.get("volume_24h") or 0),
+        "market_cap_usd": float(ticker.get("market_cap") or 0),
+        "timestamp": datetime.now().isoformat(),
+        "source": ticker.get("source"),
+    }
+
+
+def history_limit(days: int = None, start_date: str = None, end_date: str = None) -> int:
+    """Daily candles get_price_history() needs for a window (for prefetching a shared download)"""
+    return _history_window(days, start_date, end_date)[2]
+
+
+def _history_window(days: int = None, start_date: str = None, end_date: str = None) -> tuple:
+    """(start, end, daily candles needed) for a price history request"""
+    if start_date and end_date:
+        start_dt = datetime.strptime(start_date, "%Y-%m-%d")
+        end_dt = datetime.strptime(end_date, "%Y-%m-%d")
+    else:
+        end_dt = datetime.now()
+        start_dt = end_dt - timedelta(days=days or 30)
+
+    limit = min(max((datetime.now() - start_dt).days + 2, 2), 1000)
+    return start_dt, end_dt, limit
+
+
+def _history_shape(base: str, ohlcv: Dict[str, Any], start_dt: datetime, end_dt: datetime) -> Dict[str, Any]:
+    start = pd.Timestamp(start_dt.date())
+    end = pd.Timestamp(end_dt.date()) + pd.Timedelta(days=1)
+
+    data_points = [
+        {"timestamp": pd.Timestamp(c['timestamp']).isoformat(), "price_usd": float(c['close'])}
+        for c in ohlcv['data'] if start <= pd.Timestamp(c['timestamp']) < end
+    ]
+    return {
+        "symbol": base,
+        "interval": "d1",
+        "data": data_points,
+        "start_date": start_dt.strftime("%Y-%m-%d"),
+        "end_date": end_dt.strftime("%Y-%m-%d"),
+        "source": ohlcv.get("source"),
+    }
+
+
+_market_data = None
+_market_data_lock = threading.Lock()
+
+
+def get_market_data() -> MarketDataService:
+    """Get the shared market data service"""
+    global _market_data
+    if _market_data is None:
+        with _market_data_lock:
+            if _market_data is None:
+                _market_data = MarketDataService()
+    return _market_data
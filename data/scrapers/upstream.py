@@ -0,0 +1,262 @@
+"""
+Upstream API Guards - 上游 API 限流與斷路器
+
+Token-bucket rate limiting per upstream (matched to each API's quota) and a
+circuit breaker that skips a source known to be failing for a cooldown
+period, so an outage costs one timeout instead of one per request.
+"""
+
+import asyncio
+import threading
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from config import Config
+
+
+class UpstreamUnavailable(Exception):
+    """Upstream skipped: circuit open or rate limit not available in time"""
+
+
+class TokenBucket:
+    """Thread-safe token bucket refilled continuously at ``rate`` tokens per second"""
+
+    def __init__(self, rate: float, capacity: float, clock: Callable[[], float] = time.monotonic,
+                 sleep: Callable[[float], None] = time.sleep):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self._clock = clock
+        self._sleep = sleep
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float):
+        self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def try_acquire(self, tokens: float = 1.0) -> float:
+        """Take tokens if available; otherwise return the seconds until they will be"""
+        with self._lock:
+            self._refill(self._clock())
+            if self.tokens >= tokens:
+                self.tokens -= tokens
+                return 0.0
+            return (tokens - self.tokens) / self.rate
+
+    def available(self) -> float:
+        with self._lock:
+            self._refill(self._clock())
+            return self.tokens
+
+    def acquire(self, tokens: float = 1.0, timeout: Optional[float] = None) -> bool:
+        """Block until tokens are available; False if that would exceed ``timeout`` seconds"""
+        deadline = None if timeout is None else self._clock() + timeout
+        while True:
+            wait = self.try_acquire(tokens)
+            if wait == 0:
+                return True
+            if deadline is not None and self._clock() + wait > deadline:
+                return False
+            self._sleep(wait)
+
+    async def acquire_async(self, tokens: float = 1.0, timeout: Optional[float] = None) -> bool:
+        """Like acquire(), but waits with asyncio.sleep so the event loop keeps running"""
+        deadline = None if timeout is None else self._clock() + timeout
+        while True:
+            wait = self.try_acquire(tokens)
+            if wait == 0:
+                return True
+            if deadline is not None and self._clock() + wait > deadline:
+                return False
+            await asyncio.sleep(wait)
+
+
+class CircuitBreaker:
+    """
+    Closed -> open after ``failure_threshold`` consecutive failures; after
+    ``cooldown`` seconds one trial call is let through (half-open) and its
+    outcome closes or re-opens the circuit
+    """
+
+    CLOSED, OPEN, HALF_OPEN = 'closed', 'open', 'half_open'
+
+    def __init__(self, failure_threshold: int = 3, cooldown: float = 60.0,
+                 clock: Callable[[], float] = time.monotonic):
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self._clock = clock
+        self._lock = threading.Lock()
+        self.state = self.CLOSED
+        self.consecutive_failures = 0
+        self.opened_at = None
+        self._probing = False
+        # Metrics
+        self.successes = 0
+        self.failures = 0
+        self.rejected = 0
+        self.times_opened = 0
+        self.open_seconds = 0.0
+
+    def allow(self) -> bool:
+        """Whether a call may go through now"""
+        with self._lock:
+            if self.state == self.OPEN and self._clock() - self.opened_at >= self.cooldown:
+                self.state = self.HALF_OPEN
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.HALF_OPEN and not self._probing:
+                self._probing = True
+                return True
+            self.rejected += 1
+            return False
+
+    def cancel(self):
+        """A permitted call was not made (e.g. rate limited); free the trial slot"""
+        with self._lock:
+            self._probing = False
+
+    def record_success(self):
+        with self._lock:
+            self.successes += 1
+            self.consecutive_failures = 0
+            self._probing = False
+            if self.state != self.CLOSED:
+                self.open_seconds += self._clock() - self.opened_at
+                self.state = self.CLOSED
+                self.opened_at = None
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            self.consecutive_failures += 1
+            self._probing = False
+            if self.state == self.HALF_OPEN:
+                # Failed trial: restart the cooldown
+                self.state = self.OPEN
+                self.open_seconds += self._clock() - self.opened_at
+                self.opened_at = self._clock()
+            elif self.state == self.CLOSED and self.consecutive_failures >= self.failure_threshold:
+                self.state = self.OPEN
+                self.opened_at = self._clock()
+                self.times_opened += 1
+
+    def status(self) -> Dict[str, Any]:
+        with self._lock:
+            open_for = self._clock() - self.opened_at if self.opened_at is not None else 0.0
+            return {
+                "state": self.state,
+                "consecutive_failures": self.consecutive_failures,
+                "successes": self.successes,
+                "failures": self.failures,
+                "rejected": self.rejected,
+                "times_opened": self.times_opened,
+                "open_for_seconds": round(open_for, 1),
+                "total_open_seconds": round(self.open_seconds + open_for, 1),
+                "retry_in_seconds": round(max(0.0, self.cooldown - open_for), 1) if self.state == self.OPEN else 0.0
+            }
+
+
+def default_client_errors() -> Tuple[type, ...]:
+    """
+    Exceptions that mean the request itself was bad (unknown symbol, invalid
+    parameters), not that the upstream is failing; they do not count toward
+    opening the circuit. ccxt's BadRequest (parent of BadSymbol) derives from
+    ExchangeError rather than ValueError, so it is listed explicitly.
+    """
+    errors: Tuple[type, ...] = (ValueError,)
+    try:
+        import ccxt
+        errors += (ccxt.BadRequest,)
+    except ImportError:
+        pass
+    return errors
+
+
+class Upstream:
+    """Rate limiter and circuit breaker guarding one upstream API"""
+
+    def __init__(self, name: str, rate_per_minute: float, burst: float,
+                 failure_threshold: int = None, cooldown: float = None, max_wait: float = None,
+                 client_errors: Tuple[type, ...] = None):
+        self.name = name
+        self.client_errors = default_client_errors() if client_errors is None else tuple(client_errors)
+        self.bucket = TokenBucket(rate_per_minute / 60.0, burst)
+        self.breaker = CircuitBreaker(
+            Config.UPSTREAM_FAILURE_THRESHOLD if failure_threshold is None else failure_threshold,
+            Config.UPSTREAM_COOLDOWN if cooldown is None else cooldown
+        )
+        self.max_wait = Config.UPSTREAM_MAX_WAIT if max_wait is None else max_wait
+        self.rate_limited = 0
+
+    def call(self, fn: Callable, *args, **kwargs) -> Any:
+        """
+        Run ``fn`` through the guards
+
+        Raises:
+            UpstreamUnavailable: circuit open or no token within max_wait
+        """
+        if not self.breaker.allow():
+            raise UpstreamUnavailable(f"{self.name} circuit open")
+        if not self.bucket.acquire(timeout=self.max_wait):
+            self.breaker.cancel()
+            self.rate_limited += 1
+            raise UpstreamUnavailable(f"{self.name} rate limit")
+        try:
+            result = fn(*args, **kwargs)
+        except self.client_errors:
+            # Bad input (e.g. unknown symbol), not an upstream fault
+            self.breaker.cancel()
+            raise
+        except Exception:
+            self.breaker.record_failure()
+            raise
+        self.breaker.record_success()
+        return result
+
+    async def acall(self, fn: Callable[..., Awaitable], *args, **kwargs) -> Any:
+        """Await coroutine function ``fn`` through the same guards as call()"""
+        if not self.breaker.allow():
+            raise UpstreamUnavailable(f"{self.name} circuit open")
+        if not await self.bucket.acquire_async(timeout=self.max_wait):
+            self.breaker.cancel()
+            self.rate_limited += 1
+            raise UpstreamUnavailable(f"{self.name} rate limit")
+        try:
+            result = await fn(*args, **kwargs)
+        except self.client_errors + (asyncio.CancelledError,):
+            self.breaker.cancel()
+            raise
+        except Exception:
+            self.breaker.record_failure()
+            raise
+        self.breaker.record_success()
+        return result
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            **self.breaker.status(),
+            "tokens_available": round(self.bucket.available(), 2),
+            "rate_per_minute": self.bucket.rate * 60,
+            "rate_limited": self.rate_limited
+        }
+
+
+_upstreams: Dict[str, Upstream] = {}
+_upstreams_lock = threading.Lock()
+
+
+def get_upstream(name: str) -> Upstream:
+    """Get the shared guard for an upstream ('binance', 'coingecko')"""
+    with _upstreams_lock:
+        if name not in _upstreams:
+            limits = Config.UPSTREAM_RATE_LIMITS.get(name, (60, 10))
+            _upstreams[name] = Upstream(name, *limits)
+        return _upstreams[name]
+
+
+def upstream_status() -> Dict[str, Dict[str, Any]]:
+    """Breaker state and limiter metrics of every upstream used so far"""
+    with _upstreams_lock:
+        upstreams = dict(_upstreams)
+    return {name: upstream.status() for name, upstream in upstreams.items()}
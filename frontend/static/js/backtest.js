@@ -3,6 +3,7 @@
 let backtestResults = [];
 let performanceChart = null;
 let comparisonChart = null;
+let equityChart = null;
 
 // Load results on page load
 document.addEventListener('DOMContentLoaded', function() {
@@ -68,6 +69,7 @@ async function runBacktest() {
         if (data.success) {
             // Reload results
             await loadBacktestResults();
+            updateEquityChart(data);
             alert('回測完成！');
         } else {
             alert('回測失敗: ' + data.error);
@@ -91,6 +93,7 @@ async function loadBacktestResults() {
             backtestResults = data.results;
             displayResults(backtestResults);
             updateCharts(backtestResults);
+            loadLatestEquityCurve();
         } else {
             document.getElementById('resultsContainer').innerHTML = 
                 '<p class="text-center">暫無回測結果，請運行一個回測。</p>';
@@ -103,6 +106,20 @@ async function loadBacktestResults() {
     }
 }
 
+// Load the equity curve of the most recent run
+async function loadLatestEquityCurve() {
+    try {
+        const response = await fetch('/api/backtest/results?limit=1&include_equity=true');
+        const data = await response.json();
+        
+        if (data.success && data.results.length > 0) {
+            updateEquityChart(data.results[0]);
+        }
+    } catch (error) {
+        console.error('Error loading equity curve:', error);
+    }
+}
+
 // Display results
 function displayResults(results) {
     const container = document.getElementById('resultsContainer');
@@ -114,7 +131,8 @@ function displayResults(results) {
     
     let html = '';
     
-    results.reverse().forEach((result, index) => {
+    // API returns newest first
+    results.forEach((result, index) => {
         const isProfit = result.total_return_pct > 0;
         const badgeClass = isProfit ? 'badge-success' : 'badge-danger';
         
@@ -295,6 +313,62 @@ function updatePerformanceChart(results) {
     });
 }
 
+// Update equity curve chart
+function updateEquityChart(result) {
+    const curve = result && result.equity_curve;
+    if (!curve || !curve.values || curve.values.length === 0) return;
+    
+    document.getElementById('chartsContainer').style.display = 'grid';
+    document.getElementById('equityChartTitle').textContent =
+        `資金曲線 - ${result.symbol || ''} ${getStrategyName(result.strategy)}`;
+    
+    const ctx = document.getElementById('equityChart').getContext('2d');
+    
+    if (equityChart) {
+        equityChart.destroy();
+    }
+    
+    const labels = curve.timestamps.map(t => new Date(t).toLocaleDateString('zh-TW'));
+    
+    equityChart = new Chart(ctx, {
+        type: 'line',
+        data: {
+            labels: labels,
+            datasets: [
+                {
+                    label: '資產價值',
+                    data: curve.values,
+                    borderColor: 'rgb(37, 99, 235)',
+                    backgroundColor: 'rgba(37, 99, 235, 0.1)',
+                    pointRadius: 0,
+                    borderWidth: 1.5,
+                    fill: true
+                }
+            ]
+        },
+        options: {
+            responsive: true,
+            maintainAspectRatio: false,
+            animation: false,
+            scales: {
+                y: {
+                    ticks: { color: '#94a3b8' },
+                    grid: { color: 'rgba(148, 163, 184, 0.1)' }
+                },
+                x: {
+                    ticks: { color: '#94a3b8', maxTicksLimit: 8 },
+                    grid: { color: 'rgba(148, 163, 184, 0.1)' }
+                }
+            },
+            plugins: {
+                legend: {
+                    labels: { color: '#f1f5f9' }
+                }
+            }
+        }
+    });
+}
+
 // Update comparison chart
 function updateComparisonChart(results) {
     const ctx = document.getElementById('comparisonChart').getContext('2d');
@@ -2,6 +2,17 @@
 
 let conversationHistory = [];
 
+// Socket.IO: 接收快速路徑回應之後的 LLM 補充解讀
+const socket = (typeof io !== 'undefined') ? io() : null;
+if (socket) {
+    socket.on('response_enriched', function(data) {
+        const target = document.querySelector(`[data-request-id="${data.request_id}"] .response-text`);
+        if (target && data.response) {
+            target.innerHTML = formatResponse(data.response);
+        }
+    });
+}
+
 // Send message on Enter key
 document.getElementById('chatInput').addEventListener('keypress', function(e) {
     if (e.key === 'Enter' && !e.shiftKey) {
@@ -46,13 +57,19 @@ async function sendMessage() {
     // Update status
     updateStatus('🔄 AI 思考中...', 'warning');
     
+    const requestId = 'req-' + Date.now();
+    
     try {
         const response = await fetch('/api/chat', {
             method: 'POST',
             headers: {
                 'Content-Type': 'application/json',
             },
-            body: JSON.stringify({ message: message })
+            body: JSON.stringify({
+                message: message,
+                sid: socket && socket.connected ? socket.id : null,
+                request_id: requestId
+            })
         });
         
         // Remove loading indicator
@@ -62,7 +79,7 @@ async function sendMessage() {
         
         if (data.success) {
             // Add bot response
-            addBotResponse(data);
+            addBotResponse(data, requestId);
             updateStatus('✅ 就緒', 'success');
         } else {
             addMessage('❌ 抱歉，處理您的請求時發生錯誤: ' + data.error, 'bot');
@@ -134,10 +151,13 @@ function addMessage(content, type) {
 }
 
 // Add bot response with tool results
-function addBotResponse(data) {
+function addBotResponse(data, requestId) {
     const messagesDiv = document.getElementById('chatMessages');
     const messageDiv = document.createElement('div');
     messageDiv.className = 'message bot-message';
+    if (requestId) {
+        messageDiv.dataset.requestId = requestId;
+    }
 
     const contentDiv = document.createElement('div');
     contentDiv.className = 'message-content';
@@ -147,7 +167,7 @@ function addBotResponse(data) {
     // Add main response (新 API 使用 response 字段)
     const responseText = data.response || data.message || '';
     if (responseText) {
-        html += `<p>${formatResponse(responseText)}</p>`;
+        html += `<div class="response-text">${formatResponse(responseText)}</div>`;
     }
 
     // 處理圖表數據 (直接從回應中獲取)
@@ -5,6 +5,8 @@ MCP Tools - 工具定義層
 定義所有可供 LLM 調用的工具。
 """
 
+import asyncio
+import contextvars
 import sys
 from pathlib import Path
 from datetime import datetime
@@ -60,7 +62,7 @@ TOOLS = [
     },
     {
         "name": "get_technical_analysis",
-        "description": "獲取技術分析指標，包括 RSI、波動率、移動平均線等。",
+        "description": "獲取技術分析指標，包括 RSI、波動率、移動平均線等，並回傳完整指標序列。可用 symbols 一次分析多個幣種。",
         "parameters": {
             "type": "object",
             "properties": {
@@ -68,9 +70,33 @@ TOOLS = [
                     "type": "string",
                     "enum": ["BTC", "ETH", "SOL", "BNB", "XRP", "ADA", "DOT", "DOGE"],
                     "description": "加密貨幣符號"
+                },
+                "symbols": {
+                    "type": "array",
+                    "items": {
+                        "type": "string",
+                        "enum": ["BTC", "ETH", "SOL", "BNB", "XRP", "ADA", "DOT", "DOGE"]
+                    },
+                    "description": "多個加密貨幣符號（一次比較分析）"
+                },
+                "days": {
+                    "type": "integer",
+                    "description": "回傳指標序列的天數 (預設 60)"
+                },
+                "sma_periods": {
+                    "type": "array",
+                    "items": {"type": "integer"},
+                    "description": "移動平均線週期 (預設 [20, 50])"
+                },
+                "rsi_period": {
+                    "type": "integer",
+                    "description": "RSI 週期 (預設 14)"
+                },
+                "volatility_window": {
+                    "type": "integer",
+                    "description": "波動率計算天數 (預設 7)"
                 }
-            },
-            "required": ["symbol"]
+            }
         }
     },
     {
@@ -83,10 +109,19 @@ TOOLS = [
                     "type": "string",
                     "description": "交易對符號"
                 },
+                "symbols": {
+                    "type": "array",
+                    "items": {"type": "string"},
+                    "description": "多個交易對，進行投資組合回測（例如 [\"BTC/USDT\", \"ETH/USDT\"]）"
+                },
+                "allocation": {
+                    "type": "string",
+                    "enum": ["equal", "volatility", "signal"],
+                    "description": "投資組合資金分配方式：等權重、波動率平價、信號加權"
+                },
                 "strategy": {
                     "type": "string",
-                    "enum": ["combined", "macd", "technical", "sentiment"],
-                    "description": "策略類型"
+                    "description": "策略類型：combined、macd、technical、sentiment，或以 create_strategy 建立的自訂策略名稱"
                 },
                 "start_date": {
                     "type": "string",
@@ -100,6 +135,64 @@ TOOLS = [
             "required": []
         }
     },
+    {
+        "name": "create_strategy",
+        "description": "以宣告式規則建立自訂交易策略，之後可用 run_backtest 回測。支援範本（sma_crossover、ema_crossover、rsi_reversion、macd_crossover、bollinger_reversion）或自訂規則。",
+        "parameters": {
+            "type": "object",
+            "properties": {
+                "name": {
+                    "type": "string",
+                    "description": "策略名稱"
+                },
+                "config": {
+                    "type": "object",
+                    "description": (
+                        "策略規格。範本：{\"type\": \"sma_crossover\", \"parameters\": {\"short_period\": 10, \"long_period\": 30}}。"
+                        "規則：{\"type\": \"rules\", \"entry\": 條件, \"exit\": 條件}，"
+                        "條件為 {\"left\": \"rsi(14)\", \"op\": \"<\", \"right\": 30}（op 可為 > < >= <= crosses_above crosses_below），"
+                        "或以 {\"all\": [...]}、{\"any\": [...]}、{\"weighted\": [{\"condition\": 條件, \"weight\": 1}], \"threshold\": 0.5} 組合。"
+                        "指標：close、volume、sentiment、sma(n)、ema(n)、rsi(n)、macd(f,s,sig)、macd_signal(f,s,sig)、bb_upper(n,k)、bb_lower(n,k)、bb_mid(n,k)、returns(n)、volatility(n)"
+                    )
+                }
+            },
+            "required": ["name", "config"]
+        }
+    },
+    {
+        "name": "analyze_backtest_robustness",
+        "description": "以區塊自助法（block bootstrap）重抽樣回測報酬，估計總回報、夏普比率與最大回撤的信賴區間，判斷策略優勢是否顯著。",
+        "parameters": {
+            "type": "object",
+            "properties": {
+                "result_id": {
+                    "type": "integer",
+                    "description": "已儲存的回測結果 ID（不提供則先執行回測）"
+                },
+                "symbol": {
+                    "type": "string",
+                    "description": "交易對符號"
+                },
+                "strategy": {
+                    "type": "string",
+                    "description": "策略類型：combined、macd、technical、sentiment，或自訂策略名稱"
+                },
+                "start_date": {
+                    "type": "string",
+                    "description": "回測開始日期"
+                },
+                "end_date": {
+                    "type": "string",
+                    "description": "回測結束日期"
+                },
+                "n_samples": {
+                    "type": "integer",
+                    "description": "重抽樣次數（預設 2000）"
+                }
+            },
+            "required": []
+        }
+    },
 ]
 
 
@@ -126,86 +219,133 @@ def get_tools_for_llm() -> list[dict]:
 # ===== 工具實現 =====
 
 def _get_current_price(symbol: str) -> dict:
-    """獲取即時價格"""
-    from data.scrapers.coincap_client import get_current_price
-    return get_current_price(symbol)
+    """獲取即時價格（同一請求內共用）"""
+    from backend.data_context import current_data
+    return current_data().current_price(symbol)
 
 
 def _get_price_history(symbol: str, days: int = None, start_date: str = None, end_date: str = None) -> dict:
-    """獲取歷史價格"""
-    from data.scrapers.coincap_client import get_price_history
-    return get_price_history(symbol, days=days, start_date=start_date, end_date=end_date)
-
-
-def _get_technical_analysis(symbol: str) -> dict:
-    """技術分析（簡化版）"""
-    from data.scrapers.coincap_client import get_price_history
-    import random
-
-    # 獲取歷史數據計算指標
-    history = get_price_history(symbol, days=60)
-    prices = [p["price_usd"] for p in history.get("data", [])]
-
-    if len(prices) < 14:
-        return {"error": "數據不足以計算技術指標"}
-
-    # 計算簡單指標
-    current_price = prices[-1] if prices else 0
-    sma_20 = sum(prices[-20:]) / 20 if len(prices) >= 20 else current_price
-    sma_50 = sum(prices[-50:]) / 50 if len(prices) >= 50 else current_price
-
-    # 簡單 RSI 計算
-    gains = []
-    losses = []
-    for i in range(1, min(15, len(prices))):
-        change = prices[-i] - prices[-i-1]
-        if change > 0:
-            gains.append(change)
-        else:
-            losses.append(abs(change))
+    """獲取歷史價格（同一請求內共用日 K 下載）"""
+    from backend.data_context import current_data
+    return current_data().price_history(symbol, days=days, start_date=start_date, end_date=end_date)
 
-    avg_gain = sum(gains) / 14 if gains else 0.001
-    avg_loss = sum(losses) / 14 if losses else 0.001
-    rs = avg_gain / avg_loss if avg_loss > 0 else 1
-    rsi = 100 - (100 / (1 + rs))
 
-    # RSI 解讀
+def _rsi_signal(rsi: float) -> str:
+    """RSI 解讀"""
     if rsi > 70:
-        rsi_signal = "超買（可能回調）"
-    elif rsi < 30:
-        rsi_signal = "超賣（可能反彈）"
-    else:
-        rsi_signal = "中性"
-
-    # 計算波動率
-    returns = [(prices[i] - prices[i-1]) / prices[i-1] for i in range(1, len(prices))]
-    volatility = (sum([r**2 for r in returns[-7:]]) / 7) ** 0.5 if len(returns) >= 7 else 0
+        return "超買（可能回調）"
+    if rsi < 30:
+        return "超賣（可能反彈）"
+    return "中性"
+
+
+def _round_series(values) -> list:
+    """序列轉 JSON（暖機期為 None）"""
+    import numpy as np
+    return [None if np.isnan(v) else round(float(v), 4) for v in values]
+
+
+def _technical_lookback(sma_periods: list, rsi_period: int, volatility_window: int) -> int:
+    """指標暖機所需的額外天數"""
+    return max([int(p) for p in sma_periods] + [int(rsi_period) + 1, int(volatility_window) + 1])
+
+
+def _get_technical_analysis(symbol: str = None, symbols: list = None, days: int = 60,
+                            sma_periods: list = None, rsi_period: int = 14,
+                            volatility_window: int = 7) -> dict:
+    """技術分析：多幣種一次以向量化指標計算（Wilder RSI），回傳完整指標序列"""
+    import numpy as np
+    import pandas as pd
+    from backend.data_context import current_data
+    from backend.models import indicators as ind
+
+    symbols = [s.upper() for s in (symbols or [symbol or "BTC"])]
+    sma_periods = sorted({int(p) for p in (sma_periods or [20, 50])})
+    rsi_period, volatility_window, days = int(rsi_period), int(volatility_window), int(days)
+
+    # 多抓最長回看期的資料作為暖機，回傳的序列只保留最近 days 天
+    lookback = _technical_lookback(sma_periods, rsi_period, volatility_window)
+    columns = {}
+    for sym in symbols:
+        history = current_data().price_history(sym, days=days + lookback)
+        points = history.get("data", [])
+        if points:
+            columns[sym] = pd.Series(
+                [p["price_usd"] for p in points],
+                index=pd.to_datetime([p["timestamp"] for p in points]).normalize()
+            ).groupby(level=0).last()
+
+    missing = [sym for sym in symbols if sym not in columns]
+    prices = pd.concat(columns, axis=1, join="inner") if columns else pd.DataFrame()
+    if len(prices) < rsi_period + 1:
+        return {"error": "數據不足以計算技術指標", "symbols": symbols}
+
+    # 列為幣種、欄為日期
+    close = prices[list(columns)].to_numpy().T
+    returns = np.hstack([np.full((close.shape[0], 1), np.nan), np.diff(close, axis=1) / close[:, :-1]])
+    series = {f"rsi_{rsi_period}": ind.rsi_array(close, rsi_period),
+              f"volatility_{volatility_window}d": ind.rolling_std_array(returns, volatility_window)}
+    for period in sma_periods:
+        series[f"sma_{period}"] = ind.rolling_mean_array(close, period)
+
+    keep = slice(-min(days, close.shape[1]), None)
+    timestamps = [t.strftime("%Y-%m-%d") for t in prices.index[keep]]
+    trend_sma = f"sma_{sma_periods[0]}"
+    results = {}
+    for row, sym in enumerate(columns):
+        current_price = float(close[row, -1])
+        latest = {name: float(values[row, -1]) for name, values in series.items()}
+        rsi = latest[f"rsi_{rsi_period}"]
+        indicators = {
+            name: (f"{value * 100:.2f}%" if name.startswith("volatility") else round(value, 2))
+            for name, value in latest.items() if not np.isnan(value)
+        }
+        indicators[f"rsi_{rsi_period}"] = round(rsi, 2)
+        indicators["rsi_signal"] = _rsi_signal(rsi)
+        indicators["current_price"] = round(current_price, 2)
+
+        # 歷史不足最短均線週期時不判斷趨勢
+        trend_value = latest[trend_sma]
+        if np.isnan(trend_value):
+            trend = "數據不足"
+        else:
+            trend = "上升" if current_price > trend_value else "下降"
+        results[sym] = {
+            "symbol": sym,
+            "indicators": indicators,
+            "trend": trend,
+            "series": {
+                "timestamps": timestamps,
+                "close": _round_series(close[row, keep]),
+                **{name: _round_series(values[row, keep]) for name, values in series.items()}
+            },
+            "timestamp": datetime.now().isoformat()
+        }
 
+    if len(symbols) == 1:
+        return results[symbols[0]]
     return {
-        "symbol": symbol,
-        "indicators": {
-            "rsi_14": round(rsi, 2),
-            "rsi_signal": rsi_signal,
-            "volatility_7d": f"{volatility*100:.2f}%",
-            "sma_20": round(sma_20, 2),
-            "sma_50": round(sma_50, 2),
-            "current_price": round(current_price, 2),
-        },
-        "trend": "上升" if current_price > sma_20 else "下降",
+        "symbols": symbols,
+        "results": results,
+        "missing": missing,
         "timestamp": datetime.now().isoformat()
     }
 
 
 def _run_backtest(symbol: str = "BTC/USDT", strategy: str = "combined",
-                  start_date: str = None, end_date: str = None) -> dict:
-    """執行回測"""
+                  start_date: str = None, end_date: str = None,
+                  symbols: list = None, allocation: str = "equal") -> dict:
+    """執行回測（提供 symbols 時為投資組合回測）"""
     try:
         from backend.models.backtest_engine import BacktestTool
         tool = BacktestTool()
         params = {
             "symbol": symbol,
-            "strategy_name": strategy,
+            "strategy": strategy,
+            "allocation": allocation,
         }
+        if symbols:
+            params["symbols"] = symbols
         if start_date:
             params["start_date"] = start_date
         if end_date:
@@ -215,8 +355,63 @@ def _run_backtest(symbol: str = "BTC/USDT", strategy: str = "combined",
         return {"error": f"回測執行失敗: {e}"}
 
 
+def _create_strategy(name: str, config: dict) -> dict:
+    """建立宣告式自訂策略"""
+    try:
+        from backend.mcp_tools.crypto_tools import TradingStrategyTool
+        return TradingStrategyTool().create_strategy(name, config)
+    except Exception as e:
+        return {"error": f"建立策略失敗: {e}"}
+
+
+def _analyze_backtest_robustness(result_id: int = None, symbol: str = "BTC/USDT",
+                                 strategy: str = "combined", start_date: str = None,
+                                 end_date: str = None, n_samples: int = 2000) -> dict:
+    """回測穩健性分析（自助法信賴區間）"""
+    try:
+        from backend.models.robustness import RobustnessAnalysisTool
+        params = {"n_samples": n_samples}
+        if result_id is not None:
+            params["result_id"] = result_id
+        else:
+            params.update({"symbol": symbol, "strategy": strategy})
+            if start_date:
+                params["start_date"] = start_date
+            if end_date:
+                params["end_date"] = end_date
+        return RobustnessAnalysisTool().execute(params)
+    except Exception as e:
+        return {"error": f"穩健性分析失敗: {e}"}
+
+
 # ===== 工具執行器 =====
 
+def history_requirements(tool_name: str, arguments: dict) -> dict:
+    """
+    工具需要的日 K 數量 {幣種: 根數}
+
+    同一則訊息中多個工具需要同一幣種的日 K 時，可先下載最長的一份，
+    其餘工具直接從市場數據快取切片。不需要歷史數據的工具回傳空字典。
+    """
+    from data.scrapers.market_data import history_limit
+
+    try:
+        if tool_name == "get_price_history":
+            limit = history_limit(arguments.get("days"), arguments.get("start_date"), arguments.get("end_date"))
+            return {arguments["symbol"].upper(): limit}
+        if tool_name == "get_technical_analysis":
+            days = int(arguments.get("days", 60))
+            lookback = _technical_lookback(arguments.get("sma_periods") or [20, 50],
+                                           arguments.get("rsi_period", 14),
+                                           arguments.get("volatility_window", 7))
+            symbols = arguments.get("symbols") or [arguments.get("symbol") or "BTC"]
+            return {s.upper(): history_limit(days + lookback) for s in symbols}
+    except (KeyError, TypeError, ValueError, AttributeError):
+        # 參數有誤時交給工具本身回報錯誤
+        pass
+    return {}
+
+
 def execute_tool(tool_name: str, arguments: dict) -> dict:
     """執行指定的工具"""
     tool_map = {
@@ -224,6 +419,8 @@ def execute_tool(tool_name: str, arguments: dict) -> dict:
         "get_price_history": _get_price_history,
         "get_technical_analysis": _get_technical_analysis,
         "run_backtest": _run_backtest,
+        "create_strategy": _create_strategy,
+        "analyze_backtest_robustness": _analyze_backtest_robustness,
     }
 
     if tool_name not in tool_map:
@@ -234,3 +431,38 @@ def execute_tool(tool_name: str, arguments: dict) -> dict:
         return result
     except Exception as e:
         return {"error": str(e)}
+
+
+# ===== 非同步工具執行器 =====
+
+async def _aget_current_price(symbol: str) -> dict:
+    from data.scrapers.market_data import get_market_data
+    return await get_market_data().aget_current_price(symbol)
+
+
+async def _aget_price_history(symbol: str, days: int = None, start_date: str = None, end_date: str = None) -> dict:
+    from data.scrapers.market_data import get_market_data
+    return await get_market_data().aget_price_history(symbol, days=days, start_date=start_date, end_date=end_date)
+
+
+async def aexecute_tool(tool_name: str, arguments: dict) -> dict:
+    """
+    非同步執行工具
+
+    行情查詢走非阻塞的 HTTP；技術分析、回測等 CPU 或同步 I/O 工作
+    交給事件迴圈的執行緒池，不阻塞其他請求。
+    """
+    async_map = {
+        "get_current_price": _aget_current_price,
+        "get_price_history": _aget_price_history,
+    }
+
+    if tool_name in async_map:
+        try:
+            return await async_map[tool_name](**arguments)
+        except Exception as e:
+            return {"error": str(e)}
+
+    # 複製 contextvars，讓執行緒中的工具共用本請求的數據快取
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(None, contextvars.copy_context().run, execute_tool, tool_name, arguments)
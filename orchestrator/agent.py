@@ -8,16 +8,84 @@ LLM Agent - 大腦層
 
 import sys
 import json
-import re
+import asyncio
+import contextvars
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from datetime import datetime
+from typing import Any
 import urllib.request
 import urllib.error
 
 PROJECT_ROOT = Path(__file__).parent.parent
 sys.path.insert(0, str(PROJECT_ROOT))
 
-from mcp.tools import get_available_tools, execute_tool, get_tools_for_llm
+from config import Config
+from mcp.tools import get_available_tools, execute_tool, aexecute_tool, get_tools_for_llm, history_requirements
+from backend.conversation_memory import ConversationMemory
+from backend.data_context import data_context
+from backend.models.llm_cache import get_llm_cache, prompt_key, strip_volatile
+from orchestrator.intent_router import route
+from orchestrator.templates import render_tool_results
+
+# 工具結果解讀的提示詞（模板全文也是 LLM 快取鍵的一部分）
+INTERPRETATION_TEMPLATE = """用戶問：{user_message}
+
+工具執行結果：
+{result_text}
+
+請用繁體中文自然地回答用戶的問題。如果是價格，請標明幣種和金額。如果有圖表數據，請簡要描述走勢。"""
+
+# 同一則訊息的獨立工具調用共用的執行緒池（有上限）
+_tool_executor = None
+_tool_executor_lock = threading.Lock()
+
+# 非同步路徑共用的 HTTP 連線池（於事件迴圈中建立）
+_http_session = None
+
+
+def _get_tool_executor() -> ThreadPoolExecutor:
+    global _tool_executor
+    if _tool_executor is None:
+        with _tool_executor_lock:
+            if _tool_executor is None:
+                _tool_executor = ThreadPoolExecutor(max_workers=Config.CHAT_TOOL_POOL_SIZE,
+                                                    thread_name_prefix='agent-tool')
+    return _tool_executor
+
+
+def _call_key(call: dict) -> tuple:
+    return call["tool"], json.dumps(call["arguments"], sort_keys=True, ensure_ascii=False, default=str)
+
+
+def _shared_history(calls: list) -> dict:
+    """多個工具需要同一幣種的日 K 時，回傳 {幣種: 最長根數} 以便先下載一次"""
+    needs, counts = {}, {}
+    for call in calls:
+        for symbol, limit in history_requirements(call["tool"], call["arguments"]).items():
+            needs[symbol] = max(needs.get(symbol, 0), limit)
+            counts[symbol] = counts.get(symbol, 0) + 1
+    return {symbol: limit for symbol, limit in needs.items() if counts[symbol] > 1}
+
+
+def _needs_shared(call: dict, shared: dict) -> bool:
+    return any(symbol in shared for symbol in history_requirements(call["tool"], call["arguments"]))
+
+
+def _get_http_session():
+    global _http_session
+    if _http_session is None or _http_session.closed:
+        import aiohttp
+        _http_session = aiohttp.ClientSession()
+    return _http_session
+
+
+async def close_http_session():
+    """關閉非同步路徑的 HTTP 連線池（事件迴圈結束時呼叫）"""
+    global _http_session
+    if _http_session is not None:
+        await _http_session.close()
+        _http_session = None
 
 
 class CryptoAgent:
@@ -32,12 +100,17 @@ class CryptoAgent:
         ollama_host: str = "http://localhost:11434",
         model: str = "llama3.2",
         timeout: float = 60.0,
-        api_key: str = ""
+        api_key: str = "",
+        fast_path: bool = False
     ):
         self.ollama_host = ollama_host.rstrip('/')
         self.model = model
         self.timeout = timeout
         self.api_key = api_key
+        # 結構化工具結果直接以模板回答，不等 LLM
+        self.fast_path = fast_path
+        # 本會話的對話記憶（工具結果只保留摘要）
+        self.memory = ConversationMemory()
         self.tools = get_available_tools()
 
         self.system_prompt = """你是一個加密貨幣分析助手。你可以使用以下工具來幫助用戶：
@@ -47,6 +120,8 @@ class CryptoAgent:
 2. get_price_history - 獲取歷史價格數據
 3. get_technical_analysis - 獲取技術分析指標
 4. run_backtest - 執行回測策略
+5. create_strategy - 以規則建立自訂策略（可再用 run_backtest 回測）
+6. analyze_backtest_robustness - 回測穩健性分析（報酬、夏普、回撤的信賴區間）
 
 當用戶詢問時，你需要：
 1. 理解用戶意圖
@@ -59,6 +134,15 @@ class CryptoAgent:
 - 數據要清楚標示
 - 適當加入分析解讀"""
 
+    def _headers(self) -> dict:
+        headers = {
+            'Content-Type': 'application/json',
+            'accept': 'application/json'
+        }
+        if self.api_key:
+            headers['X-API-Key'] = self.api_key
+        return headers
+
     def _call_ollama(self, messages: list, use_tools: bool = True) -> dict:
         """調用 Ollama API"""
         url = f"{self.ollama_host}/api/chat"
@@ -74,15 +158,8 @@ class CryptoAgent:
 
         data = json.dumps(payload).encode('utf-8')
 
-        headers = {
-            'Content-Type': 'application/json',
-            'accept': 'application/json'
-        }
-        if self.api_key:
-            headers['X-API-Key'] = self.api_key
-
         try:
-            req = urllib.request.Request(url, data=data, headers=headers)
+            req = urllib.request.Request(url, data=data, headers=self._headers())
             with urllib.request.urlopen(req, timeout=self.timeout) as response:
                 return json.loads(response.read().decode('utf-8'))
         except urllib.error.URLError as e:
@@ -90,169 +167,198 @@ class CryptoAgent:
         except Exception as e:
             raise RuntimeError(f"Ollama 調用失敗: {e}")
 
-    def _call_ollama_simple(self, prompt: str) -> str:
-        """簡單調用 Ollama（不使用工具）"""
-        url = f"{self.ollama_host}/api/chat"
-
-        payload = {
-            "model": self.model,
-            "messages": [{"role": "user", "content": prompt}],
-            "stream": False,
-        }
+    def _call_ollama_simple(self, prompt: str, cache_key: Any = None, history: list = None) -> str:
+        """
+        簡單調用 Ollama（不使用工具）
 
-        data = json.dumps(payload).encode('utf-8')
+        Args:
+            prompt: 提示詞
+            cache_key: 提供時以此為鍵快取回應（相同鍵在 TTL 內直接回傳快取）
+            history: 放在提示詞之前的對話記錄 (role/content)
+        """
+        llm_cache, key, cached = self._cache_lookup(cache_key)
+        if cached is not None:
+            return cached
 
-        headers = {
-            'Content-Type': 'application/json',
-            'accept': 'application/json'
-        }
-        if self.api_key:
-            headers['X-API-Key'] = self.api_key
+        url = f"{self.ollama_host}/api/chat"
+        data = json.dumps(self._simple_payload(prompt, history)).encode('utf-8')
 
         try:
-            req = urllib.request.Request(url, data=data, headers=headers)
+            req = urllib.request.Request(url, data=data, headers=self._headers())
             with urllib.request.urlopen(req, timeout=self.timeout) as response:
                 result = json.loads(response.read().decode('utf-8'))
-                return result.get("message", {}).get("content", "")
+                content = result.get("message", {}).get("content", "")
         except Exception as e:
+            # 失敗訊息不寫入快取
             return f"LLM 調用失敗: {e}"
 
-    def _parse_tool_calls(self, response: dict) -> list:
-        """解析 LLM 回應中的工具調用"""
-        message = response.get("message", {})
-        tool_calls = message.get("tool_calls", [])
-        return tool_calls
+        if llm_cache is not None and content:
+            llm_cache.put(key, content)
+        return content
 
-    def _execute_tools(self, tool_calls: list) -> list:
-        """執行工具調用"""
-        results = []
-        for call in tool_calls:
-            func = call.get("function", {})
-            tool_name = func.get("name")
-            arguments = func.get("arguments", {})
-
-            print(f"[Agent] 調用工具: {tool_name}({arguments})")
-            result = execute_tool(tool_name, arguments)
-            results.append({
-                "tool": tool_name,
-                "arguments": arguments,
-                "result": result
-            })
+    async def _acall_ollama_simple(self, prompt: str, cache_key: Any = None, history: list = None) -> str:
+        """_call_ollama_simple() 的非同步版本（等待 LLM 時不佔用執行緒）"""
+        llm_cache, key, cached = self._cache_lookup(cache_key)
+        if cached is not None:
+            return cached
 
-        return results
+        import aiohttp
+        url = f"{self.ollama_host}/api/chat"
 
-    def _parse_date(self, date_str: str) -> str:
-        """解析日期字串為 YYYY-MM-DD 格式"""
-        now = datetime.now()
-        year = now.year
+        try:
+            async with _get_http_session().post(
+                url,
+                json=self._simple_payload(prompt, history),
+                headers=self._headers(),
+                timeout=aiohttp.ClientTimeout(total=self.timeout)
+            ) as response:
+                response.raise_for_status()
+                result = await response.json(content_type=None)
+                content = result.get("message", {}).get("content", "")
+        except Exception as e:
+            return f"LLM 調用失敗: {e}"
 
-        if re.match(r'^\d{4}-\d{1,2}-\d{1,2}$', date_str):
-            parts = date_str.split('-')
-            return f"{parts[0]}-{parts[1].zfill(2)}-{parts[2].zfill(2)}"
+        if llm_cache is not None and content:
+            llm_cache.put(key, content)
+        return content
 
-        if re.match(r'^\d{1,2}/\d{1,2}$', date_str):
-            parts = date_str.split('/')
-            return f"{year}-{parts[0].zfill(2)}-{parts[1].zfill(2)}"
+    def _cache_lookup(self, cache_key: Any):
+        """回傳 (快取, 鍵, 已快取的回應)；未指定 cache_key 或快取停用時皆為 None"""
+        llm_cache = get_llm_cache() if cache_key is not None else None
+        if llm_cache is None:
+            return None, None, None
+        key = prompt_key(self.model, cache_key)
+        return llm_cache, key, llm_cache.get(key)
 
-        if re.match(r'^\d{1,2}-\d{1,2}$', date_str):
-            parts = date_str.split('-')
-            return f"{year}-{parts[0].zfill(2)}-{parts[1].zfill(2)}"
+    def _simple_payload(self, prompt: str, history: list = None) -> dict:
+        return {
+            "model": self.model,
+            "messages": (history or []) + [{"role": "user", "content": prompt}],
+            "stream": False,
+        }
 
-        cn_match = re.match(r'(\d{1,2})月(\d{1,2})日?', date_str)
-        if cn_match:
-            return f"{year}-{cn_match.group(1).zfill(2)}-{cn_match.group(2).zfill(2)}"
+    def _parse_tool_calls(self, response: dict) -> list:
+        """解析 LLM 回應中的工具調用"""
+        message = response.get("message", {})
+        tool_calls = message.get("tool_calls", [])
+        return tool_calls
 
-        return None
+    def _execute_tools(self, tool_calls: list) -> list:
+        """執行工具調用（LLM function calling 格式）"""
+        calls = [
+            {"tool": call.get("function", {}).get("name"), "arguments": call.get("function", {}).get("arguments", {})}
+            for call in tool_calls
+        ]
+        return [self._tool_result(call, result) for call, result in zip(calls, self._run_tools(calls))]
+
+    def _run_tools(self, calls: list) -> list:
+        """
+        並行執行工具調用，結果依原順序回傳
 
-    def _fallback_tool_detection(self, user_message: str) -> list:
+        相同的調用只執行一次；所有工具共用本請求的數據快取（DataContext），
+        多個工具需要同一幣種的日 K 時，先下載最長的一份，其餘直接切片。
+        每則訊息最多同時佔用 CHAT_TOOL_WORKERS 個共用執行緒，避免擠壓其他使用者。
+        """
+        unique = {}
+        for call in calls:
+            unique.setdefault(_call_key(call), call)
+
+        def run(call):
+            print(f"[Agent] 調用工具: {call['tool']}({call['arguments']})")
+            return execute_tool(call["tool"], call["arguments"])
+
+        with data_context() as ctx:
+            if len(unique) <= 1:
+                results = {key: run(call) for key, call in unique.items()}
+            else:
+                executor = _get_tool_executor()
+                slots = threading.BoundedSemaphore(max(1, Config.CHAT_TOOL_WORKERS))
+
+                def submit(fn, *args):
+                    # 超過本訊息的並行上限時，等前一個工具完成再送出
+                    slots.acquire()
+                    # 執行緒需要複製 contextvars 才看得到本請求的 DataContext
+                    future = executor.submit(contextvars.copy_context().run, fn, *args)
+                    future.add_done_callback(lambda _: slots.release())
+                    return future
+
+                shared = _shared_history(list(unique.values()))
+                waiting = {key: call for key, call in unique.items() if _needs_shared(call, shared)}
+                # 不依賴共用日 K 的工具立即開始，與預先下載同時進行
+                futures = {key: submit(run, call) for key, call in unique.items() if key not in waiting}
+                for future in [submit(ctx.ohlcv, symbol, '1d', limit) for symbol, limit in shared.items()]:
+                    future.result()
+                futures.update({key: submit(run, call) for key, call in waiting.items()})
+                results = {key: future.result() for key, future in futures.items()}
+
+        return [results[_call_key(call)] for call in calls]
+
+    async def _arun_tools(self, calls: list) -> list:
+        """_run_tools() 的非同步版本"""
+        unique = {}
+        for call in calls:
+            unique.setdefault(_call_key(call), call)
+
+        shared = _shared_history(list(unique.values())) if len(unique) > 1 else {}
+        prefetch = None
+        if shared:
+            from data.scrapers.market_data import get_market_data
+            market_data = get_market_data()
+            prefetch = asyncio.ensure_future(asyncio.gather(
+                *(market_data.aget_ohlcv(symbol, '1d', limit) for symbol, limit in shared.items())
+            ))
+
+        # 與同步路徑相同的每則訊息並行上限
+        slots = asyncio.Semaphore(max(1, Config.CHAT_TOOL_WORKERS))
+
+        async def run(call):
+            if prefetch is not None and _needs_shared(call, shared):
+                await prefetch
+            async with slots:
+                return await aexecute_tool(call["tool"], call["arguments"])
+
+        with data_context():
+            results = await asyncio.gather(*(run(call) for call in unique.values()))
+        results = dict(zip(unique, results))
+        return [results[_call_key(call)] for call in calls]
+
+    def _fallback_tool_detection(self, user_message: str, intent: dict = None) -> list:
         """備用工具檢測（當 LLM 不支援 function calling 時）"""
-        message_lower = user_message.lower()
+        intent = intent or route(user_message)
+        intents = intent["intents"]
+        symbol = intent["symbol"]
         tool_calls = []
 
-        # 支援的幣種
-        supported_symbols = ["btc", "eth", "sol", "bnb", "xrp", "ada", "dot", "doge"]
-
-        for symbol in supported_symbols:
-            if symbol in message_lower:
-                symbol_upper = symbol.upper()
-
-                # 即時價格查詢
-                if any(word in message_lower for word in ["價格", "多少錢", "現在", "即時", "price"]):
-                    tool_calls.append({
-                        "tool": "get_current_price",
-                        "arguments": {"symbol": symbol_upper}
-                    })
-
-                # 技術分析
-                if any(word in message_lower for word in ["技術", "分析", "rsi", "指標", "technical"]):
-                    tool_calls.append({
-                        "tool": "get_technical_analysis",
-                        "arguments": {"symbol": symbol_upper}
-                    })
-
-                # 歷史價格/走勢圖
-                has_date_indicator = (
-                    any(word in message_lower for word in ["歷史", "過去", "history", "走勢", "圖表", "chart", "近", "最近", "從", "到現在", "至今", "到今天"]) or
-                    re.search(r'\d{1,2}[月\/]\d{1,2}', user_message) or
-                    re.search(r'\d{4}-\d{1,2}-\d{1,2}', user_message) or
-                    re.search(r'(\d+)\s*(?:天|日|週|周|月)', message_lower)
-                )
-                if has_date_indicator:
-                    arguments = {"symbol": symbol_upper}
-                    today = datetime.now().strftime("%Y-%m-%d")
-
-                    # 匹配「從 X 到現在」
-                    to_now_match = re.search(
-                        r'(?:從)?(\d{1,2}月\d{1,2}日?|\d{1,2}[\/]\d{1,2}|\d{4}-\d{1,2}-\d{1,2})\s*(?:到|至)?\s*(?:現在|今天|今日|now|today|至今)',
-                        user_message, re.IGNORECASE
-                    )
-                    if to_now_match:
-                        start_date = self._parse_date(to_now_match.group(1))
-                        if start_date:
-                            arguments["start_date"] = start_date
-                            arguments["end_date"] = today
-
-                    # 匹配日期範圍
-                    elif not to_now_match:
-                        date_range_match = re.search(
-                            r'(\d{1,2}月\d{1,2}日?|\d{1,2}[\/]\d{1,2}|\d{4}-\d{1,2}-\d{1,2})\s*(?:到|至|~)\s*(\d{1,2}月\d{1,2}日?|\d{1,2}[\/]\d{1,2}|\d{4}-\d{1,2}-\d{1,2})',
-                            user_message
-                        )
-                        if date_range_match:
-                            start_date = self._parse_date(date_range_match.group(1))
-                            end_date = self._parse_date(date_range_match.group(2))
-                            if start_date and end_date:
-                                arguments["start_date"] = start_date
-                                arguments["end_date"] = end_date
-
-                    if "start_date" not in arguments:
-                        days = 30
-                        days_match = re.search(r'(?:近|過去|最近)\s*(\d+)\s*(?:天|日|days?)', message_lower)
-                        if days_match:
-                            days = min(int(days_match.group(1)), 365)
-                        else:
-                            simple_days_match = re.search(r'(\d+)\s*(?:天|日|days?)', message_lower)
-                            if simple_days_match:
-                                days = min(int(simple_days_match.group(1)), 365)
-                            elif "一週" in message_lower or "一周" in message_lower:
-                                days = 7
-                            elif "兩週" in message_lower or "两周" in message_lower:
-                                days = 14
-                            elif "一個月" in message_lower or "一个月" in message_lower:
-                                days = 30
-                            elif "三個月" in message_lower or "三个月" in message_lower:
-                                days = 90
-                        arguments["days"] = days
-
-                    tool_calls.append({
-                        "tool": "get_price_history",
-                        "arguments": arguments
-                    })
-
-                break
+        if symbol:
+            # 即時價格查詢
+            if "price" in intents:
+                tool_calls.append({
+                    "tool": "get_current_price",
+                    "arguments": {"symbol": symbol}
+                })
+
+            # 技術分析
+            if "technical" in intents:
+                tool_calls.append({
+                    "tool": "get_technical_analysis",
+                    "arguments": {"symbol": symbol}
+                })
+
+            # 歷史價格/走勢圖
+            if "history" in intents:
+                arguments = {"symbol": symbol}
+                if intent["start_date"]:
+                    arguments["start_date"] = intent["start_date"]
+                    arguments["end_date"] = intent["end_date"]
+                else:
+                    arguments["days"] = intent["days"]
+                tool_calls.append({
+                    "tool": "get_price_history",
+                    "arguments": arguments
+                })
 
         # 回測
-        if any(word in message_lower for word in ["回測", "backtest", "策略測試"]):
+        if "backtest" in intents:
             tool_calls.append({
                 "tool": "run_backtest",
                 "arguments": {}
@@ -260,60 +366,124 @@ class CryptoAgent:
 
         return tool_calls
 
-    def chat(self, user_message: str) -> dict:
+    def chat(self, user_message: str, fast_path: bool = None, intent: dict = None) -> dict:
         """
         處理用戶訊息
 
+        Args:
+            user_message: 用戶訊息
+            fast_path: 是否以模板直接回答結構化結果（預設依 self.fast_path）
+            intent: 已由 intent_router.route() 解析的意圖（省略則自行解析）
+
         Returns:
-            包含 response, chart_data (可選), tool_result (可選) 的字典
+            包含 response, chart_data (可選), tool_result (可選) 的字典；
+            走快速路徑時 fast_path 為 True，可再呼叫 interpret() 取得 LLM 解讀
         """
+        history, calls = self._prepare(user_message, intent)
+        tool_results = [self._tool_result(call, result) for call, result in zip(calls, self._run_tools(calls))]
+
+        if not tool_results:
+            return self._reply(self._call_ollama_simple(self._general_prompt(user_message), history=history), tool_results)
+        return (self._fast_reply(tool_results, fast_path)
+                or self._reply(self.interpret(user_message, tool_results), tool_results))
+
+    async def achat(self, user_message: str, fast_path: bool = None, intent: dict = None) -> dict:
+        """chat() 的非同步版本：多個工具並行執行，等待行情與 LLM 時不佔用執行緒"""
+        history, calls = self._prepare(user_message, intent)
+        tool_results = [self._tool_result(call, result) for call, result in zip(calls, await self._arun_tools(calls))]
+
+        if not tool_results:
+            return self._reply(await self._acall_ollama_simple(self._general_prompt(user_message), history=history),
+                               tool_results)
+        return (self._fast_reply(tool_results, fast_path)
+                or self._reply(await self.ainterpret(user_message, tool_results), tool_results))
+
+    def _prepare(self, user_message: str, intent: dict = None):
+        """記錄用戶訊息並檢測工具，回傳 (先前的對話記錄, 工具調用)"""
         print(f"[Agent] 收到訊息: {user_message}")
+        history = self.memory.messages()
+        self.memory.add_user(user_message)
 
         # 備用方案：手動檢測工具
         print("[Agent] 使用備用工具檢測")
-        fallback_calls = self._fallback_tool_detection(user_message)
+        return history, self._fallback_tool_detection(user_message, intent)
 
-        tool_results = []
+    @staticmethod
+    def _tool_result(call: dict, result: dict) -> dict:
+        return {
+            "tool": call["tool"],
+            "arguments": call["arguments"],
+            "result": result
+        }
+
+    @staticmethod
+    def _chart_data(tool_results: list):
+        """如果有歷史價格，準備圖表數據"""
         chart_data = None
+        for item in tool_results:
+            result = item["result"]
+            if item["tool"] == "get_price_history" and "data" in result:
+                chart_data = {
+                    "symbol": result.get("symbol", ""),
+                    "timestamps": [p["timestamp"] for p in result["data"]],
+                    "prices": [p["price_usd"] for p in result["data"]],
+                    "period": f"{result.get('start_date', '')} ~ {result.get('end_date', '')}",
+                    "source": result.get("source", "")
+                }
+        return chart_data
+
+    def _general_prompt(self, user_message: str) -> str:
+        return f"{self.system_prompt}\n\n用戶：{user_message}\n\n請用繁體中文回答："
+
+    def _fast_reply(self, tool_results: list, fast_path: bool = None):
+        """結構化結果以模板回答；無法套用時回傳 None"""
+        if not (self.fast_path if fast_path is None else fast_path):
+            return None
+        templated = render_tool_results(tool_results)
+        if templated is None:
+            return None
+        reply = self._reply(templated, tool_results)
+        reply["fast_path"] = True
+        return reply
+
+    def _reply(self, response_text: str, tool_results: list) -> dict:
+        self._remember_reply(response_text, tool_results)
+        return {
+            "response": response_text,
+            "chart_data": self._chart_data(tool_results),
+            "tool_results": tool_results
+        }
 
-        if fallback_calls:
-            for call in fallback_calls:
-                result = execute_tool(call["tool"], call["arguments"])
-                tool_results.append({
-                    "tool": call["tool"],
-                    "arguments": call["arguments"],
-                    "result": result
-                })
+    def _remember_reply(self, response_text: str, tool_results: list):
+        """記錄助手回覆（工具結果以摘要保存）"""
+        if len(tool_results) == 1:
+            self.memory.add_assistant(response_text, tool_results[0]["tool"], tool_results[0]["result"])
+        elif tool_results:
+            self.memory.add_assistant(response_text, "+".join(r["tool"] for r in tool_results),
+                                      {r["tool"]: r["result"] for r in tool_results})
+        else:
+            self.memory.add_assistant(response_text)
 
-                # 如果是歷史價格，準備圖表數據
-                if call["tool"] == "get_price_history" and "data" in result:
-                    chart_data = {
-                        "symbol": result.get("symbol", ""),
-                        "timestamps": [p["timestamp"] for p in result["data"]],
-                        "prices": [p["price_usd"] for p in result["data"]],
-                        "period": f"{result.get('start_date', '')} ~ {result.get('end_date', '')}",
-                        "source": result.get("source", "")
-                    }
-
-        # 讓 LLM 解讀結果
-        if tool_results:
-            result_text = json.dumps(tool_results, ensure_ascii=False, indent=2)
-            interpretation_prompt = f"""用戶問：{user_message}
+    def reset(self):
+        """清除本會話的對話記憶"""
+        self.memory.clear()
 
-工具執行結果：
-{result_text}
+    def interpret(self, user_message: str, tool_results: list) -> str:
+        """讓 LLM 以自然語言解讀工具結果"""
+        return self._call_ollama_simple(*self._interpretation_prompt(user_message, tool_results))
 
-請用繁體中文自然地回答用戶的問題。如果是價格，請標明幣種和金額。如果有圖表數據，請簡要描述走勢。"""
+    async def ainterpret(self, user_message: str, tool_results: list) -> str:
+        """interpret() 的非同步版本"""
+        return await self._acall_ollama_simple(*self._interpretation_prompt(user_message, tool_results))
 
-            response_text = self._call_ollama_simple(interpretation_prompt)
-        else:
-            response_text = self._call_ollama_simple(f"{self.system_prompt}\n\n用戶：{user_message}\n\n請用繁體中文回答：")
+    def _interpretation_prompt(self, user_message: str, tool_results: list):
+        """回傳 (解讀提示詞, 快取鍵)"""
+        result_text = json.dumps(tool_results, ensure_ascii=False, indent=2)
+        interpretation_prompt = INTERPRETATION_TEMPLATE.format(user_message=user_message, result_text=result_text)
 
-        return {
-            "response": response_text,
-            "chart_data": chart_data,
-            "tool_results": tool_results
-        }
+        # 工具結果中的時間戳每次都不同，快取鍵忽略它們；
+        # 模板本身也在鍵中，修改提示詞後不會回傳舊模板的快取回應
+        return interpretation_prompt, [INTERPRETATION_TEMPLATE, user_message, strip_volatile(tool_results)]
 
     def check_connection(self) -> dict:
         """檢查 Ollama 連接狀態"""
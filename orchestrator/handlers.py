@@ -0,0 +1,198 @@
+"""
+API 處理邏輯 - app.py（Flask）與 async_app.py（aiohttp）共用
+
+這裡只放與框架無關的部分：解析請求參數、組出回應內容與狀態碼。
+兩個伺服器各自負責讀取請求、呼叫同步或非同步的數據與 Agent、寫出回應。
+"""
+
+import traceback
+from typing import Any, Dict, Mapping, Optional, Tuple
+
+from config import Config
+
+SESSION_COOKIE = 'chat_session'
+
+NO_MESSAGE = {'success': False, 'error': 'No message provided'}
+
+
+def create_agent():
+    """Create a CryptoAgent (tools, models and caches are shared singletons)"""
+    from orchestrator.agent import CryptoAgent
+    return CryptoAgent(
+        ollama_host=Config.OLLAMA_URI.rstrip('/'),
+        model=Config.OLLAMA_MODEL,
+        timeout=60.0,
+        api_key=Config.OLLAMA_API_KEY,
+        fast_path=Config.CHAT_FAST_PATH
+    )
+
+
+# ============================================================
+# 聊天
+# ============================================================
+
+def chat_message(data: Optional[dict]) -> str:
+    """請求中的訊息（去除空白；沒有則為空字串）"""
+    return ((data or {}).get('message') or '').strip()
+
+
+def chart_request(intent: dict) -> Optional[Dict[str, Any]]:
+    """
+    明確的圖表請求直接取數據，不經過 Agent
+
+    Returns:
+        {"symbol", "period", "history_args"}；不是圖表請求時為 None
+    """
+    symbol = intent["symbol"]
+    if not (symbol and "chart" in intent["intents"]):
+        return None
+    start_date, end_date = intent["start_date"], intent["end_date"]
+    if start_date and end_date:
+        return {"symbol": symbol, "period": f"{start_date} ~ {end_date}",
+                "history_args": {"start_date": start_date, "end_date": end_date}}
+    return {"symbol": symbol, "period": f"近 {intent['days']} 天",
+            "history_args": {"days": intent["days"]}}
+
+
+def chart_reply(chart: Dict[str, Any], history: dict) -> dict:
+    """圖表請求的聊天回應"""
+    return {
+        "success": True,
+        "response": f"以下是 {chart['symbol']} {chart['period']} 的價格走勢圖：",
+        "chart_data": {
+            "symbol": chart["symbol"],
+            "timestamps": [p["timestamp"] for p in history["data"]],
+            "prices": [p["price_usd"] for p in history["data"]],
+            "period": chart["period"],
+            "source": history["source"]
+        }
+    }
+
+
+def chat_reply(result: dict, enriching: bool) -> dict:
+    """Agent 結果的 HTTP 回應"""
+    return {
+        "success": True,
+        "response": result.get("response", ""),
+        "chart_data": result.get("chart_data"),
+        "tool_results": result.get("tool_results", []),
+        "fast_path": result.get("fast_path", False),
+        "enriching": enriching
+    }
+
+
+def socket_reply(request_id, result: dict, enriching: bool) -> dict:
+    """Agent 結果的 Socket.IO 'response' 事件"""
+    return {
+        'success': True,
+        'request_id': request_id,
+        'response': result.get('response', ''),
+        'chart_data': result.get('chart_data'),
+        'fast_path': result.get('fast_path', False),
+        'enriching': enriching
+    }
+
+
+def agent_error(e: Exception) -> Tuple[dict, int]:
+    print(f"[API] Agent error: {e}")
+    traceback.print_exc()
+    return {'success': False, 'response': f'處理請求時發生錯誤: {e}'}, 500
+
+
+def request_error(e: Exception) -> Tuple[dict, int]:
+    print(f"[API] Request error: {e}")
+    return {'success': False, 'error': str(e), 'traceback': traceback.format_exc()}, 500
+
+
+# ============================================================
+# 快速路徑的 LLM 補充解讀
+# ============================================================
+
+def should_enrich(sid: Optional[str], result: dict) -> bool:
+    """快速路徑回應後，是否排程 LLM 補充解讀（需要 Socket.IO 連線）"""
+    return bool(sid and result.get('fast_path') and Config.CHAT_FAST_PATH_ENRICH)
+
+
+def enrichment_event(request_id, response: Optional[str]) -> Optional[dict]:
+    """LLM 解讀的 'response_enriched' 事件；LLM 失敗時為 None（不覆蓋已送出的模板回應）"""
+    if not response or response.startswith("LLM 調用失敗"):
+        print(f"[API] Enrichment skipped: {response}")
+        return None
+    return {'request_id': request_id, 'response': response}
+
+
+# ============================================================
+# 價格 / 圖表 / 回測參數
+# ============================================================
+
+def history_query(data: Optional[dict]) -> Tuple[str, dict]:
+    """/api/chart-data 的幣種與 get_price_history 參數"""
+    data = data or {}
+    symbol = data.get('symbol', 'BTC').upper()
+    start_date, end_date = data.get('start_date'), data.get('end_date')
+    if start_date and end_date:
+        return symbol, {"start_date": start_date, "end_date": end_date}
+    return symbol, {"days": data.get('days', 30)}
+
+
+def chart_data_reply(symbol: str, history: dict) -> dict:
+    return {
+        "success": True,
+        "symbol": symbol,
+        "timestamps": [p["timestamp"] for p in history["data"]],
+        "prices": [p["price_usd"] for p in history["data"]],
+        "source": history["source"]
+    }
+
+
+def _int_arg(args: Mapping[str, str], name: str, default: Optional[int]) -> Optional[int]:
+    try:
+        return int(args[name]) if name in args else default
+    except (TypeError, ValueError):
+        return default
+
+
+def _flag_arg(args: Mapping[str, str], name: str) -> bool:
+    return str(args.get(name, 'false')).lower() == 'true'
+
+
+def backtest_results_args(args: Mapping[str, str]) -> tuple:
+    """/api/backtest/results 查詢參數 -> BacktestTool.get_results 的位置參數"""
+    return (
+        _int_arg(args, 'limit', 10),
+        _int_arg(args, 'page', 1),
+        _int_arg(args, 'offset', None),
+        args.get('symbol'),
+        args.get('strategy'),
+        _flag_arg(args, 'include_equity'),
+        _flag_arg(args, 'full_resolution'),
+    )
+
+
+# ============================================================
+# 狀態
+# ============================================================
+
+def upstreams_reply() -> dict:
+    """上游 API 斷路器與限流狀態"""
+    from data.scrapers.market_data import get_market_data
+    from data.scrapers.upstream import upstream_status
+    return {
+        "success": True,
+        "upstreams": upstream_status(),
+        "cache": get_market_data().stats()
+    }
+
+
+def health_reply() -> dict:
+    """存活檢查（含各元件載入狀態）"""
+    from backend.warmup import get_warmup
+    return {"status": "ok", **get_warmup().status()}
+
+
+def readiness_reply() -> Tuple[dict, int]:
+    """就緒檢查：所有預熱元件載入完成才回傳 200"""
+    from backend.warmup import get_warmup
+    status = get_warmup().status()
+    return {"status": "ready" if status["ready"] else "warming_up", **status}, \
+        200 if status["ready"] else 503
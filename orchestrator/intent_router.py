@@ -0,0 +1,173 @@
+"""
+意圖路由器 - 預編譯的關鍵字與日期規則
+
+一次掃描訊息即取得幣種、意圖、日期範圍與天數，
+取代 app.py 與 CryptoAgent 各自重複的關鍵字迴圈與即時編譯的正規表達式。
+"""
+
+import re
+from datetime import datetime
+from typing import Any, Dict, Optional, Tuple
+
+# 支援的幣種（順序即優先順序：訊息同時提到多個時取最前者）
+SUPPORTED_SYMBOLS = ["btc", "eth", "sol", "bnb", "xrp", "ada", "dot", "doge"]
+
+# 意圖 -> 觸發關鍵字（子字串比對）
+INTENT_KEYWORDS = {
+    "price": ["價格", "多少錢", "現在", "即時", "price"],
+    "technical": ["技術", "分析", "rsi", "指標", "technical"],
+    "history": ["歷史", "過去", "history", "走勢", "圖表", "chart", "近", "最近", "從", "到現在", "至今", "到今天"],
+    "chart": ["走勢", "圖表", "chart", "歷史", "價格圖", "趨勢圖", "近", "過去", "最近"],
+    "backtest": ["回測", "backtest", "策略測試"],
+}
+
+# 口語期間 -> 天數（依序比對，先符合者優先）
+PERIOD_DAYS = [
+    (("一週", "一周"), 7),
+    (("兩週", "两周"), 14),
+    (("一個月", "一个月"), 30),
+    (("三個月", "三个月"), 90),
+]
+
+DEFAULT_DAYS = 30
+MAX_DAYS = 365
+_INTENT_NAMES = frozenset(INTENT_KEYWORDS)
+_SYMBOL_RANK = {symbol: rank for rank, symbol in enumerate(SUPPORTED_SYMBOLS)}
+_DATED_INTENTS = frozenset({"history", "chart"})
+
+_DATE = r'\d{1,2}月\d{1,2}日?|\d{1,2}[\/]\d{1,2}|\d{4}-\d{1,2}-\d{1,2}'
+
+# 「從 X 到現在」
+_TO_NOW_RE = re.compile(rf'(?:從)?({_DATE})\s*(?:到|至)?\s*(?:現在|今天|今日|now|today|至今)')
+# 「X 到 Y」
+_DATE_RANGE_RE = re.compile(rf'({_DATE})\s*(?:到|至|~)\s*({_DATE})')
+# 日期與天數規則都需要數字；沒有數字的訊息直接略過
+_DIGIT_RE = re.compile(r'\d')
+# 訊息中出現日期或「N 天/週/月」即視為指定了時間範圍
+_TIME_RANGE_RE = re.compile(r'\d{1,2}[月\/]\d{1,2}|\d{4}-\d{1,2}-\d{1,2}|\d+\s*(?:天|日|週|周|月)')
+_RECENT_DAYS_RE = re.compile(r'(?:近|過去|最近)\s*(\d+)\s*(?:天|日|days?)')
+_DAYS_RE = re.compile(r'(\d+)\s*(?:天|日|days?)')
+
+_ISO_DATE_RE = re.compile(r'^(\d{4})-(\d{1,2})-(\d{1,2})$')
+_SHORT_DATE_RE = re.compile(r'^(\d{1,2})[\/-](\d{1,2})$')
+_CN_DATE_RE = re.compile(r'(\d{1,2})月(\d{1,2})日?')
+
+
+def _build_keyword_table():
+    """
+    關鍵字 -> 標籤集合（意圖名稱、幣種、("days", N) 期間）
+
+    掃描時每個位置只取最長的關鍵字，因此每個關鍵字也帶上
+    它所包含的較短關鍵字的標籤（如「價格圖」也屬於「價格」），
+    結果與逐一做子字串比對相同。
+    """
+    labels = {}
+    for intent, words in INTENT_KEYWORDS.items():
+        for word in words:
+            labels.setdefault(word, set()).add(intent)
+    for symbol in SUPPORTED_SYMBOLS:
+        labels.setdefault(symbol, set()).add(symbol)
+    for words, days in PERIOD_DAYS:
+        for word in words:
+            labels.setdefault(word, set()).add(("days", days))
+
+    table = {
+        word: frozenset().union(*(other_labels for other, other_labels in labels.items() if other in word))
+        for word in labels
+    }
+
+    # 零寬度前瞻：每個位置都嘗試比對（允許重疊），長的關鍵字優先；
+    # 開頭的字元集合讓不可能是關鍵字開頭的位置快速跳過
+    words = sorted(table, key=len, reverse=True)
+    first_chars = re.escape(''.join(sorted({w[0] for w in words})))
+    alternation = '|'.join(re.escape(w) for w in words)
+    return table, re.compile(f'(?=[{first_chars}])(?=({alternation}))')
+
+
+_KEYWORD_TABLE, _KEYWORD_RE = _build_keyword_table()
+
+
+def parse_date(date_str: str, year: int = None) -> Optional[str]:
+    """解析日期字串為 YYYY-MM-DD 格式（YYYY-MM-DD、MM/DD、MM-DD、X月X日）"""
+    year = year or datetime.now().year
+
+    match = _ISO_DATE_RE.match(date_str)
+    if match:
+        return f"{match.group(1)}-{match.group(2).zfill(2)}-{match.group(3).zfill(2)}"
+
+    match = _SHORT_DATE_RE.match(date_str) or _CN_DATE_RE.match(date_str)
+    if match:
+        return f"{year}-{match.group(1).zfill(2)}-{match.group(2).zfill(2)}"
+
+    return None
+
+
+def _extract_date_range(message: str) -> Tuple[Optional[str], Optional[str]]:
+    """「從 X 到現在」優先，其次「X 到 Y」；無法解析時回傳 (None, None)"""
+    to_now = _TO_NOW_RE.search(message)
+    if to_now:
+        start_date = parse_date(to_now.group(1))
+        if start_date:
+            return start_date, datetime.now().strftime("%Y-%m-%d")
+        return None, None
+
+    date_range = _DATE_RANGE_RE.search(message)
+    if date_range:
+        start_date = parse_date(date_range.group(1))
+        end_date = parse_date(date_range.group(2))
+        if start_date and end_date:
+            return start_date, end_date
+    return None, None
+
+
+def _extract_days(message: str, labels, has_digits: bool = True) -> int:
+    match = has_digits and (_RECENT_DAYS_RE.search(message) or _DAYS_RE.search(message))
+    if match:
+        return min(int(match.group(1)), MAX_DAYS)
+    for _, days in PERIOD_DAYS:
+        if ("days", days) in labels:
+            return days
+    return DEFAULT_DAYS
+
+
+def route(message: str) -> Dict[str, Any]:
+    """
+    解析訊息意圖
+
+    Returns:
+        {"symbol": "BTC" 或 None,
+         "intents": 觸發的意圖集合 (price/technical/history/chart/backtest),
+         "has_time_range": 是否出現日期或「N 天」,
+         "start_date"/"end_date": 指定的日期範圍 (YYYY-MM-DD) 或 None,
+         "days": 未指定日期範圍時的天數}
+    """
+    text = message.lower()
+
+    labels = set()
+    for word in _KEYWORD_RE.findall(text):
+        labels |= _KEYWORD_TABLE[word]
+    intents = labels & _INTENT_NAMES
+    symbols = labels & _SYMBOL_RANK.keys()
+    symbol = min(symbols, key=_SYMBOL_RANK.__getitem__).upper() if symbols else None
+
+    has_digits = _DIGIT_RE.search(text) is not None
+    has_time_range = has_digits and _TIME_RANGE_RE.search(text) is not None
+    if has_time_range:
+        intents |= _DATED_INTENTS
+
+    # 日期範圍與天數只對歷史/走勢查詢有意義
+    start_date = end_date = days = None
+    if intents & _DATED_INTENTS:
+        if has_digits:
+            start_date, end_date = _extract_date_range(text)
+        if start_date is None:
+            days = _extract_days(text, labels, has_digits)
+
+    return {
+        "symbol": symbol,
+        "intents": intents,
+        "has_time_range": has_time_range,
+        "start_date": start_date,
+        "end_date": end_date,
+        "days": days,
+    }
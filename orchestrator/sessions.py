@@ -0,0 +1,81 @@
+"""
+會話管理 - 每個使用者一個 Agent
+
+以 LRU 保存各會話的 Agent（各自的對話記憶），超過上限或閒置過久即淘汰。
+工具、模型與市場數據快取都是模組層級的單例，所有會話共用。
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict
+
+from config import Config
+
+
+class SessionStore:
+    """有上限、閒置淘汰的會話 -> Agent 對照表"""
+
+    def __init__(self, factory: Callable[[], Any], max_sessions: int = None,
+                 idle_timeout: float = None, clock: Callable[[], float] = time.monotonic):
+        self.factory = factory
+        self.max_sessions = max_sessions or Config.MAX_SESSIONS
+        self.idle_timeout = Config.SESSION_IDLE_TIMEOUT if idle_timeout is None else idle_timeout
+        self._clock = clock
+        self._sessions: 'OrderedDict[str, list]' = OrderedDict()  # session_id -> [agent, last_seen]
+        self._lock = threading.Lock()
+        self.created = 0
+        self.evicted = 0
+
+    def get(self, session_id: str) -> Any:
+        """取得（或建立）會話的 Agent"""
+        now = self._clock()
+        with self._lock:
+            entry = self._sessions.get(session_id)
+            if entry is None:
+                entry = [self.factory(), now]
+                self._sessions[session_id] = entry
+                self.created += 1
+            entry[1] = now
+            self._sessions.move_to_end(session_id)
+            self._evict(now)
+            return entry[0]
+
+    def reset(self, session_id: str) -> bool:
+        """移除單一會話（下次使用時重新建立）"""
+        with self._lock:
+            return self._sessions.pop(session_id, None) is not None
+
+    def sweep(self) -> int:
+        """淘汰閒置會話，回傳淘汰數量"""
+        with self._lock:
+            return self._evict(self._clock())
+
+    def _evict(self, now: float) -> int:
+        evicted = 0
+        # 最舊的在前面：遇到未閒置的即可停止
+        while self._sessions:
+            session_id, (_, last_seen) = next(iter(self._sessions.items()))
+            if len(self._sessions) <= self.max_sessions and now - last_seen <= self.idle_timeout:
+                break
+            del self._sessions[session_id]
+            evicted += 1
+        self.evicted += evicted
+        return evicted
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "active": len(self._sessions),
+                "max_sessions": self.max_sessions,
+                "idle_timeout": self.idle_timeout,
+                "created": self.created,
+                "evicted": self.evicted
+            }
+
+    def __contains__(self, session_id: str) -> bool:
+        with self._lock:
+            return session_id in self._sessions
+
+    def __len__(self) -> int:
+        return len(self._sessions)
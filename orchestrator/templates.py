@@ -0,0 +1,90 @@
+"""
+回應模板 - 快速路徑
+
+結構化的工具結果（價格、歷史走勢、技術指標）直接以模板回答，
+不需等待 LLM 措辭；LLM 的解讀可稍後再補上。
+"""
+
+from typing import Callable, Dict, List, Optional
+
+
+def _price(result: dict) -> str:
+    change = result.get("change_24h_percent", 0) or 0
+    change_emoji = "📈" if change > 0 else "📉" if change < 0 else "➡️"
+    lines = [
+        f"💰 **{result.get('symbol', '')}** 當前價格：**${result.get('price_usd', 0):,.2f}**",
+        f"- 24小時變化：{change_emoji} {change:+.2f}%",
+        f"- 24小時交易量：${result.get('volume_24h_usd', 0):,.0f}",
+    ]
+    if result.get("market_cap_usd"):
+        lines.append(f"- 市值：${result['market_cap_usd']:,.0f}")
+    return "\n".join(lines)
+
+
+def _history(result: dict) -> Optional[str]:
+    data = result.get("data") or []
+    if not data:
+        return None
+    prices = [p["price_usd"] for p in data]
+    first, last = prices[0], prices[-1]
+    change = (last - first) / first * 100 if first else 0.0
+    direction = "上漲" if change > 0 else "下跌" if change < 0 else "持平"
+    return "\n".join([
+        f"📈 **{result.get('symbol', '')}** {result.get('start_date', '')} ~ {result.get('end_date', '')} 價格走勢：",
+        f"- 期間{direction} {change:+.2f}%（${first:,.2f} → ${last:,.2f}）",
+        f"- 最高 ${max(prices):,.2f}，最低 ${min(prices):,.2f}",
+    ])
+
+
+def _technical_one(result: dict) -> str:
+    indicators = result.get("indicators", {})
+    lines = [f"📊 **{result.get('symbol', '')}** 技術指標（趨勢：{result.get('trend', '-')}）"]
+    for name, value in indicators.items():
+        if name in ("rsi_signal", "current_price"):
+            continue
+        if isinstance(value, (int, float)):
+            lines.append(f"- {name.upper()}：{value:,.2f}")
+    if "rsi_signal" in indicators:
+        lines.append(f"- RSI 解讀：{indicators['rsi_signal']}")
+    return "\n".join(lines)
+
+
+def _technical(result: dict) -> Optional[str]:
+    if "results" in result:
+        parts = [_technical_one(r) for r in result["results"].values()]
+        if result.get("missing"):
+            parts.append(f"⚠️ 無法取得：{', '.join(result['missing'])}")
+        return "\n\n".join(parts) or None
+    if "indicators" not in result:
+        return None
+    return _technical_one(result)
+
+
+# 工具名稱 -> 模板（回傳 None 表示無法套用模板）
+TEMPLATES: Dict[str, Callable[[dict], Optional[str]]] = {
+    "get_current_price": _price,
+    "get_price_history": _history,
+    "get_technical_analysis": _technical,
+}
+
+
+def render_tool_results(tool_results: List[dict]) -> Optional[str]:
+    """
+    以模板回答工具結果
+
+    Returns:
+        所有結果都成功且皆有模板時回傳文字，否則 None（改由 LLM 解讀）
+    """
+    if not tool_results:
+        return None
+    parts = []
+    for item in tool_results:
+        template = TEMPLATES.get(item["tool"])
+        result = item.get("result") or {}
+        if template is None or "error" in result:
+            return None
+        text = template(result)
+        if text is None:
+            return None
+        parts.append(text)
+    return "\n\n".join(parts)
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+啟動時間基準測試：在全新的子進程中計時各模組的匯入，
+並列出匯入時被一併載入的重量級套件
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# 預設測量的進入點（Web 進程啟動路徑在前）
+DEFAULT_TARGETS = [
+    'app',
+    'orchestrator.agent',
+    'mcp.tools',
+    'backend.mcp_orchestrator',
+    'backend.mcp_tools.crypto_tools',
+    'backend.models.backtest_engine',
+    'backend.models.technical_analysis',
+    'backend.models.sentiment_analyzer',
+]
+
+HEAVY_MODULES = ['torch', 'transformers', 'backtrader', 'ccxt', 'plotly', 'sklearn', 'ta']
+
+# 在子進程中執行：匯入目標並回報耗時與已載入的重量級套件
+PROBE = """
+import json, sys, time
+sys.path.insert(0, {root!r})
+start = time.perf_counter()
+import importlib
+importlib.import_module({target!r})
+elapsed = time.perf_counter() - start
+print(json.dumps({{"seconds": elapsed, "heavy": [m for m in {heavy!r} if m in sys.modules]}}))
+"""
+
+ORCHESTRATOR_PROBE = """
+import json, sys, time
+sys.path.insert(0, {root!r})
+start = time.perf_counter()
+from backend.mcp_orchestrator import MCPOrchestrator
+MCPOrchestrator()
+elapsed = time.perf_counter() - start
+print(json.dumps({{"seconds": elapsed, "heavy": [m for m in {heavy!r} if m in sys.modules]}}))
+"""
+
+
+def measure(code: str) -> dict:
+    """Run a probe in a fresh interpreter and parse its JSON result"""
+    proc = subprocess.run([sys.executable, '-c', code], cwd=PROJECT_ROOT,
+                          capture_output=True, text=True)
+    lines = [line for line in proc.stdout.splitlines() if line.startswith('{')]
+    if proc.returncode != 0 or not lines:
+        return {"error": (proc.stderr.strip().splitlines() or ['unknown error'])[-1]}
+    return json.loads(lines[-1])
+
+
+def best_of(code: str, repeat: int) -> dict:
+    """Fastest of several cold runs (filters out disk cache noise)"""
+    runs = [measure(code) for _ in range(repeat)]
+    ok = [r for r in runs if 'error' not in r]
+    return min(ok, key=lambda r: r['seconds']) if ok else runs[0]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark cold import time of the web process modules')
+    parser.add_argument('targets', nargs='*', default=DEFAULT_TARGETS, help='要測量的模組')
+    parser.add_argument('--repeat', type=int, default=3, help='每個模組的冷啟動次數 (取最快)')
+    parser.add_argument('--json', action='store_true', help='以 JSON 輸出')
+    args = parser.parse_args()
+
+    results = {}
+    for target in args.targets:
+        results[target] = best_of(PROBE.format(root=PROJECT_ROOT, target=target, heavy=HEAVY_MODULES),
+                                  args.repeat)
+    results['MCPOrchestrator()'] = best_of(
+        ORCHESTRATOR_PROBE.format(root=PROJECT_ROOT, heavy=HEAVY_MODULES), args.repeat)
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    print("=" * 72)
+    print(f"{'模組':<40}{'秒':>8}  重量級套件")
+    print("=" * 72)
+    for target, result in results.items():
+        if 'error' in result:
+            print(f"{target:<40}{'失敗':>8}  {result['error']}")
+        else:
+            print(f"{target:<40}{result['seconds']:>8.3f}  {', '.join(result['heavy']) or '-'}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,222 @@
+#!/usr/bin/env python3
+"""
+意圖路由基準測試：比較預編譯的 intent_router.route() 與
+舊版逐一掃描關鍵字、每則訊息即時編譯正規表達式的做法，並檢查兩者結果一致
+"""
+import argparse
+import json
+import os
+import re
+import sys
+import timeit
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from orchestrator.agent import CryptoAgent
+from orchestrator.intent_router import route
+
+SAMPLE_MESSAGES = [
+    "BTC 現在價格多少？",
+    "ETH 的 RSI 指標如何",
+    "給我 SOL 近 7 天的走勢圖",
+    "doge 從 3/1 到現在的價格",
+    "BNB 1月5日到2月10日的歷史價格",
+    "XRP 過去 90 天 chart",
+    "ada 最近一週走勢",
+    "幫我跑一個回測",
+    "dot technical analysis please",
+    "你好，今天市場怎麼樣？",
+    "比特幣和以太幣哪個比較值得投資？請詳細說明你的理由與風險",
+]
+
+
+def _legacy_parse_date(date_str):
+    year = datetime.now().year
+    if re.match(r'^\d{4}-\d{1,2}-\d{1,2}$', date_str):
+        parts = date_str.split('-')
+        return f"{parts[0]}-{parts[1].zfill(2)}-{parts[2].zfill(2)}"
+    if re.match(r'^\d{1,2}/\d{1,2}$', date_str):
+        parts = date_str.split('/')
+        return f"{year}-{parts[0].zfill(2)}-{parts[1].zfill(2)}"
+    if re.match(r'^\d{1,2}-\d{1,2}$', date_str):
+        parts = date_str.split('-')
+        return f"{year}-{parts[0].zfill(2)}-{parts[1].zfill(2)}"
+    cn_match = re.match(r'(\d{1,2})月(\d{1,2})日?', date_str)
+    if cn_match:
+        return f"{year}-{cn_match.group(1).zfill(2)}-{cn_match.group(2).zfill(2)}"
+    return None
+
+
+def legacy_chart_request(message):
+    """舊版 app.py::chat 的幣種/圖表/天數/日期範圍檢測"""
+    symbol = None
+    message_lower = message.lower()
+    for s in ['btc', 'eth', 'sol', 'bnb', 'xrp', 'ada', 'dot', 'doge']:
+        if s in message_lower:
+            symbol = s.upper()
+            break
+    chart_keywords = ["走勢", "圖表", "chart", "歷史", "價格圖", "趨勢圖", "近", "過去", "最近"]
+    is_chart_request = any(kw in message_lower for kw in chart_keywords)
+    has_time_range = bool(
+        re.search(r'\d{1,2}[月\/]\d{1,2}', message) or
+        re.search(r'\d{4}-\d{1,2}-\d{1,2}', message) or
+        re.search(r'(\d+)\s*(?:天|日|週|周|月)', message_lower)
+    )
+    if not (symbol and (is_chart_request or has_time_range)):
+        return None
+    days = 30
+    days_match = re.search(r'(\d+)\s*(?:天|日)', message_lower)
+    if days_match:
+        days = min(int(days_match.group(1)), 365)
+    elif "一週" in message_lower or "一周" in message_lower:
+        days = 7
+    elif "兩週" in message_lower:
+        days = 14
+    elif "一個月" in message_lower:
+        days = 30
+    elif "三個月" in message_lower:
+        days = 90
+    start_date = end_date = None
+    date_range_match = re.search(
+        r'(\d{1,2}[\/月]\d{1,2}日?|\d{4}-\d{1,2}-\d{1,2})\s*(?:到|至|~)\s*(\d{1,2}[\/月]\d{1,2}日?|\d{4}-\d{1,2}-\d{1,2}|現在|今天)',
+        message
+    )
+    if date_range_match:
+        start_date = _legacy_parse_date(date_range_match.group(1))
+        end_str = date_range_match.group(2)
+        end_date = datetime.now().strftime("%Y-%m-%d") if end_str in ['現在', '今天'] else _legacy_parse_date(end_str)
+    return symbol, days, start_date, end_date
+
+
+def legacy_tool_calls(user_message):
+    """舊版 CryptoAgent._fallback_tool_detection（逐一掃描，正規表達式即時編譯）"""
+    message_lower = user_message.lower()
+    tool_calls = []
+    for symbol in ["btc", "eth", "sol", "bnb", "xrp", "ada", "dot", "doge"]:
+        if symbol in message_lower:
+            symbol_upper = symbol.upper()
+            if any(word in message_lower for word in ["價格", "多少錢", "現在", "即時", "price"]):
+                tool_calls.append({"tool": "get_current_price", "arguments": {"symbol": symbol_upper}})
+            if any(word in message_lower for word in ["技術", "分析", "rsi", "指標", "technical"]):
+                tool_calls.append({"tool": "get_technical_analysis", "arguments": {"symbol": symbol_upper}})
+            has_date_indicator = (
+                any(word in message_lower for word in ["歷史", "過去", "history", "走勢", "圖表", "chart", "近", "最近", "從", "到現在", "至今", "到今天"]) or
+                re.search(r'\d{1,2}[月\/]\d{1,2}', user_message) or
+                re.search(r'\d{4}-\d{1,2}-\d{1,2}', user_message) or
+                re.search(r'(\d+)\s*(?:天|日|週|周|月)', message_lower)
+            )
+            if has_date_indicator:
+                arguments = {"symbol": symbol_upper}
+                today = datetime.now().strftime("%Y-%m-%d")
+                to_now_match = re.search(
+                    r'(?:從)?(\d{1,2}月\d{1,2}日?|\d{1,2}[\/]\d{1,2}|\d{4}-\d{1,2}-\d{1,2})\s*(?:到|至)?\s*(?:現在|今天|今日|now|today|至今)',
+                    user_message, re.IGNORECASE
+                )
+                if to_now_match:
+                    start_date = _legacy_parse_date(to_now_match.group(1))
+                    if start_date:
+                        arguments["start_date"] = start_date
+                        arguments["end_date"] = today
+                else:
+                    date_range_match = re.search(
+                        r'(\d{1,2}月\d{1,2}日?|\d{1,2}[\/]\d{1,2}|\d{4}-\d{1,2}-\d{1,2})\s*(?:到|至|~)\s*(\d{1,2}月\d{1,2}日?|\d{1,2}[\/]\d{1,2}|\d{4}-\d{1,2}-\d{1,2})',
+                        user_message
+                    )
+                    if date_range_match:
+                        start_date = _legacy_parse_date(date_range_match.group(1))
+                        end_date = _legacy_parse_date(date_range_match.group(2))
+                        if start_date and end_date:
+                            arguments["start_date"] = start_date
+                            arguments["end_date"] = end_date
+                if "start_date" not in arguments:
+                    days = 30
+                    days_match = re.search(r'(?:近|過去|最近)\s*(\d+)\s*(?:天|日|days?)', message_lower)
+                    if days_match:
+                        days = min(int(days_match.group(1)), 365)
+                    else:
+                        simple_days_match = re.search(r'(\d+)\s*(?:天|日|days?)', message_lower)
+                        if simple_days_match:
+                            days = min(int(simple_days_match.group(1)), 365)
+                        elif "一週" in message_lower or "一周" in message_lower:
+                            days = 7
+                        elif "兩週" in message_lower or "两周" in message_lower:
+                            days = 14
+                        elif "一個月" in message_lower or "一个月" in message_lower:
+                            days = 30
+                        elif "三個月" in message_lower or "三个月" in message_lower:
+                            days = 90
+                    arguments["days"] = days
+                tool_calls.append({"tool": "get_price_history", "arguments": arguments})
+            break
+    if any(word in message_lower for word in ["回測", "backtest", "策略測試"]):
+        tool_calls.append({"tool": "run_backtest", "arguments": {}})
+    return tool_calls
+
+
+def routed_tool_calls(user_message, intent=None):
+    """以 route() 為基礎的工具檢測（同 CryptoAgent._fallback_tool_detection）"""
+    return CryptoAgent._fallback_tool_detection(None, user_message, intent)
+
+
+def legacy_request(message):
+    """舊版每則訊息的路徑：app.py 掃描一次，CryptoAgent 再掃描一次"""
+    if legacy_chart_request(message) is None:
+        legacy_tool_calls(message)
+
+
+def routed_request(message):
+    """新版：route() 一次，結果傳給 CryptoAgent"""
+    intent = route(message)
+    if not (intent["symbol"] and "chart" in intent["intents"]):
+        routed_tool_calls(message, intent)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the precompiled intent router')
+    parser.add_argument('--number', type=int, default=2000, help='每則訊息的執行次數')
+    parser.add_argument('--json', action='store_true', help='以 JSON 輸出')
+    args = parser.parse_args()
+
+    mismatches = [m for m in SAMPLE_MESSAGES if legacy_tool_calls(m) != routed_tool_calls(m)]
+
+    def run_all(fn, purge=False):
+        def run():
+            if purge:
+                # 清空 re 模組的編譯快取，模擬大量其他樣式把舊版的樣式擠出快取
+                re.purge()
+            for message in SAMPLE_MESSAGES:
+                fn(message)
+        return run
+
+    number = max(args.number // 10, 1)
+
+    def per_message(fn):
+        return min(timeit.repeat(fn, number=number, repeat=5)) / number / len(SAMPLE_MESSAGES) * 1e6
+
+    results = {
+        "messages": len(SAMPLE_MESSAGES),
+        "legacy_us_per_message": round(per_message(run_all(legacy_request)), 2),
+        "legacy_cold_regex_cache_us_per_message": round(per_message(run_all(legacy_request, purge=True)), 2),
+        "router_us_per_message": round(per_message(run_all(routed_request)), 2),
+        "route_only_us_per_message": round(per_message(run_all(route)), 2),
+        "mismatches": mismatches,
+    }
+    results["speedup"] = round(results["legacy_us_per_message"] / results["router_us_per_message"], 2)
+
+    if args.json:
+        print(json.dumps(results, ensure_ascii=False, indent=2))
+        return
+
+    print("=" * 60)
+    print(f"舊版 (app + agent 各掃描一次) {results['legacy_us_per_message']:>10.2f} µs/訊息")
+    print(f"舊版 (正規表達式冷快取) {results['legacy_cold_regex_cache_us_per_message']:>10.2f} µs/訊息")
+    print(f"預編譯路由器           {results['router_us_per_message']:>10.2f} µs/訊息")
+    print(f"  其中 route()          {results['route_only_us_per_message']:>10.2f} µs/訊息")
+    print(f"加速                   {results['speedup']:>10.2f}x")
+    print(f"結果不一致             {len(mismatches)} 則 {mismatches if mismatches else ''}")
+    print("=" * 60)
+
+
+if __name__ == '__main__':
+    main()
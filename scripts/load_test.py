@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+"""
+聊天 API 負載測試：比較同步 (app.py) 與非同步 (async_app.py) 伺服器
+
+啟動一個延遲可調的假 Ollama，讓兩個伺服器都指向它，
+逐步提高同時連線數，回報吞吐量、p50/p95 延遲與錯誤數。
+"""
+import argparse
+import asyncio
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+
+import aiohttp
+from aiohttp import web
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# 一般問題只走 LLM；價格問題先呼叫工具再由 LLM 解讀
+MESSAGES = ["你好，今天市場怎麼樣？", "BTC 現在價格多少？", "ETH 的 RSI 指標如何"]
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def serve_fake_ollama(port: int, delay: float):
+    """假 Ollama：每次 /api/chat 等待 delay 秒後回覆固定內容"""
+    async def chat(request):
+        await request.read()
+        await asyncio.sleep(delay)
+        return web.json_response({"message": {"role": "assistant", "content": "這是測試回覆。"}, "done": True})
+
+    async def tags(request):
+        return web.json_response({"models": [{"name": "fake"}]})
+
+    app = web.Application()
+    app.router.add_post('/api/chat', chat)
+    app.router.add_get('/api/tags', tags)
+    web.run_app(app, host='127.0.0.1', port=port, print=None, access_log=None)
+
+
+def _spawn(args: list, env: dict = None) -> subprocess.Popen:
+    return subprocess.Popen([sys.executable] + args, cwd=PROJECT_ROOT, env=env,
+                            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+
+async def _wait_ready(url: str, timeout: float = 60.0):
+    deadline = time.monotonic() + timeout
+    async with aiohttp.ClientSession() as session:
+        while time.monotonic() < deadline:
+            try:
+                async with session.get(url) as response:
+                    if response.status < 500:
+                        return
+            except aiohttp.ClientError:
+                pass
+            await asyncio.sleep(0.3)
+    raise RuntimeError(f"server not ready: {url}")
+
+
+async def run_level(base_url: str, concurrency: int, requests: int) -> dict:
+    """以固定同時連線數送出 requests 個聊天請求"""
+    latencies, errors = [], 0
+    queue = asyncio.Queue()
+    for i in range(requests):
+        queue.put_nowait(i)
+
+    async def worker(worker_id: int):
+        nonlocal errors
+        # 每個 worker 一個會話（各自的 cookie）
+        async with aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=120)) as session:
+            while not queue.empty():
+                i = queue.get_nowait()
+                payload = {"message": MESSAGES[i % len(MESSAGES)], "session_id": f"load-{worker_id}"}
+                start = time.perf_counter()
+                try:
+                    async with session.post(f"{base_url}/api/chat", json=payload) as response:
+                        body = await response.json(content_type=None)
+                        if response.status != 200 or not body.get("success"):
+                            errors += 1
+                            continue
+                except (aiohttp.ClientError, asyncio.TimeoutError):
+                    errors += 1
+                    continue
+                latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker(w) for w in range(concurrency)))
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    return {
+        "concurrency": concurrency,
+        "requests": requests,
+        "throughput_rps": round(len(latencies) / elapsed, 1) if elapsed else 0.0,
+        "p50_ms": round(statistics.median(latencies) * 1000, 1) if latencies else None,
+        "p95_ms": round(latencies[int(len(latencies) * 0.95) - 1] * 1000, 1) if latencies else None,
+        "errors": errors,
+    }
+
+
+async def benchmark(server: str, args, ollama_url: str) -> list:
+    port = _free_port()
+    env = dict(os.environ,
+               FLASK_HOST='127.0.0.1', FLASK_PORT=str(port), DEBUG='false',
+               OLLAMA_URI=ollama_url, OLLAMA_API_KEY='',
+               # 每個請求都要等 LLM：關閉模板快速路徑與 LLM 快取
+               CHAT_FAST_PATH='false', LLM_CACHE_ENABLED='false',
+               WARMUP_COMPONENTS='', PRELOAD_MODELS='')
+    process = _spawn([server], env)
+    base_url = f"http://127.0.0.1:{port}"
+    try:
+        await _wait_ready(f"{base_url}/healthz")
+        # 暖機：載入工具與市場數據快取
+        await run_level(base_url, 1, len(MESSAGES))
+        results = []
+        for concurrency in args.levels:
+            results.append(await run_level(base_url, concurrency, max(args.requests, concurrency)))
+        return results
+    finally:
+        process.terminate()
+        process.wait(timeout=10)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Load test the sync and async chat servers')
+    parser.add_argument('--levels', type=int, nargs='+', default=[1, 8, 32, 64], help='同時連線數')
+    parser.add_argument('--requests', type=int, default=128, help='每個層級的請求數')
+    parser.add_argument('--delay', type=float, default=0.5, help='假 Ollama 的回覆延遲（秒）')
+    parser.add_argument('--servers', nargs='+', default=['app.py', 'async_app.py'])
+    parser.add_argument('--json', action='store_true', help='以 JSON 輸出')
+    parser.add_argument('--serve-fake-ollama', type=int, metavar='PORT', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.serve_fake_ollama:
+        serve_fake_ollama(args.serve_fake_ollama, args.delay)
+        return
+
+    ollama_port = _free_port()
+    ollama = _spawn([os.path.abspath(__file__), '--serve-fake-ollama', str(ollama_port), '--delay', str(args.delay)])
+    ollama_url = f"http://127.0.0.1:{ollama_port}"
+    try:
+        asyncio.run(_wait_ready(f"{ollama_url}/api/tags"))
+        report = {server: asyncio.run(benchmark(server, args, ollama_url)) for server in args.servers}
+    finally:
+        ollama.terminate()
+        ollama.wait(timeout=10)
+
+    if args.json:
+        print(json.dumps(report, ensure_ascii=False, indent=2))
+        return
+
+    print("=" * 72)
+    print(f"假 Ollama 延遲 {args.delay:.2f}s，每層級 {args.requests} 個請求")
+    print(f"{'server':<14}{'conc':>6}{'req/s':>10}{'p50 ms':>12}{'p95 ms':>12}{'errors':>8}")
+    for server, rows in report.items():
+        for row in rows:
+            print(f"{server:<14}{row['concurrency']:>6}{row['throughput_rps']:>10}"
+                  f"{row['p50_ms']!s:>12}{row['p95_ms']!s:>12}{row['errors']:>8}")
+    print("=" * 72)
+
+
+if __name__ == '__main__':
+    main()
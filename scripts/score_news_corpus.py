@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+"""
+使用多進程對新聞數據集進行 FinBERT 情感評分
+評分結果寫入 data/sentiment_cache/article_scores/，供情感時間序列聚合使用
+中斷後重新執行即可從上次進度繼續
+"""
+import argparse
+import os
+import sys
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend.models.corpus_scoring import score_news_corpus
+from backend.models.sentiment_timeseries import SentimentTimeSeriesProcessor
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Score the crypto news corpus with FinBERT')
+    parser.add_argument('--symbol', default='ALL', help='只評分指定幣種的新聞 (預設: ALL)')
+    parser.add_argument('--workers', type=int, default=None, help='工作進程數 (預設: CPU 核心數)')
+    parser.add_argument('--torch-threads', type=int, default=None,
+                        help='每個進程的 torch 線程數 (預設: 核心數 / 進程數)')
+    parser.add_argument('--chunk-size', type=int, default=256, help='每個檢查點的文章數')
+    parser.add_argument('--model', default=None, help='FinBERT 模型名稱或路徑')
+    parser.add_argument('--force', action='store_true', help='清除此模型的既有評分並重新開始')
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("新聞數據集情感評分")
+    print("=" * 60)
+
+    result = score_news_corpus(
+        SentimentTimeSeriesProcessor(),
+        symbol=args.symbol,
+        workers=args.workers,
+        torch_threads=args.torch_threads,
+        chunk_size=args.chunk_size,
+        model_name=args.model,
+        force=args.force
+    )
+
+    if not result.get('success'):
+        print(f"❌ 評分失敗: {result.get('error')}")
+        return False
+
+    print(f"\n✅ 已評分 {result['scored_articles']:,}/{result['total_articles']:,} 篇新聞")
+    return True
+
+
+if __name__ == '__main__':
+    success = main()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,46 @@
+"""
+Shared fixtures
+"""
+import sys
+import os
+
+import pandas as pd
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import data.scrapers.market_data as market_data_module
+from data.scrapers.market_data import MarketDataService
+
+
+def _candles(pair, timeframe, limit):
+    days = pd.date_range(end=pd.Timestamp.now().normalize(), periods=min(limit, 365), freq='D')
+    return {
+        "success": True, "symbol": pair, "timeframe": timeframe, "source": "binance", "requested": limit,
+        "data": [{"timestamp": t, "open": 100.0 + i, "high": 101.0 + i, "low": 99.0 + i,
+                  "close": 100.0 + i + (i % 3), "volume": 10.0} for i, t in enumerate(days)],
+    }
+
+
+def _ticker(pair):
+    return {"success": True, "symbol": pair, "price": 123.0, "change_24h": -2.0,
+            "volume_24h": 5e8, "market_cap": 9e9, "source": "binance"}
+
+
+@pytest.fixture
+def market(monkeypatch):
+    """Shared market data service with deterministic sync and async upstreams"""
+    service = MarketDataService(price_ttl=60, history_ttl=60)
+
+    async def afetch_ticker(base, pair):
+        return _ticker(pair)
+
+    async def afetch_ohlcv(base, pair, timeframe, limit):
+        return _candles(pair, timeframe, limit)
+
+    monkeypatch.setattr(service, "_fetch_ticker", lambda base, pair: _ticker(pair))
+    monkeypatch.setattr(service, "_afetch_ticker", afetch_ticker)
+    monkeypatch.setattr(service, "_fetch_ohlcv", lambda base, pair, timeframe, limit: _candles(pair, timeframe, limit))
+    monkeypatch.setattr(service, "_afetch_ohlcv", afetch_ohlcv)
+    monkeypatch.setattr(market_data_module, "_market_data", service)
+    return service
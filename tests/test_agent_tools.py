@@ -0,0 +1,81 @@
+"""
+Tests for concurrent, de-duplicated tool execution in CryptoAgent
+"""
+import sys
+import os
+import threading
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import orchestrator.agent as agent_module
+from mcp.tools import history_requirements
+from orchestrator.agent import CryptoAgent, _shared_history
+
+
+def test_history_requirements_cover_indicator_warmup():
+    history = history_requirements("get_price_history", {"symbol": "btc", "days": 30})
+    technical = history_requirements("get_technical_analysis", {"symbol": "BTC"})
+
+    assert list(history) == ["BTC"]
+    assert technical["BTC"] > history["BTC"]
+    assert history_requirements("get_current_price", {"symbol": "BTC"}) == {}
+    assert history_requirements("get_price_history", {}) == {}
+
+
+def test_shared_history_only_for_symbols_needed_twice():
+    calls = [
+        {"tool": "get_price_history", "arguments": {"symbol": "BTC", "days": 30}},
+        {"tool": "get_technical_analysis", "arguments": {"symbol": "BTC"}},
+        {"tool": "get_price_history", "arguments": {"symbol": "ETH", "days": 7}},
+    ]
+    shared = _shared_history(calls)
+
+    assert list(shared) == ["BTC"]
+    assert shared["BTC"] == history_requirements("get_technical_analysis", {"symbol": "BTC"})["BTC"]
+
+
+def test_run_tools_dedupes_identical_calls_and_keeps_order(monkeypatch):
+    executed = []
+    lock = threading.Lock()
+
+    def fake_execute(tool_name, arguments):
+        with lock:
+            executed.append(tool_name)
+        return {"tool": tool_name, **arguments}
+
+    monkeypatch.setattr(agent_module, "execute_tool", fake_execute)
+    calls = [
+        {"tool": "get_current_price", "arguments": {"symbol": "BTC"}},
+        {"tool": "run_backtest", "arguments": {}},
+        {"tool": "get_current_price", "arguments": {"symbol": "BTC"}},
+    ]
+
+    results = CryptoAgent(fast_path=True)._run_tools(calls)
+
+    assert sorted(executed) == ["get_current_price", "run_backtest"]
+    assert [r["tool"] for r in results] == ["get_current_price", "run_backtest", "get_current_price"]
+    assert results[0] is results[2]
+
+
+def test_run_tools_bounds_parallelism_per_message(monkeypatch):
+    active = []
+    peak = []
+    lock = threading.Lock()
+
+    def fake_execute(tool_name, arguments):
+        with lock:
+            active.append(1)
+            peak.append(len(active))
+        threading.Event().wait(0.05)
+        with lock:
+            active.pop()
+        return {"tool": tool_name, **arguments}
+
+    monkeypatch.setattr(agent_module, "execute_tool", fake_execute)
+    monkeypatch.setattr(agent_module.Config, "CHAT_TOOL_WORKERS", 2)
+    calls = [{"tool": "get_current_price", "arguments": {"symbol": s}} for s in ("BTC", "ETH", "SOL", "BNB", "XRP")]
+
+    results = CryptoAgent(fast_path=True)._run_tools(calls)
+
+    assert [r["symbol"] for r in results] == ["BTC", "ETH", "SOL", "BNB", "XRP"]
+    assert max(peak) == 2
@@ -0,0 +1,66 @@
+"""
+Tests that app.py (Flask) and async_app.py (aiohttp) answer the shared API the same way
+"""
+import sys
+import os
+import asyncio
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from orchestrator import handlers
+
+
+def _flask_call(method, path, body=None):
+    from app import app
+    client = app.test_client()
+    response = client.open(path, method=method, json=body)
+    return response.status_code, response.get_json()
+
+
+def _aiohttp_call(method, path, body=None):
+    from aiohttp.test_utils import TestClient, TestServer
+    from async_app import create_app
+
+    async def call():
+        async with TestClient(TestServer(create_app())) as client:
+            response = await client.request(method, path, json=body)
+            return response.status, await response.json()
+
+    return asyncio.run(call())
+
+
+@pytest.mark.parametrize("method, path, body", [
+    ("POST", "/api/chat", {"message": "  "}),
+    ("POST", "/api/chat", {"message": "BTC 最近 7 天走勢圖"}),
+    ("POST", "/api/chart-data", {"symbol": "eth", "days": 5}),
+    ("GET", "/api/price/btc", None),
+    ("GET", "/readyz", None),
+])
+def test_both_apps_answer_alike(market, method, path, body):
+    flask_status, flask_body = _flask_call(method, path, body)
+    aiohttp_status, aiohttp_body = _aiohttp_call(method, path, body)
+
+    assert flask_status == aiohttp_status
+    flask_body.pop("timestamp", None)
+    aiohttp_body.pop("timestamp", None)
+    assert flask_body == aiohttp_body
+
+
+def test_chart_request_uses_explicit_range_or_days():
+    ranged = handlers.chart_request({"symbol": "BTC", "intents": {"chart"}, "start_date": "2024-01-01",
+                                     "end_date": "2024-02-01", "days": 30})
+    recent = handlers.chart_request({"symbol": "ETH", "intents": {"chart", "history"}, "start_date": None,
+                                     "end_date": None, "days": 7})
+
+    assert ranged["history_args"] == {"start_date": "2024-01-01", "end_date": "2024-02-01"}
+    assert recent == {"symbol": "ETH", "period": "近 7 天", "history_args": {"days": 7}}
+    assert handlers.chart_request({"symbol": "BTC", "intents": {"price"}}) is None
+
+
+def test_backtest_results_args_tolerate_bad_numbers():
+    assert handlers.backtest_results_args({}) == (10, 1, None, None, None, False, False)
+    assert handlers.backtest_results_args(
+        {"limit": "abc", "page": "2", "offset": "5", "symbol": "BTC/USDT", "include_equity": "True"}
+    ) == (10, 2, 5, "BTC/USDT", None, True, False)
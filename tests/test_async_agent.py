@@ -0,0 +1,68 @@
+"""
+Parity tests for the async agent path (aexecute_tool, achat) against the sync one
+"""
+import sys
+import os
+import asyncio
+import re
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from mcp.tools import aexecute_tool, execute_tool
+from orchestrator.agent import CryptoAgent
+
+
+def _stable(value):
+    """Drop the wall-clock timestamps that differ between two calls"""
+    if isinstance(value, dict):
+        return {k: _stable(v) for k, v in value.items() if k != "timestamp"}
+    if isinstance(value, list):
+        return [_stable(v) for v in value]
+    return value
+
+
+@pytest.mark.parametrize("tool_name, arguments", [
+    ("get_current_price", {"symbol": "BTC"}),
+    ("get_price_history", {"symbol": "ETH", "days": 10}),
+    ("get_technical_analysis", {"symbol": "BTC"}),
+    ("no_such_tool", {}),
+])
+def test_aexecute_tool_matches_execute_tool(market, tool_name, arguments):
+    sync_result = execute_tool(tool_name, arguments)
+    async_result = asyncio.run(aexecute_tool(tool_name, arguments))
+
+    assert _stable(async_result) == _stable(sync_result)
+
+
+@pytest.mark.parametrize("message", ["BTC 現在價格多少？", "ETH 的 RSI 指標如何"])
+def test_achat_fast_path_matches_chat(market, message):
+    sync_reply = CryptoAgent(fast_path=True).chat(message)
+    async_reply = asyncio.run(CryptoAgent(fast_path=True).achat(message))
+
+    assert async_reply.get("fast_path") and sync_reply.get("fast_path")
+    assert _stable(async_reply) == _stable(sync_reply)
+
+
+def test_achat_llm_path_matches_chat(market, monkeypatch):
+    prompts = []
+
+    def fake_llm(self, prompt, cache_key=None, history=None):
+        prompts.append(prompt)
+        return f"answer {len(prompt)}"
+
+    async def afake_llm(self, prompt, cache_key=None, history=None):
+        return fake_llm(self, prompt, cache_key, history)
+
+    monkeypatch.setattr(CryptoAgent, "_call_ollama_simple", fake_llm)
+    monkeypatch.setattr(CryptoAgent, "_acall_ollama_simple", afake_llm)
+
+    for message in ["你好", "BTC 現在價格多少？"]:
+        sync_reply = CryptoAgent(fast_path=False).chat(message)
+        async_reply = asyncio.run(CryptoAgent(fast_path=False).achat(message))
+        assert async_reply["response"] == sync_reply["response"]
+        assert _stable(async_reply) == _stable(sync_reply)
+    prompts = [re.sub(r'"timestamp": "[^"]*"', '', p) for p in prompts]
+    assert prompts[0] == prompts[1]
+    assert prompts[2] == prompts[3]
@@ -0,0 +1,40 @@
+"""
+Tests for the token-budgeted conversation memory
+"""
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend.conversation_memory import ConversationMemory, estimate_tokens, summarize_tool_result
+
+
+def test_tool_results_are_summarized():
+    result = {"success": True, "symbol": "BTC/USDT", "price": 98500.123456,
+              "data": [[1, 2, 3, 4, 5, 6]] * 1000, "timestamp": "2024-01-01T00:00:00"}
+    summary = summarize_tool_result("get_crypto_ohlcv", result)
+
+    assert summary.startswith("get_crypto_ohlcv: ")
+    assert "[1000 items]" in summary
+    assert "98500.1235" in summary
+    assert "timestamp" not in summary
+    assert summarize_tool_result("x", {"success": False, "error": "boom"}) == "x: error: boom"
+
+
+def test_memory_stays_within_budget_and_summarizes_evicted_turns():
+    memory = ConversationMemory(max_tokens=200, summary_tokens=60)
+    for i in range(20):
+        memory.add_user(f"問題 {i}")
+        memory.add_assistant("回答" * 30, "get_crypto_price", {"success": True, "price": i})
+
+    stats = memory.stats()
+    assert stats["tokens"] <= 200
+    messages = memory.messages()
+    assert messages[0]["role"] == "system"
+    assert messages[0]["content"].startswith("先前對話摘要")
+    assert estimate_tokens(messages[0]["content"]) <= 60 + estimate_tokens("先前對話摘要：\n")
+    assert messages[-1]["content"].endswith('get_crypto_price: {"success": true, "price": 19}')
+    assert all(set(m) == {"role", "content"} for m in messages)
+
+    memory.clear()
+    assert memory.messages() == []
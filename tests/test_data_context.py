@@ -0,0 +1,87 @@
+"""
+Tests for the request-scoped data context
+"""
+import sys
+import os
+import contextvars
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend.data_context import DataContext, current_data, data_context
+
+
+class FakeMarketData:
+    def __init__(self, delay: float = 0.0):
+        self.calls = []
+        self.delay = delay
+        self._lock = threading.Lock()
+
+    def get_ticker(self, pair):
+        with self._lock:
+            self.calls.append(('ticker', pair))
+        return {"success": True, "symbol": pair, "price": 100.0}
+
+    def get_ohlcv(self, pair, timeframe='1d', limit=100):
+        if self.delay:
+            threading.Event().wait(self.delay)
+        with self._lock:
+            self.calls.append(('ohlcv', pair, timeframe, limit))
+        return {"success": True, "symbol": pair, "data": [{"close": float(i)} for i in range(limit)]}
+
+
+def test_candles_are_sliced_from_the_widest_download():
+    market = FakeMarketData()
+    ctx = DataContext(market)
+
+    wide = ctx.ohlcv('BTC', '1d', 500)
+    narrow = ctx.ohlcv('BTC/USDT', '1d', 60)
+    other_timeframe = ctx.ohlcv('BTC', '1h', 60)
+
+    assert market.calls == [('ohlcv', 'BTC/USDT', '1d', 500), ('ohlcv', 'BTC/USDT', '1h', 60)]
+    assert len(wide['data']) == 500 and 'requested' not in wide
+    assert narrow['data'] == wide['data'][-60:]
+    assert len(other_timeframe['data']) == 60
+
+    ctx.ohlcv('BTC', '1d', 1000)
+    assert market.calls[-1] == ('ohlcv', 'BTC/USDT', '1d', 1000)
+
+
+def test_failures_are_not_memoized():
+    ctx = DataContext(FakeMarketData())
+    attempts = []
+
+    def fetch():
+        attempts.append(1)
+        return {"success": False, "error": "down"}
+
+    ctx.news('BTC', 10, fetch)
+    ctx.news('BTC', 10, fetch)
+    assert len(attempts) == 2
+
+
+def test_scope_is_shared_by_nested_scopes_and_copied_threads():
+    assert current_data() is not current_data()
+
+    with data_context() as ctx:
+        with data_context() as inner:
+            assert inner is ctx
+        assert current_data() is ctx
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            seen = pool.submit(contextvars.copy_context().run, current_data).result()
+        assert seen is ctx
+
+    assert current_data() is not ctx
+
+
+def test_concurrent_requests_for_one_dataset_fetch_once():
+    market = FakeMarketData(delay=0.05)
+    ctx = DataContext(market)
+
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        results = list(pool.map(lambda _: ctx.ohlcv('ETH', '1d', 30), range(4)))
+
+    assert market.calls == [('ohlcv', 'ETH/USDT', '1d', 30)]
+    assert all(r['data'] == results[0]['data'] for r in results)
+    assert ctx.stats() == {"datasets": 1, "fetches": 1, "hits": 3}
@@ -0,0 +1,98 @@
+"""
+Tests that the bulk-derived equity curve matches the broker's per-bar value
+"""
+import sys
+import os
+
+import backtrader as bt
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend.models.backtest_engine import STRATEGIES, BacktestEngine, EquityCurveAnalyzer
+from backend.models.execution_model import ExecutionCommInfo, ExecutionModel
+from backend.models.feature_store import FeatureFrameStore
+
+
+class PerBarValue(bt.Analyzer):
+    """Reference: broker value and position read on every bar"""
+
+    def start(self):
+        self.values, self.positions = [], []
+        self.sold = 0.0
+
+    def notify_order(self, order):
+        self.sold -= sum(bit.size for bit in order.executed.iterpending() if bit.size < 0)
+
+    def prenext(self):
+        self.next()
+
+    def next(self):
+        self.values.append(self.strategy.broker.getvalue())
+        self.positions.append(self.strategy.position.size)
+
+
+class SentimentFeed(bt.feeds.PandasData):
+    lines = ('sentiment',)
+    params = (('sentiment', 'sentiment_score'),)
+
+
+def _candles(n=300, seed=7):
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, n)))
+    return pd.DataFrame({
+        'timestamp': pd.date_range('2023-01-01', periods=n, freq='D'),
+        'open': close * (1 + rng.normal(0, 0.003, n)), 'high': close * 1.01,
+        'low': close * 0.99, 'close': close, 'volume': rng.uniform(1e3, 1e4, n),
+    })
+
+
+def _run(frame, strategy, execution_model=None):
+    cerebro = bt.Cerebro()
+    cerebro.adddata(SentimentFeed(dataname=frame))
+    cerebro.addstrategy(STRATEGIES[strategy])
+    cerebro.broker.setcash(10000)
+    cerebro.broker.set_fundmode(fundmode=True, fundstartval=10000)
+    if execution_model is not None:
+        ExecutionCommInfo(model=execution_model, data=cerebro.datas[0]).configure(cerebro)
+    else:
+        cerebro.broker.setcommission(commission=0.001)
+    cerebro.addanalyzer(EquityCurveAnalyzer, _name='equity')
+    cerebro.addanalyzer(PerBarValue, _name='reference')
+    strat = cerebro.run()[0]
+    return strat.analyzers.equity.get_analysis(), strat.analyzers.reference, cerebro.broker.getvalue()
+
+
+@pytest.mark.parametrize("strategy, execution_model", [
+    ("technical", None),
+    ("macd", None),
+    ("macd", ExecutionModel(max_participation=0.05)),
+])
+def test_bulk_equity_matches_broker_value(tmp_path, strategy, execution_model):
+    engine = BacktestEngine(feature_store=FeatureFrameStore(str(tmp_path)))
+    frame = engine.prepare_feature_frame(_candles(), 'BTC', '1d', with_sentiment=False)
+
+    capture, reference, final_value = _run(frame, strategy, execution_model)
+
+    assert len(capture['trades']) > 0
+    assert len(capture['equity']) == len(frame)
+    np.testing.assert_allclose(capture['equity'], reference.values, rtol=1e-9)
+    np.testing.assert_allclose(capture['position'], reference.positions, atol=1e-12)
+    assert capture['equity'][-1] == pytest.approx(final_value)
+    assert (pd.DatetimeIndex(capture['timestamps']) == frame.index).all()
+
+
+def test_trade_ledger_records_closed_size(tmp_path):
+    engine = BacktestEngine(feature_store=FeatureFrameStore(str(tmp_path)))
+    frame = engine.prepare_feature_frame(_candles(), 'BTC', '1d', with_sentiment=False)
+
+    # Volume-capped fills spread entries and exits over several bars
+    capture, reference, _ = _run(frame, "macd", ExecutionModel(max_participation=0.05))
+
+    # Long-only: every unit sold closed part of a recorded trade
+    assert sum(t['size'] for t in capture['trades']) == pytest.approx(reference.sold)
+    for trade in capture['trades']:
+        bars = frame.loc[trade['entry_time']:trade['exit_time']]
+        assert bars['low'].min() <= trade['exit_price'] <= bars['high'].max() * 1.01
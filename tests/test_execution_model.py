@@ -0,0 +1,75 @@
+"""
+Tests for the vectorized ExecutionModel: fee tiers, slippage and volume-capped fills
+"""
+import sys
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend.models.execution_model import ExecutionModel
+
+TIERS = [(0, 0.0010, 0.0020), (1000, 0.0005, 0.0010)]
+
+
+def _bars(n, price=100.0, volume=1e9, high=None, low=None):
+    index = pd.date_range('2024-01-01', periods=n, freq='D')
+    column = lambda value: pd.DataFrame({'BTC': np.full(n, value, dtype=float)}, index=index)
+    return {
+        'open': column(price), 'close': column(price), 'volume': column(volume),
+        'high': column(price if high is None else high), 'low': column(price if low is None else low),
+    }
+
+
+def _target(weights):
+    return pd.DataFrame({'BTC': weights}, index=pd.date_range('2024-01-01', periods=len(weights), freq='D'))
+
+
+def test_fee_tier_boundary_on_cumulative_notional():
+    taker = ExecutionModel(fee_tiers=TIERS, slippage_coef=0.0, max_participation=None)
+    maker = ExecutionModel(fee_tiers=TIERS, liquidity='maker', max_participation=None)
+
+    np.testing.assert_allclose(taker.fee_rate(np.array([0, 999.99, 1000, 5000])), [0.002, 0.002, 0.001, 0.001])
+    np.testing.assert_allclose(maker.fee_rate(np.array([0, 999.99, 1000])), [0.001, 0.001, 0.0005])
+
+    # Flat prices keep equity at 1000: the buy is charged tier 0, the sell after it tier 1
+    fills = taker.simulate(_target([1.0, 0.0, 0.0]), _bars(3), initial_cash=1000)
+    np.testing.assert_allclose(fills['fees']['BTC'], [0.0, 0.002, 0.001])
+    np.testing.assert_allclose(fills['pnl']['BTC'], [0.0, -0.002, -0.001])
+
+
+def test_slippage_scales_with_order_size_and_candle_range():
+    model = ExecutionModel(slippage_coef=0.1)
+    close, volume = np.array([100.0]), np.array([1000.0])
+    rate = lambda notional, high, low: model.slippage_rate(
+        np.array([notional]), np.array([high]), np.array([low]), close, volume)[0]
+
+    base = rate(1000.0, 101.0, 99.0)
+    # 0.1 x 2% range x sqrt(1% of bar volume)
+    assert base == pytest.approx(0.1 * 0.02 * 0.1)
+    assert rate(4000.0, 101.0, 99.0) == pytest.approx(2 * base)
+    assert rate(1000.0, 102.0, 98.0) == pytest.approx(2 * base)
+    # Participation is capped at the whole bar
+    assert rate(1e9, 101.0, 99.0) == pytest.approx(0.1 * 0.02)
+    assert ExecutionModel(liquidity='maker').slippage_rate(
+        np.array([1000.0]), np.array([101.0]), np.array([99.0]), close, volume)[0] == 0.0
+
+    fills = ExecutionModel(fee_tiers=TIERS, slippage_coef=0.1, max_participation=None).simulate(
+        _target([1.0, 1.0]), _bars(2, volume=1000.0, high=101.0, low=99.0), initial_cash=1000)
+    assert fills['slippage']['BTC'].iloc[1] == pytest.approx(base)
+
+
+def test_participation_cap_carries_remainder_to_next_bars():
+    # Capacity per bar: 0.1 x 40 units x 100 / 1000 equity = 40% of capital
+    model = ExecutionModel(fee_tiers=TIERS, slippage_coef=0.0, max_participation=0.1)
+
+    fills = model.simulate(_target([1.0] * 5), _bars(5, volume=40.0), initial_cash=1000)
+
+    np.testing.assert_allclose(fills['held']['BTC'], [0.0, 0.4, 0.8, 1.0, 1.0])
+    assert fills['fill_ratio'].iloc[1] == pytest.approx(0.4)
+    assert (fills['fill_ratio'] <= 1.0).all()
+    # Fees follow the partial fills
+    np.testing.assert_allclose(fills['fees']['BTC'], [0.0, 0.4 * 0.002, 0.4 * 0.002, 0.2 * 0.002, 0.0])
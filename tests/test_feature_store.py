@@ -0,0 +1,98 @@
+"""
+Tests for the on-disk feature frame store: key versioning and LRU eviction
+"""
+import sys
+import os
+import time
+from types import SimpleNamespace
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend.models.backtest_engine import BacktestEngine
+from backend.models.feature_store import FeatureFrameStore
+from backend.models.sentiment_timeseries import SentimentTimeSeriesProcessor
+
+
+def _candles(n=10):
+    return pd.DataFrame({
+        'timestamp': pd.date_range('2024-01-01', periods=n, freq='D'),
+        'open': np.arange(n, dtype=float), 'high': np.arange(n) + 1.0,
+        'low': np.arange(n) - 1.0, 'close': np.arange(n, dtype=float), 'volume': np.ones(n),
+    })
+
+
+def _frame(df):
+    return df.set_index('timestamp').astype(float)
+
+
+def test_key_changes_with_sentiment_version(tmp_path):
+    store = FeatureFrameStore(str(tmp_path))
+    df = _candles()
+
+    base = store.make_key('BTC/USDT', '1d', df, True, 'aaaa')
+    assert store.make_key('BTC/USDT', '1d', df, True, 'aaaa') == base
+    assert store.make_key('BTC/USDT', '1d', df, True, 'bbbb') != base
+    assert store.make_key('BTC/USDT', '1d', df, False, 'aaaa') == store.make_key('BTC/USDT', '1d', df, False, 'bbbb')
+
+
+def test_store_version_tracks_model_and_stored_scores(tmp_path):
+    processor = SentimentTimeSeriesProcessor(str(tmp_path))
+    before = processor.article_store_version()
+
+    assert processor.article_store_version('other/model') != before
+
+    store_dir = processor.article_scores_dir()
+    os.makedirs(store_dir)
+    with open(os.path.join(store_dir, 'shard_000.csv'), 'w') as f:
+        f.write('article_id,newsDatetime,negative,neutral,positive,sentiment\n')
+    assert processor.article_store_version() != before
+
+
+def test_second_cold_run_with_sentiment_loads_the_saved_frame(tmp_path, monkeypatch):
+    processor = SentimentTimeSeriesProcessor(str(tmp_path / 'sentiment'))
+    news = pd.DataFrame({'newsDatetime': pd.date_range('2024-01-01 06:00', periods=30, freq='D'),
+                         'title': [f"headline {i}" for i in range(30)], 'description': 'BTC'})
+    monkeypatch.setattr(processor, 'load_news_data', lambda symbol: news)
+    analyzer = SimpleNamespace(
+        analyze_batch=lambda texts: [{'sentiment': 'positive', 'scores': {
+            'negative': 0.1, 'neutral': 0.2, 'positive': 0.7}} for _ in texts],
+        aggregate_sentiment=lambda results: {'sentiment_score': 0.6, 'distribution': {
+            'positive': 1.0, 'negative': 0.0, 'neutral': 0.0}})
+    store = FeatureFrameStore(str(tmp_path / 'features'))
+    loads = []
+    original_load = store.load
+    monkeypatch.setattr(store, 'load', lambda key: loads.append(original_load(key)) or loads[-1])
+
+    frames = []
+    for _ in range(2):
+        engine = BacktestEngine(feature_store=store)
+        engine.sentiment_processor, engine.sentiment_analyzer = processor, analyzer
+        frames.append(engine.prepare_feature_frame(_candles(30), 'BTC', '1d', with_sentiment=True))
+
+    assert loads[0] is None and loads[1] is not None
+    assert (frames[1]['sentiment_score'] == 0.6).all()
+    pd.testing.assert_frame_equal(frames[0], frames[1], check_freq=False)
+    assert len(os.listdir(tmp_path / 'features')) == 1
+
+
+def test_least_recently_used_frames_are_evicted(tmp_path):
+    store = FeatureFrameStore(str(tmp_path), max_entries=2)
+    frames = {}
+    for n in (10, 11, 12):
+        df = _candles(n)
+        key = store.make_key('BTC/USDT', '1d', df, False)
+        frames[n] = key
+        store.save(key, _frame(df))
+        time.sleep(0.02)
+        if n == 11:
+            # Touch the oldest entry so the middle one becomes least recently used
+            assert store.load(frames[10]) is not None
+            time.sleep(0.02)
+
+    assert store.load(frames[10]) is not None
+    assert store.load(frames[11]) is None
+    assert store.load(frames[12]) is not None
+    assert len(os.listdir(tmp_path)) == 2
@@ -0,0 +1,46 @@
+"""
+Tests for the precompiled intent router
+"""
+import sys
+import os
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from orchestrator.intent_router import parse_date, route
+
+
+def test_symbol_and_intents_match_substring_semantics():
+    intent = route("ETH 和 BTC 現在價格圖表")
+    # 依支援清單順序取第一個幣種
+    assert intent["symbol"] == "BTC"
+    # 「價格圖」「到現在」等較長的關鍵字不會遮蔽其中較短的關鍵字
+    assert {"price", "chart", "history"} <= intent["intents"]
+
+    assert route("幫我跑一個回測")["intents"] == {"backtest"}
+    assert route("你好")["symbol"] is None
+
+
+def test_date_range_and_day_count():
+    year = datetime.now().year
+    today = datetime.now().strftime("%Y-%m-%d")
+
+    to_now = route("doge 從 3/1 到現在的價格")
+    assert (to_now["start_date"], to_now["end_date"], to_now["days"]) == (f"{year}-03-01", today, None)
+
+    date_range = route("BNB 1月5日到2月10日的歷史價格")
+    assert (date_range["start_date"], date_range["end_date"]) == (f"{year}-01-05", f"{year}-02-10")
+
+    assert route("SOL 過去 400 天走勢")["days"] == 365
+    assert route("ada 最近一週走勢")["days"] == 7
+    assert route("XRP 走勢")["days"] == 30
+    assert route("XRP 30日")["has_time_range"]
+    assert route("BTC 價格")["days"] is None
+
+
+def test_parse_date_formats():
+    assert parse_date("2024-1-5") == "2024-01-05"
+    assert parse_date("3/7", year=2024) == "2024-03-07"
+    assert parse_date("12-25", year=2024) == "2024-12-25"
+    assert parse_date("6月1日", year=2024) == "2024-06-01"
+    assert parse_date("yesterday") is None
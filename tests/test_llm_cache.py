@@ -0,0 +1,63 @@
+"""
+Tests for the LLM response cache
+"""
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend.models.llm_cache import LLMResponseCache, prompt_key, strip_volatile
+
+
+def test_key_ignores_volatile_fields_and_dict_order():
+    a = {"price": 100, "timestamp": "2024-01-01T00:00:00", "meta": {"timestamp": 1, "source": "x"}}
+    b = {"meta": {"source": "x", "timestamp": 2}, "price": 100, "timestamp": "2024-01-02T00:00:00"}
+
+    assert prompt_key("m", strip_volatile(a)) == prompt_key("m", strip_volatile(b))
+    assert prompt_key("m", strip_volatile(a)) != prompt_key("other", strip_volatile(a))
+
+
+def test_lru_eviction_and_ttl():
+    cache = LLMResponseCache(max_entries=2, ttl=60)
+    cache.put("a", "A")
+    cache.put("b", "B")
+    assert cache.get("a") == "A"  # a is now most recent
+    cache.put("c", "C")
+
+    assert cache.get("b") is None
+    assert cache.get("a") == "A"
+    cache.put("d", "D", ttl=0)
+    assert cache.get("d") is None
+
+
+def test_disk_tier_survives_new_instance_and_skips_uncacheable(tmp_path):
+    cache = LLMResponseCache(ttl=60, disk_dir=str(tmp_path))
+    calls = []
+
+    def generate():
+        calls.append(1)
+        return "答案"
+
+    assert cache.get_or_generate("k", generate) == "答案"
+    assert cache.get_or_generate("k", generate) == "答案"
+    assert len(calls) == 1
+
+    fresh = LLMResponseCache(ttl=60, disk_dir=str(tmp_path))
+    assert fresh.get("k") == "答案"
+    assert fresh.stats()["disk_hits"] == 1
+
+    assert fresh.get_or_generate("err", lambda: "失敗", cacheable=lambda v: False) == "失敗"
+    assert fresh.get("err") is None
+
+
+def test_interpretation_key_changes_with_template(monkeypatch):
+    import orchestrator.agent as agent_module
+    agent = agent_module.CryptoAgent(fast_path=False)
+    results = [{"tool": "get_current_price", "result": {"price_usd": 1.0, "timestamp": "now"}}]
+
+    prompt, key = agent._interpretation_prompt("BTC?", results)
+    assert prompt.startswith("用戶問：BTC?")
+    monkeypatch.setattr(agent_module, "INTERPRETATION_TEMPLATE", "Answer in English.\n{user_message}\n{result_text}")
+    _, edited_key = agent._interpretation_prompt("BTC?", results)
+
+    assert prompt_key(agent.model, key) != prompt_key(agent.model, edited_key)
@@ -0,0 +1,130 @@
+"""
+Tests for the MarketDataService cache: single-flight, fallback TTL and market cap fill
+"""
+import sys
+import os
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from data.scrapers.market_data import MarketDataService, mock_ohlcv, mock_ticker
+
+
+def _binance_like(pair):
+    return {"success": True, "symbol": pair, "price": 50000.0, "change_24h": 1.5,
+            "volume_24h": 1e9, "source": "binance"}
+
+
+def test_concurrent_misses_fetch_once(monkeypatch):
+    service = MarketDataService(history_ttl=60)
+    calls = []
+    lock = threading.Lock()
+
+    def fetch(base, pair, timeframe, limit):
+        with lock:
+            calls.append(pair)
+        time.sleep(0.05)
+        return mock_ohlcv(pair, limit) | {"source": "binance"}
+
+    monkeypatch.setattr(service, "_fetch_ohlcv", fetch)
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        results = list(pool.map(lambda _: service.get_ohlcv("BTC", "1d", 30), range(4)))
+
+    assert calls == ["BTC/USDT"]
+    assert all(r["data"] == results[0]["data"] for r in results)
+    assert service.stats()["misses"] == 1
+
+
+def test_mock_fallback_expires_quickly(monkeypatch):
+    service = MarketDataService(price_ttl=60, fallback_ttl=0.05)
+    calls = []
+
+    def fetch(base, pair):
+        calls.append(pair)
+        return mock_ticker(pair) if len(calls) == 1 else _binance_like(pair)
+
+    monkeypatch.setattr(service, "_fetch_ticker", fetch)
+    assert service.get_ticker("BTC")["source"] == "mock"
+    time.sleep(0.1)
+    assert service.get_ticker("BTC")["source"] == "binance"
+    assert service.get_ticker("BTC")["source"] == "binance"
+    assert len(calls) == 2
+
+
+def test_exchange_ticker_gets_coingecko_market_cap(monkeypatch):
+    service = MarketDataService(price_ttl=60)
+    lookups = []
+
+    def get_asset(base):
+        lookups.append(base)
+        return {"priceUsd": "49900", "marketCapUsd": "980000000000"}
+
+    monkeypatch.setattr(service, "_fetch_ticker", lambda base, pair: _binance_like(pair))
+    monkeypatch.setattr(service.coingecko, "get_asset", get_asset)
+
+    first = service.get_current_price("BTC")
+    second = service.get_current_price("BTC")
+
+    assert first["source"] == "binance"
+    assert first["price_usd"] == 50000.0
+    assert first["market_cap_usd"] == 980000000000.0
+    assert second["market_cap_usd"] == first["market_cap_usd"]
+    assert lookups == ["BTC"]
+
+
+def test_market_cap_failure_is_zero_not_error(monkeypatch):
+    service = MarketDataService(price_ttl=60)
+
+    def get_asset(base):
+        raise ConnectionError("coingecko down")
+
+    monkeypatch.setattr(service, "_fetch_ticker", lambda base, pair: _binance_like(pair))
+    monkeypatch.setattr(service.coingecko, "get_asset", get_asset)
+
+    price = service.get_current_price("BTC")
+    assert price["price_usd"] == 50000.0
+    assert price["market_cap_usd"] == 0.0
+
+
+def test_concurrent_async_misses_fetch_once(monkeypatch):
+    service = MarketDataService(price_ttl=60)
+    calls = []
+
+    async def afetch(base, pair):
+        calls.append(pair)
+        await asyncio.sleep(0.05)
+        return _binance_like(pair)
+
+    monkeypatch.setattr(service, "_afetch_ticker", afetch)
+
+    async def scenario():
+        first = await asyncio.gather(*(service.aget_ticker("BTC") for _ in range(5)))
+        again = await service.aget_ticker("BTC/USDT")
+        return first, again
+
+    first, again = asyncio.run(scenario())
+
+    assert calls == ["BTC/USDT"]
+    assert all(r is first[0] for r in first) and again is first[0]
+    assert service.stats() == {"entries": 1, "hits": 5, "misses": 1}
+
+
+def test_async_price_gets_coingecko_market_cap(monkeypatch):
+    service = MarketDataService(price_ttl=60)
+
+    class FakeAsyncCoinGecko:
+        async def get_asset(self, base):
+            return {"marketCapUsd": "1200"}
+
+    async def afetch(base, pair):
+        return _binance_like(pair)
+
+    monkeypatch.setattr(service, "_afetch_ticker", afetch)
+    service._async_coingecko = FakeAsyncCoinGecko()
+
+    price = asyncio.run(service.aget_current_price("ETH"))
+    assert price["source"] == "binance"
+    assert price["market_cap_usd"] == 1200.0
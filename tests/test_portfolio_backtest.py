@@ -0,0 +1,99 @@
+"""
+Tests for the multi-asset PortfolioBacktester: allocation rules, shared index and correlation
+"""
+import sys
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend.models.vectorized_backtest import PortfolioBacktester
+
+
+def _frame(closes, go, start='2024-01-01'):
+    """Feature frame whose 'go' column drives the test signal (1 = enter, -1 = exit)"""
+    closes = np.asarray(closes, dtype=float)
+    return pd.DataFrame({
+        'open': closes, 'high': closes, 'low': closes, 'close': closes,
+        'volume': np.ones(len(closes)), 'sentiment_score': 0.0, 'go': go,
+    }, index=pd.date_range(start, periods=len(closes), freq='D'))
+
+
+def _go_signals(indicators):
+    go = indicators.frame['go'].to_numpy()
+    return go == 1, go == -1
+
+
+def test_equal_and_signal_weights():
+    backtester = PortfolioBacktester()
+    returns = pd.DataFrame(0.0, index=range(3), columns=['A', 'B'])
+    positions = pd.DataFrame({'A': [1.0, 1.0, 0.0], 'B': [0.0, 1.0, 0.0]})
+
+    equal = backtester.allocation_weights('equal', returns, positions)
+    signal = backtester.allocation_weights('signal', returns, positions)
+
+    np.testing.assert_allclose(equal.to_numpy(), [[0.5, 0.0], [0.5, 0.5], [0.0, 0.0]])
+    np.testing.assert_allclose(signal.to_numpy(), [[1.0, 0.0], [0.5, 0.5], [0.0, 0.0]])
+    with pytest.raises(ValueError):
+        backtester.allocation_weights('kelly', returns, positions)
+
+
+def test_volatility_weights_are_inverse_volatility():
+    r = np.array([0.0, 0.01, -0.01, 0.02])
+    returns = pd.DataFrame({'A': r, 'B': 2 * r})
+    positions = pd.DataFrame({'A': [1.0] * 4, 'B': [1.0, 1.0, 1.0, 0.0]})
+
+    weights = PortfolioBacktester().allocation_weights('volatility', returns, positions, vol_window=2)
+
+    # No estimate on the first bar: equal weight; then B is twice as volatile as A
+    np.testing.assert_allclose(weights.to_numpy(), [[0.5, 0.5], [2 / 3, 1 / 3], [2 / 3, 1 / 3], [2 / 3, 0.0]])
+
+
+@pytest.mark.parametrize("commission", [0.0, 0.001])
+def test_single_symbol_equity_is_position_times_returns(commission):
+    closes = [100, 110, 99, 99, 108.9]
+    frame = _frame(closes, [1, 0, 0, -1, 0])
+
+    result = PortfolioBacktester(initial_cash=1000, commission=commission).run(
+        {'BTC': frame}, signal_fn=_go_signals)
+
+    returns = pd.Series(closes).pct_change().fillna(0.0).to_numpy()
+    held = np.array([0, 1, 1, 1, 0], dtype=float)
+    turnover = np.abs(np.diff(held, prepend=0.0))
+    expected = 1000 * np.cumprod(1 + held * returns - turnover * commission)
+
+    assert result['success'] and result['mode'] == 'single'
+    assert result['final_value'] == pytest.approx(expected[-1])
+    np.testing.assert_allclose(result['equity_curve']['values'], expected.round(2))
+    assert result['total_trades'] == 1
+    assert result['per_asset']['BTC']['time_in_market_pct'] == pytest.approx(60.0)
+
+
+def test_portfolio_uses_shared_index_and_reports_correlation():
+    r = np.array([0.0, 0.02, -0.01, 0.03, -0.02, 0.01])
+    a = _frame(100 * np.cumprod(1 + r), [1, 0, 0, 0, 0, 0])
+    # B starts a day earlier and ends a day later; its returns on the shared bars are -2x A's
+    b_closes = 50 * np.cumprod(1 - 2 * r)
+    b = _frame(np.r_[50.0, b_closes, 40.0], [1, 0, 0, 0, 0, 0, 0, 0], start='2023-12-31')
+
+    result = PortfolioBacktester(commission=0.0).run({'A': a, 'B': b}, allocation='equal', signal_fn=_go_signals)
+
+    assert result['mode'] == 'portfolio' and result['bars'] == len(a)
+    assert result['equity_curve']['timestamps'] == [t.isoformat() for t in a.index]
+    assert result['correlation_matrix']['A']['B'] == pytest.approx(-1.0)
+    assert result['correlation_matrix']['A']['A'] == pytest.approx(1.0)
+    # Both held from the second shared bar at half weight each
+    held = np.r_[0.0, np.ones(len(r) - 1)]
+    expected = 10000 * np.cumprod(1 + 0.5 * held * r + 0.5 * held * (-2 * r))
+    assert result['final_value'] == pytest.approx(expected[-1])
+
+
+def test_no_overlap_is_an_error():
+    a = _frame([1, 2, 3], [1, 0, 0], start='2024-01-01')
+    b = _frame([1, 2, 3], [1, 0, 0], start='2025-01-01')
+
+    result = PortfolioBacktester().run({'A': a, 'B': b}, signal_fn=_go_signals)
+    assert result == {"success": False, "error": "No overlapping bars across symbols"}
@@ -0,0 +1,35 @@
+"""
+Tests for the chat fast-path response templates
+"""
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from orchestrator.templates import render_tool_results
+
+
+def test_price_and_history_render_without_llm():
+    text = render_tool_results([
+        {"tool": "get_current_price", "arguments": {"symbol": "BTC"},
+         "result": {"symbol": "BTC", "price_usd": 100000.0, "change_24h_percent": -1.5,
+                    "volume_24h_usd": 1e9, "market_cap_usd": 0}},
+        {"tool": "get_price_history", "arguments": {"symbol": "BTC"},
+         "result": {"symbol": "BTC", "start_date": "2024-01-01", "end_date": "2024-01-03",
+                    "data": [{"price_usd": 100.0}, {"price_usd": 90.0}, {"price_usd": 110.0}]}},
+    ])
+
+    assert "$100,000.00" in text
+    assert "-1.50%" in text
+    assert "+10.00%" in text
+    assert "最高 $110.00" in text
+
+
+def test_errors_and_untemplated_tools_fall_back_to_llm():
+    assert render_tool_results([]) is None
+    assert render_tool_results([
+        {"tool": "get_current_price", "arguments": {}, "result": {"error": "無法取得"}}
+    ]) is None
+    assert render_tool_results([
+        {"tool": "run_backtest", "arguments": {}, "result": {"total_return": 0.1}}
+    ]) is None
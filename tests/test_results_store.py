@@ -0,0 +1,88 @@
+"""
+Tests for the SQLite backtest results store
+"""
+import sys
+import os
+import json
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend.models.results_store import BacktestResultsStore
+
+
+def _result(i, symbol='BTC/USDT', strategy='macd', **extra):
+    return {
+        'timestamp': f'2024-01-{i + 1:02d}T00:00:00', 'symbol': symbol, 'strategy': strategy,
+        'timeframe': '1d', 'total_return_pct': float(i), 'total_trades': i, 'params': {'fast': i},
+        **extra,
+    }
+
+
+@pytest.fixture
+def store(tmp_path):
+    return BacktestResultsStore(str(tmp_path / 'results.db'))
+
+
+def test_save_many_appends(store):
+    first = store.save_many([_result(0), _result(1)])
+    second = store.save_many([_result(0)])
+
+    assert len(first) == 2 and second[0] > first[1]
+    page = store.query(limit=10)
+    assert page['total'] == 3
+    # Same run saved twice is kept twice; newest timestamp first, then newest id
+    assert [r['id'] for r in page['results']] == [first[1], second[0], first[0]]
+    assert page['results'][0]['params'] == {'fast': 1}
+
+
+def test_symbol_and_strategy_filters(store):
+    store.save_many([_result(0), _result(1, symbol='ETH/USDT'), _result(2, strategy='technical'),
+                     _result(3, symbol='ETH/USDT', strategy='technical')])
+
+    assert store.query(symbol='ETH/USDT')['total'] == 2
+    assert store.query(strategy='technical')['total'] == 2
+    both = store.query(symbol='ETH/USDT', strategy='technical')
+    assert both['total'] == 1 and both['results'][0]['total_trades'] == 3
+
+
+def test_page_and_offset(store):
+    store.save_many([_result(i) for i in range(7)])
+
+    page2 = store.query(limit=3, page=2)
+    assert [r['total_trades'] for r in page2['results']] == [3, 2, 1]
+    assert (page2['offset'], page2['page'], page2['total']) == (3, 2, 7)
+
+    # An explicit offset overrides the page
+    shifted = store.query(limit=3, page=1, offset=5)
+    assert [r['total_trades'] for r in shifted['results']] == [1, 0]
+    assert shifted['page'] == 2
+    assert store.query(limit=3, page=4)['results'] == []
+
+
+def test_equity_curve_round_trip(store):
+    curve = {'timestamps': ['2024-01-01T00:00:00', '2024-01-01T04:00:00', '2024-01-01T08:00:00'],
+             'values': [10000.0, 10012.345, 9990.5], 'positions': [0.0, 0.5, 1.25]}
+    result_id = store.save(_result(0, equity_curve=curve))
+
+    loaded = store.get(result_id)['equity_curve']
+    assert loaded['timestamps'] == curve['timestamps']
+    # float32 storage, rounded to cents on the way out
+    assert loaded['values'] == pytest.approx(curve['values'], abs=0.01)
+    assert loaded['positions'] == [0.0, 0.5, 1.25]
+    # Listing skips the blobs unless asked for
+    assert 'equity_curve' not in store.query()['results'][0]
+    assert store.query(include_equity=True)['results'][0]['equity_curve']['timestamps'] == curve['timestamps']
+
+
+def test_migrate_legacy_json(store, tmp_path):
+    legacy = tmp_path / 'backtest_results.json'
+    legacy.write_text(json.dumps([_result(0), _result(1, symbol='ETH/USDT'), {'symbol': 'no timestamp'}]))
+
+    assert store.migrate_json(str(legacy)) == 2
+    assert not legacy.exists() and (tmp_path / 'backtest_results.json.migrated').exists()
+    assert store.query()['total'] == 2
+    assert store.query(symbol='ETH/USDT')['results'][0]['params'] == {'fast': 1}
+    # Running again is a no-op
+    assert store.migrate_json(str(legacy)) == 0
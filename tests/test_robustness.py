@@ -0,0 +1,64 @@
+"""
+Tests for the block-bootstrap robustness analysis
+"""
+import sys
+import os
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend.models import robustness
+from backend.models.robustness import analyze_robustness, block_bootstrap_indices, bootstrap
+
+
+def _result(n_bars=400, n_trades=40, seed=5):
+    rng = np.random.default_rng(seed)
+    values = 10000 * np.cumprod(1 + rng.normal(0.0005, 0.01, n_bars))
+    trades = [{"size": 1.0, "entry_price": 100.0, "pnl_net": float(pnl)}
+              for pnl in rng.normal(1.0, 5.0, n_trades)]
+    return {
+        "equity_curve": {
+            "values": values.tolist(),
+            "timestamps": [str(t) for t in pd.date_range('2023-01-01', periods=n_bars, freq='D')],
+        },
+        "trades_log": trades,
+    }
+
+
+def test_block_indices_shape_and_contiguity():
+    idx = block_bootstrap_indices(10, 7, 4, np.random.default_rng(0))
+
+    assert idx.shape == (7, 10)
+    assert idx.min() >= 0 and idx.max() < 10
+    # Within each block of 4 the indices advance by one (wrapping at the end)
+    blocks = idx[:, :8].reshape(7, 2, 4)
+    assert ((np.diff(blocks, axis=2) % 10) == 1).all()
+
+
+def test_bootstrap_shape_and_seed_determinism(monkeypatch):
+    returns = np.random.default_rng(1).normal(0, 0.01, 50)
+    monkeypatch.setattr(robustness, "CHUNK_SAMPLES", 64)
+
+    first = bootstrap(returns, 150, 3, 365.0, seed=42)
+    second = bootstrap(returns, 150, 3, 365.0, seed=42)
+    other = bootstrap(returns, 150, 3, 365.0, seed=43)
+
+    for name in ("total_return_pct", "sharpe_ratio", "max_drawdown_pct"):
+        assert first[name].shape == (150,)
+        np.testing.assert_array_equal(first[name], second[name])
+    assert not np.array_equal(first["total_return_pct"], other["total_return_pct"])
+
+
+def test_analysis_block_resamples_trades_deterministically():
+    result = _result()
+
+    first = analyze_robustness(result, n_samples=300, seed=7)
+    second = analyze_robustness(result, n_samples=300, seed=7)
+
+    assert first["success"] and first == second
+    assert first["block_size"] == robustness.default_block_size(399)
+    trade = first["trade_bootstrap"]
+    assert trade["trades"] == 40 and trade["block_size"] == robustness.default_block_size(40) > 1
+    assert trade["total_return_pct"]["ci_lower"] <= trade["total_return_pct"]["ci_upper"]
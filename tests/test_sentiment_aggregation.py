@@ -0,0 +1,126 @@
+"""
+Tests that sentiment series aggregated from the corpus score store match the
+series aggregated by running the model over the news
+"""
+import sys
+import os
+import hashlib
+import shutil
+
+import numpy as np
+import pandas as pd
+import pytest
+import torch
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import backend.models.sentiment_analyzer as sentiment_analyzer_module
+from backend.models.corpus_scoring import _score_shard
+from backend.models.sentiment_analyzer import FinBERTSentimentAnalyzer
+from backend.models.sentiment_timeseries import SentimentTimeSeriesProcessor
+
+
+class FakeAnalyzer:
+    """Deterministic stand-in for FinBERT: scores derived from a hash of the text"""
+
+    salt = ''
+
+    def __init__(self, model_name=None):
+        self.calls = 0
+
+    def analyze_batch(self, texts):
+        self.calls += len(texts)
+        results = []
+        for text in texts:
+            digest = hashlib.sha256((self.salt + text).encode('utf-8')).digest()
+            logits = np.frombuffer(digest[:3], dtype=np.uint8) / 64.0
+            scores = np.exp(logits) / np.exp(logits).sum()
+            results.append(FinBERTSentimentAnalyzer._build_result(scores))
+        return results
+
+    aggregate_sentiment = staticmethod(FinBERTSentimentAnalyzer.aggregate_sentiment)
+
+
+@pytest.fixture
+def news():
+    rng = np.random.default_rng(11)
+    times = pd.Timestamp('2024-03-01') + pd.to_timedelta(np.sort(rng.uniform(0, 6 * 24, 60)), unit='h')
+    return pd.DataFrame({
+        'newsDatetime': times,
+        'title': [f"Bitcoin headline {i}" for i in range(60)],
+        'description': [f"Market update number {i} for BTC" for i in range(60)],
+    })
+
+
+class UpgradedAnalyzer(FakeAnalyzer):
+    """A different model: same texts, different scores"""
+    salt = 'v2'
+
+
+def _store_scores(processor, news_df, monkeypatch, analyzer_class=FakeAnalyzer):
+    """Write article scores through the corpus scoring worker"""
+    monkeypatch.setattr(sentiment_analyzer_module, "FinBERTSentimentAnalyzer", analyzer_class)
+    articles = processor.build_article_texts(news_df)
+    records = articles.assign(newsDatetime=articles['newsDatetime'].astype(str)).to_dict('records')
+    store_dir = processor.article_scores_dir()
+    os.makedirs(store_dir, exist_ok=True)
+    threads = torch.get_num_threads()
+    try:
+        _score_shard(0, records, 'fake', 1, 16, store_dir)
+    finally:
+        torch.set_num_threads(threads)
+
+
+def _series(processor, news_df, analyzer, timeframe, use_cache=False):
+    series = processor.preprocess_sentiment_timeseries(news_df, analyzer, timeframe, 'BTC', use_cache=use_cache)
+    return series.sort_values('timestamp').reset_index(drop=True)
+
+
+@pytest.mark.parametrize("timeframe", ["1d", "12h"])
+def test_store_aggregation_matches_model_aggregation(tmp_path, news, monkeypatch, timeframe):
+    model_processor = SentimentTimeSeriesProcessor(str(tmp_path / 'model'))
+    store_processor = SentimentTimeSeriesProcessor(str(tmp_path / 'store'))
+    _store_scores(store_processor, news, monkeypatch)
+
+    expected = _series(model_processor, news, FakeAnalyzer(), timeframe)
+    analyzer = FakeAnalyzer()
+    actual = _series(store_processor, news, analyzer, timeframe)
+
+    assert analyzer.calls == 0
+    assert len(expected) > 1
+    pd.testing.assert_frame_equal(actual, expected[actual.columns], check_dtype=False, rtol=1e-9)
+
+
+def test_articles_missing_from_store_are_scored_by_model(tmp_path, news, monkeypatch):
+    model_processor = SentimentTimeSeriesProcessor(str(tmp_path / 'model'))
+    store_processor = SentimentTimeSeriesProcessor(str(tmp_path / 'store'))
+    _store_scores(store_processor, news.iloc[::2], monkeypatch)
+
+    expected = _series(model_processor, news, FakeAnalyzer(), '1d')
+    analyzer = FakeAnalyzer()
+    actual = _series(store_processor, news, analyzer, '1d')
+
+    assert analyzer.calls == 30
+    pd.testing.assert_frame_equal(actual, expected[actual.columns], check_dtype=False, rtol=1e-9)
+
+
+def test_cached_series_follows_a_rescored_corpus(tmp_path, news, monkeypatch):
+    processor = SentimentTimeSeriesProcessor(str(tmp_path / 'store'))
+    _store_scores(processor, news, monkeypatch)
+    first = _series(processor, news, FakeAnalyzer(), '1d', use_cache=True)
+    pd.testing.assert_frame_equal(_series(processor, news, FakeAnalyzer(), '1d', use_cache=True), first,
+                                  check_dtype=False, rtol=1e-9)
+
+    # Re-score the corpus from scratch, as score_news_corpus.py --force does
+    shutil.rmtree(processor.article_scores_dir())
+    _store_scores(processor, news, monkeypatch, UpgradedAnalyzer)
+    analyzer = FakeAnalyzer()
+    rescored = _series(processor, news, analyzer, '1d', use_cache=True)
+
+    expected = _series(SentimentTimeSeriesProcessor(str(tmp_path / 'model')), news, UpgradedAnalyzer(), '1d')
+    assert analyzer.calls == 0
+    assert not np.allclose(rescored['sentiment_score'], first['sentiment_score'])
+    pd.testing.assert_frame_equal(rescored, expected[rescored.columns], check_dtype=False, rtol=1e-9)
+    # The series built from the old scores is gone
+    assert [n for n in os.listdir(processor.cache_dir) if n.endswith('.csv')] == \
+        [os.path.basename(processor.sentiment_cache_file('BTC', '1d'))]
@@ -0,0 +1,85 @@
+"""
+Tests for the FinBERT token-budget batch scheduler
+"""
+import sys
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+
+import torch
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend.models.sentiment_analyzer import FinBERTSentimentAnalyzer, plan_token_budget_batches
+
+
+def test_batches_cover_every_index_once():
+    lengths = [5, 300, 20, 22, 512, 7]
+    batches = plan_token_budget_batches(lengths, token_budget=1024, max_batch_size=3)
+
+    flat = sorted(i for batch in batches for i in batch)
+    assert flat == list(range(len(lengths)))
+
+
+def test_batches_respect_token_budget_and_size():
+    lengths = [12, 18, 25, 30, 480, 510, 20, 16]
+    batches = plan_token_budget_batches(lengths, token_budget=600, max_batch_size=4)
+
+    for batch in batches:
+        assert len(batch) <= 4
+        padded = max(lengths[i] for i in batch) * len(batch)
+        # A single text longer than the budget still forms its own batch
+        assert padded <= 600 or len(batch) == 1
+
+
+def test_short_texts_are_not_batched_with_long_ones():
+    lengths = [20, 512, 22, 24]
+    batches = plan_token_budget_batches(lengths, token_budget=1024, max_batch_size=64)
+
+    assert [1] in batches
+
+
+class _NonReentrantTokenizer:
+    """Fails like a fast tokenizer ("Already borrowed") when entered by two threads at once"""
+
+    def __init__(self):
+        self._busy = False
+
+    def _enter(self):
+        if self._busy:
+            raise RuntimeError("Already borrowed")
+        self._busy = True
+        time.sleep(0.002)
+        self._busy = False
+
+    def __call__(self, texts, truncation=True, max_length=512):
+        self._enter()
+        return {'input_ids': [[1] * (len(t) % 7 + 2) for t in texts]}
+
+    def pad(self, features, return_tensors='pt'):
+        self._enter()
+        width = max(len(f['input_ids']) for f in features)
+        return {'input_ids': torch.ones(len(features), width, dtype=torch.long)}
+
+
+class _FakeModel:
+    def __call__(self, input_ids):
+        return SimpleNamespace(logits=torch.tensor([[0.0, 0.0, 3.0]]).repeat(len(input_ids), 1))
+
+
+def test_concurrent_batches_do_not_share_the_tokenizer():
+    analyzer = FinBERTSentimentAnalyzer.__new__(FinBERTSentimentAnalyzer)
+    analyzer.tokenizer = _NonReentrantTokenizer()
+    analyzer.model = _FakeModel()
+    analyzer.device = torch.device('cpu')
+    analyzer._inference_lock = threading.Lock()
+    analyzer._tokenizer_lock = threading.Lock()
+
+    texts = [f"headline {i}" for i in range(12)]
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        results = list(pool.map(lambda _: analyzer.analyze_batch(texts, token_budget=16, max_batch_size=4),
+                                range(16)))
+
+    assert all('error' not in r and r['sentiment'] == 'positive' for batch in results for r in batch)
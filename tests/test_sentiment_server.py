@@ -0,0 +1,70 @@
+"""
+Round-trip tests for the out-of-process sentiment server and its client
+"""
+import sys
+import os
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend.models.sentiment_server import SentimentClient, SentimentInferenceServer, wait_for_server
+
+
+class FakeAnalyzer:
+    """Labels texts by keyword and records each forward pass"""
+
+    def __init__(self):
+        self.batches = []
+        self._lock = threading.Lock()
+
+    def analyze_batch(self, texts):
+        with self._lock:
+            self.batches.append(list(texts))
+        results = []
+        for text in texts:
+            label = 'positive' if 'up' in text else 'negative' if 'down' in text else 'neutral'
+            scores = {'negative': 0.0, 'neutral': 0.0, 'positive': 0.0, label: 1.0}
+            results.append({'text': text, 'sentiment': label, 'confidence': 1.0, 'scores': scores})
+        return results
+
+
+def _start_server(address, authkey='test-key'):
+    server = SentimentInferenceServer(address=address, authkey=authkey, max_latency_ms=50)
+    server.analyzer = FakeAnalyzer()
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def test_round_trip_batches_concurrent_clients():
+    with tempfile.TemporaryDirectory() as tmp:
+        address = os.path.join(tmp, 'finbert.sock')
+        server = _start_server(address)
+        client = SentimentClient(address, authkey='test-key')
+        wait_for_server(address, timeout=10, authkey='test-key')
+
+        texts = [f"BTC up {i}" if i % 2 else f"ETH down {i}" for i in range(8)]
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            results = list(pool.map(lambda t: client.analyze_sentiment(t), texts))
+
+        assert [r['text'] for r in results] == texts
+        assert [r['sentiment'] for r in results] == ['negative', 'positive'] * 4
+        assert sum(len(b) for b in server.analyzer.batches) == 8
+        assert len(server.analyzer.batches) < 8
+        server.shutdown()
+
+
+def test_failures_return_neutral_results():
+    with tempfile.TemporaryDirectory() as tmp:
+        address = os.path.join(tmp, 'finbert.sock')
+
+        missing = SentimentClient(address, authkey='test-key').analyze_batch(['a', 'b'])
+        assert [r['sentiment'] for r in missing] == ['neutral', 'neutral']
+        assert all('error' in r for r in missing)
+
+        server = _start_server(address)
+        wait_for_server(address, timeout=10, authkey='test-key')
+        wrong_key = SentimentClient(address, authkey='other-key')
+        assert wrong_key.analyze_sentiment('BTC up')['sentiment'] == 'neutral'
+        server.shutdown()
@@ -0,0 +1,47 @@
+"""
+Tests for the per-session agent store
+"""
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from orchestrator.sessions import SessionStore
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_sessions_are_isolated_and_reset_individually():
+    store = SessionStore(object, max_sessions=10, idle_timeout=60, clock=FakeClock())
+    a, b = store.get("a"), store.get("b")
+
+    assert a is not b
+    assert store.get("a") is a
+    assert store.reset("a")
+    assert store.get("a") is not a
+    assert store.get("b") is b
+
+
+def test_lru_cap_and_idle_eviction():
+    clock = FakeClock()
+    store = SessionStore(object, max_sessions=2, idle_timeout=60, clock=clock)
+    store.get("a")
+    store.get("b")
+    store.get("a")  # b is now least recently used
+    store.get("c")
+
+    assert "b" not in store
+    assert "a" in store and "c" in store
+
+    clock.now = 30
+    store.get("c")
+    clock.now = 70
+    assert store.sweep() == 1  # a idle for 70s, c for 40s
+    assert "a" not in store and "c" in store
+    assert store.stats()["evicted"] == 2
@@ -0,0 +1,104 @@
+"""
+Tests for declarative strategy spec compilation
+"""
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from backend.models import indicators as ind
+from backend.models.strategy_spec import StrategySpecError, validate_spec
+
+
+def make_frame(n=300, seed=0):
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, n)))
+    index = pd.date_range('2024-01-01', periods=n, freq='D')
+    return pd.DataFrame({'open': close, 'high': close * 1.01, 'low': close * 0.99,
+                         'close': close, 'volume': 1000.0}, index=index)
+
+
+def test_template_matches_manual_crossover():
+    frame = make_frame()
+    compiled = validate_spec({"type": "sma_crossover",
+                              "parameters": {"short_period": 10, "long_period": 30}})
+    entries, exits = compiled.signals(frame)
+
+    cross = ind.crossover(ind.sma(frame['close'], 10), ind.sma(frame['close'], 30)).to_numpy()
+    assert np.array_equal(entries, cross > 0)
+    assert np.array_equal(exits, cross < 0)
+    assert entries.any() and exits.any()
+
+
+def test_weighted_combination_uses_threshold():
+    frame = make_frame()
+    rsi = ind.rsi(frame['close'], 14).to_numpy()
+    below_mid = (frame['close'] < ind.bollinger_bands(frame['close'], 20, 2)[0]).to_numpy()
+    spec = {
+        "type": "rules",
+        "entry": {"weighted": [
+            {"condition": {"left": "rsi(14)", "op": "<", "right": 40}, "weight": 2},
+            {"condition": {"left": "close", "op": "<", "right": "bb_mid(20, 2)"}, "weight": 1},
+        ], "threshold": 0.6},
+        "exit": {"left": {"indicator": "rsi", "period": 14}, "op": ">", "right": 60},
+    }
+    entries, exits = validate_spec(spec).signals(frame)
+
+    with np.errstate(invalid='ignore'):
+        expected = (2 * (rsi < 40) + below_mid) / 3 >= 0.6
+        assert np.array_equal(entries, expected)
+        assert np.array_equal(exits, rsi > 60)
+
+
+def test_crossing_a_constant_level():
+    frame = make_frame()
+    spec = {"type": "rules",
+            "entry": {"left": "rsi(14)", "op": "crosses_above", "right": 30},
+            "exit": {"left": 70, "op": "crosses_above", "right": "rsi(14)"}}
+    entries, exits = validate_spec(spec).signals(frame)
+
+    level = pd.Series(30.0, index=frame.index)
+    rsi = ind.rsi(frame['close'], 14)
+    assert np.array_equal(entries, ind.crossover(rsi, level).to_numpy() > 0)
+    assert np.array_equal(exits, ind.crossover(pd.Series(70.0, index=frame.index), rsi).to_numpy() > 0)
+    assert entries.any()
+
+
+def test_named_parameters_map_by_name():
+    frame = make_frame()
+    by_name = validate_spec({"type": "rules",
+                             "entry": {"left": "close", "op": "<",
+                                       "right": {"indicator": "bb_lower", "devs": 1.5, "period": 10}},
+                             "exit": {"left": "close", "op": ">",
+                                      "right": {"indicator": "bb_mid", "period": 10}}})
+    positional = validate_spec({"type": "rules",
+                                "entry": {"left": "close", "op": "<", "right": "bb_lower(10, 1.5)"},
+                                "exit": {"left": "close", "op": ">", "right": "bb_mid(10, 2)"}})
+
+    assert ('bb_lower', (10.0, 1.5)) in by_name.operands
+    for got, expected in zip(by_name.signals(frame), positional.signals(frame)):
+        assert np.array_equal(got, expected)
+
+
+@pytest.mark.parametrize("config", [
+    {"type": "unknown_template"},
+    {"type": "rules", "entry": {"left": "rsi(14)", "op": "<", "right": 30}},
+    {"type": "rules", "entry": {"left": "foo(3)", "op": "<", "right": 1},
+     "exit": {"left": "close", "op": ">", "right": 1}},
+    {"type": "rules", "entry": {"left": "rsi(14)", "op": "~", "right": 1},
+     "exit": {"left": "close", "op": ">", "right": 1}},
+    {"type": "rules", "entry": {"left": 1, "op": "<", "right": 2},
+     "exit": {"left": "close", "op": ">", "right": 1}},
+    {"type": "rules", "entry": {"left": "close", "op": "<",
+                                "right": {"indicator": "bb_lower", "period": 20, "stdev": 2}},
+     "exit": {"left": "close", "op": ">", "right": 1}},
+    {"type": "rules", "entry": {"weighted": ["rsi(14) < 30"]},
+     "exit": {"left": "close", "op": ">", "right": 1}},
+])
+def test_invalid_specs_are_rejected(config):
+    with pytest.raises(StrategySpecError):
+        validate_spec(config)
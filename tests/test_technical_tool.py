@@ -0,0 +1,98 @@
+"""
+Tests for the get_technical_analysis tool: indicator series against reference
+implementations, multi-symbol shape and the trend with short history
+"""
+import sys
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import backend.data_context as data_context_module
+from mcp.tools import _technical_lookback, execute_tool
+
+
+def _closes(n, seed):
+    return 100 * np.exp(np.cumsum(np.random.default_rng(seed).normal(0, 0.03, n)))
+
+
+class FakeData:
+    """price_history over fixed daily closes per symbol (an unknown symbol has none)"""
+
+    def __init__(self, closes):
+        self.closes = closes
+
+    def price_history(self, symbol, days=30, **kwargs):
+        closes = self.closes.get(symbol)
+        if closes is None:
+            return {"success": False, "data": [], "source": "unavailable"}
+        days_index = pd.date_range(end='2024-06-30', periods=len(closes), freq='D')
+        points = [{"timestamp": t.isoformat(), "price_usd": float(c)} for t, c in zip(days_index, closes)]
+        return {"success": True, "data": points[-days:], "source": "binance"}
+
+
+@pytest.fixture
+def data(monkeypatch):
+    fake = FakeData({"BTC": _closes(200, 1), "ETH": _closes(200, 2), "NEW": _closes(30, 3)})
+    monkeypatch.setattr(data_context_module, "current_data", lambda: fake)
+    return fake
+
+
+def _wilder_rsi(close, period):
+    """Textbook Wilder RSI, one bar at a time"""
+    delta = np.diff(close)
+    gains, losses = np.clip(delta, 0, None), np.clip(-delta, 0, None)
+    out = np.full(len(close), np.nan)
+    avg_gain, avg_loss = gains[:period].mean(), losses[:period].mean()
+    for t in range(period, len(close)):
+        if t > period:
+            avg_gain = (avg_gain * (period - 1) + gains[t - 1]) / period
+            avg_loss = (avg_loss * (period - 1) + losses[t - 1]) / period
+        out[t] = 100.0 if avg_loss == 0 else 100 - 100 / (1 + avg_gain / avg_loss)
+    return out
+
+
+def _as_array(values):
+    return np.array([np.nan if v is None else v for v in values])
+
+
+def test_series_match_reference(data):
+    result = execute_tool("get_technical_analysis", {"symbol": "BTC", "days": 60, "sma_periods": [10, 30],
+                                                      "rsi_period": 14, "volatility_window": 7})
+    series = result["series"]
+    # The tool fetches its warm-up on top of the requested days; RSI is seeded at the first fetched bar
+    close = pd.Series(data.closes["BTC"][-(60 + _technical_lookback([10, 30], 14, 7)):])
+    tail = slice(-60, None)
+
+    assert len(series["timestamps"]) == 60 and series["timestamps"][-1] == "2024-06-30"
+    np.testing.assert_allclose(_as_array(series["close"]), close.iloc[tail].round(4))
+    np.testing.assert_allclose(_as_array(series["rsi_14"]), np.round(_wilder_rsi(close.to_numpy(), 14)[tail], 4))
+    for period in (10, 30):
+        np.testing.assert_allclose(_as_array(series[f"sma_{period}"]),
+                                   close.rolling(period).mean().iloc[tail].round(4))
+    np.testing.assert_allclose(_as_array(series["volatility_7d"]),
+                               close.pct_change().rolling(7).std(ddof=0).iloc[tail].round(4), atol=1e-4)
+    assert result["trend"] == ("上升" if close.iloc[-1] > close.rolling(10).mean().iloc[-1] else "下降")
+
+
+def test_multiple_symbols_report_results_and_missing(data):
+    result = execute_tool("get_technical_analysis", {"symbols": ["btc", "eth", "nope"], "days": 30})
+
+    assert result["symbols"] == ["BTC", "ETH", "NOPE"]
+    assert sorted(result["results"]) == ["BTC", "ETH"] and result["missing"] == ["NOPE"]
+    for sym, single in result["results"].items():
+        alone = execute_tool("get_technical_analysis", {"symbol": sym, "days": 30})
+        assert single["indicators"] == alone["indicators"]
+        assert single["series"] == alone["series"]
+
+
+def test_trend_reports_insufficient_history(data):
+    # 30 days of history cannot fill the 50-day SMA
+    result = execute_tool("get_technical_analysis", {"symbol": "NEW", "days": 30, "sma_periods": [50]})
+
+    assert result["trend"] == "數據不足"
+    assert "sma_50" not in result["indicators"]
+    assert all(v is None for v in result["series"]["sma_50"])
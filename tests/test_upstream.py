@@ -0,0 +1,153 @@
+"""
+Tests for upstream rate limiting and circuit breaking
+"""
+import sys
+import os
+import asyncio
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+
+from data.scrapers.upstream import CircuitBreaker, TokenBucket, Upstream, UpstreamUnavailable
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+def test_token_bucket_limits_burst_and_refills():
+    clock = FakeClock()
+    bucket = TokenBucket(rate=0.5, capacity=2, clock=clock, sleep=clock.sleep)
+
+    assert bucket.try_acquire() == 0
+    assert bucket.try_acquire() == 0
+    assert bucket.try_acquire() == pytest.approx(2.0)
+    assert not bucket.acquire(timeout=1.0)
+
+    assert bucket.acquire(timeout=5.0)
+    assert clock.now == pytest.approx(2.0)
+
+
+def test_breaker_opens_then_half_opens_after_cooldown():
+    clock = FakeClock()
+    breaker = CircuitBreaker(failure_threshold=2, cooldown=30, clock=clock)
+
+    for _ in range(2):
+        assert breaker.allow()
+        breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    assert not breaker.allow()
+
+    clock.now = 31
+    assert breaker.allow()
+    # Only one trial call while half-open
+    assert not breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+
+    clock.now = 62
+    assert breaker.allow()
+    breaker.record_success()
+    status = breaker.status()
+    assert status['state'] == CircuitBreaker.CLOSED
+    assert status['times_opened'] == 1
+    assert status['rejected'] == 2
+    assert status['total_open_seconds'] == pytest.approx(62)
+
+
+def test_upstream_skips_dead_source_without_calling_it():
+    upstream = Upstream('test', rate_per_minute=600, burst=10,
+                        failure_threshold=1, cooldown=60, max_wait=0)
+    calls = []
+
+    def failing():
+        calls.append(1)
+        raise ConnectionError("down")
+
+    with pytest.raises(ConnectionError):
+        upstream.call(failing)
+    with pytest.raises(UpstreamUnavailable):
+        upstream.call(failing)
+    assert len(calls) == 1
+    assert upstream.status()['state'] == 'open'
+
+
+def test_bad_symbol_does_not_open_the_circuit():
+    import ccxt
+
+    upstream = Upstream('test', rate_per_minute=600, burst=10,
+                        failure_threshold=1, cooldown=60, max_wait=0)
+
+    def unknown_pair():
+        raise ccxt.BadSymbol("binance does not have market symbol FOO/USDT")
+
+    for _ in range(3):
+        with pytest.raises(ccxt.BadSymbol):
+            upstream.call(unknown_pair)
+    assert upstream.status()['state'] == 'closed'
+    assert upstream.call(lambda: 'ok') == 'ok'
+
+
+def test_client_errors_are_configurable():
+    class QuotaExhausted(Exception):
+        pass
+
+    upstream = Upstream('test', rate_per_minute=600, burst=10, failure_threshold=1,
+                        cooldown=60, max_wait=0, client_errors=(QuotaExhausted,))
+
+    def fail(error):
+        raise error
+
+    with pytest.raises(QuotaExhausted):
+        upstream.call(fail, QuotaExhausted())
+    assert upstream.status()['state'] == 'closed'
+    with pytest.raises(ValueError):
+        upstream.call(fail, ValueError("counted"))
+    assert upstream.status()['state'] == 'open'
+
+
+def test_acall_accounts_like_call():
+    upstream = Upstream('test', rate_per_minute=600, burst=10,
+                        failure_threshold=2, cooldown=60, max_wait=0)
+
+    async def ok():
+        return 'ok'
+
+    async def down():
+        raise ConnectionError("down")
+
+    async def bad_input():
+        raise ValueError("unknown symbol")
+
+    async def scenario():
+        assert await upstream.acall(ok) == 'ok'
+        with pytest.raises(ValueError):
+            await upstream.acall(bad_input)
+
+        # A cancelled caller is neither a success nor a failure
+        slow = asyncio.ensure_future(upstream.acall(asyncio.sleep, 10))
+        await asyncio.sleep(0)
+        slow.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await slow
+        assert upstream.status()['state'] == 'closed'
+
+        for _ in range(2):
+            with pytest.raises(ConnectionError):
+                await upstream.acall(down)
+        with pytest.raises(UpstreamUnavailable):
+            await upstream.acall(ok)
+
+    asyncio.run(scenario())
+
+    status = upstream.status()
+    assert status['state'] == 'open'
+    assert (status['successes'], status['failures'], status['rejected']) == (1, 2, 1)
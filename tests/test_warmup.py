@@ -0,0 +1,39 @@
+"""
+Tests for the warm-up state behind /healthz and /readyz
+"""
+import sys
+import os
+import threading
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import backend.warmup as warmup
+from orchestrator import handlers
+
+
+def test_not_ready_before_configured_warmup_starts(monkeypatch):
+    monkeypatch.setattr(warmup, "_warmup", None)
+    monkeypatch.setattr(warmup.Config, "WARMUP_COMPONENTS", ["news_index"])
+    monkeypatch.setattr(warmup.Config, "PRELOAD_MODELS", [])
+
+    payload, status = handlers.readiness_reply()
+    assert status == 503
+    assert payload["components"]["news_index"]["state"] == "pending"
+
+    monkeypatch.setattr(warmup.Config, "WARMUP_COMPONENTS", [])
+    assert handlers.readiness_reply()[1] == 200
+
+
+def test_ready_once_components_load(monkeypatch):
+    loaded = threading.Event()
+    monkeypatch.setattr(warmup, "_warmup", None)
+    monkeypatch.setattr(warmup.Config, "WARMUP_COMPONENTS", ["fake"])
+    monkeypatch.setattr(warmup.Config, "PRELOAD_MODELS", [])
+    monkeypatch.setitem(warmup.COMPONENTS, "fake", lambda: loaded.set() or {"ok": True})
+
+    state = warmup.start_warmup(lambda fn: fn())
+
+    assert loaded.is_set()
+    assert warmup.get_warmup() is state
+    payload, status = handlers.readiness_reply()
+    assert status == 200 and payload["components"]["fake"]["detail"] == {"ok": True}